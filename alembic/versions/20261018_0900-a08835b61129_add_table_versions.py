@@ -0,0 +1,77 @@
+"""add_table_versions
+
+Revision ID: a08835b61129
+Revises: 7389b6c26b8d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a08835b61129'
+down_revision: Union[str, None] = '7389b6c26b8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose list APIs send ETags (see utils/http_cache.py)
+VERSIONED_TABLES = [
+    'tblcustworkorderdetail',
+    'tblrepairworkorderdetail',
+    'tblcustomers',
+]
+
+
+def upgrade() -> None:
+    """
+    Add per-table change counters used to build ETags for the list APIs.
+
+    Statement-level triggers bump the counter once per INSERT/UPDATE/DELETE
+    statement, so bulk updates and the source_name sync trigger are covered
+    without any application code.
+    """
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (table_name)
+            DO UPDATE SET version = table_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+    for table in VERSIONED_TABLES:
+        op.execute(
+            f"INSERT INTO table_versions (table_name, version) VALUES ('{table}', 0)"
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop table version triggers, function and table."""
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
@@ -0,0 +1,36 @@
+"""seed_cleaning_queue_version
+
+Revision ID: 3c5e9a1f7b20
+Revises: a08835b61129
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e9a1f7b20'
+down_revision: Union[str, None] = 'a08835b61129'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Seed the cleaning queue's optimistic-concurrency version.
+
+    Queue reorder/move requests send back the version they were rendered
+    from; see utils/queue_positions.py (QUEUE_VERSION_KEY).
+    """
+    op.execute(
+        "INSERT INTO table_versions (table_name, version) "
+        "VALUES ('cleaning_queue', 0) ON CONFLICT (table_name) DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    """Remove the cleaning queue version row."""
+    op.execute("DELETE FROM table_versions WHERE table_name = 'cleaning_queue'")
@@ -0,0 +1,61 @@
+"""add_cleaning_queue_index
+
+Revision ID: 5d2f8c4b9e61
+Revises: 3c5e9a1f7b20
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8c4b9e61'
+down_revision: Union[str, None] = '3c5e9a1f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match utils.queue_positions.queue_base_filter() (and the model's
+# CLEANING_QUEUE_PREDICATE) for the planner to use the index
+CLEANING_QUEUE_PREDICATE = (
+    "datecompleted IS NULL AND clean IS NULL AND treat IS NULL "
+    "AND quote = 'Approved'"
+)
+
+
+def upgrade() -> None:
+    """
+    Add a partial covering index for the cleaning queue.
+
+    Only queued orders are indexed, in queue page order (QueuePosition,
+    DateRequired, DateIn, WorkOrderNo). The priority flags, customer and name
+    are INCLUDEd so the tier counts, dashboard summary and position loaders
+    are index-only scans. Built CONCURRENTLY so the table stays writable.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_workorder_cleaning_queue',
+            'tblcustworkorderdetail',
+            ['queueposition', 'daterequired', 'datein', 'workorderno'],
+            unique=False,
+            postgresql_where=sa.text(CLEANING_QUEUE_PREDICATE),
+            postgresql_include=['firmrush', 'rushorder', 'custid', 'woname'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+    # Fresh statistics so the planner sees the new index's selectivity
+    op.execute('ANALYZE tblcustworkorderdetail')
+
+
+def downgrade() -> None:
+    """Drop the cleaning queue index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_workorder_cleaning_queue',
+            table_name='tblcustworkorderdetail',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
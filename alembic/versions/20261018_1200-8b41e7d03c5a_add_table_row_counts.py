@@ -0,0 +1,95 @@
+"""add_table_row_counts
+
+Revision ID: 8b41e7d03c5a
+Revises: 5d2f8c4b9e61
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e7d03c5a'
+down_revision: Union[str, None] = '5d2f8c4b9e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose list APIs report totals (see utils/count_helpers.py)
+COUNTED_TABLES = [
+    'tblcustworkorderdetail',
+    'tblrepairworkorderdetail',
+    'tblcustomers',
+]
+
+
+def upgrade() -> None:
+    """
+    Keep a row count per list table in table_versions.
+
+    Statement-level triggers with transition tables add the number of
+    inserted rows and subtract the number of deleted rows once per
+    statement, so unfiltered list totals never need a COUNT(*).
+    """
+    op.add_column('table_versions', sa.Column('row_count', sa.BigInteger(), nullable=True))
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION adjust_table_row_count() RETURNS trigger AS $$
+        DECLARE
+            delta BIGINT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT count(*) INTO delta FROM inserted_rows;
+            ELSE
+                SELECT -count(*) INTO delta FROM deleted_rows;
+            END IF;
+            IF delta <> 0 THEN
+                UPDATE table_versions SET row_count = row_count + delta
+                WHERE table_name = TG_TABLE_NAME;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+    for table in COUNTED_TABLES:
+        # Lock out writers while the starting count is taken
+        op.execute(f"LOCK TABLE {table} IN SHARE MODE")
+        op.execute(
+            f"""
+            INSERT INTO table_versions (table_name, version, row_count)
+            VALUES ('{table}', 0, (SELECT count(*) FROM {table}))
+            ON CONFLICT (table_name)
+            DO UPDATE SET row_count = EXCLUDED.row_count
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_count_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS inserted_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION adjust_table_row_count();
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_count_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS deleted_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION adjust_table_row_count();
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop row count triggers, function and column."""
+    for table in COUNTED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_count_insert ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_count_delete ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS adjust_table_row_count()")
+    op.drop_column('table_versions', 'row_count')
@@ -0,0 +1,55 @@
+"""add_order_number_counters
+
+Revision ID: c7a9e2f4d816
+Revises: 8b41e7d03c5a
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a9e2f4d816'
+down_revision: Union[str, None] = '8b41e7d03c5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Counter name -> (table, number column); see utils/order_numbers.py
+COUNTERS = {
+    'work_order': ('tblcustworkorderdetail', 'workorderno'),
+    'repair_order': ('tblrepairworkorderdetail', 'repairorderno'),
+}
+
+
+def upgrade() -> None:
+    """
+    Add per-order-kind number counters, seeded from the highest existing
+    numeric order number, so new numbers come from UPDATE ... RETURNING
+    instead of a MAX() scan.
+    """
+    op.create_table(
+        'order_number_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_value', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+    for name, (table, column) in COUNTERS.items():
+        op.execute(
+            f"""
+            INSERT INTO order_number_counters (name, last_value)
+            SELECT '{name}', COALESCE(MAX({column}::bigint), 0)
+            FROM {table}
+            WHERE {column} ~ '^[0-9]+$'
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop order number counters."""
+    op.drop_table('order_number_counters')
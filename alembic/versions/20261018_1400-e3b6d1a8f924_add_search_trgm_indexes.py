@@ -0,0 +1,73 @@
+"""add_search_trgm_indexes
+
+Revision ID: e3b6d1a8f924
+Revises: c7a9e2f4d816
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b6d1a8f924'
+down_revision: Union[str, None] = 'c7a9e2f4d816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _document(*columns):
+    return " || ' | ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+
+# index name -> (table, search document). The documents must match
+# utils.search_helpers.search_document() for each model's __search_columns__,
+# otherwise the planner cannot use the index.
+SEARCH_INDEXES = {
+    'idx_workorder_search_trgm': (
+        'tblcustworkorderdetail',
+        _document('workorderno', 'woname', 'custid', 'shipto', 'storage',
+                  'rack_number', 'specialinstructions'),
+    ),
+    'idx_workorderitem_search_trgm': (
+        'tblorddetcustawngs',
+        _document('description', 'material', 'color', 'condition'),
+    ),
+    'idx_customer_search_trgm': (
+        'tblcustomers',
+        _document('custid', 'name', 'contact', 'city', 'homephone',
+                  'emailaddress', 'source'),
+    ),
+    'idx_inventory_search_trgm': (
+        'tblcustawngs',
+        _document('description', 'material', 'color', 'condition', 'custid'),
+    ),
+}
+
+
+def upgrade() -> None:
+    """
+    Add pg_trgm GIN indexes for global search.
+
+    One expression index per table over the columns joined into a single
+    search document, so ``document ILIKE '%term%'`` (and word_similarity()
+    ranking) no longer needs a sequential scan. Built CONCURRENTLY so the
+    tables stay writable.
+    """
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, (table, document) in SEARCH_INDEXES.items():
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} '
+                f'USING gin (({document}) gin_trgm_ops)'
+            )
+    for table, _ in SEARCH_INDEXES.values():
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    """Drop the search indexes (the pg_trgm extension is left installed)."""
+    with op.get_context().autocommit_block():
+        for name in SEARCH_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
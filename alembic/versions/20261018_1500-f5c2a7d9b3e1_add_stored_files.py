@@ -0,0 +1,62 @@
+"""add_stored_files
+
+Revision ID: f5c2a7d9b3e1
+Revises: e3b6d1a8f924
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c2a7d9b3e1'
+down_revision: Union[str, None] = 'e3b6d1a8f924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# File tables that reference stored_files; see utils/file_store.py
+FILE_TABLES = ('tblworkorderfiles', 'tblrepairorderfiles', 'tblcheckinfiles')
+
+
+def upgrade() -> None:
+    """
+    Add content-addressed file storage: one S3 object per SHA-256 digest,
+    reference counted, with order and check-in files pointing at it.
+
+    Existing files keep content_sha256 NULL and are deleted directly, as
+    before.
+    """
+    op.create_table(
+        'stored_files',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('s3_key', sa.String(length=500), nullable=False),
+        sa.Column('thumbnail_key', sa.String(length=500), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+        sa.UniqueConstraint('s3_key'),
+    )
+    op.create_index('ix_stored_files_thumbnail_key', 'stored_files', ['thumbnail_key'])
+
+    for table in FILE_TABLES:
+        op.add_column(table, sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        op.create_index(f'ix_{table}_content_sha256', table, ['content_sha256'])
+        op.create_foreign_key(
+            f'fk_{table}_content_sha256', table, 'stored_files',
+            ['content_sha256'], ['sha256'], ondelete='SET NULL',
+        )
+
+
+def downgrade() -> None:
+    """Drop content-addressed file storage (files keep their own S3 paths)."""
+    for table in FILE_TABLES:
+        op.drop_constraint(f'fk_{table}_content_sha256', table, type_='foreignkey')
+        op.drop_index(f'ix_{table}_content_sha256', table_name=table)
+        op.drop_column(table, 'content_sha256')
+    op.drop_index('ix_stored_files_thumbnail_key', table_name='stored_files')
+    op.drop_table('stored_files')
@@ -0,0 +1,44 @@
+"""add_s3_delete_outbox
+
+Revision ID: 9a4e6c2f8d13
+Revises: f5c2a7d9b3e1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6c2f8d13'
+down_revision: Union[str, None] = 'f5c2a7d9b3e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the S3 delete outbox: object keys of deleted orders and files,
+    queued with the DB change and removed in batches after the commit.
+    """
+    op.create_table(
+        's3_delete_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('s3_key', sa.String(length=1024), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_s3_delete_outbox_next_attempt_at', 's3_delete_outbox', ['next_attempt_at']
+    )
+
+
+def downgrade() -> None:
+    """Drop the S3 delete outbox (pending deletes are abandoned)."""
+    op.drop_index('ix_s3_delete_outbox_next_attempt_at', table_name='s3_delete_outbox')
+    op.drop_table('s3_delete_outbox')
@@ -23,6 +23,14 @@ def create_app(config_class=Config):
     login_manager.login_view = "auth.login"
     cache.init_app(app)
 
+    from utils.cache_metrics import init_cache_metrics
+
+    init_cache_metrics(app)
+
+    from utils.queue_events import init_queue_events
+
+    init_queue_events(app)
+
     # Initialize Limiter
     limiter.init_app(app)
 
@@ -151,6 +159,8 @@ def create_app(config_class=Config):
     from routes.email_reminders import email_reminders_bp
     from routes.drafts import drafts_bp
     from routes.chatbot import chatbot_bp
+    from routes.events import events_bp
+    from routes.search import search_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(source_bp, url_prefix="/sources")
@@ -169,6 +179,8 @@ def create_app(config_class=Config):
     app.register_blueprint(email_reminders_bp)
     app.register_blueprint(drafts_bp)  # API routes for draft auto-save
     app.register_blueprint(chatbot_bp)  # RAG chatbot API routes
+    app.register_blueprint(events_bp, url_prefix="/events")
+    app.register_blueprint(search_bp)
 
     # Register routes
     @app.route("/")
@@ -53,6 +53,20 @@ class Config:
     AWS_S3_BUCKET = os.environ.get("AWS_S3_BUCKET")
     AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 
+    # Deferred S3 uploads (see commit_deferred_uploads in utils/file_upload.py):
+    # S3_UPLOAD_WORKERS files in parallel; files above S3_MULTIPART_THRESHOLD_MB
+    # go up as multipart uploads of S3_MULTIPART_CHUNK_MB parts (5 MB is the
+    # S3 minimum), S3_MULTIPART_CONCURRENCY parts at a time
+    S3_UPLOAD_WORKERS = int(os.environ.get("S3_UPLOAD_WORKERS", 4))
+    S3_MULTIPART_THRESHOLD_MB = int(os.environ.get("S3_MULTIPART_THRESHOLD_MB", 5))
+    S3_MULTIPART_CHUNK_MB = int(os.environ.get("S3_MULTIPART_CHUNK_MB", 5))
+    S3_MULTIPART_CONCURRENCY = int(os.environ.get("S3_MULTIPART_CONCURRENCY", 4))
+
+    # S3 deletes for removed orders and files (see utils/s3_deletes.py): queued
+    # in s3_delete_outbox with the DB change and removed after the commit on
+    # S3_DELETE_WORKERS background threads (0 deletes inline)
+    S3_DELETE_WORKERS = int(os.environ.get("S3_DELETE_WORKERS", 1))
+
     # Email configuration
     FROM_EMAIL = os.environ.get("FROM_EMAIL", "reminders@yourdomain.com")
 
@@ -100,6 +114,44 @@ class Config:
     CACHE_TYPE = "SimpleCache"  # In-memory, thread-safe
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
     CACHE_KEY_PREFIX = "awning_"
+    # Seconds between "[CACHE STATS]" summary log lines (0 disables)
+    CACHE_METRICS_LOG_INTERVAL = int(os.environ.get("CACHE_METRICS_LOG_INTERVAL", 300))
+
+    # Live queue/in-progress events (SSE, see utils/queue_events.py)
+    # "auto" uses Postgres LISTEN/NOTIFY when available, else in-process only
+    QUEUE_EVENTS_BACKEND = os.environ.get("QUEUE_EVENTS_BACKEND", "auto")
+    # Streams are closed after this long; EventSource reconnects with Last-Event-ID
+    QUEUE_EVENTS_STREAM_SECONDS = int(os.environ.get("QUEUE_EVENTS_STREAM_SECONDS", 300))
+    QUEUE_EVENTS_HEARTBEAT_SECONDS = 15
+    # An open stream holds one gthread (Procfile: 8 per worker), so each worker
+    # serves at most this many; further clients are polled every
+    # QUEUE_EVENTS_POLL_SECONDS through the same endpoint instead
+    QUEUE_EVENTS_MAX_STREAMS = int(os.environ.get("QUEUE_EVENTS_MAX_STREAMS", 4))
+    QUEUE_EVENTS_POLL_SECONDS = int(os.environ.get("QUEUE_EVENTS_POLL_SECONDS", 20))
+
+    # List API totals (see utils/count_helpers.py): filtered queries whose
+    # planner estimate is at least this many rows report the estimate instead
+    # of running an exact COUNT (clients can still ask for count=exact)
+    COUNT_ESTIMATE_THRESHOLD = int(os.environ.get("COUNT_ESTIMATE_THRESHOLD", 10000))
+
+    # Bulk work order PDFs (see utils/bulk_pdf.py): orders are rendered in
+    # batches of BULK_PDF_BATCH_SIZE across BULK_PDF_WORKERS processes
+    # (0 renders in the request thread), merged into a temp file and streamed
+    BULK_PDF_WORKERS = int(os.environ.get("BULK_PDF_WORKERS", 2))
+    BULK_PDF_BATCH_SIZE = int(os.environ.get("BULK_PDF_BATCH_SIZE", 25))
+    BULK_PDF_MAX_ORDERS = int(os.environ.get("BULK_PDF_MAX_ORDERS", 500))
+
+    # Rendered order PDF cache (see utils/pdf_cache.py): local disk LRU capped
+    # at PDF_CACHE_MAX_BYTES (0 disables it), optionally shared through S3
+    PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR")
+    PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    PDF_CACHE_S3 = os.environ.get("PDF_CACHE_S3", "false").lower() == "true"
+
+    # Upload thumbnails (see utils/thumbnail_jobs.py): generated after the DB
+    # commit on THUMBNAIL_WORKERS background threads (0 generates them inline);
+    # past THUMBNAIL_QUEUE_SIZE waiting jobs, new ones run inline
+    THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", 2))
+    THUMBNAIL_QUEUE_SIZE = int(os.environ.get("THUMBNAIL_QUEUE_SIZE", 64))
 
     # DeepSeek API configuration (for RAG chatbot)
     DEEPSEEK_API_KEY = os.environ.get("DEEPSEEK_API_KEY", "")
@@ -131,6 +183,13 @@ class TestingConfig(Config):
     # Disable caching in tests to avoid stale data
     CACHE_TYPE = "NullCache"  # No caching during tests
     CACHE_NO_NULL_WARNING = True
+    CACHE_METRICS_LOG_INTERVAL = 0
+    QUEUE_EVENTS_BACKEND = "memory"
+    BULK_PDF_WORKERS = 0
+    PDF_CACHE_MAX_BYTES = 0
+    PDF_CACHE_S3 = False
+    THUMBNAIL_WORKERS = 0
+    S3_DELETE_WORKERS = 0
 
 
 config = {
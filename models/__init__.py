@@ -5,6 +5,10 @@ from .checkin_file import CheckInFile
 from .work_order_draft import WorkOrderDraft
 from .chat import ChatSession, ChatMessage
 from .embeddings import CustomerEmbedding, WorkOrderEmbedding, ItemEmbedding
+from .table_version import TableVersion
+from .order_number_counter import OrderNumberCounter
+from .stored_file import StoredFile
+from .s3_delete_outbox import S3DeleteOutbox
 
 # Optional: add the renamed files with spaces if needed
 # from .Name_AutoCorrect_Log import NameAutoCorrectLog
@@ -22,4 +26,8 @@ __all__ = [
     "CustomerEmbedding",
     "WorkOrderEmbedding",
     "ItemEmbedding",
+    "TableVersion",
+    "OrderNumberCounter",
+    "StoredFile",
+    "S3DeleteOutbox",
 ]
@@ -13,11 +13,22 @@ class CheckInFile(db.Model):
         nullable=False,
     )
     file_name = db.Column("file_name", db.String(255), nullable=False)
+    # Same attribute name as WorkOrderFile / RepairOrderFile (utils/file_upload.py)
+    filename = db.synonym("file_name")
     file_path = db.Column("file_path", db.String(500), nullable=False)
     file_size = db.Column("file_size", db.Integer, nullable=True)
     file_type = db.Column("file_type", db.String(100), nullable=True)
     uploaded_at = db.Column("uploaded_at", db.DateTime, server_default=func.now())
 
+    # Shared S3 object with this content (see models/stored_file.py)
+    content_sha256 = db.Column(
+        "content_sha256",
+        db.String(64),
+        db.ForeignKey("stored_files.sha256", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
     # Relationship to CheckIn
     checkin = db.relationship("CheckIn", back_populates="files")
 
@@ -1,9 +1,20 @@
 from extensions import db
 import re
+from utils.search_helpers import search_index
 
 
 class Customer(db.Model):
     __tablename__ = "tblcustomers"
+    # Global search (utils/search_helpers.py); the first column is the key
+    __search_columns__ = (
+        "CustID",
+        "Name",
+        "Contact",
+        "City",
+        "HomePhone",
+        "EmailAddress",
+        "Source",
+    )
 
     # Update to use lowercase column names to match PostgreSQL
     CustID = db.Column("custid", db.Text, primary_key=True, nullable=False)
@@ -161,3 +172,6 @@ class Customer(db.Model):
 
     def __repr__(self):
         return f"<Customer {self.CustID}: {self.Name}>"
+
+
+search_index(Customer, "idx_customer_search_trgm")
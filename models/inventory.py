@@ -1,9 +1,12 @@
 from extensions import db
 from datetime import datetime
+from utils.search_helpers import search_index
 
 
 class Inventory(db.Model):
     __tablename__ = "tblcustawngs"
+    # Global search (utils/search_helpers.py)
+    __search_columns__ = ("Description", "Material", "Color", "Condition", "CustID")
 
     # Map Python attributes to actual lowercase database columns
     Description = db.Column("description", db.Text)
@@ -34,3 +37,6 @@ class Inventory(db.Model):
 
     def __repr__(self):
         return f"<CustAwning {self.Description} (CustID={self.CustID})>"
+
+
+search_index(Inventory, "idx_inventory_search_trgm")
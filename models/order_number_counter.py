@@ -0,0 +1,23 @@
+from extensions import db
+from sqlalchemy.sql import func
+
+
+class OrderNumberCounter(db.Model):
+    """
+    Last number handed out for a kind of order (work orders, repair orders).
+
+    Numbers are allocated with UPDATE ... RETURNING on this row (see
+    utils/order_numbers.py) instead of scanning the order table for its
+    maximum number.
+    """
+
+    __tablename__ = "order_number_counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_value = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(
+        db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<OrderNumberCounter {self.name}: {self.last_value}>"
@@ -22,6 +22,15 @@ class RepairOrderFile(db.Model):
     uploaded_at = db.Column("uploaded_at", db.DateTime, default=datetime.utcnow)
     thumbnail_path = db.Column(db.String(500), nullable=True)
 
+    # Shared S3 object with this content (see models/stored_file.py)
+    content_sha256 = db.Column(
+        "content_sha256",
+        db.String(64),
+        db.ForeignKey("stored_files.sha256", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
     # Relationship back to RepairWorkOrder
     repair_order = db.relationship("RepairWorkOrder", back_populates="files")
 
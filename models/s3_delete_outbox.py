@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from extensions import db
+
+
+class S3DeleteOutbox(db.Model):
+    """
+    An S3 object waiting to be deleted.
+
+    Rows are added in the same transaction that deletes the order or file
+    rows, and removed once the object is gone (see utils/s3_deletes.py). A
+    failed delete stays here with its error and is retried from
+    next_attempt_at.
+    """
+
+    __tablename__ = "s3_delete_outbox"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    s3_key = db.Column(db.String(1024), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<S3DeleteOutbox {self.id}: {self.s3_key} ({self.attempts} attempts)>"
@@ -0,0 +1,25 @@
+from extensions import db
+from sqlalchemy.sql import func
+
+
+class StoredFile(db.Model):
+    """
+    One S3 object per distinct upload content (SHA-256 digest).
+
+    Order and check-in file rows point at it through ``content_sha256``;
+    ``ref_count`` is the number of rows sharing the object. The object (and
+    its thumbnail) is deleted when the last reference is released (see
+    utils/file_store.py).
+    """
+
+    __tablename__ = "stored_files"
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    s3_key = db.Column(db.String(500), nullable=False, unique=True)
+    thumbnail_key = db.Column(db.String(500), nullable=True, index=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<StoredFile {self.sha256[:12]}: {self.s3_key} x{self.ref_count}>"
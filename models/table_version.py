@@ -0,0 +1,29 @@
+from extensions import db
+from sqlalchemy.sql import func
+
+
+class TableVersion(db.Model):
+    """
+    Change counter per table, used to build cheap ETags for list APIs.
+
+    On PostgreSQL the counters are bumped by statement-level triggers
+    (see migration add_table_versions), so bulk UPDATEs and the source_name
+    sync trigger are covered too. Other databases fall back to the
+    in-process counters in utils/http_cache.py.
+
+    row_count is the table's row count, kept up to date by INSERT/DELETE
+    triggers (migration add_table_row_counts) for the list API totals in
+    utils/count_helpers.py. NULL for rows that are not real tables.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    row_count = db.Column(db.BigInteger, nullable=True)
+    updated_at = db.Column(
+        db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<TableVersion {self.table_name}: {self.version}>"
@@ -1,10 +1,43 @@
 from extensions import db
 from sqlalchemy.sql import func
 from flask import current_app  # Import current_app to access Flask config
+from utils.search_helpers import search_index
+
+
+# utils.queue_positions.queue_base_filter() as SQL, for the cleaning queue index
+CLEANING_QUEUE_PREDICATE = (
+    "datecompleted IS NULL AND clean IS NULL AND treat IS NULL "
+    "AND quote = 'Approved'"
+)
 
 
 class WorkOrder(db.Model):
     __tablename__ = "tblcustworkorderdetail"
+    # Global search (utils/search_helpers.py); the first column is the key
+    __search_columns__ = (
+        "WorkOrderNo",
+        "WOName",
+        "CustID",
+        "ShipTo",
+        "Storage",
+        "RackNo",
+        "SpecialInstructions",
+    )
+    __table_args__ = (
+        # Cleaning queue: a small partial index in queue page order, carrying
+        # the other columns the queue counts, summary and position loaders
+        # read so they run as index-only scans. Positions are assigned per
+        # tier (utils/queue_positions.py), so this one order serves every tier.
+        db.Index(
+            "idx_workorder_cleaning_queue",
+            "queueposition",
+            "daterequired",
+            "datein",
+            "workorderno",
+            postgresql_where=db.text(CLEANING_QUEUE_PREDICATE),
+            postgresql_include=["firmrush", "rushorder", "custid", "woname"],
+        ),
+    )
 
     # Map Python attributes to actual lowercase database columns
     WorkOrderNo = db.Column("workorderno", db.String, primary_key=True, nullable=False)
@@ -61,11 +94,12 @@ class WorkOrder(db.Model):
         "WorkOrderItem", back_populates="work_order", cascade="all, delete-orphan"
     )
 
+    # Relationships load lazily; call sites choose what to eager load with
+    # utils.load_profiles.work_order_load_options()
     files = db.relationship(
         "WorkOrderFile",
         back_populates="work_order",
         cascade="all, delete-orphan",
-        lazy="joined",
     )
 
     QueuePosition = db.Column("queueposition", db.Integer, nullable=True)
@@ -75,7 +109,6 @@ class WorkOrder(db.Model):
     ship_to_source = db.relationship(
         "Source",
         primaryjoin="WorkOrder.ShipTo==Source.SSource",
-        lazy="joined",
         uselist=False,
     )
 
@@ -181,6 +214,7 @@ class WorkOrder(db.Model):
 
 class WorkOrderItem(db.Model):
     __tablename__ = "tblorddetcustawngs"
+    __search_columns__ = ("Description", "Material", "Color", "Condition")
 
     # Auto-increment primary key
     id = db.Column("id", db.Integer, primary_key=True, autoincrement=True)
@@ -234,3 +268,7 @@ class WorkOrderItem(db.Model):
 
     def __str__(self):
         return f"{self.Description} ({self.Material}) - Qty: {self.Qty}"
+
+
+search_index(WorkOrder, "idx_workorder_search_trgm")
+search_index(WorkOrderItem, "idx_workorderitem_search_trgm")
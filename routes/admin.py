@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import os
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from models.user import User
 from models.invite_token import InviteToken
 from extensions import db
 from decorators import role_required
+from utils.cache_metrics import cache_metrics
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -79,3 +81,19 @@ def update_user_role(user_id):
 
     flash(f"Updated {user.username}'s role to {new_role}", "success")
     return redirect(url_for("admin.manage_users"))
+
+
+@admin_bp.route("/cache-stats", methods=["GET", "POST"])
+@login_required
+@role_required("admin")
+def cache_stats():
+    """
+    Per-prefix cache hit/miss/set/eviction counters for this worker.
+
+    POST resets the counters (e.g. before measuring a change).
+    """
+    if request.method == "POST":
+        cache_metrics.reset()
+    snapshot = cache_metrics.snapshot()
+    snapshot["worker_pid"] = os.getpid()
+    return jsonify(snapshot)
@@ -1,10 +1,11 @@
 from flask import Blueprint, render_template, jsonify
 from flask_login import login_required
 import pandas as pd
-from extensions import db, cache
+from extensions import db
 from datetime import datetime, timedelta
 from sqlalchemy import text
 from decorators import role_required
+from utils.cache_helpers import cached_view
 import numpy as np
 from scipy import stats
 from scipy.stats import percentileofscore
@@ -362,7 +363,7 @@ def get_weekly_sq_ft_cleaned_kde(df):
 @analytics_bp.route("/")
 @login_required
 @role_required("admin", "manager")
-@cache.cached(timeout=300, key_prefix="analytics_dashboard")
+@cached_view(timeout=300, key_prefix="analytics_dashboard")
 def analytics_dashboard():
     """Main analytics dashboard."""
     try:
@@ -384,7 +385,7 @@ def analytics_dashboard():
 @analytics_bp.route("/api/data")
 @login_required
 @role_required("admin", "manager")
-@cache.cached(timeout=300, key_prefix="analytics_api_data")
+@cached_view(timeout=300, key_prefix="analytics_api_data")
 def get_analytics_data():
     """API endpoint for chart data."""
     try:
@@ -22,8 +22,10 @@ from utils.file_upload import (
     save_order_file_generic,
     allowed_file,
     commit_deferred_uploads,
-    cleanup_deferred_files
+    cleanup_deferred_files,
+    release_file_keys,
 )
+from utils.s3_deletes import queue_s3_deletes, schedule_s3_delete_drain
 
 checkins_bp = Blueprint("checkins", __name__, url_prefix="/checkins")
 
@@ -347,8 +349,13 @@ def delete_checkin(checkin_id):
             flash("Cannot delete a processed check-in", "error")
             return redirect(url_for("checkins.view_pending"))
 
+        # Queue the files' S3 objects (shared ones are kept while referenced)
+        for file_obj in checkin.files:
+            queue_s3_deletes(release_file_keys(file_obj))
+
         db.session.delete(checkin)
         db.session.commit()
+        schedule_s3_delete_drain()
         flash(f"Check-in #{checkin_id} deleted successfully", "success")
     except Exception as e:
         db.session.rollback()
@@ -426,7 +433,7 @@ def download_checkin_file(file_id):
 
     try:
         # Generate presigned URL for download
-        download_url = generate_presigned_url(checkin_file.file_path, expiration=300)
+        download_url = generate_presigned_url(checkin_file.file_path, expires_in=300)
         return redirect(download_url)
     except Exception as e:
         flash(f"Error downloading file: {str(e)}", "error")
@@ -1,4 +1,13 @@
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    jsonify,
+    flash,
+    redirect,
+    url_for,
+    get_template_attribute,
+)
 from flask_login import login_required
 from models.customer import Customer
 from models.source import Source
@@ -6,13 +15,24 @@ from models.inventory import Inventory
 from models.work_order import WorkOrder
 from models.repair_order import RepairWorkOrder
 from extensions import db, cache
-from sqlalchemy import or_, func, cast, Integer, desc, asc
+from sqlalchemy import func, cast, Integer, select
+from sqlalchemy.orm import lazyload
 from sqlalchemy.exc import IntegrityError
 import time
 import random
 from decorators import role_required
 from flask_login import current_user
 from utils.cache_helpers import invalidate_customer_cache
+from utils.http_cache import conditional_list_response
+from utils.search_helpers import apply_search
+from utils.count_helpers import count_for_list, wants_exact_count
+from utils.query_helpers import (
+    InvalidCursor,
+    keyset_paginate,
+    sort_clauses,
+    sort_key,
+    tabulator_sort_keys,
+)
 
 
 customers_bp = Blueprint("customers", __name__)
@@ -61,6 +81,7 @@ def list_customers():
 
 @customers_bp.route("/api/customers")
 @login_required
+@conditional_list_response(Customer)
 def api_customers():
     """API endpoint for the customers table with server-side filtering, sorting, and pagination"""
 
@@ -70,20 +91,7 @@ def api_customers():
     query = Customer.query
 
     # Apply global search
-    search = request.args.get("search", "").strip()
-    if search:
-        term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Customer.Name.ilike(term),
-                Customer.CustID.ilike(term),
-                Customer.Contact.ilike(term),
-                Customer.City.ilike(term),
-                Customer.HomePhone.ilike(term),
-                Customer.EmailAddress.ilike(term),
-                Customer.Source.ilike(term),
-            )
-        )
+    query = apply_search(query, Customer, request.args.get("search"))
 
     # Apply column-specific filters
     filter_mapping = {
@@ -115,27 +123,29 @@ def api_customers():
         "Source": Customer.Source,
     }
 
-    i = 0
-    sort_applied = False
-    while True:
-        field = request.args.get(f"sort[{i}][field]")
-        direction = request.args.get(f"sort[{i}][dir]", "asc")
-        if not field:
-            break
-        if field in sort_mapping:
-            col = sort_mapping[field]
-            query = query.order_by(desc(col) if direction == "desc" else asc(col))
-            sort_applied = True
-        i += 1
-
-    if not sort_applied:
-        query = query.order_by(Customer.CustID)
-
-    total = query.count()
-    customers = query.paginate(page=page, per_page=size, error_out=False)
+    sort_keys = tabulator_sort_keys(Customer, request.args, sort_mapping) or [
+        sort_key("CustID", Customer.CustID)
+    ]
+
+    cursor = request.args.get("cursor")
+    if cursor is not None:
+        # Keyset mode: seek past the cursor, no OFFSET and no COUNT
+        try:
+            keyset_page = keyset_paginate(
+                query, sort_keys, cursor, size, tiebreaker=Customer.CustID
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        items = keyset_page.items
+    else:
+        query = query.order_by(*sort_clauses(sort_keys))
+        list_count = count_for_list(query, Customer, exact=wants_exact_count(request.args))
+        customers = query.paginate(page=page, per_page=size, error_out=False, count=False)
+        customers.total = list_count.total
+        items = customers.items
 
     data = []
-    for c in customers.items:
+    for c in items:
         location = ", ".join(filter(None, [c.City, c.State]))
         data.append(
             {
@@ -155,10 +165,21 @@ def api_customers():
             }
         )
 
+    if cursor is not None:
+        return jsonify(
+            {
+                "data": data,
+                "size": size,
+                "next_cursor": keyset_page.next_cursor,
+                "has_next": keyset_page.has_next,
+            }
+        )
+
     return jsonify(
         {
             "data": data,
-            "total": total,
+            "total": list_count.total,
+            "total_exact": list_count.exact,
             "page": page,
             "size": size,
             "last_page": customers.pages,
@@ -175,32 +196,161 @@ def view_customer(customer_id):
     return customer_detail(customer_id)
 
 
-@customers_bp.route("/view/<customer_id>")
+# Rows per section on the customer detail page; the rest load on demand
+DETAIL_SECTION_SIZE = 25
+MAX_SECTION_SIZE = 100
+
+
+def customer_summary(customer_id):
+    """
+    Order and inventory totals for the detail page, counted in SQL in one
+    round trip instead of loading every order to count them in the template.
+    """
+
+    def count(model, column=None):
+        counted = func.count(column) if column is not None else func.count()
+        return (
+            select(counted)
+            .select_from(model)
+            .where(model.CustID == customer_id)
+            .scalar_subquery()
+        )
+
+    row = db.session.execute(
+        select(
+            count(WorkOrder).label("work_orders"),
+            count(WorkOrder, WorkOrder.DateCompleted).label("closed_work_orders"),
+            count(RepairWorkOrder).label("repair_orders"),
+            count(RepairWorkOrder, RepairWorkOrder.DateCompleted).label("closed_repair_orders"),
+            count(Inventory).label("inventory_items"),
+        )
+    ).one()
+    summary = dict(row._mapping)
+    summary["open_work_orders"] = summary["work_orders"] - summary["closed_work_orders"]
+    summary["open_repair_orders"] = summary["repair_orders"] - summary["closed_repair_orders"]
+    return summary
+
+
+def _work_order_section(customer_id):
+    query = WorkOrder.query.filter_by(CustID=customer_id).options(lazyload("*"))
+    # Newest first by numeric WorkOrderNo
+    sort_keys = [sort_key("WorkOrderNo", cast(WorkOrder.WorkOrderNo, Integer), descending=True)]
+    return query, sort_keys, WorkOrder.WorkOrderNo
+
+
+def _repair_order_section(customer_id):
+    query = RepairWorkOrder.query.filter_by(CustID=customer_id).options(lazyload("*"))
+    # Newest first by numeric RepairOrderNo
+    sort_keys = [
+        sort_key("RepairOrderNo", cast(RepairWorkOrder.RepairOrderNo, Integer), descending=True)
+    ]
+    return query, sort_keys, RepairWorkOrder.RepairOrderNo
+
+
+def _inventory_section(customer_id):
+    query = Inventory.query.filter_by(CustID=customer_id)
+    # Newest first (issue #165); undated items last
+    sort_keys = [sort_key("created_at", Inventory.created_at, descending=True)]
+    return query, sort_keys, Inventory.InventoryKey
+
+
+# section -> (query builder, row macro in customers/_detail_macros.html)
+DETAIL_SECTIONS = {
+    "work_orders": (_work_order_section, "work_order_row"),
+    "repair_orders": (_repair_order_section, "repair_order_row"),
+    "inventory": (_inventory_section, "inventory_row"),
+}
+
+
+def detail_section_page(section, customer_id, cursor=None, size=DETAIL_SECTION_SIZE):
+    """
+    One keyset page of a customer detail section.
+
+    Returns:
+        KeysetPage: items, next_cursor, has_next
+
+    Raises:
+        InvalidCursor: if the cursor is malformed or was made for another section
+    """
+    build, _ = DETAIL_SECTIONS[section]
+    query, sort_keys, tiebreaker = build(customer_id)
+    return keyset_paginate(query, sort_keys, cursor, size, tiebreaker=tiebreaker)
+
+
+def _order_row_data(order, number_field):
+    return {
+        number_field: getattr(order, number_field),
+        "DateIn": order.DateIn.strftime("%m/%d/%Y") if order.DateIn else None,
+        "is_open": not order.DateCompleted,
+    }
+
+
+@customers_bp.route("/api/customers/<customer_id>/<section>")
 @login_required
-def customer_detail(customer_id):
-    """Display detailed view of a customer"""
-    customer = Customer.query.get_or_404(customer_id)
-    inventory_items = Inventory.query.filter_by(CustID=customer_id).order_by(desc(Inventory.created_at).nulls_last()).all()
+def customer_detail_section(customer_id, section):
+    """
+    Further pages of a customer detail section (work_orders, repair_orders
+    or inventory), for the page's "Show more" buttons.
 
-    # Work Orders: newest first by date
-    work_orders = (
-        WorkOrder.query.filter_by(CustID=customer_id)
-        .order_by(desc(cast(WorkOrder.WorkOrderNo, Integer)))
-        .all()
-    )
+    Query args: cursor (from the previous page's next_cursor), size.
+    Returns the rows as data and as rendered list/table rows (html).
+    """
+    if section not in DETAIL_SECTIONS:
+        return jsonify({"error": f"Unknown section: {section}"}), 404
+    if db.session.get(Customer, customer_id) is None:
+        return jsonify({"error": f"Unknown customer: {customer_id}"}), 404
+    size = min(max(request.args.get("size", DETAIL_SECTION_SIZE, type=int), 1), MAX_SECTION_SIZE)
 
-    # Repair Orders: newest first by numeric RepairOrderNo
-    repair_orders = (
-        RepairWorkOrder.query.filter_by(CustID=customer_id)
-        .order_by(desc(cast(RepairWorkOrder.RepairOrderNo, Integer)))
-        .all()
+    try:
+        page = detail_section_page(section, customer_id, request.args.get("cursor"), size)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    if section == "inventory":
+        data = [item.to_dict() for item in page.items]
+    elif section == "work_orders":
+        data = [_order_row_data(wo, "WorkOrderNo") for wo in page.items]
+    else:
+        data = [_order_row_data(ro, "RepairOrderNo") for ro in page.items]
+
+    row = get_template_attribute("customers/_detail_macros.html", DETAIL_SECTIONS[section][1])
+    return_url = url_for("customers.customer_detail", customer_id=customer_id)
+    html = "".join(str(row(item, user_can_edit(), return_url)) for item in page.items)
+
+    return jsonify(
+        {
+            "data": data,
+            "html": html,
+            "size": size,
+            "next_cursor": page.next_cursor,
+            "has_next": page.has_next,
+        }
     )
+
+
+@customers_bp.route("/view/<customer_id>")
+@login_required
+def customer_detail(customer_id):
+    """
+    Display detailed view of a customer
+
+    Renders the totals and the first page of each section; the rest of a
+    long customer's orders and inventory load on demand through
+    customer_detail_section().
+    """
+    customer = Customer.query.get_or_404(customer_id)
+    sections = {
+        section: detail_section_page(section, customer_id) for section in DETAIL_SECTIONS
+    }
     return render_template(
         "customers/detail.html",
         customer=customer,
-        inventory_items=inventory_items,
-        work_orders=work_orders,
-        repair_work_orders=repair_orders,
+        can_edit=user_can_edit(),
+        summary=customer_summary(customer_id),
+        sections=sections,
+        inventory_items=sections["inventory"].items,
+        work_orders=sections["work_orders"].items,
+        repair_work_orders=sections["repair_orders"].items,
     )
 
 
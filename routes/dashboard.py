@@ -20,8 +20,6 @@ def get_recent_orders(limit=10):
                 "activity_time"
             ),
         )
-        .outerjoin(WorkOrder.files)
-        .outerjoin(WorkOrder.ship_to_source)
         .options(joinedload(WorkOrder.customer).joinedload(Customer.source_info))
         .order_by(
             nullslast(func.greatest(WorkOrder.created_at, WorkOrder.updated_at).desc())
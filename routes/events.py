@@ -0,0 +1,85 @@
+from flask import Blueprint, Response, current_app, request
+from flask_login import login_required
+import time
+
+from utils.queue_events import format_sse, broker, subscribe
+
+
+events_bp = Blueprint("events", __name__)
+
+
+@events_bp.route("/stream")
+@login_required
+def event_stream():
+    """
+    Server-sent events feed for the cleaning queue and in-progress boards.
+
+    The stream closes after QUEUE_EVENTS_STREAM_SECONDS so a worker thread is
+    never held indefinitely; EventSource reconnects with Last-Event-ID and
+    missed events are replayed from the broker's buffer. When they are no
+    longer available a "reset" event tells the page to reload its data.
+
+    Each open stream holds a request thread, so a worker serves at most
+    QUEUE_EVENTS_MAX_STREAMS of them. Past that the client is polled instead:
+    the response replays missed events, ends with a "busy" event carrying the
+    id to resume from, and tells EventSource to reconnect after
+    QUEUE_EVENTS_POLL_SECONDS.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    stream_seconds = current_app.config.get("QUEUE_EVENTS_STREAM_SECONDS", 300)
+    heartbeat_seconds = current_app.config.get("QUEUE_EVENTS_HEARTBEAT_SECONDS", 15)
+    max_streams = current_app.config.get("QUEUE_EVENTS_MAX_STREAMS", 4)
+
+    subscription, replay = subscribe(last_event_id, max_subscribers=max_streams)
+    if subscription is None:
+        return _sse_response(_poll(last_event_id))
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if replay is None:
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                for evt in replay:
+                    yield format_sse(evt)
+
+            deadline = time.monotonic() + stream_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                evt = subscription.get(timeout=min(heartbeat_seconds, remaining))
+                if subscription.overflowed:
+                    yield "event: reset\ndata: {}\n\n"
+                    break
+                if evt is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_sse(evt)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return _sse_response(generate())
+
+
+def _poll(last_event_id):
+    """Body for a client turned away by QUEUE_EVENTS_MAX_STREAMS."""
+    poll_seconds = current_app.config.get("QUEUE_EVENTS_POLL_SECONDS", 20)
+    replay, cursor = broker.poll(last_event_id)
+
+    chunks = [f"retry: {int(poll_seconds * 1000)}\n\n"]
+    if replay is None:
+        chunks.append("event: reset\ndata: {}\n\n")
+    else:
+        chunks.extend(format_sse(evt) for evt in replay)
+    # Dispatched with an id so the next reconnect resumes after the cursor
+    chunks.append(f"id: {cursor}\nevent: busy\ndata: {{}}\n\n")
+    return "".join(chunks)
+
+
+def _sse_response(body):
+    response = Response(body, mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop nginx/ELB-style proxies from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -2,7 +2,7 @@ from flask import Blueprint, render_template, request, jsonify, flash, redirect,
 from flask_login import login_required
 from models.inventory import Inventory  # Updated import
 from extensions import db
-from sqlalchemy import or_
+from utils.search_helpers import apply_search
 import uuid
 from decorators import role_required
 
@@ -20,16 +20,7 @@ def inventory_list():
     query = Inventory.query
 
     # Apply search filter
-    if search_query:
-        query = query.filter(
-            or_(
-                Inventory.Description.contains(search_query),
-                Inventory.Material.contains(search_query),
-                Inventory.Color.contains(search_query),
-                Inventory.Condition.contains(search_query),
-                Inventory.CustID.contains(search_query),
-            )
-        )
+    query = apply_search(query, Inventory, search_query)
 
     items = query.paginate(page=page, per_page=per_page, error_out=False)
 
@@ -169,16 +160,8 @@ def api_search_inventory():
     if cust_id:
         base_query = base_query.filter_by(CustID=cust_id)
 
-    # Apply search filter if provided
-    if query:
-        base_query = base_query.filter(
-            or_(
-                Inventory.Description.contains(query),
-                Inventory.Material.contains(query),
-                Inventory.Color.contains(query),
-                Inventory.Condition.contains(query),
-            )
-        )
+    # Apply search filter if provided, best matches first
+    base_query = apply_search(base_query, Inventory, query, ranked=True)
 
     items = base_query.limit(10).all()
 
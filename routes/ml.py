@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, jsonify, request, flash, redirect,
 from flask_login import login_required
 from extensions import db
 from models.work_order import WorkOrder
+from utils.load_profiles import ML, work_order_load_options
 import pandas as pd
 import lightgbm as lgb
 from sklearn.model_selection import train_test_split
@@ -14,6 +15,7 @@ import joblib
 import os
 from datetime import datetime, timedelta
 from utils.file_upload import save_ml_model
+from utils.cache_metrics import cache_metrics
 
 warnings.filterwarnings("ignore")
 
@@ -68,6 +70,9 @@ _model_cache = {
     "cache_ttl_seconds": 300,  # 5 minutes
 }
 
+# Metrics prefix for the model cache (see utils/cache_metrics.py)
+ML_CACHE_METRICS_PREFIX = "ml:model"
+
 
 def get_current_model():
     """
@@ -92,13 +97,20 @@ def get_current_model():
         cache["loaded_at"] is not None and
         (now - cache["loaded_at"]) < cache["cache_ttl_seconds"]):
         # Cache hit
+        cache_metrics.record_hit(ML_CACHE_METRICS_PREFIX)
         return cache["model"], cache["metadata"]
 
     # Cache miss or expired - load from S3
+    if cache["model"] is not None:
+        # TTL expiry drops the previously loaded model
+        cache_metrics.record_eviction(ML_CACHE_METRICS_PREFIX)
+    cache_metrics.record_miss(ML_CACHE_METRICS_PREFIX)
     print(f"[ML CACHE] Loading model from S3 (cache expired or empty)")
-    success = load_latest_model_from_s3()
+    with cache_metrics.time_recompute(ML_CACHE_METRICS_PREFIX):
+        success = load_latest_model_from_s3()
 
     if success:
+        cache_metrics.record_set(ML_CACHE_METRICS_PREFIX)
         return cache["model"], cache["metadata"]
     else:
         return None, {}
@@ -213,7 +225,7 @@ class MLService:
         """Load work orders using SQLAlchemy model"""
         try:
             # Get all work orders and convert to DataFrame
-            work_orders = WorkOrder.query.all()
+            work_orders = WorkOrder.query.options(*work_order_load_options(ML)).all()
             data = [wo.to_dict(include_items=False) for wo in work_orders]
             df = pd.DataFrame(data)
 
@@ -626,6 +638,7 @@ def train_model():
         cache["model"] = current_model
         cache["metadata"] = model_metadata
         cache["loaded_at"] = time.time()
+        cache_metrics.record_set(ML_CACHE_METRICS_PREFIX)
 
         # Auto-save the model if requested
         save_result = None
@@ -746,7 +759,8 @@ def batch_predict():
     try:
         # Get pending work orders (DateCompleted is now DateTime, not string)
         pending_orders = (
-            WorkOrder.query.filter(WorkOrder.DateCompleted.is_(None))
+            WorkOrder.query.options(*work_order_load_options(ML))
+            .filter(WorkOrder.DateCompleted.is_(None))
             .limit(50)
             .all()
         )
@@ -831,7 +845,11 @@ def predict_work_order(work_order_no):
         return jsonify({"error": "No trained model available"}), 400
 
     # Fetch the order
-    order = WorkOrder.query.filter_by(WorkOrderNo=str(work_order_no)).first()
+    order = (
+        WorkOrder.query.options(*work_order_load_options(ML))
+        .filter_by(WorkOrderNo=str(work_order_no))
+        .first()
+    )
     if not order:
         return jsonify({"error": f"Work order {work_order_no} not found"}), 404
 
@@ -1638,6 +1656,7 @@ def cron_retrain():
         cache["model"] = current_model
         cache["metadata"] = model_metadata
         cache["loaded_at"] = time.time()
+        cache_metrics.record_set(ML_CACHE_METRICS_PREFIX)
 
         # Auto-save the model with timestamp
         model_name = f"cron_{config_name}_{start_timestamp.strftime('%Y%m%d_%H%M%S')}"
@@ -6,63 +6,46 @@ from models.customer import Customer
 from models.source import Source
 from sqlalchemy.orm import joinedload
 from .work_orders import format_date_from_str
-from sqlalchemy import or_, func, and_
+from sqlalchemy import or_, func, and_, case
 from extensions import db, limiter
 from decorators import role_required
 from flask import current_app
+from utils.cache_helpers import cached_query
+from utils.queue_events import add_commit_hook, broker as queue_events_broker
+from utils.search_helpers import search_filter
+from utils.queue_positions import (
+    QUEUE_POSITION_GAP,
+    TIER_FIRM_RUSH,
+    TIER_REGULAR,
+    TIER_RUSH,
+    QueueVersionConflict,
+    assign_positions_to_unassigned,
+    bump_queue_version,
+    get_queue_version,
+    move_queue_entry,
+    queue_base_filter,
+    rebalance_queue_positions,
+    reorder_within_slots,
+    write_queue_positions,
+)
 import logging
 import traceback
 
 logger = logging.getLogger(__name__)
 queue_bp = Blueprint("cleaning_queue", __name__)
 
-
-# Sort firm rush orders by DateRequired (closest date first), then DateIn, then WorkOrderNo
-def safe_date_sort_key(date_value):
-    """Convert date object to a sortable format - now handles proper date types"""
-    from datetime import date
-
-    # Handle None or empty
-    if not date_value:
-        return date.max  # Put empty dates at the end
-
-    # Already a date object - return as-is
-    if isinstance(date_value, date):
-        return date_value
-
-    # Legacy string handling (for backward compatibility during migration)
-    if isinstance(date_value, str):
-        if date_value.strip() == "":
-            return date.max
-
-        # If it's already in YYYY-MM-DD format, parse it
-        if len(date_value) == 10 and date_value[4] == "-" and date_value[7] == "-":
-            try:
-                from datetime import datetime
-
-                return datetime.strptime(date_value, "%Y-%m-%d").date()
-            except:
-                return date.max
-
-        # Try other formats
-        try:
-            from datetime import datetime
-
-            if "/" in date_value:
-                parsed_date = datetime.strptime(date_value, "%m/%d/%Y")
-                return parsed_date.date()
-        except:
-            pass
-
-    # Fallback
-    return date.max
+# Orders shown in the dashboard's "next up" preview
+QUEUE_SUMMARY_PREVIEW_SIZE = 5
+TIER_LABELS = {TIER_FIRM_RUSH: "FIRM RUSH", TIER_RUSH: "RUSH", TIER_REGULAR: "REGULAR"}
 
 
 def initialize_queue_positions_for_unassigned():
     """Initialize queue positions for work orders that don't have them.
 
-    When new orders enter the queue, their entire priority tier is re-sorted
-    to maintain correct FIFO ordering based on DateIn (or DateRequired for firm rush).
+    Each new order is slotted into its priority tier in FIFO order, taking a
+    position in the gap between its neighbours (see utils/queue_positions.py).
+    Only the new orders are written; existing orders keep their positions
+    unless the gap is exhausted and the queue is rebalanced.
 
     Priority order:
     1. Firm Rush: sorted by DateRequired (closest first), then DateIn
@@ -70,100 +53,10 @@ def initialize_queue_positions_for_unassigned():
     3. Regular: sorted by DateIn (oldest first - FIFO)
     """
     try:
-        base_filter = and_(
-            WorkOrder.DateCompleted.is_(None),
-            WorkOrder.Clean.is_(None),        # Exclude already cleaned orders
-            WorkOrder.Treat.is_(None),        # Exclude already treated orders
-            WorkOrder.Quote == 'Approved'
-        )
-
-        # Only get work orders without queue positions
-        unassigned_orders = WorkOrder.query.filter(
-            base_filter, WorkOrder.QueuePosition.is_(None)
-        ).all()
-
-        if not unassigned_orders:
-            return 0
-
-        # Separate unassigned orders by priority
-        new_firm_rush = [wo for wo in unassigned_orders if wo.FirmRush]
-        new_rush = [wo for wo in unassigned_orders if wo.RushOrder and not wo.FirmRush]
-        new_regular = [wo for wo in unassigned_orders if not wo.RushOrder and not wo.FirmRush]
-
-        # Get ALL existing orders by priority tier (with positions)
-        existing_firm_rush = WorkOrder.query.filter(
-            base_filter,
-            WorkOrder.FirmRush == True,
-            WorkOrder.QueuePosition.isnot(None)
-        ).all()
-
-        existing_rush = WorkOrder.query.filter(
-            base_filter,
-            WorkOrder.RushOrder == True,
-            or_(WorkOrder.FirmRush == False, WorkOrder.FirmRush.is_(None)),
-            WorkOrder.QueuePosition.isnot(None)
-        ).all()
-
-        existing_regular = WorkOrder.query.filter(
-            base_filter,
-            or_(WorkOrder.RushOrder == False, WorkOrder.RushOrder.is_(None)),
-            or_(WorkOrder.FirmRush == False, WorkOrder.FirmRush.is_(None)),
-            WorkOrder.QueuePosition.isnot(None)
-        ).all()
-
-        # Re-sort each tier that has new orders, preserving other tiers
-        # Combine new orders with existing ones in their tier and sort
-
-        if new_firm_rush:
-            # Re-sort entire firm rush tier
-            all_firm_rush = existing_firm_rush + new_firm_rush
-            all_firm_rush.sort(key=lambda wo: (
-                safe_date_sort_key(wo.DateRequired),
-                safe_date_sort_key(wo.DateIn),
-                wo.WorkOrderNo
-            ))
-        else:
-            # Keep existing firm rush order
-            all_firm_rush = sorted(existing_firm_rush, key=lambda wo: wo.QueuePosition or 0)
-
-        if new_rush:
-            # Re-sort entire rush tier
-            all_rush = existing_rush + new_rush
-            all_rush.sort(key=lambda wo: (
-                safe_date_sort_key(wo.DateIn),
-                wo.WorkOrderNo
-            ))
-        else:
-            # Keep existing rush order
-            all_rush = sorted(existing_rush, key=lambda wo: wo.QueuePosition or 0)
-
-        if new_regular:
-            # Re-sort entire regular tier
-            all_regular = existing_regular + new_regular
-            all_regular.sort(key=lambda wo: (
-                safe_date_sort_key(wo.DateIn),
-                wo.WorkOrderNo
-            ))
-        else:
-            # Keep existing regular order
-            all_regular = sorted(existing_regular, key=lambda wo: wo.QueuePosition or 0)
-
-        # Assign positions: firm rush first, then rush, then regular
-        position = 1
-        for wo in all_firm_rush:
-            wo.QueuePosition = position
-            position += 1
-
-        for wo in all_rush:
-            wo.QueuePosition = position
-            position += 1
-
-        for wo in all_regular:
-            wo.QueuePosition = position
-            position += 1
-
-        db.session.commit()
-        return len(unassigned_orders)
+        initialized_count = assign_positions_to_unassigned()
+        if initialized_count:
+            db.session.commit()
+        return initialized_count
 
     except Exception as e:
         db.session.rollback()
@@ -174,56 +67,16 @@ def initialize_queue_positions_for_unassigned():
 def initialize_all_queue_positions(force_reset=False):
     """Initialize queue positions for all work orders that don't have them"""
     try:
-        base_filter = and_(
-            WorkOrder.DateCompleted.is_(None),
-            WorkOrder.Clean.is_(None),        # Exclude already cleaned orders
-            WorkOrder.Treat.is_(None),        # Exclude already treated orders
-            WorkOrder.Quote == 'Approved'
-        )
-
         if force_reset:
             # Clear all existing positions first
-            WorkOrder.query.filter(base_filter).update({WorkOrder.QueuePosition: None})
+            WorkOrder.query.filter(queue_base_filter()).update(
+                {WorkOrder.QueuePosition: None}, synchronize_session=False
+            )
             db.session.flush()
 
-        # Get all work orders without queue positions
-        unpositioned_orders = WorkOrder.query.filter(
-            base_filter, WorkOrder.QueuePosition.is_(None)
-        ).all()
-
-        if not unpositioned_orders:
-            return 0
-
-        # Sort by priority and date
-        def priority_sort_key(wo):
-            if wo.FirmRush:
-                return (
-                    1,
-                    safe_date_sort_key(wo.DateRequired),
-                    safe_date_sort_key(wo.DateIn),
-                    wo.WorkOrderNo,
-                )
-            elif wo.RushOrder:
-                return (2, safe_date_sort_key(wo.DateIn), wo.WorkOrderNo)
-            else:
-                return (3, safe_date_sort_key(wo.DateIn), wo.WorkOrderNo)
-
-        sorted_orders = sorted(unpositioned_orders, key=priority_sort_key)
-
-        # Get starting position
-        max_position = (
-            db.session.query(func.max(WorkOrder.QueuePosition))
-            .filter(base_filter)
-            .scalar()
-            or 0
-        )
-
-        # Assign positions
-        for i, wo in enumerate(sorted_orders):
-            wo.QueuePosition = max_position + i + 1
-
+        initialized_count = assign_positions_to_unassigned()
         db.session.commit()
-        return len(sorted_orders)
+        return initialized_count
 
     except Exception as e:
         db.session.rollback()
@@ -231,6 +84,72 @@ def initialize_all_queue_positions(force_reset=False):
         return 0
 
 
+def _cleaning_queue_criteria(search, show_sail_orders, show_cushion_orders):
+    """WHERE criteria for the cleaning queue view (shared by page and count queries)."""
+    criteria = [queue_base_filter()]
+
+    if search:
+        criteria.append(search_filter(WorkOrder, search))
+
+    if not show_sail_orders:
+        sail_sources = current_app.config.get("SAIL_ORDER_SOURCES", [])
+        logger.debug(f"Applying sail order filter, excluding: {sail_sources}")
+        criteria.append(~WorkOrder.ShipTo.in_(sail_sources))
+
+    if not show_cushion_orders:
+        logger.debug("Applying cushion order filter, excluding cushion orders")
+        criteria.append(
+            (WorkOrder.isCushion == False) | (WorkOrder.isCushion == None)
+        )
+
+    return criteria
+
+
+def _queue_tier_counts_query(criteria):
+    """Aggregate query counting queued orders per priority tier."""
+    not_firm_rush = or_(WorkOrder.FirmRush == False, WorkOrder.FirmRush.is_(None))
+    not_rush = or_(WorkOrder.RushOrder == False, WorkOrder.RushOrder.is_(None))
+
+    return (
+        db.session.query(
+            func.count(WorkOrder.WorkOrderNo),
+            func.count(WorkOrder.WorkOrderNo).filter(WorkOrder.FirmRush == True),
+            func.count(WorkOrder.WorkOrderNo).filter(
+                and_(WorkOrder.RushOrder == True, not_firm_rush)
+            ),
+            func.count(WorkOrder.WorkOrderNo).filter(and_(not_rush, not_firm_rush)),
+        )
+        .filter(*criteria)
+    )
+
+
+def _queue_tier_counts(criteria):
+    """Count queued orders per priority tier in a single aggregate query."""
+    total, firm_rush, rush, regular = _queue_tier_counts_query(criteria).one()
+    return {
+        "firm_rush": firm_rush,
+        "rush": rush,
+        "regular": regular,
+        "total": total,
+    }
+
+
+def _cleaning_queue_page_query(criteria):
+    """Queued orders in page order, with their customer/source relationships."""
+    return (
+        WorkOrder.query.options(
+            joinedload(WorkOrder.customer).joinedload(Customer.source_info)
+        )
+        .filter(*criteria)
+        .order_by(
+            WorkOrder.QueuePosition.asc().nullslast(),
+            WorkOrder.DateRequired.asc().nullslast(),
+            WorkOrder.DateIn.asc().nullslast(),
+            WorkOrder.WorkOrderNo.asc(),
+        )
+    )
+
+
 @queue_bp.route("/cleaning-queue")
 @login_required
 def cleaning_queue():
@@ -246,124 +165,34 @@ def cleaning_queue():
         request.args.get("show_cushion_orders", "true").lower() == "true"
     )  # Default to showing cushion orders
 
-    # Helper: build search filter if search term is provided
-    def search_filter(query):
-        if not search:
-            return query
-        term = f"%{search}%"
-        return query.filter(
-            or_(
-                WorkOrder.WorkOrderNo.ilike(term),
-                WorkOrder.CustID.ilike(term),
-                WorkOrder.WOName.ilike(term),
-                WorkOrder.ShipTo.ilike(term),
-            )
-        )
-
-    # Base filters: incomplete work orders with approved quotes that haven't been cleaned/treated yet
-    base_filter = and_(
-        WorkOrder.DateCompleted.is_(None),
-        WorkOrder.Clean.is_(None),        # Exclude already cleaned orders
-        WorkOrder.Treat.is_(None),        # Exclude already treated orders
-        WorkOrder.Quote == 'Approved'
-    )
-
     # Initialize queue positions for any work orders that don't have them
     initialized_count = initialize_queue_positions_for_unassigned()
     if initialized_count > 0:
         logger.info(f"Auto-initialized {initialized_count} work orders with queue positions")
 
-    # Build the main query with all filters
-    all_orders_query = WorkOrder.query.options(
-        joinedload(WorkOrder.customer).joinedload(Customer.source_info)
-    ).filter(base_filter)
-
-    # Apply search filter
-    all_orders_query = search_filter(all_orders_query)
+    criteria = _cleaning_queue_criteria(search, show_sail_orders, show_cushion_orders)
 
-    # Check what's in the config
-    sail_sources = current_app.config.get("SAIL_ORDER_SOURCES", [])
-    logger.debug(f"Config SAIL_ORDER_SOURCES: {sail_sources}")
-    logger.debug(f"show_sail_orders parameter: {show_sail_orders}")
+    # Tier counts (and the total for pagination) come from one aggregate query
+    queue_counts = _queue_tier_counts(criteria)
 
-    # Apply sail order filter if needed
-    if not show_sail_orders:
-        logger.debug(f"Applying sail order filter, excluding: {sail_sources}")
-        all_orders_query = all_orders_query.filter(~WorkOrder.ShipTo.in_(sail_sources))
-
-        # Print the SQL after adding sail filter
-        if current_app.debug:
-            logger.debug(
-                f"Filtered query SQL: {str(all_orders_query.statement.compile(compile_kwargs={'literal_binds': True}))}"
-            )
-    else:
-        logger.debug(
-            "NOT applying sail order filter (showing all orders including sail orders)"
-        )
-
-    # Apply cushion order filter if needed
-    if not show_cushion_orders:
-        logger.debug("Applying cushion order filter, excluding cushion orders")
-        all_orders_query = all_orders_query.filter(
-            (WorkOrder.isCushion == False) | (WorkOrder.isCushion == None)
-        )
-    else:
-        logger.debug("NOT applying cushion order filter (showing all orders including cushion orders)")
-
-    # Apply ordering
-    all_orders_query = all_orders_query.order_by(
-        WorkOrder.QueuePosition.asc().nullslast(),
-        WorkOrder.DateRequired.asc().nullslast(),
-        WorkOrder.DateIn.asc().nullslast(),
-        WorkOrder.WorkOrderNo.asc(),
+    # Only the visible page is loaded
+    pagination = _cleaning_queue_page_query(criteria).paginate(
+        page=page, per_page=per_page, error_out=False, count=False
     )
+    # Reuse the aggregate total instead of running a second COUNT
+    pagination.total = queue_counts["total"]
+    paginated_orders = pagination.items
+    start = (pagination.page - 1) * pagination.per_page
 
-    # Execute query
-    all_orders = all_orders_query.all()
-
-    # Check what we got back
-    logger.debug(f"Total orders found: {len(all_orders)}")
-
-    # Count sail orders in results
-    sail_orders_in_results = [wo for wo in all_orders if wo.ShipTo in sail_sources]
-    logger.debug(f"Sail orders in results: {len(sail_orders_in_results)}")
-    if sail_orders_in_results:
-        logger.debug(
-            f"Sail order ShipTo values found: {[wo.ShipTo for wo in sail_orders_in_results]}"
-        )
-
-    # Show some ShipTo values for debugging
-    ship_to_values = list(set([wo.ShipTo for wo in all_orders if wo.ShipTo]))[:10]
-    logger.debug(f"Sample ShipTo values in results: {ship_to_values}")
-
-    # Calculate counts for each priority (for the stats display)
-    firm_rush_orders = [wo for wo in all_orders if wo.FirmRush]
-    rush_orders = [wo for wo in all_orders if wo.RushOrder and not wo.FirmRush]
-    regular_orders = [wo for wo in all_orders if not wo.RushOrder and not wo.FirmRush]
-
-    # Manual pagination
-    total = len(all_orders)
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated_orders = all_orders[start:end]
-
-    # Manual pagination object
-    class ManualPagination:
-        def __init__(self, items, page, per_page, total):
-            self.items = items
-            self.page = page
-            self.per_page = per_page
-            self.total = total
-            self.pages = (total + per_page - 1) // per_page if per_page > 0 else 1
-            self.has_prev = page > 1
-            self.prev_num = page - 1 if self.has_prev else None
-            self.has_next = page < self.pages
-            self.next_num = page + 1 if self.has_next else None
-
-    pagination = ManualPagination(paginated_orders, page, per_page, total)
+    logger.debug(
+        f"Cleaning queue page {pagination.page}: {len(paginated_orders)} of {queue_counts['total']} orders"
+    )
 
     # Add display priority labels and customer URL
-    for wo in paginated_orders:
+    for index, wo in enumerate(paginated_orders):
+        # Positions are sparse, so show the order's rank in the queue instead
+        wo.queue_rank = start + index + 1
+
         # Assign priority labels
         if wo.FirmRush:
             wo.priority_label = "FIRM RUSH"
@@ -381,14 +210,6 @@ def cleaning_queue():
         else:
             wo.customer_url = None
 
-    # Queue counts
-    queue_counts = {
-        "firm_rush": len(firm_rush_orders),
-        "rush": len(rush_orders),
-        "regular": len(regular_orders),
-        "total": total,
-    }
-
     return render_template(
         "queue/list.html",
         work_orders=paginated_orders,
@@ -398,7 +219,39 @@ def cleaning_queue():
         show_sail_orders=show_sail_orders,
         show_cushion_orders=show_cushion_orders,
         queue_counts=queue_counts,
+        queue_version=get_queue_version(),
+    )
+
+
+def _positions_with_tail_fallback(work_order_ids):
+    """
+    Current positions for the given orders, appending any that are still
+    unpositioned (e.g. not in the queue filter) after the last position.
+    """
+    positions = dict(
+        db.session.query(WorkOrder.WorkOrderNo, WorkOrder.QueuePosition)
+        .filter(WorkOrder.WorkOrderNo.in_(work_order_ids))
+        .all()
     )
+    unpositioned = [wo_id for wo_id in work_order_ids if positions.get(wo_id) is None]
+    if unpositioned:
+        tail = db.session.query(func.max(WorkOrder.QueuePosition)).scalar() or 0
+        for offset, wo_id in enumerate(unpositioned, start=1):
+            positions[wo_id] = tail + offset * QUEUE_POSITION_GAP
+        write_queue_positions({wo_id: positions[wo_id] for wo_id in unpositioned})
+    return positions
+
+
+def _version_conflict_response(conflict):
+    """409 response for a reorder/move based on a stale queue version."""
+    logger.warning(f"Queue version conflict: {conflict}")
+    return jsonify({
+        "success": False,
+        "message": "Queue order was modified by another user. Please refresh the page and try again.",
+        "error_type": "concurrency",
+        "queue_version": conflict.current_version,
+        "retry": True
+    }), 409
 
 
 @queue_bp.route("/api/cleaning-queue/reorder", methods=["POST"])
@@ -428,29 +281,20 @@ def reorder_cleaning_queue():
         logger.info(f"Reorder request received: {len(work_order_ids)} work orders")
         logger.debug(f"Work order IDs: {work_order_ids}")
 
-        # Get the current page info to only reorder visible items
-        page = data.get("page", 1)
-        per_page = data.get("per_page", 25)
-
-        # Calculate the starting position for this page
-        start_position = (page - 1) * per_page + 1
+        # Optimistic concurrency: the client sends the queue version it
+        # rendered; the write below only succeeds if it is still current
+        expected_version = data.get("queue_version")
+        if expected_version is not None:
+            expected_version = int(expected_version)
 
-        logger.debug(f"Page: {page}, Per page: {per_page}, Start position: {start_position}")
-
-        # Use SELECT FOR UPDATE to lock rows and prevent concurrent modifications
-        # This will block other transactions from reading/writing these rows until we commit
-        work_orders_locked = (
-            db.session.query(WorkOrder)
+        current_positions = dict(
+            db.session.query(WorkOrder.WorkOrderNo, WorkOrder.QueuePosition)
             .filter(WorkOrder.WorkOrderNo.in_(work_order_ids))
-            .with_for_update(of=WorkOrder)
             .all()
         )
 
-        # Create a mapping of work order numbers to objects for quick lookup
-        work_orders_map = {wo.WorkOrderNo: wo for wo in work_orders_locked}
-
         # Verify we have all the work orders we need
-        found_ids = set(work_orders_map.keys())
+        found_ids = set(current_positions.keys())
         requested_ids = set(work_order_ids)
         missing_ids = requested_ids - found_ids
 
@@ -462,17 +306,23 @@ def reorder_cleaning_queue():
                 "retry": False
             }), 404
 
-        # Update queue positions for the reordered items
-        success_count = 0
+        if any(position is None for position in current_positions.values()):
+            # Check the client's version before the extra writes below
+            bump_queue_version(expected_version)
+            expected_version = None
+
+            # Slot unpositioned orders into the queue first, then permute
+            assign_positions_to_unassigned()
+            current_positions = _positions_with_tail_fallback(work_order_ids)
 
-        for index, wo_id in enumerate(work_order_ids):
-            work_order = work_orders_map.get(wo_id)
-            if work_order:
-                old_position = work_order.QueuePosition
-                new_position = start_position + index
-                work_order.QueuePosition = new_position
-                success_count += 1
-                logger.debug(f"Updated WO {wo_id}: {old_position} -> {new_position}")
+        # The page keeps the set of positions it already occupies; only the
+        # orders whose slot changed are written, in one UPDATE statement
+        moved = reorder_within_slots(work_order_ids, current_positions)
+        new_version = write_queue_positions(moved, expected_version=expected_version)
+        if new_version is None:
+            new_version = get_queue_version()
+        success_count = len(work_order_ids)
+        logger.debug(f"Reorder moved {len(moved)} of {success_count} work orders: {moved}")
 
         # Commit the transaction
         db.session.commit()
@@ -481,10 +331,16 @@ def reorder_cleaning_queue():
             "success": True,
             "message": f"Queue order updated successfully for {success_count} work orders",
             "updated_count": success_count,
+            "moved_count": len(moved),
+            "queue_version": new_version,
         }
 
         return jsonify(result)
 
+    except QueueVersionConflict as conflict:
+        db.session.rollback()
+        return _version_conflict_response(conflict)
+
     except (OperationalError, DBAPIError) as e:
         # Handle database locking/concurrency errors
         db.session.rollback()
@@ -518,114 +374,206 @@ def reorder_cleaning_queue():
         }), 500
 
 
-@queue_bp.route("/api/cleaning-queue/summary")
+@queue_bp.route("/api/cleaning-queue/move", methods=["POST"])
 @login_required
-def cleaning_queue_summary():
-    """API endpoint for dashboard summary of cleaning queue"""
-    # Count work orders in cleaning queue by priority (only approved quotes that haven't been cleaned/treated)
-    base_filter = and_(
-        WorkOrder.DateCompleted.is_(None),
-        WorkOrder.Clean.is_(None),        # Exclude already cleaned orders
-        WorkOrder.Treat.is_(None),        # Exclude already treated orders
-        WorkOrder.Quote == 'Approved'
-    )
-
-    firm_rush_count = WorkOrder.query.filter(
-        base_filter,
-        WorkOrder.FirmRush == True,
-    ).count()
+@role_required("admin", "manager")
+@limiter.exempt
+def move_cleaning_queue_item():
+    """Move one work order to a rank anywhere in the queue (e.g. another page)"""
+    data = request.get_json(silent=True) or {}
+    work_order_no = data.get("work_order_no")
+    target_rank = data.get("target_rank")
 
-    rush_count = WorkOrder.query.filter(
-        base_filter,
-        WorkOrder.RushOrder == True,
-        or_(WorkOrder.FirmRush.is_(None), WorkOrder.FirmRush != True),
-    ).count()
+    if not work_order_no or target_rank is None:
+        return jsonify({
+            "success": False,
+            "message": "work_order_no and target_rank are required"
+        }), 400
 
-    regular_count = WorkOrder.query.filter(
-        base_filter,
-        or_(WorkOrder.RushOrder.is_(None), WorkOrder.RushOrder != True),
-        or_(WorkOrder.FirmRush.is_(None), WorkOrder.FirmRush != True),
-    ).count()
+    try:
+        target_rank = int(target_rank)
+        expected_version = data.get("queue_version")
+        if expected_version is not None:
+            expected_version = int(expected_version)
+    except (TypeError, ValueError):
+        return jsonify({
+            "success": False,
+            "message": "target_rank and queue_version must be integers"
+        }), 400
 
-    total_count = firm_rush_count + rush_count + regular_count
+    try:
+        in_queue = (
+            db.session.query(WorkOrder.QueuePosition)
+            .filter(queue_base_filter(), WorkOrder.WorkOrderNo == work_order_no)
+            .first()
+        )
+        if in_queue is None:
+            return jsonify({
+                "success": False,
+                "message": f"Work order {work_order_no} is not in the cleaning queue",
+                "retry": False
+            }), 404
 
-    # Get next 5 work orders in queue for preview (using queue position ordering)
-    base_query = WorkOrder.query.filter(base_filter)
+        if in_queue.QueuePosition is None:
+            bump_queue_version(expected_version)
+            expected_version = None
+            assign_positions_to_unassigned()
 
-    # Get in priority order with queue position ordering
-    firm_rush_orders = (
-        base_query.filter(WorkOrder.FirmRush == True)
-        .order_by(
-            WorkOrder.QueuePosition.asc().nullslast(),
-            WorkOrder.DateRequired.asc().nullslast(),
-            WorkOrder.DateIn.asc().nullslast(),
+        position, new_version = move_queue_entry(
+            work_order_no, target_rank, expected_version=expected_version
         )
-        .limit(5)
-        .all()
-    )
+        db.session.commit()
 
-    remaining_slots = 5 - len(firm_rush_orders)
-    rush_orders = []
-    regular_orders = []
+        logger.info(f"Moved work order {work_order_no} to rank {target_rank} (position {position})")
+        return jsonify({
+            "success": True,
+            "message": f"Work order {work_order_no} moved to position {target_rank}",
+            "queue_position": position,
+            "queue_version": new_version,
+        })
 
-    if remaining_slots > 0:
-        rush_orders = (
-            base_query.filter(
-                WorkOrder.RushOrder == True,
-                or_(WorkOrder.FirmRush.is_(None), WorkOrder.FirmRush != True),
-            )
-            .order_by(
-                WorkOrder.QueuePosition.asc().nullslast(),
-                WorkOrder.DateIn.asc().nullslast(),
-                WorkOrder.WorkOrderNo.asc(),
-            )
-            .limit(remaining_slots)
-            .all()
-        )
+    except QueueVersionConflict as conflict:
+        db.session.rollback()
+        return _version_conflict_response(conflict)
 
-        remaining_slots = remaining_slots - len(rush_orders)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Unexpected error during queue move:\n{traceback.format_exc()}")
+        return jsonify({
+            "success": False,
+            "message": f"Error: {str(e)}",
+            "retry": True
+        }), 500
 
-        if remaining_slots > 0:
-            regular_orders = (
-                base_query.filter(
-                    or_(WorkOrder.RushOrder.is_(None), WorkOrder.RushOrder != True),
-                    or_(WorkOrder.FirmRush.is_(None), WorkOrder.FirmRush != True),
-                )
-                .order_by(
+
+def _queue_summary_query():
+    """
+    Tier counts and the next QUEUE_SUMMARY_PREVIEW_SIZE orders in one query.
+
+    Every queued row carries the whole-queue counts (COUNT(*) FILTER ...
+    OVER ()) and its rank (ROW_NUMBER() in tier/queue order); only the top
+    ranks are returned.
+    """
+    not_firm_rush = or_(WorkOrder.FirmRush == False, WorkOrder.FirmRush.is_(None))
+    tier = case(
+        (WorkOrder.FirmRush == True, TIER_FIRM_RUSH),
+        (WorkOrder.RushOrder == True, TIER_RUSH),
+        else_=TIER_REGULAR,
+    )
+
+    ranked = (
+        db.session.query(
+            WorkOrder.WorkOrderNo,
+            WorkOrder.WOName,
+            WorkOrder.CustID,
+            WorkOrder.DateIn,
+            WorkOrder.DateRequired,
+            WorkOrder.QueuePosition,
+            tier.label("tier"),
+            func.count().over().label("total"),
+            func.count().filter(WorkOrder.FirmRush == True).over().label("firm_rush"),
+            func.count()
+            .filter(and_(WorkOrder.RushOrder == True, not_firm_rush))
+            .over()
+            .label("rush"),
+            func.row_number()
+            .over(
+                order_by=(
+                    tier,
                     WorkOrder.QueuePosition.asc().nullslast(),
+                    # Firm rush ties go by the required date
+                    case((tier == TIER_FIRM_RUSH, WorkOrder.DateRequired)).asc().nullslast(),
                     WorkOrder.DateIn.asc().nullslast(),
                     WorkOrder.WorkOrderNo.asc(),
                 )
-                .limit(remaining_slots)
-                .all()
             )
+            .label("queue_rank"),
+        )
+        .filter(queue_base_filter())
+        .subquery()
+    )
+
+    return (
+        db.session.query(ranked)
+        .filter(ranked.c.queue_rank <= QUEUE_SUMMARY_PREVIEW_SIZE)
+        .order_by(ranked.c.queue_rank)
+    )
+
+
+@cached_query(timeout=120, key_prefix="queue")
+def get_queue_summary():
+    """
+    Queue summary for the dashboard (see _queue_summary_query).
+
+    Cached, and dropped whenever a queue event is published (see
+    _invalidate_queue_summary).
+    """
+    rows = _queue_summary_query().all()
+
+    counts = {"firm_rush": 0, "rush": 0, "regular": 0, "total": 0}
+    if rows:
+        first = rows[0]
+        counts = {
+            "firm_rush": first.firm_rush,
+            "rush": first.rush,
+            "regular": first.total - first.firm_rush - first.rush,
+            "total": first.total,
+        }
+
+    return {
+        "counts": counts,
+        "next_orders": [
+            {
+                "WorkOrderNo": row.WorkOrderNo,
+                "WOName": row.WOName,
+                "CustID": row.CustID,
+                "DateIn": row.DateIn,
+                "DateRequired": row.DateRequired,
+                "priority": TIER_LABELS[row.tier],
+                "QueuePosition": row.QueuePosition,
+            }
+            for row in rows
+        ],
+    }
+
+
+def _invalidate_queue_summary(event):
+    """Drop the cached summary on every queue/work order event (all workers)."""
+    get_queue_summary.cache_delete()
+
 
-    next_orders = firm_rush_orders + rush_orders + regular_orders
+def _invalidate_queue_summary_on_commit(events):
+    """Drop it in the committing worker at once, not when NOTIFY comes back."""
+    get_queue_summary.cache_delete()
+
+
+queue_events_broker.add_listener(_invalidate_queue_summary)
+add_commit_hook(_invalidate_queue_summary_on_commit)
+
+
+@queue_bp.route("/api/cleaning-queue/summary")
+@login_required
+def cleaning_queue_summary():
+    """API endpoint for dashboard summary of cleaning queue"""
+    summary = get_queue_summary()
 
     return jsonify(
         {
-            "counts": {
-                "firm_rush": firm_rush_count,
-                "rush": rush_count,
-                "regular": regular_count,
-                "total": total_count,
-            },
+            "counts": summary["counts"],
             "next_orders": [
                 {
-                    "WorkOrderNo": wo.WorkOrderNo,
-                    "WOName": wo.WOName,
-                    "CustID": wo.CustID,
-                    "DateIn": format_date_from_str(wo.DateIn),
-                    "DateRequired": format_date_from_str(wo.DateRequired),
-                    "priority": "FIRM RUSH"
-                    if wo.FirmRush
-                    else ("RUSH" if wo.RushOrder else "REGULAR"),
+                    "WorkOrderNo": wo["WorkOrderNo"],
+                    "WOName": wo["WOName"],
+                    "CustID": wo["CustID"],
+                    "DateIn": format_date_from_str(wo["DateIn"]),
+                    "DateRequired": format_date_from_str(wo["DateRequired"]),
+                    "priority": wo["priority"],
                     "detail_url": url_for(
-                        "work_orders.view_work_order", work_order_no=wo.WorkOrderNo
+                        "work_orders.view_work_order", work_order_no=wo["WorkOrderNo"]
                     ),
-                    "queue_position": wo.QueuePosition,
+                    "queue_position": wo["QueuePosition"],
                 }
-                for wo in next_orders[:5]
+                for wo in summary["next_orders"]
             ],
         }
     )
@@ -665,6 +613,31 @@ def initialize_queue_positions():
         )
 
 
+@queue_bp.route("/api/cleaning-queue/rebalance", methods=["POST"])
+@login_required
+@role_required("admin", "manager")
+def rebalance_queue():
+    """Renumber queue positions with fresh gaps, keeping the current order"""
+    try:
+        entries = rebalance_queue_positions()
+        db.session.commit()
+        return jsonify(
+            {
+                "success": True,
+                "message": f"Rebalanced {len(entries)} queue positions",
+                "rebalanced_count": len(entries),
+                "queue_version": get_queue_version(),
+            }
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error rebalancing queue positions: {e}")
+        return jsonify(
+            {"success": False, "message": f"Error rebalancing queue positions: {str(e)}"}
+        ), 500
+
+
 @queue_bp.route("/api/cleaning-queue/reset", methods=["POST"])
 @login_required
 @role_required("admin", "manager")
@@ -15,7 +15,7 @@ from models.repair_order_file import RepairOrderFile
 from models.customer import Customer
 from models.inventory import Inventory
 from models.source import Source
-from sqlalchemy import or_, case, func, literal, desc, cast, Integer
+from sqlalchemy import or_, case, func, literal, cast, Integer
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from extensions import db
@@ -25,19 +25,34 @@ from decorators import role_required
 from utils.repair_order_pdf import generate_repair_order_pdf
 from sqlalchemy.orm import joinedload
 from utils.pdf_helpers import prepare_order_data_for_pdf
+from utils.pdf_cache import REPAIR_ORDER_PDFS, order_pdf_response
+from utils.thumbnail_jobs import thumbnail_pending
 from utils.file_upload import (
     save_repair_order_file,
     generate_presigned_url,
     get_file_size,
     commit_deferred_uploads,
     cleanup_deferred_files,
+    presigned_thumbnail_urls,
 )
 from utils.query_helpers import (
+    InvalidCursor,
     apply_column_filters,
-    apply_tabulator_sorting,
     apply_search_filter,
+    keyset_paginate,
+    sort_clauses,
+    sort_key,
+    tabulator_sort_keys,
 )
 from utils.order_item_helpers import safe_price_conversion
+from utils.http_cache import conditional_list_response
+from utils.count_helpers import count_for_list, wants_exact_count
+from utils.order_numbers import (
+    REPAIR_ORDER_NUMBERS,
+    allocate_order_number,
+    peek_next_order_number,
+    sync_order_counter,
+)
 
 
 repair_work_orders_bp = Blueprint(
@@ -325,20 +340,10 @@ def _handle_seeclean_backlink(repair_order_no, new_seeclean, old_seeclean=None):
 
 def _generate_next_repair_order_number():
     """
-    Generate the next repair order number.
+    Allocate the next repair order number (see utils/order_numbers.py).
     Returns the next repair order number as a string.
     """
-    latest_order = RepairWorkOrder.query.order_by(
-        desc(cast(RepairWorkOrder.RepairOrderNo, Integer))
-    ).first()
-
-    if latest_order:
-        try:
-            return str(int(latest_order.RepairOrderNo) + 1)
-        except ValueError:
-            return str(int(datetime.now().timestamp()))
-    else:
-        return "1"
+    return allocate_order_number(REPAIR_ORDER_NUMBERS)
 
 
 def _validate_repair_order_form(form_data):
@@ -465,10 +470,20 @@ def get_repair_order_thumbnail(file_id):
         abort(404)
 
 
+@repair_work_orders_bp.route("/thumbnail/<int:file_id>/status")
+@login_required
+def repair_order_thumbnail_status(file_id):
+    """Whether a file's background thumbnail is ready (polled by the detail page)"""
+    ro_file = RepairOrderFile.query.get_or_404(file_id)
+    return jsonify(
+        {"ready": bool(ro_file.thumbnail_path), "pending": thumbnail_pending(ro_file)}
+    )
+
+
 @repair_work_orders_bp.context_processor
 def utility_processor():
     """Add utility functions to template context"""
-    return dict(get_file_size=get_file_size)
+    return dict(get_file_size=get_file_size, thumbnail_pending=thumbnail_pending)
 
 
 @repair_work_orders_bp.route("/<repair_order_no>/files")
@@ -520,11 +535,13 @@ def view_repair_work_order(repair_order_no):
         "repair_orders/detail.html",
         repair_work_order=repair_work_order,
         files=repair_work_order.files,
+        thumbnail_urls=presigned_thumbnail_urls(repair_work_order.files),
     )
 
 
 @repair_work_orders_bp.route("/api/repair_work_orders")
 @login_required
+@conditional_list_response(RepairWorkOrder, Customer)
 def api_repair_work_orders():
     """
     API endpoint to provide repair work order data with robust filtering,
@@ -592,7 +609,8 @@ def api_repair_work_orders():
         },
     )
 
-    # Apply sorting (support both simple and Tabulator multi-sort)
+    # Sorting (support both simple and Tabulator multi-sort)
+    sort_keys = []
     simple_sort = request.args.get("sort")
     if simple_sort:
         # Simple sort mode
@@ -601,13 +619,10 @@ def api_repair_work_orders():
         if column:
             if simple_sort in ["RepairOrderNo", "CustID"]:
                 column = cast(column, Integer)
-            query = query.order_by(
-                column.desc() if simple_dir == "desc" else column.asc()
-            )
+            sort_keys = [sort_key(simple_sort, column, descending=simple_dir == "desc")]
     else:
         # Tabulator multi-sort mode
-        query = apply_tabulator_sorting(
-            query,
+        sort_keys = tabulator_sort_keys(
             RepairWorkOrder,
             request.args,
             {
@@ -623,17 +638,34 @@ def api_repair_work_orders():
     if not simple_sort and not any(
         request.args.get(f"sort[{i}][field]") for i in range(10)
     ):
-        query = query.order_by(
-            RepairWorkOrder.DateIn.desc(), RepairWorkOrder.RepairOrderNo.desc()
-        )
+        sort_keys = [
+            sort_key("DateIn", RepairWorkOrder.DateIn, descending=True),
+            sort_key("RepairOrderNo", RepairWorkOrder.RepairOrderNo, descending=True),
+        ]
+
+    cursor = request.args.get("cursor")
+    if cursor is not None:
+        # Keyset mode: seek past the cursor, no OFFSET and no COUNT
+        try:
+            keyset_page = keyset_paginate(
+                query, sort_keys, cursor, size, tiebreaker=RepairWorkOrder.RepairOrderNo
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        items = keyset_page.items
+    else:
+        if sort_keys:
+            query = query.order_by(*sort_clauses(sort_keys))
 
-    # Pagination & results
-    total = query.count()
-    pagination = query.paginate(page=page, per_page=size, error_out=False)
+        # Pagination & results
+        list_count = count_for_list(query, RepairWorkOrder, exact=wants_exact_count(request.args))
+        pagination = query.paginate(page=page, per_page=size, error_out=False, count=False)
+        pagination.total = list_count.total
+        items = pagination.items
 
     # Build response data
     data = []
-    for order in pagination.items:
+    for order in items:
         data.append(
             {
                 "RepairOrderNo": order.RepairOrderNo,
@@ -663,10 +695,20 @@ def api_repair_work_orders():
             }
         )
 
+    if cursor is not None:
+        return jsonify(
+            {
+                "data": data,
+                "next_cursor": keyset_page.next_cursor,
+                "has_next": keyset_page.has_next,
+            }
+        )
+
     return jsonify(
         {
             "data": data,
-            "total": total,
+            "total": list_count.total,
+            "total_exact": list_count.exact,
             "last_page": pagination.pages,
         }
     )
@@ -675,20 +717,8 @@ def api_repair_work_orders():
 @repair_work_orders_bp.route("/api/next_ro_number")
 @login_required
 def get_next_ro_number():
-    """API endpoint to get the next repair order number"""
-    latest_order = RepairWorkOrder.query.order_by(
-        desc(cast(RepairWorkOrder.RepairOrderNo, Integer))
-    ).first()
-
-    if latest_order:
-        try:
-            next_num = int(latest_order.RepairOrderNo) + 1
-        except ValueError:
-            next_num = int(datetime.now().timestamp())
-    else:
-        next_num = 1
-
-    return jsonify({"next_ro_number": str(next_num)})
+    """API endpoint to get the next repair order number (a preview; it is allocated on save)"""
+    return jsonify({"next_ro_number": peek_next_order_number(REPAIR_ORDER_NUMBERS)})
 
 
 @repair_work_orders_bp.route("/new", methods=["GET", "POST"])
@@ -798,6 +828,9 @@ def create_repair_order(prefill_cust_id=None):
                 is_duplicate = "duplicate" in error_msg or "unique" in error_msg
 
                 if is_duplicate and retry_count < max_retries:
+                    # The number was taken outside the allocator; skip past it
+                    sync_order_counter(REPAIR_ORDER_NUMBERS)
+                    db.session.commit()
                     delay = base_delay * (2**retry_count) + (random.random() * 0.05)
                     print(
                         f"Duplicate repair order number detected. Retry {retry_count}/{max_retries} after {delay:.3f}s"
@@ -989,18 +1022,14 @@ def delete_repair_order(repair_order_no):
     ).first_or_404()
 
     try:
-        # Import the delete function
-        from utils.file_upload import delete_file_from_s3
+        from utils.file_upload import release_file_keys
+        from utils.s3_deletes import queue_s3_deletes, schedule_s3_delete_drain
 
-        # Delete S3 files first (before deleting DB records)
+        # Queue the S3 files (main + thumbnail) with the DB delete; they are
+        # removed in one batch once it commits
         files_deleted = 0
         for file_obj in repair_order.files:
-            # Delete main file
-            if delete_file_from_s3(file_obj.file_path):
-                files_deleted += 1
-            # Delete thumbnail if it exists
-            if file_obj.thumbnail_path and delete_file_from_s3(file_obj.thumbnail_path):
-                files_deleted += 1
+            files_deleted += queue_s3_deletes(release_file_keys(file_obj))
 
         # Delete associated items first (if cascade is not set up)
         RepairWorkOrderItem.query.filter_by(RepairOrderNo=repair_order_no).delete()
@@ -1008,6 +1037,7 @@ def delete_repair_order(repair_order_no):
         # Delete the repair order (cascade will delete file records)
         db.session.delete(repair_order)
         db.session.commit()
+        schedule_s3_delete_drain()
 
         if files_deleted > 0:
             flash(
@@ -1049,16 +1079,16 @@ def download_repair_order_pdf(repair_order_no):
     ro_dict = prepare_order_data_for_pdf(repair_order, order_type="repair_order")
 
     try:
-        pdf_buffer = generate_repair_order_pdf(
+        return order_pdf_response(
+            REPAIR_ORDER_PDFS,
+            repair_order_no,
             ro_dict,
-            company_info={"name": "Awning Cleaning Industries - Repair Work Order"},
-        )
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
+            render=lambda: generate_repair_order_pdf(
+                ro_dict,
+                company_info={"name": "Awning Cleaning Industries - Repair Work Order"},
+            ).getvalue(),
             download_name=f"WorkOrder_{repair_order_no}.pdf",
-            mimetype="application/pdf",
+            as_attachment=True,
         )
 
     except Exception as e:
@@ -1086,16 +1116,16 @@ def view_repair_order_pdf(repair_order_no):
     ro_dict = prepare_order_data_for_pdf(repair_order, order_type="repair_order")
 
     try:
-        pdf_buffer = generate_repair_order_pdf(
+        return order_pdf_response(
+            REPAIR_ORDER_PDFS,
+            repair_order_no,
             ro_dict,
-            company_info={"name": "Awning Cleaning Industries - Repair Work Order"},
-        )
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=False,
+            render=lambda: generate_repair_order_pdf(
+                ro_dict,
+                company_info={"name": "Awning Cleaning Industries - Repair Work Order"},
+            ).getvalue(),
             download_name=f"WorkOrder_{repair_order_no}.pdf",
-            mimetype="application/pdf",
+            as_attachment=False,
         )
 
     except Exception as e:
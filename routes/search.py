@@ -0,0 +1,85 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+
+from models.customer import Customer
+from models.inventory import Inventory
+from models.work_order import WorkOrder, WorkOrderItem
+from utils.search_helpers import apply_search
+
+
+search_bp = Blueprint("search", __name__)
+
+MAX_RESULTS_PER_TYPE = 25
+
+
+def _ranked(model, term, limit):
+    return apply_search(model.query, model, term, ranked=True).limit(limit).all()
+
+
+@search_bp.route("/api/search")
+@login_required
+def api_search():
+    """
+    Ranked search across work orders, customers, items and inventory.
+
+    Query params:
+        q: search text (blank returns no results)
+        limit: results per type (default 5, max 25)
+    """
+    term = request.args.get("q", "").strip()
+    limit = max(1, min(request.args.get("limit", 5, type=int), MAX_RESULTS_PER_TYPE))
+
+    if not term:
+        return jsonify(
+            {"query": term, "work_orders": [], "customers": [], "items": [], "inventory": []}
+        )
+
+    work_orders = [
+        {
+            "WorkOrderNo": wo.WorkOrderNo,
+            "WOName": wo.WOName,
+            "CustID": wo.CustID,
+            "ShipTo": wo.ShipTo,
+            "DateCompleted": wo.DateCompleted.isoformat() if wo.DateCompleted else None,
+        }
+        for wo in _ranked(WorkOrder, term, limit)
+    ]
+    customers = [
+        {
+            "CustID": c.CustID,
+            "Name": c.Name,
+            "Contact": c.Contact,
+            "City": c.City,
+        }
+        for c in _ranked(Customer, term, limit)
+    ]
+    items = [
+        {
+            "id": item.id,
+            "WorkOrderNo": item.WorkOrderNo,
+            "Description": item.Description,
+            "Material": item.Material,
+            "Color": item.Color,
+        }
+        for item in _ranked(WorkOrderItem, term, limit)
+    ]
+    inventory = [
+        {
+            "InventoryKey": item.InventoryKey,
+            "CustID": item.CustID,
+            "Description": item.Description,
+            "Material": item.Material,
+            "Color": item.Color,
+        }
+        for item in _ranked(Inventory, term, limit)
+    ]
+
+    return jsonify(
+        {
+            "query": term,
+            "work_orders": work_orders,
+            "customers": customers,
+            "items": items,
+            "inventory": inventory,
+        }
+    )
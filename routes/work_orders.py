@@ -8,6 +8,7 @@ from flask import (
     url_for,
     send_file,
     abort,
+    current_app,
 )
 from flask_login import login_required
 from models.work_order import WorkOrder, WorkOrderItem
@@ -22,20 +23,25 @@ from utils.file_upload import (
     get_file_size,
     commit_deferred_uploads,
     cleanup_deferred_files,
+    presigned_thumbnail_urls,
 )
-from sqlalchemy import or_, func, cast, Integer
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, func
 from sqlalchemy.exc import IntegrityError
 from extensions import db
 from datetime import datetime, date
 import time
+import os
 import random
 from utils.work_order_pdf import generate_work_order_pdf
 from decorators import role_required
 from utils.pdf_helpers import prepare_order_data_for_pdf
 from utils.query_helpers import (
+    InvalidCursor,
     apply_column_filters,
     apply_tabulator_sorting,
+    keyset_paginate,
+    sort_key,
+    tabulator_sort_keys,
 )
 from utils.form_helpers import extract_work_order_fields
 from utils.order_item_helpers import (
@@ -45,8 +51,23 @@ from utils.order_item_helpers import (
     safe_price_conversion,
 )
 from utils.cache_helpers import invalidate_analytics_cache
-from io import BytesIO
-import fitz  # PyMuPDF
+from utils.http_cache import conditional_list_response
+from utils.count_helpers import count_for_list, wants_exact_count
+from utils.search_helpers import apply_search
+from utils.load_profiles import DETAIL, LIST, PDF, work_order_load_options
+from utils.pdf_cache import WORK_ORDER_PDFS, order_pdf_response
+from utils.thumbnail_jobs import thumbnail_pending
+from utils.bulk_pdf import (
+    build_bulk_work_order_pdf,
+    bulk_pdf_response,
+    new_bulk_pdf_path,
+)
+from utils.order_numbers import (
+    WORK_ORDER_NUMBERS,
+    allocate_order_number,
+    peek_next_order_number,
+    sync_order_counter,
+)
 
 work_orders_bp = Blueprint("work_orders", __name__, url_prefix="/work_orders")
 
@@ -279,13 +300,10 @@ def _handle_work_order_items(form_data, work_order_no, cust_id):
 
 def _generate_next_work_order_number():
     """
-    Generate the next work order number.
+    Allocate the next work order number (see utils/order_numbers.py).
     Returns the next work order number as a string.
     """
-    latest_num = db.session.query(
-        func.max(cast(WorkOrder.WorkOrderNo, Integer))
-    ).scalar()
-    return str(latest_num + 1) if latest_num is not None else "1"
+    return allocate_order_number(WORK_ORDER_NUMBERS)
 
 
 def _restore_draft_data(draft_id, current_user):
@@ -508,10 +526,20 @@ def get_thumbnail(file_id):
         abort(404)
 
 
+@work_orders_bp.route("/thumbnail/<int:file_id>/status")
+@login_required
+def thumbnail_status(file_id):
+    """Whether a file's background thumbnail is ready (polled by the detail page)"""
+    wo_file = WorkOrderFile.query.get_or_404(file_id)
+    return jsonify(
+        {"ready": bool(wo_file.thumbnail_path), "pending": thumbnail_pending(wo_file)}
+    )
+
+
 # Add this to your template context
 @work_orders_bp.context_processor
 def utility_processor():
-    return dict(get_file_size=get_file_size)
+    return dict(get_file_size=get_file_size, thumbnail_pending=thumbnail_pending)
 
 
 @work_orders_bp.route("/<work_order_no>/files")
@@ -562,20 +590,7 @@ def list_work_orders():
 
     query = WorkOrder.query
 
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                WorkOrder.WorkOrderNo.like(search_term),
-                WorkOrder.CustID.like(search_term),
-                WorkOrder.WOName.like(search_term),
-                WorkOrder.Storage.like(search_term),
-                WorkOrder.RackNo.like(search_term),
-                WorkOrder.ShipTo.like(search_term),
-                WorkOrder.SpecialInstructions.like(search_term),
-                WorkOrder.RepairsNeeded.like(search_term),
-            )
-        )
+    query = apply_search(query, WorkOrder, search)
 
     pagination = query.order_by(WorkOrder.DateIn.desc()).paginate(
         page=page, per_page=per_page
@@ -595,7 +610,7 @@ def list_work_orders():
 def view_work_order(work_order_no):
     work_order = (
         WorkOrder.query.filter_by(WorkOrderNo=work_order_no)
-        .options(db.joinedload(WorkOrder.files))  # eager load for safety
+        .options(*work_order_load_options(DETAIL))
         .first_or_404()
     )
     # Get the referrer from query param or request referrer
@@ -607,6 +622,7 @@ def view_work_order(work_order_no):
         "work_orders/detail.html",
         work_order=work_order,
         files=work_order.files,  # pass files explicitly
+        thumbnail_urls=presigned_thumbnail_urls(work_order.files),
         return_url=return_url,
         get_file_size=get_file_size,  # pass function to template
     )
@@ -629,16 +645,7 @@ def list_by_status(status):
     else:
         query = WorkOrder.query  # fallback if unknown status
 
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                WorkOrder.WorkOrderNo.like(search_term),
-                WorkOrder.CustID.like(search_term),
-                WorkOrder.WOName.like(search_term),
-                WorkOrder.ShipTo.like(search_term),
-            )
-        )
+    query = apply_search(query, WorkOrder, search)
 
     pagination = query.order_by(
         WorkOrder.DateIn.desc().nullslast(), WorkOrder.WorkOrderNo.desc()
@@ -680,15 +687,7 @@ def rush_work_orders():
         WorkOrder.DateCompleted.is_(None),
     )
 
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                WorkOrder.WorkOrderNo.like(search_term),
-                WorkOrder.CustID.like(search_term),
-                WorkOrder.WOName.like(search_term),
-            )
-        )
+    query = apply_search(query, WorkOrder, search)
 
     pagination = query.order_by(
         WorkOrder.DateRequired.asc().nullslast(),
@@ -718,15 +717,7 @@ def cushion_work_orders():
         WorkOrder.DateCompleted.is_(None),
     )
 
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                WorkOrder.WorkOrderNo.like(search_term),
-                WorkOrder.CustID.like(search_term),
-                WorkOrder.WOName.like(search_term),
-            )
-        )
+    query = apply_search(query, WorkOrder, search)
 
     pagination = query.order_by(
         WorkOrder.DateIn.desc().nullslast(),
@@ -879,6 +870,9 @@ def create_work_order(prefill_cust_id=None):
                 is_duplicate = "duplicate" in error_msg or "unique" in error_msg
 
                 if is_duplicate and retry_count < max_retries:
+                    # The number was taken outside the allocator; skip past it
+                    sync_order_counter(WORK_ORDER_NUMBERS)
+                    db.session.commit()
                     delay = base_delay * (2**retry_count) + (random.random() * 0.05)
                     print(
                         f"Duplicate work order number detected. Retry {retry_count}/{max_retries} after {delay:.3f}s"
@@ -1276,24 +1270,8 @@ def cleaning_room_edit_work_order(work_order_no):
 @work_orders_bp.route("/api/next_wo_number")
 @login_required
 def get_next_wo_number():
-    """Get the next work order number"""
-    # Debug: see what's in your WorkOrderNo column
-    sample_wos = db.session.query(WorkOrder.WorkOrderNo).limit(10).all()
-    print("Sample WorkOrderNo values:", [wo.WorkOrderNo for wo in sample_wos])
-
-    latest_num = db.session.query(
-        func.max(cast(WorkOrder.WorkOrderNo, Integer))
-    ).scalar()
-
-    print("Latest num from query:", latest_num)
-
-    if latest_num is not None:
-        next_wo_no = str(latest_num + 1)
-    else:
-        next_wo_no = "1"
-
-    print("Returning next_wo_no:", next_wo_no)
-    return jsonify({"next_wo_number": next_wo_no})
+    """Get the next work order number (a preview; it is allocated on save)"""
+    return jsonify({"next_wo_number": peek_next_order_number(WORK_ORDER_NUMBERS)})
 
 
 def format_date_from_str(value):
@@ -1322,6 +1300,7 @@ def format_date_from_str(value):
 
 @work_orders_bp.route("/api/work_orders")
 @login_required
+@conditional_list_response(WorkOrder, Customer)
 def api_work_orders():
     page = request.args.get("page", 1, type=int)
     size = request.args.get("size", 25, type=int)
@@ -1331,7 +1310,7 @@ def api_work_orders():
     query = WorkOrder.query
 
     # Optimize relationship loading - Source is denormalized, so just load customer
-    query = query.options(joinedload(WorkOrder.customer))
+    query = query.options(*work_order_load_options(LIST))
 
     if is_cushion_view:
         query = query.filter(WorkOrder.isCushion == True)
@@ -1347,6 +1326,9 @@ def api_work_orders():
             WorkOrder.DateCompleted.is_(None),
         )
 
+    # Global search (trigram-indexed on PostgreSQL)
+    query = apply_search(query, WorkOrder, request.args.get("search"))
+
     # Make request.args mutable
     args = request.args.copy()
 
@@ -1375,27 +1357,40 @@ def api_work_orders():
         },
     )
 
-    # Apply sorting
-    query = apply_tabulator_sorting(
-        query,
-        WorkOrder,
-        request.args,
-        {
-            "WorkOrderNo": "integer",
-            "CustID": "integer",
-            "DateIn": "date",
-            "DateRequired": "date",
-            "Source": WorkOrder.source_name,  # Use denormalized column
-        },
-    )
+    sort_config = {
+        "WorkOrderNo": "integer",
+        "CustID": "integer",
+        "DateIn": "date",
+        "DateRequired": "date",
+        "Source": WorkOrder.source_name,  # Use denormalized column
+    }
+
+    cursor = request.args.get("cursor")
+    if cursor is not None:
+        # Keyset mode: seek past the cursor, no OFFSET and no COUNT
+        sort_keys = tabulator_sort_keys(WorkOrder, request.args, sort_config) or [
+            sort_key("WorkOrderNo", WorkOrder.WorkOrderNo, descending=True)
+        ]
+        try:
+            keyset_page = keyset_paginate(
+                query, sort_keys, cursor, size, tiebreaker=WorkOrder.WorkOrderNo
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        items = keyset_page.items
+    else:
+        # Apply sorting
+        query = apply_tabulator_sorting(query, WorkOrder, request.args, sort_config)
 
-    # Default sort if no sort specified
-    if not any(request.args.get(f"sort[{i}][field]") for i in range(10)):
-        query = query.order_by(WorkOrder.WorkOrderNo.desc())
+        # Default sort if no sort specified
+        if not any(request.args.get(f"sort[{i}][field]") for i in range(10)):
+            query = query.order_by(WorkOrder.WorkOrderNo.desc())
 
-    # Paginate
-    total = query.count()
-    work_orders = query.paginate(page=page, per_page=size, error_out=False)
+        # Paginate
+        list_count = count_for_list(query, WorkOrder, exact=wants_exact_count(request.args))
+        work_orders = query.paginate(page=page, per_page=size, error_out=False, count=False)
+        work_orders.total = list_count.total
+        items = work_orders.items
 
     # Build response data
     data = [
@@ -1425,13 +1420,23 @@ def api_work_orders():
             if wo.customer
             else None,
         }
-        for wo in work_orders.items
+        for wo in items
     ]
 
+    if cursor is not None:
+        return jsonify(
+            {
+                "data": data,
+                "next_cursor": keyset_page.next_cursor,
+                "has_next": keyset_page.has_next,
+            }
+        )
+
     return jsonify(
         {
             "data": data,
-            "total": total,
+            "total": list_count.total,
+            "total_exact": list_count.exact,
             "last_page": work_orders.pages,
         }
     )
@@ -1444,18 +1449,14 @@ def delete_work_order(work_order_no):
     """Delete a work order, its associated files from S3, and without adjusting inventory"""
     work_order = WorkOrder.query.filter_by(WorkOrderNo=work_order_no).first_or_404()
     try:
-        # Import the delete function
-        from utils.file_upload import delete_file_from_s3
+        from utils.file_upload import release_file_keys
+        from utils.s3_deletes import queue_s3_deletes, schedule_s3_delete_drain
 
-        # Delete S3 files first (before deleting DB records)
+        # Queue the S3 files (main + thumbnail) with the DB delete; they are
+        # removed in one batch once it commits
         files_deleted = 0
         for file_obj in work_order.files:
-            # Delete main file
-            if delete_file_from_s3(file_obj.file_path):
-                files_deleted += 1
-            # Delete thumbnail if it exists
-            if file_obj.thumbnail_path and delete_file_from_s3(file_obj.thumbnail_path):
-                files_deleted += 1
+            files_deleted += queue_s3_deletes(release_file_keys(file_obj))
 
         # Delete all associated work order items
         for item in work_order.items:
@@ -1464,6 +1465,7 @@ def delete_work_order(work_order_no):
         # Delete the work order itself (cascade will delete file records)
         db.session.delete(work_order)
         db.session.commit()
+        schedule_s3_delete_drain()
 
         if files_deleted > 0:
             flash(
@@ -1487,17 +1489,16 @@ def delete_work_order_file(file_id):
     file_obj = WorkOrderFile.query.get_or_404(file_id)
 
     try:
-        from utils.file_upload import delete_file_from_s3
+        from utils.file_upload import release_file_keys
+        from utils.s3_deletes import queue_s3_deletes, schedule_s3_delete_drain
 
-        # Delete from S3 (main + thumbnail)
-        if file_obj.file_path:
-            delete_file_from_s3(file_obj.file_path)
-        if file_obj.thumbnail_path:
-            delete_file_from_s3(file_obj.thumbnail_path)
+        # Queue the S3 delete (main + thumbnail) with the DB record's
+        queue_s3_deletes(release_file_keys(file_obj))
 
         # Delete DB record
         db.session.delete(file_obj)
         db.session.commit()
+        schedule_s3_delete_drain()
 
         return jsonify({"success": True})
     except Exception as e:
@@ -1512,9 +1513,7 @@ def download_work_order_pdf(work_order_no):
     # Fetch work order + relationships in one query
     work_order = (
         WorkOrder.query.filter_by(WorkOrderNo=work_order_no)
-        .options(
-            db.joinedload(WorkOrder.customer), db.joinedload(WorkOrder.ship_to_source)
-        )
+        .options(*work_order_load_options(PDF))
         .first_or_404()
     )
 
@@ -1522,18 +1521,18 @@ def download_work_order_pdf(work_order_no):
     wo_dict = prepare_order_data_for_pdf(work_order, order_type="work_order")
 
     try:
-        pdf_buffer = generate_work_order_pdf(
+        return order_pdf_response(
+            WORK_ORDER_PDFS,
+            work_order_no,
             wo_dict,
-            company_info={
-                "name": "Awning Cleaning Industries - In House Cleaning Work Order"
-            },
-        )
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
+            render=lambda: generate_work_order_pdf(
+                wo_dict,
+                company_info={
+                    "name": "Awning Cleaning Industries - In House Cleaning Work Order"
+                },
+            ).getvalue(),
             download_name=f"WorkOrder_{work_order_no}.pdf",
-            mimetype="application/pdf",
+            as_attachment=True,
         )
 
     except Exception as e:
@@ -1550,9 +1549,7 @@ def view_work_order_pdf(work_order_no):
     # Fetch work order + relationships in one query
     work_order = (
         WorkOrder.query.filter_by(WorkOrderNo=work_order_no)
-        .options(
-            db.joinedload(WorkOrder.customer), db.joinedload(WorkOrder.ship_to_source)
-        )
+        .options(*work_order_load_options(PDF))
         .first_or_404()
     )
 
@@ -1560,18 +1557,18 @@ def view_work_order_pdf(work_order_no):
     wo_dict = prepare_order_data_for_pdf(work_order, order_type="work_order")
 
     try:
-        pdf_buffer = generate_work_order_pdf(
+        return order_pdf_response(
+            WORK_ORDER_PDFS,
+            work_order_no,
             wo_dict,
-            company_info={
-                "name": "Awning Cleaning Industries - In House Cleaning Work Order"
-            },
-        )
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=False,
+            render=lambda: generate_work_order_pdf(
+                wo_dict,
+                company_info={
+                    "name": "Awning Cleaning Industries - In House Cleaning Work Order"
+                },
+            ).getvalue(),
             download_name=f"WorkOrder_{work_order_no}.pdf",
-            mimetype="application/pdf",
+            as_attachment=False,
         )
 
     except Exception as e:
@@ -1592,50 +1589,31 @@ def bulk_pdf_work_orders():
         if not work_order_numbers:
             return jsonify({"error": "No work orders provided"}), 400
 
-        # Create a new PDF document
-        merged_pdf = fitz.open()
-
-        # Generate PDF for each work order and merge
-        for wo_no in work_order_numbers:
-            work_order = (
-                WorkOrder.query.filter_by(WorkOrderNo=wo_no)
-                .options(
-                    db.joinedload(WorkOrder.customer),
-                    db.joinedload(WorkOrder.ship_to_source),
-                )
-                .first()
-            )
-
-            if not work_order:
-                continue
-
-            # Prepare order data using shared helper
-            wo_dict = prepare_order_data_for_pdf(work_order, order_type="work_order")
+        max_orders = current_app.config.get("BULK_PDF_MAX_ORDERS", 500)
+        if len(work_order_numbers) > max_orders:
+            return jsonify(
+                {"error": f"At most {max_orders} work orders can be printed at once"}
+            ), 400
 
-            # Generate PDF for this work order
-            pdf_buffer = generate_work_order_pdf(
-                wo_dict,
-                company_info={
-                    "name": "Awning Cleaning Industries - In House Cleaning Work Order"
-                },
+        # Render in batches into a temp file, then stream it (utils/bulk_pdf.py)
+        path = new_bulk_pdf_path()
+        try:
+            rendered = build_bulk_work_order_pdf(
+                [str(no) for no in work_order_numbers],
+                path,
+                batch_size=current_app.config.get("BULK_PDF_BATCH_SIZE", 25),
+                workers=current_app.config.get("BULK_PDF_WORKERS", 0),
             )
+        except Exception:
+            os.remove(path)
+            raise
 
-            # Open the generated PDF and append to merged PDF
-            temp_pdf = fitz.open(stream=pdf_buffer.read(), filetype="pdf")
-            merged_pdf.insert_pdf(temp_pdf)
-            temp_pdf.close()
+        if not rendered:
+            os.remove(path)
+            return jsonify({"error": "None of the work orders were found"}), 404
 
-        # Save merged PDF to buffer
-        output_buffer = BytesIO()
-        merged_pdf.save(output_buffer)
-        merged_pdf.close()
-        output_buffer.seek(0)
-
-        return send_file(
-            output_buffer,
-            as_attachment=True,
-            download_name=f"WorkOrders_Bulk_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            mimetype="application/pdf",
+        return bulk_pdf_response(
+            path, f"WorkOrders_Bulk_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         )
 
     except Exception as e:
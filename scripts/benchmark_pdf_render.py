@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark: work order / repair order PDF render time.
+
+Measures
+
+1. a single order, rendered --repeat times (median per PDF)
+2. a bulk batch of --orders work orders through
+   utils.bulk_pdf.render_work_order_pdfs() (total and per PDF)
+
+for both generators with the shared style registry (utils.pdf_styles) and,
+for comparison, with the styles rebuilt for every PDF as the generators did
+before the registry (getSampleStyleSheet() + custom ParagraphStyles +
+TableStyles per PDF).
+
+The orders are synthetic; no database is needed.
+
+Usage:
+    python scripts/benchmark_pdf_render.py                   # 200-order batch, rendered inline
+    python scripts/benchmark_pdf_render.py --orders 500 --workers 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import bulk_pdf, pdf_styles
+from utils.repair_order_pdf import RepairOrderPDF, generate_repair_order_pdf
+from utils.work_order_pdf import WorkOrderPDF, generate_work_order_pdf
+
+
+def make_work_order(number, item_count=6):
+    return {
+        "WorkOrderNo": str(number),
+        "CustID": "BENCH",
+        "WOName": f"Benchmark {number}",
+        "DateIn": "01/05/26 00:00:00",
+        "DateRequired": "02/05/26 00:00:00",
+        "RushOrder": number % 5 == 0,
+        "FirmRush": number % 10 == 0,
+        "RepairsNeeded": number % 2 == 0,
+        "StorageTime": "Seasonal",
+        "RackNo": f"R{number % 40}",
+        "SpecialInstructions": "Handle with care\nCall before delivery",
+        "customer": {
+            "Name": "Benchmark Customer",
+            "Address": "1 Main St",
+            "City": "Springfield",
+            "State": "il",
+            "ZipCode": "62701-",
+            "CellPhone": "555-0100",
+            "CleanEmail": "bench@example.com",
+            "Source": "Benchmark Source",
+            "SourceCity": "Springfield",
+        },
+        "items": [
+            {
+                "Qty": "1.0",
+                "Description": f"Awning {i}",
+                "Material": "Sunbrella",
+                "Condition": "Good",
+                "Color": "Blue",
+                "SizeWgt": "10x4",
+                "Price": "125.50",
+            }
+            for i in range(item_count)
+        ],
+    }
+
+
+def make_repair_order(number, item_count=6):
+    order = make_work_order(number, item_count)
+    order["RepairOrderNo"] = order.pop("WorkOrderNo")
+    order["SPECIALINSTRUCTIONS"] = order.pop("SpecialInstructions")
+    return order
+
+
+def build_styles():
+    """Everything the registry builds once, built again."""
+    styles = pdf_styles._build_paragraph_styles()
+    pdf_styles._build_bool_styles(styles)
+    pdf_styles._build_table_styles()
+    return styles
+
+
+@contextmanager
+def styles_rebuilt_per_pdf():
+    """Make every PDF build its own styles, as before the shared registry."""
+
+    def rebuilding(init):
+        def __init__(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+            self.styles = build_styles()
+
+        return __init__
+
+    with mock.patch.object(WorkOrderPDF, "__init__", rebuilding(WorkOrderPDF.__init__)), \
+            mock.patch.object(RepairOrderPDF, "__init__", rebuilding(RepairOrderPDF.__init__)):
+        yield
+
+
+def time_single(render, order, repeat):
+    render(dict(order))  # warm up fonts / imports
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(dict(order))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def time_batch(orders, workers):
+    if workers:
+        # Start the pool (and import the generators in each worker) untimed
+        bulk_pdf.render_work_order_pdfs(orders[: workers * 2], workers)
+    start = time.perf_counter()
+    bulk_pdf.render_work_order_pdfs(orders, workers)
+    return time.perf_counter() - start
+
+
+def run(label, args):
+    work_order = make_work_order(1)
+    repair_order = make_repair_order(2)
+    batch = [make_work_order(n) for n in range(1, args.orders + 1)]
+
+    wo_single = time_single(generate_work_order_pdf, work_order, args.repeat)
+    ro_single = time_single(generate_repair_order_pdf, repair_order, args.repeat)
+    batch_total = time_batch(batch, args.workers)
+
+    print(f"\n{label}")
+    print(f"  single work order PDF:    {wo_single * 1000:8.2f} ms")
+    print(f"  single repair order PDF:  {ro_single * 1000:8.2f} ms")
+    print(
+        f"  {args.orders}-order batch:        {batch_total:8.2f} s "
+        f"({batch_total / args.orders * 1000:.2f} ms per PDF)"
+    )
+    return wo_single, batch_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=200, help="bulk batch size")
+    parser.add_argument("--repeat", type=int, default=50, help="single-order renders")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="bulk render processes (0 renders inline; the comparison is only "
+        "meaningful inline, worker processes always use the shared registry)",
+    )
+    args = parser.parse_args()
+
+    setup = time_single(lambda _: build_styles(), {}, args.repeat)
+    print(f"Style setup alone: {setup * 1000:.3f} ms per PDF")
+
+    try:
+        with styles_rebuilt_per_pdf():
+            before = run("Styles rebuilt per PDF (previous behaviour)", args)
+        after = run("Shared style registry (utils.pdf_styles)", args)
+    finally:
+        bulk_pdf._reset_pool()
+
+    print(
+        f"\nSpeed-up: single {before[0] / after[0]:.2f}x, "
+        f"batch {before[1] / after[1]:.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
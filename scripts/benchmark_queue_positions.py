@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dense vs gap-based cleaning queue positions.
+
+Builds a queue of N approved orders, then measures
+
+1. inserting newly approved orders (late approvals that sort near the head)
+   - dense: the old approach, re-sorting the tier and renumbering 1..N
+   - gap:   utils.queue_positions.assign_positions_to_unassigned()
+2. a drag-and-drop reorder of one 25-order page (one UPDATE statement)
+3. moving an order from the last page to the top (move_queue_entry)
+
+reporting wall time and the number of rows UPDATEd for each.
+
+Usage:
+    python scripts/benchmark_queue_positions.py                 # 5000 orders, SQLite in memory
+    python scripts/benchmark_queue_positions.py --orders 20000
+    python scripts/benchmark_queue_positions.py --database-url postgresql://...  # scratch DB only!
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# utils.file_upload refuses to import without S3 settings; nothing is uploaded here
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_S3_BUCKET", "benchmark")
+
+from sqlalchemy import event
+
+from app import create_app
+from config import TestingConfig
+from extensions import db
+from models.customer import Customer
+from models.work_order import WorkOrder
+from utils.queue_positions import (
+    QUEUE_POSITION_GAP,
+    assign_positions_to_unassigned,
+    move_queue_entry,
+    priority_tier,
+    queue_base_filter,
+    reorder_within_slots,
+    tier_sort_key,
+    write_queue_positions,
+)
+
+
+class UpdateCounter:
+    """Counts UPDATE statements against work orders, and the rows they wrote."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = 0
+        self.rows = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "after_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "after_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE TBLCUSTWORKORDERDETAIL"):
+            self.statements += 1
+            self.rows += cursor.rowcount
+
+
+def build_queue(order_count, dense):
+    """Create order_count queued orders (10% firm rush, 20% rush)."""
+    db.session.add(Customer(CustID="BENCH", Name="Benchmark Customer"))
+    start = date(2024, 1, 1)
+    orders = []
+    for i in range(order_count):
+        roll = random.random()
+        orders.append(
+            {
+                "WorkOrderNo": str(100000 + i),
+                "CustID": "BENCH",
+                "WOName": f"Bench {i}",
+                "DateIn": start + timedelta(days=i // 10),
+                "DateRequired": start + timedelta(days=30 + i // 10),
+                "FirmRush": roll < 0.1,
+                "RushOrder": 0.1 <= roll < 0.3,
+                "Quote": "Approved",
+            }
+        )
+    orders.sort(
+        key=lambda o: (
+            priority_tier(o["FirmRush"], o["RushOrder"]),
+            tier_sort_key(
+                priority_tier(o["FirmRush"], o["RushOrder"]),
+                o["DateRequired"],
+                o["DateIn"],
+                o["WorkOrderNo"],
+            ),
+        )
+    )
+    for index, order in enumerate(orders):
+        order["QueuePosition"] = index + 1 if dense else (index + 1) * QUEUE_POSITION_GAP
+    db.session.bulk_insert_mappings(WorkOrder, orders)
+    db.session.commit()
+
+
+def add_late_approvals(count):
+    """Add regular orders with old DateIn values (they sort to the head of the tier)."""
+    for i in range(count):
+        db.session.add(
+            WorkOrder(
+                WorkOrderNo=f"LATE{i}",
+                CustID="BENCH",
+                WOName=f"Late {i}",
+                DateIn=date(2023, 12, 1) + timedelta(days=i),
+                Quote="Approved",
+            )
+        )
+    db.session.commit()
+
+
+def legacy_dense_insert():
+    """The previous algorithm: re-sort every tier with new orders, renumber 1..N."""
+    orders = WorkOrder.query.filter(queue_base_filter()).all()
+    new_tiers = {
+        priority_tier(wo.FirmRush, wo.RushOrder)
+        for wo in orders
+        if wo.QueuePosition is None
+    }
+
+    def key(wo):
+        tier = priority_tier(wo.FirmRush, wo.RushOrder)
+        if tier in new_tiers:
+            return (tier, tier_sort_key(tier, wo.DateRequired, wo.DateIn, wo.WorkOrderNo))
+        return (tier, wo.QueuePosition or 0)
+
+    for position, wo in enumerate(sorted(orders, key=key), start=1):
+        wo.QueuePosition = position
+    db.session.commit()
+
+
+def timed(label, func):
+    with UpdateCounter(db.engine) as counter:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    print(
+        f"  {label:<32} {elapsed * 1000:>9.1f} ms  {counter.rows:>7} rows updated"
+        f"  {counter.statements:>6} statements"
+    )
+
+
+def reset_database():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def run(order_count, late_count):
+    print(f"\nQueue of {order_count} orders, {late_count} late approvals")
+    print("-" * 64)
+
+    # Dense baseline
+    reset_database()
+    build_queue(order_count, dense=True)
+    add_late_approvals(late_count)
+    timed("dense insert (re-sort tier)", legacy_dense_insert)
+
+    # Gap-based
+    reset_database()
+    build_queue(order_count, dense=False)
+    add_late_approvals(late_count)
+
+    def gap_insert():
+        assign_positions_to_unassigned()
+        db.session.commit()
+
+    timed("gap insert", gap_insert)
+
+    # Drag-and-drop on page 3 (25 orders): move the last order to the top
+    page = (
+        db.session.query(WorkOrder.WorkOrderNo, WorkOrder.QueuePosition)
+        .filter(queue_base_filter())
+        .order_by(WorkOrder.QueuePosition)
+        .offset(50)
+        .limit(25)
+        .all()
+    )
+    current = dict(page)
+    new_order = [page[-1][0]] + [no for no, _ in page[:-1]]
+
+    def gap_reorder():
+        moved = reorder_within_slots(new_order, current)
+        write_queue_positions(moved)
+        db.session.commit()
+
+    timed("page reorder (25 orders)", gap_reorder)
+
+    last = (
+        db.session.query(WorkOrder.WorkOrderNo)
+        .filter(queue_base_filter())
+        .order_by(WorkOrder.QueuePosition.desc())
+        .first()[0]
+    )
+
+    def cross_page_move():
+        move_queue_entry(last, 1)
+        db.session.commit()
+
+    timed("cross-page move (last -> 1)", cross_page_move)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--late", type=int, default=5, help="late approvals to insert")
+    parser.add_argument("--database-url", default="sqlite:///:memory:")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+
+    app = create_app(config_class=BenchmarkConfig)
+    with app.app_context():
+        for count in sorted({1000, args.orders}):
+            run(count, args.late)
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark: upload thumbnail generation for photos and PDFs.
+
+Times utils.thumbnail_generator.generate_thumbnail() on a corpus of files,
+against the previous decoding path for comparison:
+
+- images: fully decoded (and alpha-composited) before thumbnail(), versus
+  JPEG draft() decoding at reduced scale and converting after the resize;
+- PDFs: page one rendered at zoom 1.0, encoded to PNG and re-opened with
+  Pillow, versus rendering straight at thumbnail size into a Pixmap shared
+  with PIL (no copy).
+
+The default corpus is synthetic and written to a temp directory: 12 MP and
+8 MP phone photos (JPEG, including a grayscale one), a phone screenshot
+(RGBA PNG), a 20-page text PDF and a 10-page scanned PDF (one photo per
+page). Pass --corpus to time your own files instead (pdf/jpg/jpeg/png).
+
+Usage:
+    python scripts/benchmark_thumbnails.py
+    python scripts/benchmark_thumbnails.py --corpus ~/Downloads/uploads --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+from PIL import Image, ImageDraw, ImageFilter
+
+from utils.thumbnail_generator import THUMBNAIL_SIZE, generate_thumbnail
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (for comparison)
+# ---------------------------------------------------------------------------
+
+
+def _centered(img):
+    thumbnail = Image.new("RGB", THUMBNAIL_SIZE, (255, 255, 255))
+    x = (THUMBNAIL_SIZE[0] - img.width) // 2
+    y = (THUMBNAIL_SIZE[1] - img.height) // 2
+    thumbnail.paste(img, (x, y))
+    return thumbnail
+
+
+def legacy_image_thumbnail(path):
+    img = Image.open(path)
+    if img.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    return _centered(img)
+
+
+def legacy_pdf_thumbnail(path):
+    pdf_document = fitz.open(path, filetype="pdf")
+    page = pdf_document[0]
+    pix = page.get_pixmap(matrix=fitz.Matrix(1.0, 1.0))
+    img = Image.open(BytesIO(pix.tobytes("png")))
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    pdf_document.close()
+    return _centered(img)
+
+
+def legacy_thumbnail(path):
+    if path.lower().endswith(".pdf"):
+        return legacy_pdf_thumbnail(path)
+    return legacy_image_thumbnail(path)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+
+def make_photo(size, seed, mode="RGB"):
+    """Photo-like content: gradients, shapes and sensor noise (JPEG-hostile)."""
+    width, height = size
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i in range(40):
+        x = (seed * 97 + i * 331) % width
+        y = (seed * 53 + i * 197) % height
+        r = 50 + (i * 37) % 400
+        color = ((i * 50) % 256, (seed * 80 + i * 20) % 256, (i * 90) % 256)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+    img = img.filter(ImageFilter.GaussianBlur(3))
+    noise = Image.effect_noise(size, 24).convert("RGB")
+    img = Image.blend(img, noise, 0.15)
+    return img.convert(mode)
+
+
+def make_screenshot(size):
+    img = Image.new("RGBA", size, (250, 250, 250, 255))
+    draw = ImageDraw.Draw(img)
+    for y in range(0, size[1], 120):
+        draw.rectangle((40, y + 20, size[0] - 40, y + 100), fill=(220, 230, 245, 255))
+        draw.text((60, y + 50), f"Message {y // 120}: awning pickup on Tuesday", fill=(20, 20, 20, 255))
+    return img
+
+
+def make_text_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        text = "\n".join(
+            f"{number + 1}.{line} Clean and re-hem awning panel, check grommets"
+            for line in range(45)
+        )
+        page.insert_textbox(fitz.Rect(50, 50, 560, 790), text, fontsize=10)
+    doc.save(path)
+
+
+def make_scanned_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        buffer = BytesIO()
+        make_photo((2480, 3508), seed=number).save(buffer, format="JPEG", quality=80)
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(path)
+
+
+def build_corpus(directory):
+    files = {
+        "photo_12mp.jpg": lambda p: make_photo((4032, 3024), 1).save(p, quality=90),
+        "photo_8mp_portrait.jpg": lambda p: make_photo((2448, 3264), 2).save(p, quality=90),
+        "photo_gray.jpg": lambda p: make_photo((4032, 3024), 3, "L").save(p, quality=90),
+        "screenshot.png": lambda p: make_screenshot((1170, 2532)).save(p),
+        "invoice_20_pages.pdf": lambda p: make_text_pdf(p, 20),
+        "scan_10_pages.pdf": lambda p: make_scanned_pdf(p, 10),
+    }
+    paths = []
+    for name, write in files.items():
+        path = os.path.join(directory, name)
+        write(path)
+        paths.append(path)
+    return paths
+
+
+def load_corpus(directory):
+    extensions = (".pdf", ".jpg", ".jpeg", ".png")
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(extensions)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+
+def median_ms(fn, path, repeat):
+    fn(path)  # warm up (fonts, file cache)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", help="directory of files to thumbnail")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = load_corpus(os.path.expanduser(args.corpus))
+        else:
+            print("Building synthetic corpus...")
+            paths = build_corpus(tmp)
+
+        print(f"\n{'file':<28}{'size':>10}{'before ms':>12}{'after ms':>11}{'speedup':>10}")
+        totals = [0.0, 0.0]
+        for path in paths:
+            name = os.path.basename(path)
+            before = median_ms(legacy_thumbnail, path, args.repeat)
+            after = median_ms(lambda p: generate_thumbnail(p, name), path, args.repeat)
+            totals[0] += before
+            totals[1] += after
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(
+                f"{name[:27]:<28}{size_mb:>8.1f}MB{before:>12.1f}{after:>11.1f}"
+                f"{before / after:>9.1f}x"
+            )
+        print(
+            f"{'total':<28}{'':>10}{totals[0]:>12.1f}{totals[1]:>11.1f}"
+            f"{totals[0] / totals[1]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Delete the S3 objects still queued in s3_delete_outbox.
+
+The delete routes drain the outbox right after their commit
+(utils/s3_deletes.py); keys that failed then are retried with backoff on
+the next drain. Run this from cron so retries also happen when nothing is
+being deleted.
+
+Usage:
+    python scripts/drain_s3_deletes.py             # Delete all due keys
+    python scripts/drain_s3_deletes.py --preview   # Show the queue, don't delete
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from extensions import db
+from models.s3_delete_outbox import S3DeleteOutbox
+from utils.s3_deletes import drain_s3_deletes
+
+
+def preview_queue():
+    """Show queued keys without deleting anything."""
+    with app.app_context():
+        total = db.session.query(db.func.count(S3DeleteOutbox.id)).scalar()
+        print(f"{total} keys queued for deletion")
+        failing = (
+            S3DeleteOutbox.query.filter(S3DeleteOutbox.attempts > 0)
+            .order_by(S3DeleteOutbox.attempts.desc())
+            .limit(20)
+            .all()
+        )
+        for row in failing:
+            print(
+                f"  {row.s3_key}: {row.attempts} attempts, next at "
+                f"{row.next_attempt_at:%Y-%m-%d %H:%M:%S} ({row.last_error})"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--preview", action="store_true", help="only show the queue")
+    parser.add_argument("--limit", type=int, help="delete at most this many keys")
+    args = parser.parse_args()
+
+    if args.preview:
+        preview_queue()
+        return
+
+    deleted, failed = drain_s3_deletes(app, limit=args.limit)
+    print(f"Deleted {deleted} keys, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,8 @@ from models.embeddings import (
 )
 from models.customer import Customer
 from models.work_order import WorkOrder, WorkOrderItem
+from utils.load_profiles import MINIMAL, work_order_load_options
+from utils.search_helpers import apply_search
 
 # Configuration
 DEEPSEEK_API_KEY = os.environ.get("DEEPSEEK_API_KEY", "")
@@ -874,7 +876,7 @@ def sync_all_embeddings(batch_size: int = 100) -> Dict[str, int]:
             stats["customers_failed"] += 1
 
     # Sync work orders
-    work_orders = WorkOrder.query.all()
+    work_orders = WorkOrder.query.options(*work_order_load_options(MINIMAL)).all()
     for wo in work_orders:
         if sync_work_order_embedding(wo.WorkOrderNo):
             stats["work_orders_synced"] += 1
@@ -1163,21 +1165,8 @@ AVAILABLE_TOOLS = [
 
 def tool_search_customers(query: str, limit: int = 5) -> Dict:
     """Search customers by query text."""
-    query_lower = query.lower()
-
-    # Search in database
-    customers = (
-        Customer.query.filter(
-            db.or_(
-                Customer.CustID.ilike(f"%{query}%"),
-                Customer.Name.ilike(f"%{query}%"),
-                Customer.Contact.ilike(f"%{query}%"),
-                Customer.EmailAddress.ilike(f"%{query}%"),
-            )
-        )
-        .limit(limit)
-        .all()
-    )
+    # Search in database, best matches first
+    customers = apply_search(Customer.query, Customer, query, ranked=True).limit(limit).all()
 
     results = []
     for c in customers:
@@ -1203,7 +1192,11 @@ def tool_get_customer_details(customer_id: str) -> Dict:
         return {"error": f"Customer '{customer_id}' not found"}
 
     # Get work order count
-    work_orders = WorkOrder.query.filter_by(CustID=customer_id).all()
+    work_orders = (
+        WorkOrder.query.options(*work_order_load_options(MINIMAL))
+        .filter_by(CustID=customer_id)
+        .all()
+    )
 
     return {
         "customer_id": customer.CustID,
@@ -1227,19 +1220,16 @@ def tool_get_customer_details(customer_id: str) -> Dict:
 
 def tool_search_work_orders(query: str, status: str = None, limit: int = 10) -> Dict:
     """Search work orders by query text."""
-    filters = [
-        db.or_(
-            WorkOrder.WorkOrderNo.ilike(f"%{query}%"),
-            WorkOrder.WOName.ilike(f"%{query}%"),
-            WorkOrder.CustID.ilike(f"%{query}%"),
-            WorkOrder.SpecialInstructions.ilike(f"%{query}%"),
-        )
-    ]
-
+    work_orders_query = apply_search(
+        WorkOrder.query.options(*work_order_load_options(MINIMAL)),
+        WorkOrder,
+        query,
+        ranked=True,
+    )
     if status:
-        filters.append(WorkOrder.ReturnStatus == status)
+        work_orders_query = work_orders_query.filter(WorkOrder.ReturnStatus == status)
 
-    work_orders = WorkOrder.query.filter(*filters).limit(limit).all()
+    work_orders = work_orders_query.limit(limit).all()
 
     results = []
     for wo in work_orders:
@@ -1331,7 +1321,8 @@ def tool_get_customer_work_orders(customer_id: str, limit: int = 20) -> Dict:
         return {"error": f"Customer '{customer_id}' not found"}
 
     work_orders = (
-        WorkOrder.query.filter_by(CustID=customer_id)
+        WorkOrder.query.options(*work_order_load_options(MINIMAL))
+        .filter_by(CustID=customer_id)
         .order_by(WorkOrder.created_at.desc())
         .limit(limit)
         .all()
@@ -1386,20 +1377,18 @@ def tool_search_items(
     query: str, material: str = None, color: str = None, limit: int = 10
 ) -> Dict:
     """Search items by query text."""
-    filters = [
-        db.or_(
-            WorkOrderItem.Description.ilike(f"%{query}%"),
-            WorkOrderItem.Material.ilike(f"%{query}%"),
-            WorkOrderItem.Color.ilike(f"%{query}%"),
-        )
-    ]
-
+    filters = []
     if material:
         filters.append(WorkOrderItem.Material.ilike(f"%{material}%"))
     if color:
         filters.append(WorkOrderItem.Color.ilike(f"%{color}%"))
 
-    items = WorkOrderItem.query.filter(*filters).limit(limit).all()
+    items = (
+        apply_search(WorkOrderItem.query, WorkOrderItem, query, ranked=True)
+        .filter(*filters)
+        .limit(limit)
+        .all()
+    )
 
     results = []
     for item in items:
@@ -1426,7 +1415,7 @@ def tool_search_items(
 
 def tool_get_work_order_stats(customer_id: str = None) -> Dict:
     """Get work order statistics."""
-    query = WorkOrder.query
+    query = WorkOrder.query.options(*work_order_load_options(MINIMAL))
 
     if customer_id:
         query = query.filter_by(CustID=customer_id)
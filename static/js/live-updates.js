@@ -0,0 +1,67 @@
+/**
+ * Live updates for the cleaning queue and in-progress boards.
+ *
+ * Subscribes to the server-sent events feed (/events/stream) and hands
+ * each event to the page's handlers, so screens can patch themselves
+ * instead of re-requesting whole pages. Handlers that cannot apply an
+ * event locally call LiveUpdates.showStaleNotice() to offer a reload.
+ *
+ * When the server has no stream slot free it replays missed events, sends
+ * "busy" and closes; EventSource then reconnects after the server's retry
+ * delay, so the page keeps polling until a slot opens up.
+ *
+ * Usage:
+ *   LiveUpdates.connect('/events/stream', {
+ *       'queue.positions': data => { ... },
+ *       'work_order.status': data => { ... },
+ *   });
+ */
+(function (window) {
+    'use strict';
+
+    let source = null;
+
+    function showStaleNotice(message) {
+        let notice = document.getElementById('live-updates-notice');
+        if (!notice) {
+            notice = document.createElement('div');
+            notice.id = 'live-updates-notice';
+            notice.className = 'alert alert-info d-flex align-items-center justify-content-between shadow';
+            notice.style.cssText = 'position: fixed; bottom: 20px; right: 20px; z-index: 9998; max-width: 360px;';
+            notice.innerHTML = '<span class="me-3"></span>' +
+                '<button type="button" class="btn btn-sm btn-primary">Reload</button>';
+            notice.querySelector('button').addEventListener('click', () => window.location.reload());
+            document.body.appendChild(notice);
+        }
+        notice.querySelector('span').textContent = message || 'This list has changed.';
+    }
+
+    function connect(url, handlers) {
+        if (!window.EventSource || source) {
+            return source;
+        }
+        source = new EventSource(url);
+
+        Object.keys(handlers).forEach(eventType => {
+            source.addEventListener(eventType, evt => {
+                let data;
+                try {
+                    data = JSON.parse(evt.data);
+                } catch (err) {
+                    console.error('Invalid live update payload:', err);
+                    return;
+                }
+                handlers[eventType](data);
+            });
+        });
+
+        // Events were missed (reconnect to another worker, slow client, restart)
+        source.addEventListener('reset', () => showStaleNotice('This list may be out of date.'));
+
+        // Stop retrying on pages being unloaded
+        window.addEventListener('beforeunload', () => source && source.close());
+        return source;
+    }
+
+    window.LiveUpdates = { connect, showStaleNotice };
+})(window);
@@ -0,0 +1,55 @@
+/**
+ * Placeholders for upload thumbnails that are still being generated.
+ *
+ * Thumbnails are made in the background after an upload (see
+ * utils/thumbnail_jobs.py), so a freshly uploaded file is rendered as a
+ * spinner with data-status-url / data-thumbnail-url. This polls the status
+ * URL and swaps in the thumbnail once it is ready, or a plain file icon
+ * once the server no longer expects one.
+ *
+ * Usage:
+ *   <div class="file-icon thumbnail-pending"
+ *        data-status-url="..." data-thumbnail-url="..." data-alt="photo.jpg">
+ *       <i class="fas fa-spinner fa-spin text-muted"></i>
+ *   </div>
+ */
+(function (window, document) {
+    'use strict';
+
+    const POLL_INTERVAL_MS = 2000;
+
+    function showThumbnail(placeholder) {
+        const img = document.createElement('img');
+        img.src = placeholder.dataset.thumbnailUrl;
+        img.alt = placeholder.dataset.alt || '';
+        img.className = 'file-thumbnail';
+        img.onerror = () => showIcon(img);
+        placeholder.replaceWith(img);
+    }
+
+    function showIcon(placeholder) {
+        const icon = document.createElement('div');
+        icon.className = 'file-icon';
+        icon.innerHTML = '<i class="fas fa-file text-muted"></i>';
+        placeholder.replaceWith(icon);
+    }
+
+    function poll(placeholder) {
+        fetch(placeholder.dataset.statusUrl, { credentials: 'same-origin' })
+            .then(response => (response.ok ? response.json() : { ready: false, pending: false }))
+            .then(status => {
+                if (status.ready) {
+                    showThumbnail(placeholder);
+                } else if (status.pending) {
+                    window.setTimeout(() => poll(placeholder), POLL_INTERVAL_MS);
+                } else {
+                    showIcon(placeholder);
+                }
+            })
+            .catch(() => window.setTimeout(() => poll(placeholder), POLL_INTERVAL_MS * 2));
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('.thumbnail-pending').forEach(poll);
+    });
+})(window, document);
@@ -64,8 +64,12 @@ requires_postgres = pytest.mark.skipif(
 @pytest.fixture(autouse=True)
 def mock_s3_client(mocker):
     """Automatically mock boto3 S3 client for all tests."""
+    from utils.presigned_urls import presigned_url_cache
+
     mock_s3 = MagicMock()
     mocker.patch("utils.file_upload.boto3.client", return_value=mock_s3)
+    # URLs cached by an earlier test came from another client
+    presigned_url_cache.clear()
     return mock_s3
 
 
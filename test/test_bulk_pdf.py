@@ -0,0 +1,146 @@
+"""
+Tests for batched bulk work order PDFs (utils/bulk_pdf.py).
+"""
+
+import os
+
+import fitz
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.user import User
+from models.work_order import WorkOrder, WorkOrderItem
+from utils import bulk_pdf
+from utils.bulk_pdf import (
+    build_bulk_work_order_pdf,
+    bulk_pdf_response,
+    new_bulk_pdf_path,
+    prefetch_work_order_data,
+    render_work_order_pdfs,
+)
+
+NUMBERS = [str(n) for n in range(9001, 9006)]
+
+
+@pytest.fixture
+def work_orders(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="BP1", Name="Bulk Customer"))
+        for number in NUMBERS:
+            db.session.add(WorkOrder(WorkOrderNo=number, CustID="BP1", WOName=f"Bulk {number}"))
+            db.session.add(
+                WorkOrderItem(WorkOrderNo=number, CustID="BP1", Description="Awning", Qty=1)
+            )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def pdf_path():
+    path = new_bulk_pdf_path()
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@pytest.fixture
+def user_client(client, app):
+    with app.app_context():
+        db.session.add(
+            User(
+                username="bulkpdf",
+                email="bulkpdf@example.com",
+                role="user",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "bulkpdf", "password": "password"})
+    return client
+
+
+def page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text() for page in doc]
+
+
+class TestBuildBulkPdf:
+    def test_batches_merge_in_request_order(self, work_orders, pdf_path):
+        order = list(reversed(NUMBERS))
+        with work_orders.app_context():
+            rendered = build_bulk_work_order_pdf(order, pdf_path, batch_size=2)
+
+        assert rendered == 5
+        texts = page_texts(pdf_path)
+        firsts = [next(no for no in NUMBERS if no in text) for text in texts]
+        # Every order is present, in the requested order
+        assert [no for i, no in enumerate(firsts) if i == 0 or firsts[i - 1] != no] == order
+
+    def test_unknown_orders_are_skipped(self, work_orders, pdf_path):
+        with work_orders.app_context():
+            assert build_bulk_work_order_pdf(["nope"], pdf_path) == 0
+            assert build_bulk_work_order_pdf(["nope", "9001"], pdf_path, batch_size=1) == 1
+
+    def test_one_query_per_batch(self, work_orders):
+        seen = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            seen.append(statement)
+
+        with work_orders.app_context():
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                data = prefetch_work_order_data(NUMBERS)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert [wo["WorkOrderNo"] for wo in data] == NUMBERS
+        assert all(wo["items"] for wo in data)
+        # Orders (with customer and ship-to source) + one selectin for items
+        assert len(seen) == 2
+
+    def test_process_pool_matches_inline(self, work_orders):
+        with work_orders.app_context():
+            data = prefetch_work_order_data(NUMBERS[:3])
+        try:
+            pooled = render_work_order_pdfs(data, workers=2)
+        finally:
+            bulk_pdf._reset_pool()
+
+        inline = render_work_order_pdfs(data, workers=0)
+        assert [len(fitz.open(stream=p, filetype="pdf")) for p in pooled] == [
+            len(fitz.open(stream=p, filetype="pdf")) for p in inline
+        ]
+
+
+class TestBulkPdfResponse:
+    def test_streams_and_removes_file(self, app, work_orders, pdf_path):
+        with work_orders.app_context():
+            build_bulk_work_order_pdf(NUMBERS[:2], pdf_path)
+            size = os.path.getsize(pdf_path)
+            response = bulk_pdf_response(pdf_path, "bulk.pdf")
+
+        assert response.is_streamed
+        assert response.headers["Content-Length"] == str(size)
+        body = b"".join(response.response)
+        response.close()
+
+        assert len(body) == size
+        assert body.startswith(b"%PDF")
+        assert not os.path.exists(pdf_path)
+
+    def test_order_limit(self, user_client, app):
+        app.config["BULK_PDF_MAX_ORDERS"] = 3
+        response = user_client.post(
+            "/work_orders/api/bulk_pdf", json={"work_order_numbers": NUMBERS}
+        )
+        assert response.status_code == 400
+
+    def test_nothing_found(self, user_client, work_orders):
+        response = user_client.post(
+            "/work_orders/api/bulk_pdf", json={"work_order_numbers": ["missing"]}
+        )
+        assert response.status_code == 404
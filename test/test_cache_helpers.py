@@ -0,0 +1,179 @@
+"""
+Tests for the cached_query decorator (utils/cache_helpers.py):
+negative caching, single-flight recomputation, TTL jitter and the
+bounded in-process LRU.
+"""
+
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from extensions import cache
+from utils.cache_helpers import CACHED_NONE, _jittered_timeout, cached_query
+from utils.cache_metrics import cache_metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    cache_metrics.reset()
+    yield
+    cache_metrics.reset()
+
+
+@pytest.fixture
+def simple_cache_app():
+    """Minimal app with a real in-memory cache (TestingConfig uses NullCache)."""
+    app = Flask(__name__)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield app
+
+
+class TestNegativeCaching:
+    def test_none_result_is_cached(self, simple_cache_app):
+        calls = []
+
+        @cached_query(timeout=60)
+        def find_missing(key):
+            calls.append(key)
+            return None
+
+        assert find_missing("x") is None
+        assert find_missing("x") is None
+        assert calls == ["x"]
+        assert cache.get("query:find_missing:x") == CACHED_NONE
+
+    def test_cache_none_false_skips_storing(self, simple_cache_app):
+        calls = []
+
+        @cached_query(timeout=60, cache_none=False)
+        def find_missing(key):
+            calls.append(key)
+            return None
+
+        find_missing("x")
+        find_missing("x")
+        assert calls == ["x", "x"]
+
+    def test_empty_list_is_cached(self, simple_cache_app):
+        calls = []
+
+        @cached_query(timeout=60)
+        def list_nothing():
+            calls.append(1)
+            return []
+
+        assert list_nothing() == []
+        assert list_nothing() == []
+        assert len(calls) == 1
+
+
+class TestSingleFlight:
+    def test_concurrent_misses_compute_once(self, simple_cache_app):
+        calls = []
+        started = threading.Event()
+
+        @cached_query(timeout=60)
+        def slow_query():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+
+        def worker():
+            with simple_cache_app.app_context():
+                results.append(slow_query())
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["value"] * 5
+        assert len(calls) == 1
+        stats = cache_metrics.snapshot()["prefixes"]["query:slow_query"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 4
+
+
+class TestJitter:
+    def test_jitter_stays_within_bounds(self):
+        values = {_jittered_timeout(100, 0.1) for _ in range(200)}
+        assert min(values) >= 90
+        assert max(values) <= 110
+        assert len(values) > 1
+
+    def test_zero_timeout_and_zero_jitter_unchanged(self):
+        assert _jittered_timeout(0, 0.1) == 0
+        assert _jittered_timeout(300, 0) == 300
+
+
+class TestLRU:
+    def test_maxsize_evicts_least_recently_used(self):
+        calls = []
+
+        @cached_query(timeout=60, maxsize=2, key_prefix="lru")
+        def lookup(key):
+            calls.append(key)
+            return key.upper()
+
+        lookup("a")
+        lookup("b")
+        lookup("a")  # a is now most recently used
+        lookup("c")  # evicts b
+        lookup("a")
+        lookup("b")
+
+        assert calls == ["a", "b", "c", "b"]
+        stats = cache_metrics.snapshot()["prefixes"]["lru:lookup"]
+        assert stats["evictions"] == 2
+
+    def test_lru_entries_expire(self):
+        calls = []
+
+        @cached_query(timeout=1, jitter=0, maxsize=10)
+        def lookup(key):
+            calls.append(key)
+            return key
+
+        lookup("a")
+        time.sleep(1.05)
+        lookup("a")
+        assert calls == ["a", "a"]
+
+    def test_cache_delete_and_clear(self):
+        calls = []
+
+        @cached_query(timeout=60, maxsize=10)
+        def lookup(key):
+            calls.append(key)
+            return key
+
+        lookup("a")
+        lookup("b")
+        lookup.cache_delete("a")
+        lookup("a")
+        lookup("b")
+        assert calls == ["a", "b", "a"]
+
+        lookup.cache_clear()
+        lookup("b")
+        assert calls == ["a", "b", "a", "b"]
+
+    def test_shared_cache_delete(self, simple_cache_app):
+        calls = []
+
+        @cached_query(timeout=60)
+        def lookup(key):
+            calls.append(key)
+            return key
+
+        lookup("a")
+        lookup.cache_delete("a")
+        lookup("a")
+        assert calls == ["a", "a"]
@@ -0,0 +1,191 @@
+"""
+Tests for cache instrumentation (utils/cache_metrics.py).
+
+Covers the per-prefix counters, the cached_query / cached_view hooks,
+the ML model cache hooks and the /admin/cache-stats endpoint.
+"""
+
+import pytest
+from unittest.mock import patch
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from extensions import cache, db
+from models.user import User
+from utils.cache_metrics import CacheMetrics, cache_metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    cache_metrics.reset()
+    yield
+    cache_metrics.reset()
+
+
+@pytest.fixture
+def simple_cache_app():
+    """Minimal app with a real in-memory cache (TestingConfig uses NullCache)."""
+    app = Flask(__name__)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def admin_client(client, app):
+    """Provide a logged-in client with admin privileges."""
+    with app.app_context():
+        admin = User(
+            username="admin",
+            email="admin@example.com",
+            password_hash=generate_password_hash("password"),
+            role="admin",
+        )
+        db.session.add(admin)
+        db.session.commit()
+
+    client.post("/login", data={"username": "admin", "password": "password"})
+    yield client
+    client.get("/logout")
+
+
+class TestCacheMetrics:
+    def test_counters_per_prefix(self):
+        metrics = CacheMetrics(log_interval=0)
+        metrics.record_hit("a")
+        metrics.record_hit("a")
+        metrics.record_miss("a")
+        metrics.record_set("a")
+        metrics.record_eviction("b", 3)
+
+        prefixes = metrics.snapshot()["prefixes"]
+        assert prefixes["a"]["hits"] == 2
+        assert prefixes["a"]["misses"] == 1
+        assert prefixes["a"]["sets"] == 1
+        assert prefixes["a"]["hit_rate"] == pytest.approx(2 / 3, abs=1e-3)
+        assert prefixes["b"]["evictions"] == 3
+        assert prefixes["b"]["hit_rate"] is None
+
+    def test_time_recompute_accumulates(self):
+        metrics = CacheMetrics(log_interval=0)
+        metrics.record_miss("slow")
+        with patch("utils.cache_metrics.time.perf_counter", side_effect=[1.0, 1.5]):
+            with metrics.time_recompute("slow"):
+                pass
+
+        stats = metrics.snapshot()["prefixes"]["slow"]
+        assert stats["recompute_seconds"] == pytest.approx(0.5)
+        assert stats["avg_recompute_ms"] == pytest.approx(500.0)
+
+    def test_summary_logged_once_per_interval(self, capsys):
+        metrics = CacheMetrics(log_interval=60)
+        metrics.record_hit("a")
+        capsys.readouterr()
+
+        assert metrics.maybe_log_summary(now=metrics._last_log + 30) is False
+        assert metrics.maybe_log_summary(now=metrics._last_log + 61) is True
+        out = capsys.readouterr().out
+        assert "[CACHE STATS]" in out
+        assert "a hit=1" in out
+
+    def test_logging_disabled_with_zero_interval(self, capsys):
+        metrics = CacheMetrics(log_interval=0)
+        metrics.record_hit("a")
+        assert metrics.maybe_log_summary(now=10**9) is False
+        assert "[CACHE STATS]" not in capsys.readouterr().out
+
+
+class TestCachedQueryInstrumentation:
+    def test_hit_miss_set_recorded(self, simple_cache_app):
+        from utils.cache_helpers import cached_query
+
+        calls = []
+
+        @cached_query(timeout=60)
+        def get_things(kind):
+            calls.append(kind)
+            return [kind]
+
+        assert get_things("x") == ["x"]
+        assert get_things("x") == ["x"]
+        assert calls == ["x"]
+
+        stats = cache_metrics.snapshot()["prefixes"]["query:get_things"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["sets"] == 1
+
+    def test_invalidation_counts_eviction(self, simple_cache_app):
+        from utils.cache_helpers import invalidate_work_order_cache
+
+        cache.set("query:get_work_order:123", {"id": 123})
+        invalidate_work_order_cache("123")
+
+        stats = cache_metrics.snapshot()["prefixes"]["query:get_work_order"]
+        assert stats["evictions"] == 1
+
+    def test_cached_view_hit_and_miss(self, simple_cache_app):
+        from utils.cache_helpers import cached_view
+
+        calls = []
+
+        @cached_view(timeout=60, key_prefix="test_view")
+        def view():
+            calls.append(1)
+            return "body"
+
+        with simple_cache_app.test_request_context("/"):
+            assert view() == "body"
+            assert view() == "body"
+
+        assert len(calls) == 1
+        stats = cache_metrics.snapshot()["prefixes"]["test_view"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["sets"] == 1
+
+
+class TestMLCacheInstrumentation:
+    def test_model_cache_hit_and_miss(self):
+        import time
+        from routes import ml
+
+        original = dict(ml._model_cache)
+        try:
+            ml._model_cache.update(
+                {"model": object(), "metadata": {}, "loaded_at": time.time()}
+            )
+            ml.get_current_model()
+
+            ml._model_cache["loaded_at"] = time.time() - 10_000
+            with patch("routes.ml.load_latest_model_from_s3", return_value=False):
+                ml.get_current_model()
+        finally:
+            ml._model_cache.clear()
+            ml._model_cache.update(original)
+
+        stats = cache_metrics.snapshot()["prefixes"]["ml:model"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+        assert stats["sets"] == 0
+
+
+class TestCacheStatsEndpoint:
+    def test_requires_admin(self, client):
+        response = client.get("/admin/cache-stats")
+        assert response.status_code in (302, 401, 403)
+
+    def test_returns_snapshot(self, admin_client):
+        cache_metrics.record_hit("query:example")
+        response = admin_client.get("/admin/cache-stats")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["prefixes"]["query:example"]["hits"] == 1
+        assert "worker_pid" in data
+
+    def test_post_resets(self, admin_client):
+        cache_metrics.record_hit("query:example")
+        response = admin_client.post("/admin/cache-stats")
+        assert response.status_code == 200
+        assert response.get_json()["prefixes"] == {}
@@ -0,0 +1,148 @@
+"""
+Tests for list API totals (utils/count_helpers.py).
+"""
+
+import pytest
+from sqlalchemy import event, text
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.user import User
+from utils.count_helpers import _probe, count_for_list, planner_estimate, wants_exact_count
+
+
+class CountStatements:
+    """Counts SELECT count(*) statements run while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._seen)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._seen)
+
+    def _seen(self, conn, cursor, statement, parameters, context, executemany):
+        if "count(*)" in statement.lower():
+            self.count += 1
+
+
+@pytest.fixture
+def customers(app):
+    with app.app_context():
+        for i in range(7):
+            db.session.add(Customer(CustID=f"CNT{i}", Name=f"Count {i % 2}"))
+        db.session.commit()
+    return app
+
+
+class TestCountForList:
+    def test_unfiltered_uses_cached_table_count(self, customers):
+        with customers.app_context():
+            first = count_for_list(Customer.query, Customer)
+            with CountStatements(db.engine) as counter:
+                second = count_for_list(Customer.query.order_by(Customer.Name), Customer)
+
+        assert first == second
+        assert first.total == 7
+        assert first.source == "table"
+        assert counter.count == 0
+
+    def test_table_count_follows_inserts_and_deletes(self, customers):
+        with customers.app_context():
+            assert count_for_list(Customer.query, Customer).total == 7
+
+            db.session.add(Customer(CustID="CNT_NEW", Name="New"))
+            db.session.commit()
+            assert count_for_list(Customer.query, Customer).total == 8
+
+            db.session.delete(db.session.get(Customer, "CNT0"))
+            db.session.delete(db.session.get(Customer, "CNT1"))
+            db.session.commit()
+            assert count_for_list(Customer.query, Customer).total == 6
+
+    def test_filtered_counts_exactly_without_planner(self, customers):
+        with customers.app_context():
+            query = Customer.query.filter(Customer.Name == "Count 1")
+            assert planner_estimate(query) is None  # SQLite
+            result = count_for_list(query, Customer)
+
+        assert result.total == 3
+        assert result.exact is True
+        assert result.source == "exact"
+
+    def test_exact_on_request(self, customers):
+        with customers.app_context():
+            with CountStatements(db.engine) as counter:
+                result = count_for_list(Customer.query, Customer, exact=True)
+
+        assert result.total == 7
+        assert result.source == "exact"
+        assert counter.count == 1
+
+    def test_estimate_above_threshold(self, customers, monkeypatch):
+        monkeypatch.setattr("utils.count_helpers.planner_estimate", lambda q: 25000)
+        with customers.app_context():
+            query = Customer.query.filter(Customer.Name.ilike("%count%"))
+            with CountStatements(db.engine) as counter:
+                result = count_for_list(query, Customer)
+            customers.config["COUNT_ESTIMATE_THRESHOLD"] = 50000
+            below = count_for_list(query, Customer)
+
+        assert result == (25000, False, "estimate")
+        assert counter.count == 0
+        assert below == (7, True, "exact")
+
+    def test_failed_probe_keeps_pending_changes(self, customers):
+        with customers.app_context():
+            db.session.add(Customer(CustID="CNT_PENDING", Name="Pending"))
+            missing = _probe(
+                lambda: db.session.execute(text("SELECT row_count FROM no_such_table")).scalar(),
+                "Row count",
+            )
+            db.session.commit()
+
+            assert missing is None
+            assert db.session.get(Customer, "CNT_PENDING") is not None
+
+    def test_wants_exact_count(self):
+        assert wants_exact_count({"count": "exact"}) is True
+        assert wants_exact_count({"count": "EXACT"}) is True
+        assert wants_exact_count({}) is False
+
+
+class TestListApiTotals:
+    @pytest.fixture
+    def user_client(self, client, app):
+        with app.app_context():
+            db.session.add(
+                User(
+                    username="counter",
+                    email="counter@example.com",
+                    role="user",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "counter", "password": "password"})
+        return client
+
+    def test_customer_totals(self, user_client, customers):
+        body = user_client.get("/customers/api/customers?size=5").get_json()
+        assert body["total"] == 7
+        assert body["total_exact"] is True
+        assert body["last_page"] == 2
+
+        body = user_client.get("/customers/api/customers?filter_Name=count 1").get_json()
+        assert body["total"] == 3
+
+    def test_exact_parameter(self, user_client, customers):
+        body = user_client.get("/work_orders/api/work_orders?count=exact").get_json()
+        assert body["total"] == 0
+        assert body["total_exact"] is True
+        body = user_client.get("/repair_work_orders/api/repair_work_orders").get_json()
+        assert body["total"] == 0
@@ -0,0 +1,148 @@
+"""
+Tests for the paginated sections of the customer detail page
+(routes/customers.py: customer_summary, customer_detail_section).
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.inventory import Inventory
+from models.repair_order import RepairWorkOrder
+from models.user import User
+from models.work_order import WorkOrder
+from routes.customers import DETAIL_SECTION_SIZE, customer_summary
+
+
+WORK_ORDERS = DETAIL_SECTION_SIZE + 5
+
+
+def work_order_numbers(html):
+    return [int(n) for n in re.findall(r'fa-hashtag me-1"></i>(\d+)', html)]
+
+
+@pytest.fixture
+def customer(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="8801", Name="Commercial"))
+        db.session.add(Customer(CustID="8802", Name="Other"))
+        for number in range(1, WORK_ORDERS + 1):
+            db.session.add(
+                WorkOrder(
+                    WorkOrderNo=str(number),
+                    CustID="8801",
+                    WOName=f"Order {number}",
+                    DateCompleted=datetime(2024, 1, 1) if number % 3 == 0 else None,
+                )
+            )
+        db.session.add(WorkOrder(WorkOrderNo="900", CustID="8802", WOName="Not theirs"))
+        db.session.add(RepairWorkOrder(RepairOrderNo="5", CustID="8801", ROName="Repair"))
+        for i in range(3):
+            db.session.add(
+                Inventory(
+                    InventoryKey=f"DETAIL_{i}",
+                    Description=f"Awning {i}",
+                    CustID="8801",
+                    Qty=1,
+                    created_at=datetime(2024, 1, 1) + timedelta(days=i),
+                )
+            )
+        db.session.add(
+            User(
+                username="sections",
+                email="sections@example.com",
+                role="admin",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def admin_client(client, customer):
+    client.post("/login", data={"username": "sections", "password": "password"})
+    return client
+
+
+class TestSummary:
+    def test_counts(self, customer):
+        with customer.app_context():
+            summary = customer_summary("8801")
+
+        assert summary == {
+            "work_orders": WORK_ORDERS,
+            "closed_work_orders": WORK_ORDERS // 3,
+            "open_work_orders": WORK_ORDERS - WORK_ORDERS // 3,
+            "repair_orders": 1,
+            "closed_repair_orders": 0,
+            "open_repair_orders": 1,
+            "inventory_items": 3,
+        }
+
+
+class TestDetailPage:
+    def test_first_page_and_totals(self, admin_client):
+        page = admin_client.get("/customers/view/8801").get_data(as_text=True)
+
+        # Newest first
+        assert work_order_numbers(page) == list(range(WORK_ORDERS, 5, -1))
+        assert f'data-total="{WORK_ORDERS}"' in page
+        assert ">5</span> remaining" in page
+        # Short sections have no "Show more"
+        assert page.count('class="btn btn-sm btn-outline-secondary w-100 mt-2 show-more"') == 1
+
+
+class TestSectionEndpoint:
+    def test_work_orders_continue_from_cursor(self, admin_client):
+        first = admin_client.get("/customers/api/customers/8801/work_orders?size=20").get_json()
+        second = admin_client.get(
+            f"/customers/api/customers/8801/work_orders?size=20&cursor={first['next_cursor']}"
+        ).get_json()
+
+        numbers = [row["WorkOrderNo"] for row in first["data"] + second["data"]]
+        assert numbers == [str(n) for n in range(WORK_ORDERS, 0, -1)]
+        assert first["has_next"] and not second["has_next"]
+        assert second["next_cursor"] is None
+        assert work_order_numbers(second["html"]) == list(range(WORK_ORDERS - 20, 0, -1))
+
+    def test_inventory_rows(self, admin_client):
+        result = admin_client.get("/customers/api/customers/8801/inventory").get_json()
+
+        assert [item["InventoryKey"] for item in result["data"]] == [
+            "DETAIL_2", "DETAIL_1", "DETAIL_0"
+        ]
+        assert result["html"].count('class="btn btn-sm btn-outline-primary edit-item"') == 3
+
+    def test_bad_requests(self, admin_client):
+        assert admin_client.get("/customers/api/customers/8801/files").status_code == 404
+        assert admin_client.get("/customers/api/customers/0000/work_orders").status_code == 404
+        assert (
+            admin_client.get("/customers/api/customers/8801/work_orders?cursor=nope").status_code
+            == 400
+        )
+
+    def test_edit_controls_match_first_page(self, client, customer):
+        with customer.app_context():
+            db.session.add(
+                User(
+                    username="staffer",
+                    email="staffer@example.com",
+                    role="staff",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "staffer", "password": "password"})
+
+        page = client.get("/customers/view/8801").get_data(as_text=True)
+        more = client.get("/customers/api/customers/8801/inventory").get_json()
+
+        # Inventory edits are admin/manager only: no controls on either
+        assert 'data-description="Awning' not in page + more["html"]
+        assert "<th>Actions</th>" not in page
+        assert "Edit Work Order" not in page
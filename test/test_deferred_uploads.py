@@ -0,0 +1,138 @@
+"""
+Tests for deferred S3 uploads (save_order_file_generic(..., defer_s3_upload=True)
+and commit_deferred_uploads in utils/file_upload.py).
+"""
+
+import os
+import threading
+import time
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from extensions import db
+from models.customer import Customer
+from models.work_order import WorkOrder
+from utils.file_upload import (
+    cleanup_deferred_files,
+    commit_deferred_uploads,
+    s3_transfer_config,
+    save_work_order_file,
+)
+
+
+def text_upload(name, size=1024):
+    # Distinct content per name, so uploads are not deduplicated
+    return FileStorage(stream=BytesIO(name.encode().ljust(size, b"x")), filename=name)
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+@pytest.fixture
+def work_order(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="DU1", Name="Deferred"))
+        db.session.add(WorkOrder(WorkOrderNo="7101", CustID="DU1", WOName="Deferred"))
+        db.session.commit()
+    return app
+
+
+def stage(app, count, generate_thumbnails=False):
+    files = []
+    for i in range(count):
+        wo_file = save_work_order_file(
+            "7101",
+            text_upload(f"notes{i}.txt"),
+            generate_thumbnails=generate_thumbnails,
+            defer_s3_upload=True,
+        )
+        db.session.add(wo_file)
+        files.append(wo_file)
+    db.session.commit()
+    return files
+
+
+class TestSpooling:
+    def test_content_is_spooled_not_held(self, work_order, s3):
+        with work_order.test_request_context():
+            (wo_file,) = stage(work_order, 1)
+
+        assert not hasattr(wo_file, "_deferred_file_content")
+        with open(wo_file._deferred_file_path, "rb") as f:
+            assert f.read() == b"notes0.txt".ljust(1024, b"x")
+        s3.upload_file.assert_not_called()
+        cleanup_deferred_files([wo_file])
+
+    def test_cleanup_removes_spooled_files(self, work_order, s3):
+        with work_order.test_request_context():
+            files = stage(work_order, 2)
+        paths = [f._deferred_file_path for f in files]
+
+        cleanup_deferred_files(files)
+        assert not any(os.path.exists(p) for p in paths)
+        assert not hasattr(files[0], "_deferred_file_path")
+
+
+class TestCommitDeferredUploads:
+    def test_uploads_run_concurrently(self, work_order, s3):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def upload_file(path, bucket, key, Config):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+        s3.upload_file.side_effect = upload_file
+        work_order.config["S3_UPLOAD_WORKERS"] = 3
+        with work_order.test_request_context():
+            files = stage(work_order, 6)
+            paths = [f._deferred_file_path for f in files]
+            success, uploaded, failed = commit_deferred_uploads(files)
+
+        assert success and uploaded == files and failed == []
+        assert peak[0] == 3
+        assert not any(os.path.exists(p) for p in paths)
+
+    def test_reports_each_failure(self, work_order, s3):
+        def upload_file(path, bucket, key, Config):
+            if "notes1" in key:
+                raise RuntimeError("connection reset")
+
+        s3.upload_file.side_effect = upload_file
+        with work_order.test_request_context():
+            files = stage(work_order, 3)
+            paths = [f._deferred_file_path for f in files]
+            success, uploaded, failed = commit_deferred_uploads(files)
+
+        assert not success
+        assert uploaded == [files[0], files[2]]
+        assert failed == [(files[1], "connection reset")]
+        # Spooled files are removed for failed uploads too
+        assert not any(os.path.exists(p) for p in paths)
+
+    def test_multipart_transfer_config(self, work_order, s3):
+        work_order.config["S3_MULTIPART_THRESHOLD_MB"] = 6
+        with work_order.test_request_context():
+            config = s3_transfer_config()
+            commit_deferred_uploads(stage(work_order, 1))
+
+        assert config.multipart_threshold == 6 * 1024 * 1024
+        assert s3.upload_file.call_args.kwargs["Config"].multipart_threshold == (
+            6 * 1024 * 1024
+        )
+
+    def test_files_without_deferred_data_are_skipped(self, work_order, s3):
+        with work_order.test_request_context():
+            assert commit_deferred_uploads([MagicMock(spec=[])]) == (True, [], [])
+        s3.upload_file.assert_not_called()
@@ -0,0 +1,204 @@
+"""
+Tests for content-hash deduplication of uploaded files (utils/file_store.py
+and its use in utils/file_upload.py).
+"""
+
+from datetime import date
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from extensions import db
+from models.checkin import CheckIn
+from models.checkin_file import CheckInFile
+from models.customer import Customer
+from models.stored_file import StoredFile
+from models.work_order import WorkOrder
+from models.work_order_file import WorkOrderFile
+from utils.file_upload import (
+    AWS_S3_BUCKET,
+    cleanup_deferred_files,
+    commit_deferred_uploads,
+    release_file_keys,
+    save_order_file_generic,
+    save_work_order_file,
+)
+from utils.s3_deletes import drain_s3_deletes, queue_s3_deletes
+
+
+def png_upload(name="photo.png", color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename=name, content_type="image/png")
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    client.delete_objects.return_value = {}
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+@pytest.fixture
+def orders(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="FS1", Name="Store"))
+        db.session.add(WorkOrder(WorkOrderNo="7301", CustID="FS1", WOName="First"))
+        db.session.add(WorkOrder(WorkOrderNo="7302", CustID="FS1", WOName="Second"))
+        db.session.commit()
+    return app
+
+
+def upload(work_order_no, file, **kwargs):
+    """Stage, commit and upload one file the way the routes do."""
+    wo_file = save_work_order_file(work_order_no, file, defer_s3_upload=True, **kwargs)
+    db.session.add(wo_file)
+    db.session.commit()
+    success, _, _ = commit_deferred_uploads([wo_file])
+    assert success
+    # The thumbnail job recorded thumbnail_path in its own session
+    db.session.refresh(wo_file)
+    return wo_file
+
+
+def stored(sha256):
+    db.session.expire_all()
+    return db.session.get(StoredFile, sha256)
+
+
+def deleted_keys(s3):
+    return [
+        obj["Key"]
+        for call in s3.delete_objects.call_args_list
+        for obj in call.kwargs["Delete"]["Objects"]
+    ]
+
+
+def release(app, file_obj):
+    """Delete a file row the way the delete routes do, then drain the outbox."""
+    queue_s3_deletes(release_file_keys(file_obj))
+    db.session.delete(file_obj)
+    db.session.commit()
+    drain_s3_deletes(app)
+
+
+class TestDeduplication:
+    def test_same_content_is_stored_once(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            second = upload("7302", png_upload("copy.png"))
+
+            assert s3.upload_file.call_count == 1
+            assert second.file_path == first.file_path
+            assert second.content_sha256 == first.content_sha256
+            assert stored(first.content_sha256).ref_count == 2
+
+    def test_thumbnail_is_reused(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            thumbnails = s3.upload_fileobj.call_count
+            assert first.thumbnail_path
+            assert stored(first.content_sha256).thumbnail_key in first.thumbnail_path
+
+            second = save_work_order_file("7302", png_upload(), defer_s3_upload=True)
+            assert second.thumbnail_path == first.thumbnail_path
+            assert not hasattr(second, "_deferred_file_path")
+            assert s3.upload_fileobj.call_count == thumbnails
+
+    def test_reuse_without_thumbnail_generates_one(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload(), generate_thumbnails=False)
+            second = upload("7302", png_upload())
+
+            assert s3.upload_file.call_count == 1
+            assert second.thumbnail_path
+            assert stored(first.content_sha256).thumbnail_key in second.thumbnail_path
+
+    def test_different_content_is_stored_separately(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            second = upload("7301", png_upload(color=(0, 0, 255)))
+
+            assert s3.upload_file.call_count == 2
+            assert second.file_path != first.file_path
+
+    def test_rollback_gives_reference_back(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            staged = save_work_order_file("7302", png_upload(), defer_s3_upload=True)
+            db.session.rollback()
+            cleanup_deferred_files([staged])
+
+            assert stored(first.content_sha256).ref_count == 1
+
+    def test_failed_upload_is_forgotten(self, orders, s3):
+        s3.upload_file.side_effect = RuntimeError("S3 down")
+        with orders.test_request_context():
+            wo_file = save_work_order_file("7301", png_upload(), defer_s3_upload=True)
+            db.session.add(wo_file)
+            db.session.commit()
+            success, _, failed = commit_deferred_uploads([wo_file])
+            assert not success and failed
+
+            assert stored(wo_file.content_sha256) is None
+
+
+class TestReleasing:
+    def test_last_reference_deletes_object_and_thumbnail(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            second = upload("7302", png_upload())
+            key = first.file_path.split("/", 3)[3]
+            thumbnail_key = first.thumbnail_path.split("/", 3)[3]
+
+            release(orders, first)
+            assert deleted_keys(s3) == []
+            assert stored(first.content_sha256).ref_count == 1
+
+            release(orders, second)
+            assert deleted_keys(s3) == [key, thumbnail_key]
+            assert stored(first.content_sha256) is None
+
+    def test_unstored_file_is_deleted_directly(self, orders, s3):
+        with orders.test_request_context():
+            legacy = WorkOrderFile(
+                WorkOrderNo="7301",
+                filename="legacy.pdf",
+                file_path=f"s3://{AWS_S3_BUCKET}/work_orders/1/legacy.pdf",
+            )
+            db.session.add(legacy)
+            db.session.commit()
+            release(orders, legacy)
+
+        assert deleted_keys(s3) == ["work_orders/1/legacy.pdf"]
+
+
+class TestCheckInFiles:
+    def test_checkin_upload_shares_order_content(self, orders, s3):
+        with orders.test_request_context():
+            first = upload("7301", png_upload())
+            checkin = CheckIn(CustID="FS1", DateIn=date.today())
+            db.session.add(checkin)
+            db.session.flush()
+
+            checkin_file = save_order_file_generic(
+                order_no=str(checkin.CheckInID),
+                file=png_upload(),
+                order_type="checkin",
+                generate_thumbnails=False,
+                file_model_class=CheckInFile,
+                defer_s3_upload=True,
+            )
+            db.session.add(checkin_file)
+            db.session.commit()
+
+            assert checkin_file.CheckInID == checkin.CheckInID
+            assert checkin_file.file_name.startswith("photo_")
+            assert checkin_file.file_size > 0
+            assert checkin_file.file_path == first.file_path
+            assert stored(first.content_sha256).ref_count == 2
@@ -0,0 +1,128 @@
+"""
+Tests for ETag / 304 handling on the Tabulator list APIs (utils/http_cache.py).
+"""
+
+import pytest
+from datetime import date
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.repair_order import RepairWorkOrder
+from models.source import Source
+from models.user import User
+from models.work_order import WorkOrder
+
+
+@pytest.fixture
+def admin_client(client, app):
+    """Provide a logged-in client with admin privileges."""
+    with app.app_context():
+        admin = User(
+            username="admin",
+            email="admin@example.com",
+            password_hash=generate_password_hash("password"),
+            role="admin",
+        )
+        db.session.add(admin)
+        db.session.commit()
+
+    client.post("/login", data={"username": "admin", "password": "password"})
+    yield client
+    client.get("/logout")
+
+
+@pytest.fixture
+def list_data(app):
+    with app.app_context():
+        db.session.add(Source(SSource="SRC1"))
+        db.session.add(Customer(CustID="100", Name="Etag Customer", Source="SRC1"))
+        db.session.add(
+            WorkOrder(
+                WorkOrderNo="5001", CustID="100", WOName="Etag WO", DateIn=date.today()
+            )
+        )
+        db.session.add(
+            RepairWorkOrder(
+                RepairOrderNo="7001", CustID="100", ROName="Etag RO", DateIn=date.today()
+            )
+        )
+        db.session.commit()
+
+
+LIST_URLS = [
+    "/work_orders/api/work_orders?page=1&size=25",
+    "/repair_work_orders/api/repair_work_orders?page=1&size=25",
+    "/customers/api/customers?page=1&size=25",
+]
+
+
+class TestListEtags:
+    @pytest.mark.parametrize("url", LIST_URLS)
+    def test_etag_and_304(self, admin_client, list_data, url):
+        first = admin_client.get(url)
+        assert first.status_code == 200
+        etag = first.headers.get("ETag")
+        assert etag
+
+        second = admin_client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers.get("ETag") == etag
+
+    def test_etag_varies_with_args(self, admin_client, list_data):
+        base = "/work_orders/api/work_orders?page=1&size=25"
+        first = admin_client.get(base)
+        other = admin_client.get(base + "&sort[0][field]=WOName&sort[0][dir]=asc")
+        assert first.headers["ETag"] != other.headers["ETag"]
+
+    def test_write_invalidates_etag(self, admin_client, app, list_data):
+        url = "/work_orders/api/work_orders?page=1&size=25"
+        etag = admin_client.get(url).headers["ETag"]
+
+        with app.app_context():
+            wo = db.session.get(WorkOrder, "5001")
+            wo.WOName = "Renamed"
+            db.session.commit()
+
+        response = admin_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.get_json()["data"][0]["WOName"] == "Renamed"
+
+    def test_bulk_update_invalidates_etag(self, admin_client, app, list_data):
+        url = "/customers/api/customers?page=1&size=25"
+        etag = admin_client.get(url).headers["ETag"]
+
+        with app.app_context():
+            Customer.query.filter_by(CustID="100").update({"Name": "Bulk Renamed"})
+            db.session.commit()
+
+        response = admin_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("url", LIST_URLS[:2])
+    def test_customer_delete_invalidates_order_etag(self, admin_client, app, list_data, url):
+        # Rows link to the customer only while it exists (customer_url)
+        first = admin_client.get(url)
+        assert first.get_json()["data"][0]["customer_url"]
+
+        with app.app_context():
+            Customer.query.filter_by(CustID="100").delete()
+            db.session.commit()
+
+        response = admin_client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+        assert response.status_code == 200
+        assert response.get_json()["data"][0]["customer_url"] is None
+
+    def test_other_table_write_keeps_etag(self, admin_client, app, list_data):
+        url = "/repair_work_orders/api/repair_work_orders?page=1&size=25"
+        etag = admin_client.get(url).headers["ETag"]
+
+        with app.app_context():
+            wo = db.session.get(WorkOrder, "5001")
+            wo.WOName = "Only work orders changed"
+            db.session.commit()
+
+        response = admin_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
@@ -0,0 +1,161 @@
+"""
+SQL statement counts per endpoint for the WorkOrder load profiles
+(utils/load_profiles.py). A relationship going back to eager-by-default, or
+an endpoint losing its profile, shows up here as extra joins/queries.
+"""
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.source import Source
+from models.user import User
+from models.work_order import WorkOrder, WorkOrderItem
+from models.work_order_file import WorkOrderFile
+from utils.load_profiles import (
+    DETAIL,
+    LIST,
+    MINIMAL,
+    ML,
+    PDF,
+    work_order_load_options,
+)
+
+
+class RecordStatements:
+    """Records the SQL statements run while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._seen)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._seen)
+
+    def _seen(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.lower())
+
+    def touching(self, table):
+        return [s for s in self.statements if table in s]
+
+
+@pytest.fixture
+def orders(app):
+    """Two orders for the same customer: one with one file, one with five."""
+    with app.app_context():
+        db.session.add(Source(SSource="LP Source"))
+        db.session.add(Customer(CustID="LP1", Name="Profiles", Source="LP Source"))
+        for number, file_count in (("8001", 1), ("8002", 5)):
+            db.session.add(
+                WorkOrder(WorkOrderNo=number, CustID="LP1", WOName="Load", ShipTo="LP Source")
+            )
+            db.session.add(
+                WorkOrderItem(WorkOrderNo=number, CustID="LP1", Description="Awning", Qty=1)
+            )
+            for i in range(file_count):
+                db.session.add(
+                    WorkOrderFile(
+                        WorkOrderNo=number,
+                        filename=f"photo{i}.jpg",
+                        file_path=f"s3://bucket/{number}/photo{i}.jpg",
+                    )
+                )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def user_client(client, app):
+    with app.app_context():
+        db.session.add(
+            User(
+                username="profiles",
+                email="profiles@example.com",
+                role="admin",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "profiles", "password": "password"})
+    return client
+
+
+class TestDefaultLoading:
+    def test_plain_query_does_not_join_relationships(self, orders):
+        with orders.app_context():
+            with RecordStatements(db.engine) as recorded:
+                work_orders = WorkOrder.query.all()
+
+        assert len(work_orders) == 2
+        assert len(recorded.statements) == 1
+        assert "join" not in recorded.statements[0]
+
+    @pytest.mark.parametrize("profile", [ML, MINIMAL])
+    def test_column_only_profiles(self, orders, profile):
+        with orders.app_context():
+            with RecordStatements(db.engine) as recorded:
+                rows = WorkOrder.query.options(*work_order_load_options(profile)).all()
+                [wo.to_dict(include_items=False) for wo in rows]
+
+        assert len(recorded.statements) == 1
+
+    def test_collections_are_not_joined(self, orders):
+        with orders.app_context():
+            with RecordStatements(db.engine) as recorded:
+                rows = WorkOrder.query.options(*work_order_load_options(DETAIL)).all()
+                assert sorted(len(wo.files) for wo in rows) == [1, 5]
+
+        # Main query + one selectin per collection, whatever the file count
+        assert len(recorded.statements) == 3
+        assert len(recorded.touching("tblworkorderfiles")) == 1
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            work_order_load_options("everything")
+
+
+class TestEndpointStatements:
+    def test_detail_page_constant_in_file_count(self, user_client, orders):
+        counts = []
+        for number in ("8001", "8002"):
+            with orders.app_context():
+                with RecordStatements(db.engine) as recorded:
+                    response = user_client.get(f"/work_orders/{number}")
+            assert response.status_code == 200
+            counts.append(len(recorded.statements))
+            assert len(recorded.touching("tblworkorderfiles")) == 1
+        assert counts[0] == counts[1]
+
+    def test_list_api_loads_only_customers(self, user_client, orders):
+        with orders.app_context():
+            with RecordStatements(db.engine) as recorded:
+                body = user_client.get("/work_orders/api/work_orders").get_json()
+
+        assert len(body["data"]) == 2
+        assert recorded.touching("tblworkorderfiles") == []
+        assert recorded.touching("tblorddetcustawngs") == []
+
+    def test_pdf_skips_files(self, orders):
+        with orders.app_context():
+            query = WorkOrder.query.options(*work_order_load_options(PDF))
+            with RecordStatements(db.engine) as recorded:
+                work_order = query.filter_by(WorkOrderNo="8002").one()
+                assert work_order.ship_to_source.SSource == "LP Source"
+                assert len(work_order.items) == 1
+
+        assert len(recorded.statements) == 2
+        assert recorded.touching("tblworkorderfiles") == []
+
+    def test_list_profile(self, orders):
+        with orders.app_context():
+            with RecordStatements(db.engine) as recorded:
+                rows = WorkOrder.query.options(*work_order_load_options(LIST)).all()
+                assert {wo.customer.Name for wo in rows} == {"Profiles"}
+
+        assert len(recorded.statements) == 1
@@ -0,0 +1,123 @@
+"""
+Tests for counter-row order number allocation (utils/order_numbers.py).
+"""
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.order_number_counter import OrderNumberCounter
+from models.repair_order import RepairWorkOrder
+from models.user import User
+from models.work_order import WorkOrder
+from utils.order_numbers import (
+    REPAIR_ORDER_NUMBERS,
+    WORK_ORDER_NUMBERS,
+    allocate_order_number,
+    peek_next_order_number,
+    sync_order_counter,
+)
+
+
+@pytest.fixture
+def existing_orders(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="ON001", Name="Numbers Customer"))
+        for number in ("9", "98", "1000"):
+            db.session.add(WorkOrder(WorkOrderNo=number, CustID="ON001", WOName="Existing"))
+        db.session.add(RepairWorkOrder(RepairOrderNo="500", CustID="ON001", ROName="Existing"))
+        db.session.commit()
+    return app
+
+
+def max_scans(engine):
+    """Collects statements that scan for MAX(...) while listening."""
+    seen = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if "max(" in statement.lower():
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    return seen, lambda: event.remove(engine, "before_cursor_execute", listener)
+
+
+class TestAllocateOrderNumber:
+    def test_seeded_from_numeric_maximum(self, existing_orders):
+        with existing_orders.app_context():
+            assert allocate_order_number(WORK_ORDER_NUMBERS) == "1001"
+            assert allocate_order_number(REPAIR_ORDER_NUMBERS) == "501"
+            db.session.commit()
+            counter = db.session.get(OrderNumberCounter, WORK_ORDER_NUMBERS)
+            assert counter.last_value == 1001
+
+    def test_consecutive_without_table_scans(self, existing_orders):
+        with existing_orders.app_context():
+            allocate_order_number(WORK_ORDER_NUMBERS)
+            db.session.commit()
+
+            seen, stop = max_scans(db.engine)
+            try:
+                numbers = [allocate_order_number(WORK_ORDER_NUMBERS) for _ in range(3)]
+            finally:
+                stop()
+        assert numbers == ["1002", "1003", "1004"]
+        assert seen == []
+
+    def test_rollback_returns_number(self, existing_orders):
+        with existing_orders.app_context():
+            allocate_order_number(WORK_ORDER_NUMBERS)
+            db.session.commit()
+            assert allocate_order_number(WORK_ORDER_NUMBERS) == "1002"
+            db.session.rollback()
+            assert allocate_order_number(WORK_ORDER_NUMBERS) == "1002"
+
+    def test_empty_table_starts_at_one(self, app):
+        with app.app_context():
+            assert peek_next_order_number(REPAIR_ORDER_NUMBERS) == "1"
+            assert allocate_order_number(REPAIR_ORDER_NUMBERS) == "1"
+
+    def test_peek_does_not_allocate(self, existing_orders):
+        with existing_orders.app_context():
+            assert peek_next_order_number(WORK_ORDER_NUMBERS) == "1001"
+            assert peek_next_order_number(WORK_ORDER_NUMBERS) == "1001"
+            allocate_order_number(WORK_ORDER_NUMBERS)
+            assert peek_next_order_number(WORK_ORDER_NUMBERS) == "1002"
+
+    def test_sync_skips_numbers_taken_elsewhere(self, existing_orders):
+        with existing_orders.app_context():
+            allocate_order_number(WORK_ORDER_NUMBERS)
+            db.session.add(WorkOrder(WorkOrderNo="2000", CustID="ON001", WOName="Import"))
+            db.session.commit()
+
+            sync_order_counter(WORK_ORDER_NUMBERS)
+            assert allocate_order_number(WORK_ORDER_NUMBERS) == "2001"
+
+            # Never moves the counter backwards
+            sync_order_counter(WORK_ORDER_NUMBERS)
+            assert allocate_order_number(WORK_ORDER_NUMBERS) == "2002"
+
+
+class TestNextNumberApis:
+    @pytest.fixture
+    def user_client(self, client, app):
+        with app.app_context():
+            db.session.add(
+                User(
+                    username="numbers",
+                    email="numbers@example.com",
+                    role="user",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "numbers", "password": "password"})
+        return client
+
+    def test_previews(self, user_client, existing_orders):
+        wo = user_client.get("/work_orders/api/next_wo_number").get_json()
+        ro = user_client.get("/repair_work_orders/api/next_ro_number").get_json()
+        assert wo == {"next_wo_number": "1001"}
+        assert ro == {"next_ro_number": "501"}
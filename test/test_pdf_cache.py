@@ -0,0 +1,219 @@
+"""
+Tests for the rendered order PDF cache (utils/pdf_cache.py).
+"""
+
+import os
+from datetime import date
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.s3_delete_outbox import S3DeleteOutbox
+from models.user import User
+from models.work_order import WorkOrder, WorkOrderItem
+from routes import work_orders as work_order_routes
+from utils.pdf_cache import (
+    WORK_ORDER_PDFS,
+    get_cached_pdf,
+    invalidate_order_pdfs,
+    pdf_content_hash,
+)
+from utils.s3_deletes import drain_s3_deletes
+
+
+class FakeS3:
+    """Dict-backed stand-in for the few S3 calls the cache makes."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        data = self.objects[Key]
+        return {"Body": type("Body", (), {"read": lambda self: data})()}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def list_objects_v2(self, Bucket, Prefix):
+        self.calls.append("list_objects_v2")
+        return {"Contents": [{"Key": k} for k in self.objects if k.startswith(Prefix)]}
+
+    def delete_objects(self, Bucket, Delete):
+        self.calls.append("delete_objects")
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+        return {}
+
+
+@pytest.fixture
+def s3(mocker):
+    """FakeS3 for both the cache and the S3 delete drain."""
+    fake = FakeS3()
+    mocker.patch("utils.pdf_cache._s3", return_value=(fake, "bucket"))
+    mocker.patch("utils.file_upload.s3_client", fake)
+    return fake
+
+
+@pytest.fixture
+def cache_app(app, tmp_path):
+    app.config["PDF_CACHE_DIR"] = str(tmp_path / "pdfs")
+    app.config["PDF_CACHE_MAX_BYTES"] = 1024 * 1024
+    with app.app_context():
+        db.session.add(Customer(CustID="PC1", Name="Cache Customer"))
+        db.session.add(
+            WorkOrder(WorkOrderNo="6001", CustID="PC1", WOName="Cached", DateIn=date(2026, 1, 5))
+        )
+        db.session.add(
+            WorkOrderItem(WorkOrderNo="6001", CustID="PC1", Description="Awning", Qty=1)
+        )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def user_client(client, cache_app):
+    with cache_app.app_context():
+        db.session.add(
+            User(
+                username="pdfcache",
+                email="pdfcache@example.com",
+                role="user",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "pdfcache", "password": "password"})
+    return client
+
+
+def cached_files(app):
+    root = app.config["PDF_CACHE_DIR"]
+    return sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+        if name.endswith(".pdf")
+    )
+
+
+class TestPdfRoutes:
+    def test_second_request_served_from_cache(self, user_client, cache_app, mocker):
+        render = mocker.patch(
+            "routes.work_orders.generate_work_order_pdf",
+            wraps=work_order_routes.generate_work_order_pdf,
+        )
+        first = user_client.get("/work_orders/6001/pdf/view")
+        second = user_client.get("/work_orders/6001/pdf/download")
+
+        assert first.status_code == second.status_code == 200
+        assert first.data == second.data
+        assert first.data.startswith(b"%PDF")
+        assert render.call_count == 1
+        assert first.headers["ETag"] == second.headers["ETag"]
+        assert "inline" in first.headers["Content-Disposition"]
+        assert "attachment" in second.headers["Content-Disposition"]
+        assert len(cached_files(cache_app)) == 1
+
+    def test_not_modified(self, user_client, mocker):
+        etag = user_client.get("/work_orders/6001/pdf/view").headers["ETag"]
+        render = mocker.patch("routes.work_orders.generate_work_order_pdf")
+
+        response = user_client.get(
+            "/work_orders/6001/pdf/view", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.data == b""
+        render.assert_not_called()
+
+    def test_edit_invalidates(self, user_client, cache_app):
+        before = user_client.get("/work_orders/6001/pdf/view")
+        assert len(cached_files(cache_app)) == 1
+
+        with cache_app.app_context():
+            db.session.get(WorkOrder, "6001").WOName = "Renamed"
+            db.session.commit()
+            assert cached_files(cache_app) == []
+
+        after = user_client.get("/work_orders/6001/pdf/view")
+        assert after.headers["ETag"] != before.headers["ETag"]
+
+
+class TestCacheTiers:
+    def test_lru_eviction(self, cache_app):
+        cache_app.config["PDF_CACHE_MAX_BYTES"] = 2500
+        with cache_app.test_request_context():
+            for i in range(3):
+                get_cached_pdf(WORK_ORDER_PDFS, f"E{i}", {"n": i}, lambda: b"x" * 1000)
+                # Older access times for earlier entries
+                (path,) = [p for p in cached_files(cache_app) if f"{os.sep}E{i}{os.sep}" in p]
+                os.utime(path, (1000 + i, 1000 + i))
+
+        remaining = cached_files(cache_app)
+        assert len(remaining) == 2
+        assert not any(f"{os.sep}E0{os.sep}" in path for path in remaining)
+
+    def test_s3_tier_shared_between_instances(self, cache_app, tmp_path, s3):
+        cache_app.config["PDF_CACHE_S3"] = True
+        order_data = {"WorkOrderNo": "S1"}
+
+        with cache_app.test_request_context():
+            get_cached_pdf(WORK_ORDER_PDFS, "S1", order_data, lambda: b"%PDF-shared")
+            # Another instance: empty local disk, same bucket
+            cache_app.config["PDF_CACHE_DIR"] = str(tmp_path / "other")
+            data, content_hash = get_cached_pdf(
+                WORK_ORDER_PDFS, "S1", order_data, lambda: pytest.fail("rendered again")
+            )
+            assert data == b"%PDF-shared"
+            assert content_hash == pdf_content_hash(order_data)
+
+            invalidate_order_pdfs(WORK_ORDER_PDFS, "S1")
+            db.session.commit()
+        assert s3.objects == {}
+
+    def test_s3_invalidation_leaves_the_request(self, cache_app, s3, mocker):
+        schedule = mocker.patch("utils.s3_deletes.schedule_s3_delete_drain")
+        cache_app.config["PDF_CACHE_S3"] = True
+        with cache_app.test_request_context():
+            get_cached_pdf(WORK_ORDER_PDFS, "6001", {"v": 1}, lambda: b"%PDF-old")
+            s3.calls.clear()
+
+            work_order = db.session.get(WorkOrder, "6001")
+            work_order.WOName = "Renamed"
+            db.session.flush()
+            work_order.WOName = "Renamed again"
+            db.session.commit()
+
+            assert s3.calls == []
+            schedule.assert_called_once_with()
+            assert [row.s3_key for row in S3DeleteOutbox.query.all()] == [
+                "pdf_cache/work_order/6001/"
+            ]
+
+            assert drain_s3_deletes(cache_app) == (1, 0)
+        assert s3.objects == {}
+        assert s3.calls == ["list_objects_v2", "delete_objects"]
+
+    def test_rolled_back_edit_queues_nothing(self, cache_app, s3):
+        cache_app.config["PDF_CACHE_S3"] = True
+        with cache_app.test_request_context():
+            db.session.get(WorkOrder, "6001").WOName = "Never saved"
+            db.session.flush()
+            db.session.rollback()
+
+            assert S3DeleteOutbox.query.count() == 0
+
+    def test_disabled(self, app):
+        calls = []
+        with app.test_request_context():
+            for _ in range(2):
+                get_cached_pdf(WORK_ORDER_PDFS, "D1", {}, lambda: calls.append(1) or b"%PDF")
+        assert len(calls) == 2
@@ -0,0 +1,61 @@
+"""
+Tests for the shared PDF style registry (utils/pdf_styles.py).
+"""
+
+import pytest
+from reportlab.lib.colors import green, red
+
+from utils.pdf_styles import BOOL_STYLES, PARAGRAPH_STYLES, TABLE_STYLES, bool_style
+from utils.repair_order_pdf import RepairOrderPDF, generate_repair_order_pdf
+from utils.work_order_pdf import (
+    WorkOrderPDF,
+    create_bool_paragraph,
+    generate_work_order_pdf,
+)
+
+
+class TestRegistry:
+    def test_generators_share_one_stylesheet(self):
+        first = WorkOrderPDF({"WorkOrderNo": "1"})
+        second = WorkOrderPDF({"WorkOrderNo": "2"})
+        repair = RepairOrderPDF({"RepairOrderNo": "3"})
+
+        assert first.styles is second.styles is repair.styles is PARAGRAPH_STYLES
+        assert "WONumber" in PARAGRAPH_STYLES and "RONumber" in PARAGRAPH_STYLES
+
+    def test_registries_are_read_only(self):
+        with pytest.raises(TypeError):
+            PARAGRAPH_STYLES["SmallValue"] = PARAGRAPH_STYLES["Normal"]
+        with pytest.raises(TypeError):
+            TABLE_STYLES["Items"] = TABLE_STYLES["FooterRow"]
+        with pytest.raises(AttributeError):
+            TABLE_STYLES["Items"].add("GRID", (0, 0), (-1, -1), 1, green)
+
+    def test_bool_paragraphs_reuse_shared_variants(self):
+        yes = create_bool_paragraph("Yes", PARAGRAPH_STYLES["SmallValue"])
+        no = create_bool_paragraph(False, PARAGRAPH_STYLES["SmallValue"])
+
+        assert yes.style is BOOL_STYLES[("SmallValue", True)]
+        assert no.style is BOOL_STYLES[("SmallValue", False)]
+        assert yes.style.textColor == green and no.style.textColor == red
+        assert PARAGRAPH_STYLES["SmallValue"].textColor not in (green, red)
+
+    def test_unregistered_style_is_cloned(self):
+        custom = PARAGRAPH_STYLES["SmallValue"].clone("Custom", fontSize=20)
+        variant = bool_style(custom, True)
+
+        assert variant is not BOOL_STYLES[("SmallValue", True)]
+        assert variant.fontSize == 20 and variant.textColor == green
+
+
+class TestRendering:
+    def test_both_generators_render(self):
+        work_order = generate_work_order_pdf(
+            {"WorkOrderNo": "42", "RepairsNeeded": True, "items": [{"Qty": 1}]}
+        ).getvalue()
+        repair_order = generate_repair_order_pdf(
+            {"RepairOrderNo": "43", "items": [{"Qty": 1}]}
+        ).getvalue()
+
+        assert work_order.startswith(b"%PDF")
+        assert repair_order.startswith(b"%PDF")
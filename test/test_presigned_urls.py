@@ -0,0 +1,186 @@
+"""
+Tests for presigned URL reuse (utils/presigned_urls.py) and batch signing
+(utils/file_upload.py).
+"""
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.checkin import CheckIn
+from models.checkin_file import CheckInFile
+from models.customer import Customer
+from models.user import User
+from models.work_order import WorkOrder
+from models.work_order_file import WorkOrderFile
+from utils.file_upload import (
+    AWS_S3_BUCKET,
+    generate_presigned_url,
+    get_files_with_thumbnail_urls,
+)
+from utils.presigned_urls import PresignedUrlCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Signer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key, expires_in):
+        self.calls.append(key)
+        return f"https://signed/{key}?n={len(self.calls)}"
+
+
+def s3_path(key):
+    return f"s3://{AWS_S3_BUCKET}/{key}"
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    client.generate_presigned_url.side_effect = (
+        lambda op, Params, ExpiresIn: f"https://signed/{Params['Key']}"
+    )
+    client.head_object.return_value = {"ContentLength": 1024}  # get_file_size()
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+@pytest.fixture
+def work_order(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="PU1", Name="Presigned"))
+        db.session.add(WorkOrder(WorkOrderNo="7401", CustID="PU1", WOName="Photos"))
+        for i in range(3):
+            db.session.add(
+                WorkOrderFile(
+                    WorkOrderNo="7401",
+                    filename=f"photo{i}.jpg",
+                    file_path=s3_path(f"work_orders/7401/photo{i}.jpg"),
+                    thumbnail_path=s3_path(f"work_orders/7401/thumbnails/photo{i}_thumb.jpg"),
+                )
+            )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def admin_client(client, work_order):
+    with work_order.app_context():
+        db.session.add(
+            User(
+                username="presigned",
+                email="presigned@example.com",
+                role="admin",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "presigned", "password": "password"})
+    return client
+
+
+class TestPresignedUrlCache:
+    def test_reused_until_shortly_before_expiry(self):
+        clock, sign = FakeClock(0.0), Signer()
+        cache = PresignedUrlCache(clock=clock)
+
+        first = cache.get_or_sign("a.jpg", 1000, sign)
+        clock.now = 899.0
+        assert cache.get_or_sign("a.jpg", 1000, sign) == first
+
+        # Past 90% of the lifetime: a fresh URL
+        clock.now = 900.0
+        assert cache.get_or_sign("a.jpg", 1000, sign) != first
+        assert sign.calls == ["a.jpg", "a.jpg"]
+
+    def test_expiry_is_part_of_the_key(self):
+        sign = Signer()
+        cache = PresignedUrlCache(clock=FakeClock())
+
+        assert cache.get_or_sign("a.jpg", 300, sign) != cache.get_or_sign("a.jpg", 3600, sign)
+
+    def test_batch_signs_only_misses(self):
+        sign = Signer()
+        cache = PresignedUrlCache(clock=FakeClock())
+        cached = cache.get_or_sign("a.jpg", 3600, sign)
+
+        urls = cache.get_or_sign_many(["a.jpg", "b.jpg", "b.jpg"], 3600, sign)
+
+        assert urls == {"a.jpg": cached, "b.jpg": "https://signed/b.jpg?n=2"}
+        assert sign.calls == ["a.jpg", "b.jpg"]
+
+    def test_bounded(self):
+        cache = PresignedUrlCache(maxsize=2, clock=FakeClock())
+        cache.get_or_sign_many(["a", "b", "c"], 3600, Signer())
+
+        assert len(cache) == 2
+
+
+class TestSigning:
+    def test_generate_presigned_url_is_cached(self, s3):
+        path = s3_path("work_orders/1/a.jpg")
+
+        assert generate_presigned_url(path) == generate_presigned_url(path)
+        assert s3.generate_presigned_url.call_count == 1
+
+    def test_file_listing_signed_in_one_batch(self, work_order, s3):
+        with work_order.app_context():
+            files = WorkOrderFile.query.order_by(WorkOrderFile.id).all()
+            listing = get_files_with_thumbnail_urls(files)
+
+        assert s3.generate_presigned_url.call_count == 6
+        assert listing[0]["file_url"] == "https://signed/work_orders/7401/photo0.jpg"
+        assert listing[2]["thumbnail_url"].endswith("photo2_thumb.jpg")
+        assert all(entry["has_thumbnail"] for entry in listing)
+
+
+class TestPages:
+    def test_detail_page_links_thumbnails_to_s3(self, admin_client, s3):
+        page = admin_client.get("/work_orders/7401").get_data(as_text=True)
+        admin_client.get("/work_orders/7401")
+
+        assert 'src="https://signed/work_orders/7401/thumbnails/photo0_thumb.jpg"' in page
+        # Three thumbnails, signed once across both renders
+        assert s3.generate_presigned_url.call_count == 3
+
+    def test_thumbnail_redirect_reuses_url(self, admin_client, work_order, s3):
+        with work_order.app_context():
+            file_id = WorkOrderFile.query.first().id
+
+        first = admin_client.get(f"/work_orders/thumbnail/{file_id}")
+        second = admin_client.get(f"/work_orders/thumbnail/{file_id}")
+
+        assert first.status_code == 302
+        assert first.location == second.location
+        assert s3.generate_presigned_url.call_count == 1
+
+    def test_checkin_file_download(self, admin_client, work_order, s3):
+        with work_order.app_context():
+            checkin = CheckIn(CustID="PU1", DateIn=date.today())
+            db.session.add(checkin)
+            db.session.flush()
+            checkin_file = CheckInFile(
+                CheckInID=checkin.CheckInID,
+                file_name="scan.pdf",
+                file_path=s3_path("checkins/1/scan.pdf"),
+            )
+            db.session.add(checkin_file)
+            db.session.commit()
+            file_id = checkin_file.id
+
+        response = admin_client.get(f"/checkins/files/{file_id}/download")
+
+        assert response.status_code == 302
+        assert response.location == "https://signed/checkins/1/scan.pdf"
+        assert s3.generate_presigned_url.call_args.kwargs["ExpiresIn"] == 300
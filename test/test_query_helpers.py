@@ -0,0 +1,239 @@
+"""
+Tests for keyset (cursor) pagination in utils/query_helpers.py and the
+cursor mode of the work order, repair order and customer list APIs.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.repair_order import RepairWorkOrder
+from models.user import User
+from models.work_order import WorkOrder
+from utils.query_helpers import (
+    InvalidCursor,
+    apply_tabulator_sorting,
+    encode_cursor,
+    keyset_paginate,
+    sort_key,
+    tabulator_sort_keys,
+)
+
+
+SORT_CONFIG = {
+    "WorkOrderNo": "integer",
+    "DateIn": "date",
+    "DateRequired": "date",
+}
+
+
+@pytest.fixture
+def orders(app):
+    """23 work orders with repeated and missing dates and mixed-length numbers."""
+    with app.app_context():
+        db.session.add(Customer(CustID="KS001", Name="Keyset Customer"))
+        for i in range(23):
+            db.session.add(
+                WorkOrder(
+                    WorkOrderNo=str(5 + i * 7),  # "5", "12", ... "159"
+                    CustID="KS001",
+                    WOName=f"Order {i % 4}",
+                    DateIn=date(2025, 1, 1) + timedelta(days=i % 5),
+                    DateRequired=None if i % 3 == 0 else date(2025, 3, 1) + timedelta(days=i % 2),
+                )
+            )
+        db.session.commit()
+    return app
+
+
+def walk(query, sort_keys, size, tiebreaker=WorkOrder.WorkOrderNo):
+    """All pages via cursors, as a list of pages of primary keys."""
+    pages, cursor = [], ""
+    while True:
+        page = keyset_paginate(query, sort_keys, cursor, size, tiebreaker)
+        pages.append([wo.WorkOrderNo for wo in page.items])
+        if not page.has_next:
+            assert page.next_cursor is None
+            return pages
+        cursor = page.next_cursor
+
+
+def sort_args(*sorts):
+    args = MultiDict()
+    for i, (field, direction) in enumerate(sorts):
+        args[f"sort[{i}][field]"] = field
+        args[f"sort[{i}][dir]"] = direction
+    return args
+
+
+class TestTabulatorSortKeys:
+    def test_sort_types(self, app):
+        with app.app_context():
+            keys = tabulator_sort_keys(
+                WorkOrder,
+                sort_args(("WorkOrderNo", "desc"), ("DateIn", "asc"), ("Nope", "asc")),
+                SORT_CONFIG,
+            )
+        assert [(k.field, k.descending, k.nulls_last) for k in keys] == [
+            ("WorkOrderNo", True, False),
+            ("DateIn", False, True),
+        ]
+
+    def test_apply_sorting_orders_numbers_numerically(self, orders):
+        with orders.app_context():
+            query = apply_tabulator_sorting(
+                WorkOrder.query, WorkOrder, sort_args(("WorkOrderNo", "asc")), SORT_CONFIG
+            )
+            numbers = [wo.WorkOrderNo for wo in query.all()]
+        assert numbers == sorted(numbers, key=int)
+
+
+class TestKeysetPaginate:
+    @pytest.mark.parametrize(
+        "sorts",
+        [
+            [("WorkOrderNo", "asc")],
+            [("WorkOrderNo", "desc")],
+            [("DateIn", "desc"), ("WorkOrderNo", "asc")],
+            [("DateRequired", "asc")],
+            [("DateRequired", "desc"), ("WOName", "asc")],
+        ],
+    )
+    def test_pages_match_offset_order(self, orders, sorts):
+        with orders.app_context():
+            keys = tabulator_sort_keys(WorkOrder, sort_args(*sorts), SORT_CONFIG)
+            pages = walk(WorkOrder.query, keys, size=5)
+
+            # Same order as a full sort with NULLS LAST and the tiebreaker
+            expected = walk(WorkOrder.query, keys, size=100)[0]
+
+        assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+        assert sum(pages, []) == expected
+        assert len(set(expected)) == 23
+
+    def test_integer_cast_order(self, orders):
+        with orders.app_context():
+            keys = tabulator_sort_keys(WorkOrder, sort_args(("WorkOrderNo", "asc")), SORT_CONFIG)
+            numbers = sum(walk(WorkOrder.query, keys, size=4), [])
+        assert numbers == sorted(numbers, key=int)
+
+    def test_nulls_sort_last(self, orders):
+        with orders.app_context():
+            keys = tabulator_sort_keys(WorkOrder, sort_args(("DateRequired", "desc")), SORT_CONFIG)
+            numbers = sum(walk(WorkOrder.query, keys, size=4), [])
+            dates = [db.session.get(WorkOrder, no).DateRequired for no in numbers]
+        assert dates[-8:] == [None] * 8
+        assert None not in dates[:-8]
+
+    def test_filters_are_kept(self, orders):
+        with orders.app_context():
+            query = WorkOrder.query.filter(WorkOrder.WOName == "Order 1")
+            keys = [sort_key("WorkOrderNo", WorkOrder.WorkOrderNo)]
+            numbers = sum(walk(query, keys, size=2), [])
+        assert len(numbers) == 6
+
+    def test_malformed_cursor(self, orders):
+        with orders.app_context():
+            keys = [sort_key("WOName", WorkOrder.WOName)]
+            with pytest.raises(InvalidCursor):
+                keyset_paginate(WorkOrder.query, keys, "not-a-cursor", 5, WorkOrder.WorkOrderNo)
+
+    def test_cursor_for_another_sort(self, orders):
+        with orders.app_context():
+            keys = [sort_key("WOName", WorkOrder.WOName)]
+            page = keyset_paginate(WorkOrder.query, keys, "", 5, WorkOrder.WorkOrderNo)
+            other = [sort_key("WOName", WorkOrder.WOName, descending=True)]
+            with pytest.raises(InvalidCursor):
+                keyset_paginate(WorkOrder.query, other, page.next_cursor, 5, WorkOrder.WorkOrderNo)
+
+    def test_bad_date_value(self, orders):
+        with orders.app_context():
+            keys = [
+                sort_key("DateIn", WorkOrder.DateIn, nulls_last=True),
+                sort_key("_tiebreaker", WorkOrder.WorkOrderNo, nulls_last=True),
+            ]
+            cursor = encode_cursor(keys, ["yesterday", "5"])
+            with pytest.raises(InvalidCursor):
+                keyset_paginate(WorkOrder.query, keys[:1], cursor, 5, WorkOrder.WorkOrderNo)
+
+
+class TestCursorModeApis:
+    @pytest.fixture
+    def user_client(self, client, app):
+        with app.app_context():
+            db.session.add(
+                User(
+                    username="keyset",
+                    email="keyset@example.com",
+                    role="admin",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "keyset", "password": "password"})
+        return client
+
+    def collect(self, client, url, key, **params):
+        values, cursor, requests = [], "", 0
+        while True:
+            response = client.get(url, query_string={**params, "cursor": cursor, "size": 4})
+            assert response.status_code == 200
+            body = response.get_json()
+            assert "total" not in body
+            values += [row[key] for row in body["data"]]
+            requests += 1
+            if not body["has_next"]:
+                return values, requests
+            cursor = body["next_cursor"]
+
+    def test_work_orders(self, user_client, orders):
+        values, requests = self.collect(
+            user_client,
+            "/work_orders/api/work_orders",
+            "WorkOrderNo",
+            **{"sort[0][field]": "WorkOrderNo", "sort[0][dir]": "desc"},
+        )
+        assert requests == 6
+        assert values == sorted(values, key=int, reverse=True)
+
+    def test_repair_orders(self, user_client, orders):
+        with orders.app_context():
+            for i in range(9):
+                db.session.add(
+                    RepairWorkOrder(
+                        RepairOrderNo=str(900 + i),
+                        CustID="KS001",
+                        ROName=f"Repair {i}",
+                        DateIn=date(2025, 1, 1) + timedelta(days=i % 2),
+                    )
+                )
+            db.session.commit()
+
+        values, _ = self.collect(
+            user_client, "/repair_work_orders/api/repair_work_orders", "RepairOrderNo"
+        )
+        assert sorted(values) == [str(900 + i) for i in range(9)]
+        # Default sort: DateIn desc, then RepairOrderNo desc
+        assert values[:4] == ["907", "905", "903", "901"]
+
+    def test_customers(self, user_client, orders):
+        with orders.app_context():
+            for i in range(6):
+                db.session.add(Customer(CustID=f"KS1{i:02d}", Name="Same Name"))
+            db.session.commit()
+
+        values, _ = self.collect(
+            user_client,
+            "/customers/api/customers",
+            "CustID",
+            **{"sort[0][field]": "Name", "sort[0][dir]": "asc"},
+        )
+        assert len(values) == len(set(values)) == 7
+
+    def test_invalid_cursor_is_rejected(self, user_client, orders):
+        response = user_client.get("/work_orders/api/work_orders?cursor=garbage")
+        assert response.status_code == 400
@@ -0,0 +1,312 @@
+"""
+Tests for the queue/in-progress live event feed (utils/queue_events.py,
+routes/events.py) using the in-memory bridge.
+"""
+
+import json
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.user import User
+from models.work_order import WorkOrder
+from utils import queue_events
+from utils.queue_events import EventBroker, PostgresNotifyBridge, broker, format_sse
+from utils.queue_positions import QUEUE_POSITION_GAP, write_queue_positions
+
+
+@pytest.fixture
+def received():
+    """Collect events published to the process broker during the test."""
+    subscription, _ = broker.subscribe()
+    events = []
+
+    def drain():
+        while True:
+            evt = subscription.get(timeout=0)
+            if evt is None:
+                return events
+            events.append(evt)
+
+    yield drain
+    broker.unsubscribe(subscription)
+
+
+@pytest.fixture
+def queued_order(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="EV001", Name="Events Customer"))
+        db.session.add(
+            WorkOrder(
+                WorkOrderNo="EV1",
+                WOName="Event Order",
+                CustID="EV001",
+                DateIn=date(2025, 1, 1),
+                Quote="Approved",
+                QueuePosition=QUEUE_POSITION_GAP,
+            )
+        )
+        db.session.commit()
+    return "EV1"
+
+
+class TestEventBroker:
+    def test_publish_reaches_subscribers(self):
+        local = EventBroker()
+        subscription, replay = local.subscribe()
+        assert replay == []
+
+        local.publish("queue.positions", {"version": 1})
+        evt = subscription.get(timeout=0)
+        assert evt["type"] == "queue.positions"
+        assert evt["data"] == {"version": 1}
+
+    def test_replay_after_last_event_id(self):
+        local = EventBroker()
+        first = local.publish("a", {})
+        local.publish("b", {})
+        local.publish("c", {})
+
+        _, replay = local.subscribe(first["id"])
+        assert [e["type"] for e in replay] == ["b", "c"]
+
+    def test_unknown_or_expired_id_requires_reset(self):
+        local = EventBroker(history=1)
+        first = local.publish("a", {})
+        local.publish("b", {})
+        local.publish("c", {})
+
+        assert local.subscribe("otherworker-5")[1] is None
+        assert local.subscribe(first["id"])[1] is None
+
+    def test_slow_subscriber_overflows(self):
+        local = EventBroker()
+        subscription, _ = local.subscribe()
+        subscription._queue.maxsize = 1
+        local.publish("a", {})
+        local.publish("b", {})
+        assert subscription.overflowed is True
+
+    def test_subscribe_refused_at_limit(self):
+        local = EventBroker()
+        first, _ = local.subscribe(max_subscribers=1)
+        assert first is not None
+        assert local.subscribe(max_subscribers=1) == (None, None)
+        assert local.subscriber_count() == 1
+
+        local.unsubscribe(first)
+        second, _ = local.subscribe(max_subscribers=1)
+        assert second is not None
+
+    def test_poll_returns_missed_events_and_cursor(self):
+        local = EventBroker()
+        replay, cursor = local.poll()
+        assert replay == []
+
+        evt = local.publish("queue.positions", {"version": 1})
+        replay, cursor = local.poll(cursor)
+        assert replay == [evt]
+        assert cursor == evt["id"]
+        assert local.subscriber_count() == 0
+
+    def test_format_sse(self):
+        text = format_sse({"id": "x-1", "type": "t", "data": {"a": 1}})
+        assert text == 'id: x-1\nevent: t\ndata: {"a":1}\n\n'
+
+
+class TestEventCollection:
+    def test_clean_transition_published_on_commit(self, app, queued_order, received):
+        with app.app_context():
+            wo = db.session.get(WorkOrder, queued_order)
+            wo.Clean = date(2025, 2, 1)
+            db.session.flush()
+            assert received() == []  # nothing before commit
+
+            db.session.commit()
+
+        events = received()
+        assert len(events) == 1
+        assert events[0]["type"] == "work_order.status"
+        assert events[0]["data"] == {
+            "work_order_no": "EV1",
+            "status": "cleaned",
+            "tier": 2,
+            "in_queue": False,
+            "date": "2025-02-01",
+        }
+
+    def test_rollback_discards_events(self, app, queued_order, received):
+        with app.app_context():
+            wo = db.session.get(WorkOrder, queued_order)
+            wo.DateCompleted = date(2025, 2, 1)
+            db.session.flush()
+            db.session.rollback()
+
+        assert received() == []
+
+    def test_new_approved_order_published(self, app, queued_order, received):
+        with app.app_context():
+            db.session.add(
+                WorkOrder(
+                    WorkOrderNo="EV2",
+                    WOName="New",
+                    CustID="EV001",
+                    Quote="Approved",
+                    RushOrder=True,
+                )
+            )
+            db.session.commit()
+
+        [evt] = received()
+        assert evt["data"]["status"] == "approved"
+        assert evt["data"]["tier"] == 1
+        assert evt["data"]["in_queue"] is True
+
+    def test_queued_order_edit_published(self, app, queued_order, received):
+        with app.app_context():
+            db.session.get(WorkOrder, queued_order).WOName = "Renamed"
+            db.session.commit()
+
+        [evt] = received()
+        assert evt["type"] == "work_order.updated"
+        assert evt["data"] == {"work_order_no": "EV1", "in_queue": True}
+
+    def test_edit_outside_queue_is_silent(self, app, queued_order, received):
+        with app.app_context():
+            wo = db.session.get(WorkOrder, queued_order)
+            wo.DateCompleted = date(2025, 2, 1)
+            db.session.commit()
+            received().clear()
+
+            # A re-saved edit form: same quote, unrelated field changed
+            db.session.refresh(wo)
+            wo.WOName = "Renamed"
+            wo.Quote = "Approved"
+            db.session.commit()
+
+        assert received() == []
+
+    def test_expired_status_write_is_reported_as_update(self, app, queued_order, received):
+        with app.app_context():
+            wo = db.session.get(WorkOrder, queued_order)
+            db.session.expire(wo)
+            wo.Clean = date(2025, 2, 1)  # old value unknown
+            db.session.commit()
+
+        [evt] = received()
+        assert evt["type"] == "work_order.updated"
+        assert evt["data"]["in_queue"] is False
+
+    def test_position_write_published(self, app, queued_order, received):
+        with app.app_context():
+            version = write_queue_positions({queued_order: 512})
+            db.session.commit()
+
+        [evt] = received()
+        assert evt["type"] == "queue.positions"
+        assert evt["data"] == {"version": version, "positions": {"EV1": 512}}
+
+
+class TestPostgresBridge:
+    @pytest.fixture
+    def pg_bridge(self, monkeypatch):
+        """A Postgres bridge as the active one (restored afterwards)."""
+        bridge = PostgresNotifyBridge(app=None, engine=None)
+        monkeypatch.setattr(queue_events, "_bridge", bridge)
+        return bridge
+
+    def test_listener_started_by_first_request(self, monkeypatch, mocker):
+        from app import create_app
+        from config import TestingConfig
+
+        class PostgresEventsConfig(TestingConfig):
+            QUEUE_EVENTS_BACKEND = "postgres"
+
+        monkeypatch.setattr(queue_events, "_bridge", queue_events._bridge)
+        start = mocker.patch.object(PostgresNotifyBridge, "start")
+        app = create_app(config_class=PostgresEventsConfig)
+        start.assert_not_called()
+
+        app.test_client().get("/login")
+        start.assert_called()
+
+    def test_committing_worker_drops_summary_without_listener(self, pg_bridge, mocker, received):
+        from routes.queue import get_queue_summary
+
+        cache_delete = mocker.patch.object(get_queue_summary, "cache_delete")
+        session = MagicMock()
+        session.info = {}
+
+        pg_bridge.send(session, "queue.positions", {"version": 2, "positions": {"EV1": 512}})
+        queue_events._deliver_pending(session)
+
+        cache_delete.assert_called_once_with()
+        # Subscribers still hear it only through LISTEN
+        assert received() == []
+        assert "pg_notify" in str(session.connection().execute.call_args.args[0])
+
+
+class TestEventStream:
+    @pytest.fixture
+    def user_client(self, client, app):
+        app.config["QUEUE_EVENTS_STREAM_SECONDS"] = 0.1
+        with app.app_context():
+            db.session.add(
+                User(
+                    username="viewer",
+                    email="viewer@example.com",
+                    role="user",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "viewer", "password": "password"})
+        return client
+
+    def test_requires_login(self, client):
+        response = client.get("/events/stream")
+        assert response.status_code in (302, 401)
+
+    def test_stream_replays_missed_events(self, user_client):
+        first = broker.publish("queue.positions", {"version": 1, "positions": {}})
+        broker.publish("queue.positions", {"version": 2, "positions": {"A": 1}})
+
+        response = user_client.get(
+            "/events/stream", headers={"Last-Event-ID": first["id"]}
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+
+        body = response.get_data(as_text=True)
+        assert body.startswith("retry: 3000")
+        data_lines = [l[6:] for l in body.splitlines() if l.startswith("data: ")]
+        assert [json.loads(d)["version"] for d in data_lines] == [2]
+
+    def test_stream_resets_on_unknown_id(self, user_client):
+        response = user_client.get(
+            "/events/stream", headers={"Last-Event-ID": "gone-1"}
+        )
+        assert "event: reset" in response.get_data(as_text=True)
+
+    def test_stream_falls_back_to_polling_when_full(self, user_client, app):
+        app.config["QUEUE_EVENTS_MAX_STREAMS"] = 0
+        app.config["QUEUE_EVENTS_POLL_SECONDS"] = 20
+        first = broker.publish("queue.positions", {"version": 1, "positions": {}})
+        second = broker.publish("queue.positions", {"version": 2, "positions": {}})
+
+        before = broker.subscriber_count()
+        response = user_client.get(
+            "/events/stream", headers={"Last-Event-ID": first["id"]}
+        )
+        assert response.status_code == 200
+        assert broker.subscriber_count() == before
+
+        body = response.get_data(as_text=True)
+        assert body.startswith("retry: 20000")
+        assert f"id: {second['id']}\nevent: queue.positions" in body
+        # Ends with the id the next poll resumes from
+        assert body.endswith(f"id: {second['id']}\nevent: busy\ndata: {{}}\n\n")
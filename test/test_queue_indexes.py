@@ -0,0 +1,173 @@
+"""
+EXPLAIN regression tests for the cleaning queue's partial index
+(idx_workorder_cleaning_queue, see models/work_order.py).
+
+PostgreSQL only: the tables are created in a scratch schema of the database
+in SQLALCHEMY_DATABASE_URI, filled with mostly finished orders, vacuumed, and
+the plans of the queue queries (compiled from routes/queue.py) are checked.
+"""
+
+import json
+import os
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+
+from extensions import db
+from models.customer import Customer
+from models.source import Source
+from models.work_order import WorkOrder
+from routes.queue import (
+    _cleaning_queue_criteria,
+    _cleaning_queue_page_query,
+    _queue_summary_query,
+    _queue_tier_counts_query,
+)
+from utils.queue_positions import QUEUE_POSITION_GAP, queue_base_filter
+
+
+requires_postgres = pytest.mark.skipif(
+    "sqlite" in os.environ.get("SQLALCHEMY_DATABASE_URI", "sqlite").lower(),
+    reason="Query plans are checked against PostgreSQL only",
+)
+
+SCHEMA = "queue_index_test"
+INDEX_NAME = "idx_workorder_cleaning_queue"
+
+pytestmark = requires_postgres
+
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    url = os.environ["SQLALCHEMY_DATABASE_URI"]
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    # Unqualified table names resolve to (and are created in) the scratch schema
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    tables = [Source.__table__, Customer.__table__, WorkOrder.__table__]
+    db.metadata.create_all(engine, tables=tables)
+    _fill(engine)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE tblcustworkorderdetail"))
+
+    yield engine
+
+    engine.dispose()
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def _fill(engine, order_count=20000, queued_count=300):
+    """Mostly completed orders, with a few hundred in the cleaning queue."""
+    rng = random.Random(7)
+    start = date(2020, 1, 1)
+    rows = []
+    for i in range(order_count):
+        queued = i < queued_count
+        day = start + timedelta(days=i // 20)
+        rows.append(
+            {
+                "workorderno": str(100000 + i),
+                "custid": "IDX001",
+                "woname": f"Order {i}",
+                "datein": day,
+                "daterequired": day + timedelta(days=30),
+                "datecompleted": None if queued else day + timedelta(days=60),
+                "clean": None if queued else day + timedelta(days=40),
+                "treat": None,
+                "quote": "Approved",
+                "firmrush": queued and rng.random() < 0.1,
+                "rushorder": queued and rng.random() < 0.2,
+                "queueposition": (i + 1) * QUEUE_POSITION_GAP if queued else None,
+            }
+        )
+    with engine.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [{"custid": "IDX001", "name": "Index"}])
+        conn.execute(WorkOrder.__table__.insert(), rows)
+
+
+def _plan(engine, query):
+    """JSON plan of a Query/Select compiled for PostgreSQL with inline literals."""
+    statement = getattr(query, "statement", query)
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    with engine.connect() as conn:
+        result = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    return result if isinstance(result, list) else json.loads(result)
+
+
+def _nodes(plan):
+    """Flatten a JSON plan into its nodes."""
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get("Plans", []))
+
+
+def _work_order_scans(plan):
+    return [
+        node
+        for node in _nodes(plan)
+        if node.get("Relation Name") == WorkOrder.__tablename__
+    ]
+
+
+def _assert_index_only(plan):
+    scans = _work_order_scans(plan)
+    assert scans, plan
+    for node in scans:
+        assert node["Node Type"] == "Index Only Scan", node
+        assert node["Index Name"] == INDEX_NAME
+
+
+class TestCleaningQueueIndexPlans:
+    def test_tier_counts_are_index_only(self, app, pg_engine):
+        with app.app_context():
+            criteria = _cleaning_queue_criteria("", True, True)
+            plan = _plan(pg_engine, _queue_tier_counts_query(criteria))
+        _assert_index_only(plan)
+
+    def test_summary_is_index_only(self, app, pg_engine):
+        with app.app_context():
+            plan = _plan(pg_engine, _queue_summary_query())
+        _assert_index_only(plan)
+
+    def test_position_loader_is_index_only(self, app, pg_engine):
+        with app.app_context():
+            query = (
+                db.session.query(
+                    WorkOrder.WorkOrderNo,
+                    WorkOrder.QueuePosition,
+                    WorkOrder.FirmRush,
+                    WorkOrder.RushOrder,
+                    WorkOrder.DateRequired,
+                    WorkOrder.DateIn,
+                )
+                .filter(queue_base_filter(), WorkOrder.QueuePosition.isnot(None))
+                .order_by(WorkOrder.QueuePosition.asc(), WorkOrder.WorkOrderNo.asc())
+            )
+            plan = _plan(pg_engine, query)
+        _assert_index_only(plan)
+
+    def test_page_reads_index_in_order(self, app, pg_engine):
+        with app.app_context():
+            criteria = _cleaning_queue_criteria("", True, True)
+            query = _cleaning_queue_page_query(criteria).offset(25).limit(25)
+            plan = _plan(pg_engine, query)
+
+        scans = _work_order_scans(plan)
+        assert [node["Index Name"] for node in scans] == [INDEX_NAME]
+        # The index supplies the page order, so the scan is never sorted
+        for node in _nodes(plan):
+            if node["Node Type"] in ("Sort", "Incremental Sort"):
+                assert not any(child in scans for child in node.get("Plans", [])), node
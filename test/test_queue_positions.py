@@ -0,0 +1,455 @@
+"""
+Tests for sparse (gap-based) queue positions (utils/queue_positions.py).
+"""
+
+import os
+
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event, text
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.source import Source
+from models.table_version import TableVersion
+from models.user import User
+from models.work_order import WorkOrder
+from utils.queue_positions import (
+    QUEUE_POSITION_GAP,
+    TIER_FIRM_RUSH,
+    TIER_REGULAR,
+    TIER_RUSH,
+    QueueEntry,
+    QueueVersionConflict,
+    assign_positions_to_unassigned,
+    bulk_update_positions_statement,
+    bump_queue_version,
+    find_insert_index,
+    get_queue_version,
+    move_queue_entry,
+    place_new_entries,
+    position_between,
+    rebalance_queue_positions,
+    reorder_within_slots,
+    write_queue_positions,
+)
+
+
+requires_postgres = pytest.mark.skipif(
+    "sqlite" in os.environ.get("SQLALCHEMY_DATABASE_URI", "sqlite").lower(),
+    reason="Checks queries PostgreSQL rejects but SQLite accepts",
+)
+
+PG_SCHEMA = "queue_move_test"
+
+
+def entry(no, position, tier=TIER_REGULAR, day=1):
+    return QueueEntry(no, position, tier, (date(2025, 1, day), no))
+
+
+@pytest.fixture
+def queue_customer(app):
+    with app.app_context():
+        customer = Customer(CustID="Q001", Name="Queue Customer")
+        db.session.add(customer)
+        db.session.commit()
+        yield customer.CustID
+
+
+def add_order(cust_id, no, day, position=None, **kwargs):
+    wo = WorkOrder(
+        WorkOrderNo=no,
+        WOName=f"Order {no}",
+        CustID=cust_id,
+        DateIn=date(2025, 1, day),
+        Quote="Approved",
+        QueuePosition=position,
+        **kwargs,
+    )
+    db.session.add(wo)
+    return wo
+
+
+class CountUpdates:
+    """Count UPDATE statements against work orders, and the rows they wrote."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = 0
+        self.rows = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "after_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "after_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE TBLCUSTWORKORDERDETAIL"):
+            self.statements += 1
+            self.rows += cursor.rowcount
+
+
+class TestPositionMath:
+    def test_position_between_midpoint(self):
+        assert position_between(1024, 2048) == 1536
+
+    def test_position_between_head_and_tail(self):
+        assert position_between(None, 1024) == 512
+        assert position_between(2048, None) == 2048 + QUEUE_POSITION_GAP
+        assert position_between(None, None) == QUEUE_POSITION_GAP
+
+    def test_position_between_no_room(self):
+        assert position_between(5, 6) is None
+        assert position_between(None, 1) is None
+
+    def test_find_insert_index_respects_tiers(self):
+        entries = [
+            entry("FR", 1024, TIER_FIRM_RUSH),
+            entry("R", 2048, TIER_RUSH),
+            entry("REG", 3072, TIER_REGULAR),
+        ]
+        assert find_insert_index(entries, entry("new_rush", None, TIER_RUSH, day=5)) == 2
+        assert find_insert_index(entries, entry("new_fr", None, TIER_FIRM_RUSH, day=5)) == 1
+
+    def test_find_insert_index_fifo_within_tier(self):
+        entries = [entry("A", 1024, day=3), entry("B", 2048, day=10)]
+        assert find_insert_index(entries, entry("N", None, day=1)) == 0
+        assert find_insert_index(entries, entry("N", None, day=5)) == 1
+        assert find_insert_index(entries, entry("N", None, day=20)) == 2
+
+    def test_reorder_within_slots_only_returns_moved(self):
+        current = {"A": 1024, "B": 2048, "C": 3072}
+        moved = reorder_within_slots(["B", "A", "C"], current)
+        assert moved == {"B": 1024, "A": 2048}
+
+
+class TestQueuePositionsDatabase:
+    def test_insert_touches_only_new_row(self, app, queue_customer):
+        with app.app_context():
+            for i in range(1, 21):
+                add_order(queue_customer, f"E{i:03d}", day=i + 1, position=i * QUEUE_POSITION_GAP)
+            add_order(queue_customer, "NEW", day=1)
+            db.session.commit()
+
+            with CountUpdates(db.engine) as counter:
+                assert assign_positions_to_unassigned() == 1
+                db.session.commit()
+
+            assert counter.rows == 1
+            new_pos = db.session.get(WorkOrder, "NEW").QueuePosition
+            assert new_pos < db.session.get(WorkOrder, "E001").QueuePosition
+
+    def test_rebalance_when_gap_exhausted(self, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=2, position=1)
+            add_order(queue_customer, "B", day=3, position=2)
+            add_order(queue_customer, "NEW", day=1)
+            db.session.commit()
+
+            entries = [
+                QueueEntry("A", 1, TIER_REGULAR, (date(2025, 1, 2), "A")),
+                QueueEntry("B", 2, TIER_REGULAR, (date(2025, 1, 3), "B")),
+            ]
+            new = [QueueEntry("NEW", None, TIER_REGULAR, (date(2025, 1, 1), "NEW"))]
+            _, _, rebalanced = place_new_entries(entries, new)
+            assert rebalanced is True
+            db.session.rollback()
+
+            assign_positions_to_unassigned()
+            db.session.commit()
+
+            positions = {
+                wo.WorkOrderNo: wo.QueuePosition for wo in WorkOrder.query.all()
+            }
+            assert positions["NEW"] < positions["A"] < positions["B"]
+            assert positions["B"] - positions["A"] >= QUEUE_POSITION_GAP
+
+    def test_rebalance_preserves_order_and_spaces_positions(self, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=5, position=7)
+            add_order(queue_customer, "B", day=1, position=8)
+            add_order(queue_customer, "C", day=3, position=9)
+            db.session.commit()
+
+            rebalance_queue_positions()
+            db.session.commit()
+
+            ordered = [
+                wo.WorkOrderNo
+                for wo in WorkOrder.query.order_by(WorkOrder.QueuePosition).all()
+            ]
+            assert ordered == ["A", "B", "C"]
+            assert db.session.get(WorkOrder, "C").QueuePosition == 3 * QUEUE_POSITION_GAP
+
+
+class TestBulkWrites:
+    def test_postgres_statement_uses_values_join(self):
+        from sqlalchemy.dialects import postgresql
+
+        stmt = bulk_update_positions_statement({"A": 1024, "B": 2048}, "postgresql")
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "FROM (VALUES" in sql
+        assert "new_positions" in sql
+
+    def test_write_is_a_single_statement(self, app, queue_customer):
+        with app.app_context():
+            for i in range(1, 6):
+                add_order(queue_customer, f"E{i}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+            moved = reorder_within_slots(
+                ["E5", "E4", "E3", "E2", "E1"],
+                {f"E{i}": i * QUEUE_POSITION_GAP for i in range(1, 6)},
+            )
+            with CountUpdates(db.engine) as counter:
+                write_queue_positions(moved)
+                db.session.commit()
+
+            assert counter.statements == 1
+            assert counter.rows == 4
+            ordered = [
+                wo.WorkOrderNo
+                for wo in WorkOrder.query.order_by(WorkOrder.QueuePosition).all()
+            ]
+            assert ordered == ["E5", "E4", "E3", "E2", "E1"]
+
+
+class TestQueueVersion:
+    def test_bump_creates_and_increments(self, app):
+        with app.app_context():
+            assert get_queue_version() == 0
+            assert bump_queue_version() == 1
+            assert bump_queue_version(expected_version=1) == 2
+            db.session.commit()
+            assert get_queue_version() == 2
+
+    def test_stale_version_conflicts(self, app):
+        with app.app_context():
+            bump_queue_version()
+            bump_queue_version()
+            with pytest.raises(QueueVersionConflict) as excinfo:
+                bump_queue_version(expected_version=1)
+            assert excinfo.value.current_version == 2
+
+
+class TestMoveQueueEntry:
+    def test_move_to_head_writes_one_row(self, app, queue_customer):
+        with app.app_context():
+            for i in range(1, 11):
+                add_order(queue_customer, f"E{i:02d}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+            with CountUpdates(db.engine) as counter:
+                move_queue_entry("E10", 1)
+                db.session.commit()
+
+            assert counter.rows == 1
+            first = WorkOrder.query.order_by(WorkOrder.QueuePosition).first()
+            assert first.WorkOrderNo == "E10"
+
+    def test_move_to_middle_and_past_end(self, app, queue_customer):
+        with app.app_context():
+            for i in range(1, 6):
+                add_order(queue_customer, f"E{i}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+            move_queue_entry("E1", 3)
+            db.session.commit()
+            ordered = [
+                wo.WorkOrderNo
+                for wo in WorkOrder.query.order_by(WorkOrder.QueuePosition).all()
+            ]
+            assert ordered == ["E2", "E3", "E1", "E4", "E5"]
+
+            move_queue_entry("E2", 99)
+            db.session.commit()
+            last = WorkOrder.query.order_by(WorkOrder.QueuePosition.desc()).first()
+            assert last.WorkOrderNo == "E2"
+
+    def test_tail_lookup_has_no_order_by(self, app, queue_customer):
+        """MAX() with the neighbour query's ORDER BY is an error on PostgreSQL."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.lower())
+
+        with app.app_context():
+            for i in range(1, 4):
+                add_order(queue_customer, f"E{i}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+            event.listen(db.engine, "after_cursor_execute", record)
+            try:
+                move_queue_entry("E1", 99)
+            finally:
+                event.remove(db.engine, "after_cursor_execute", record)
+
+        (tail_query,) = [sql for sql in statements if "max(" in sql]
+        assert "order by" not in tail_query
+
+    def test_move_between_adjacent_positions_rebalances(self, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=1, position=1)
+            add_order(queue_customer, "B", day=2, position=2)
+            add_order(queue_customer, "C", day=3, position=3)
+            db.session.commit()
+
+            move_queue_entry("C", 2)
+            db.session.commit()
+            ordered = [
+                wo.WorkOrderNo
+                for wo in WorkOrder.query.order_by(WorkOrder.QueuePosition).all()
+            ]
+            assert ordered == ["A", "C", "B"]
+
+
+@pytest.fixture
+def pg_app():
+    """The app on the PostgreSQL database, with its tables in a scratch schema."""
+    from app import create_app
+    from config import TestingConfig
+
+    url = os.environ["SQLALCHEMY_DATABASE_URI"]
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {PG_SCHEMA}"))
+
+    class PostgresTestingConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "connect_args": {"options": f"-csearch_path={PG_SCHEMA}"}
+        }
+
+    app = create_app(config_class=PostgresTestingConfig)
+    with app.app_context():
+        tables = [Source.__table__, Customer.__table__, WorkOrder.__table__, TableVersion.__table__]
+        db.metadata.create_all(db.engine, tables=tables)
+        db.session.add(Customer(CustID="Q001", Name="Queue Customer"))
+        db.session.commit()
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+@requires_postgres
+class TestMoveQueueEntryPostgres:
+    def test_move_past_end_goes_to_tail(self, pg_app):
+        with pg_app.app_context():
+            for i in range(1, 4):
+                add_order("Q001", f"E{i}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+            move_queue_entry("E1", 99)
+            db.session.commit()
+
+            last = WorkOrder.query.order_by(WorkOrder.QueuePosition.desc()).first()
+            assert last.WorkOrderNo == "E1"
+
+
+@pytest.fixture
+def admin_client(client, app):
+    with app.app_context():
+        db.session.add(
+            User(
+                username="admin",
+                email="admin@example.com",
+                role="admin",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "admin", "password": "password"})
+    return client
+
+
+class TestQueueEndpoints:
+    def test_reorder_with_stale_version_returns_409(self, admin_client, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=1, position=1024)
+            add_order(queue_customer, "B", day=2, position=2048)
+            bump_queue_version()
+            bump_queue_version()
+            db.session.commit()
+
+        response = admin_client.post(
+            "/cleaning_queue/api/cleaning-queue/reorder",
+            json={"work_order_ids": ["B", "A"], "queue_version": 1},
+        )
+        assert response.status_code == 409
+        data = response.get_json()
+        assert data["error_type"] == "concurrency"
+        assert data["queue_version"] == 2
+
+        with app.app_context():
+            assert db.session.get(WorkOrder, "A").QueuePosition == 1024
+
+    def test_reorder_with_current_version_bumps_it(self, admin_client, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=1, position=1024)
+            add_order(queue_customer, "B", day=2, position=2048)
+            db.session.commit()
+
+        response = admin_client.post(
+            "/cleaning_queue/api/cleaning-queue/reorder",
+            json={"work_order_ids": ["B", "A"], "queue_version": 0},
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["queue_version"] == 1
+        assert data["moved_count"] == 2
+
+    def test_move_endpoint(self, admin_client, app, queue_customer):
+        with app.app_context():
+            for i in range(1, 31):
+                add_order(queue_customer, f"E{i:02d}", day=i, position=i * QUEUE_POSITION_GAP)
+            db.session.commit()
+
+        response = admin_client.post(
+            "/cleaning_queue/api/cleaning-queue/move",
+            json={"work_order_no": "E30", "target_rank": 2, "queue_version": 0},
+        )
+        assert response.status_code == 200
+        assert response.get_json()["queue_version"] == 1
+
+        with app.app_context():
+            ordered = [
+                wo.WorkOrderNo
+                for wo in WorkOrder.query.order_by(WorkOrder.QueuePosition).limit(3)
+            ]
+            assert ordered == ["E01", "E30", "E02"]
+
+    def test_move_endpoint_validation(self, admin_client, queue_customer):
+        response = admin_client.post(
+            "/cleaning_queue/api/cleaning-queue/move", json={"work_order_no": "X"}
+        )
+        assert response.status_code == 400
+
+        response = admin_client.post(
+            "/cleaning_queue/api/cleaning-queue/move",
+            json={"work_order_no": "NOPE", "target_rank": 1},
+        )
+        assert response.status_code == 404
+
+
+class TestRebalanceEndpoint:
+    def test_rebalance_endpoint(self, admin_client, app, queue_customer):
+        with app.app_context():
+            add_order(queue_customer, "A", day=1, position=1)
+            add_order(queue_customer, "B", day=2, position=2)
+            db.session.commit()
+
+        response = admin_client.post("/cleaning_queue/api/cleaning-queue/rebalance")
+        assert response.status_code == 200
+        assert response.get_json()["rebalanced_count"] == 2
+
+        with app.app_context():
+            assert db.session.get(WorkOrder, "B").QueuePosition == 2 * QUEUE_POSITION_GAP
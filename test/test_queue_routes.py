@@ -126,9 +126,13 @@ class TestQueueRoutes:
         assert response.status_code == 200
         assert response.get_json()["success"] is True
 
-        assert WorkOrder.query.get("1002").QueuePosition == 1
-        assert WorkOrder.query.get("1001").QueuePosition == 2
-        assert WorkOrder.query.get("1003").QueuePosition == 3
+        # Positions are sparse (gap-based); only the relative order matters
+        positions = [
+            WorkOrder.query.get(wo_id).QueuePosition for wo_id in new_order
+        ]
+        assert None not in positions
+        assert positions == sorted(positions)
+        assert len(set(positions)) == 3
 
     def test_queue_summary_api(
         self, logged_in_client, sample_customers_and_work_orders
@@ -1367,3 +1371,164 @@ class TestQueueFIFOOrdering:
             ).delete(synchronize_session=False)
             db.session.query(Customer).filter_by(CustID="FIFO006").delete()
             db.session.commit()
+
+
+class TestCleaningQueuePagination:
+    def test_tier_counts_cover_whole_queue(
+        self, logged_in_client, sample_customers_and_work_orders
+    ):
+        """Tier counts reflect the whole filtered queue, not just the page."""
+        from bs4 import BeautifulSoup
+
+        response = logged_in_client.get("/cleaning_queue/cleaning-queue?per_page=1")
+        assert response.status_code == 200
+
+        soup = BeautifulSoup(response.data, "html.parser")
+        counts = [el.text.strip() for el in soup.select("h4.fw-bold")]
+        assert counts[:4] == ["1", "1", "1", "3"]
+        assert len(soup.select(".work-order-name")) == 1
+
+    def test_second_page_loads_next_order(
+        self, logged_in_client, sample_customers_and_work_orders
+    ):
+        """page=2 shows the second order in queue order with its rank."""
+        from bs4 import BeautifulSoup
+
+        response = logged_in_client.get(
+            "/cleaning_queue/cleaning-queue?per_page=1&page=2"
+        )
+        assert response.status_code == 200
+
+        soup = BeautifulSoup(response.data, "html.parser")
+        displayed = [el.text.strip() for el in soup.select(".work-order-name")]
+        assert displayed == ["Rush Order"]
+
+    def test_page_past_end_is_empty(
+        self, logged_in_client, sample_customers_and_work_orders
+    ):
+        response = logged_in_client.get(
+            "/cleaning_queue/cleaning-queue?per_page=25&page=5"
+        )
+        assert response.status_code == 200
+        assert b"Regular Order" not in response.data
+
+    def test_only_visible_page_is_loaded(
+        self, logged_in_client, sample_customers_and_work_orders, app
+    ):
+        """The page query uses LIMIT and no query loads the full queue."""
+        from sqlalchemy import event
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", capture)
+            try:
+                response = logged_in_client.get(
+                    "/cleaning_queue/cleaning-queue?per_page=1"
+                )
+            finally:
+                event.remove(db.engine, "before_cursor_execute", capture)
+
+        assert response.status_code == 200
+        work_order_selects = [
+            s for s in statements
+            if s.lstrip().upper().startswith("SELECT")
+            and "tblcustworkorderdetail.woname" in s
+        ]
+        assert work_order_selects
+        assert all("LIMIT" in s.upper() for s in work_order_selects)
+
+
+class TestQueueSummary:
+    @pytest.fixture
+    def summary_orders(self, app):
+        from models.customer import Customer
+
+        with app.app_context():
+            db.session.add(Customer(CustID="SUM1", Name="Summary Customer"))
+            specs = [
+                ("S1", {"FirmRush": True, "DateRequired": date(2024, 3, 1)}, 6000),
+                ("S2", {"RushOrder": True}, 1000),
+                ("S3", {}, 2000),
+                ("S4", {}, 3000),
+                ("S5", {"RushOrder": True}, 4000),
+                ("S6", {}, 5000),
+                ("S7", {"Quote": "Pending"}, None),
+            ]
+            for no, extra, position in specs:
+                fields = {"Quote": "Approved", **extra}
+                db.session.add(
+                    WorkOrder(
+                        WorkOrderNo=no,
+                        WOName=f"Summary {no}",
+                        CustID="SUM1",
+                        DateIn=date(2024, 1, 1),
+                        QueuePosition=position,
+                        **fields,
+                    )
+                )
+            db.session.commit()
+
+    def test_counts_and_preview_in_tier_order(
+        self, logged_in_client, summary_orders
+    ):
+        response = logged_in_client.get("/cleaning_queue/api/cleaning-queue/summary")
+        data = response.get_json()
+
+        assert data["counts"] == {"firm_rush": 1, "rush": 2, "regular": 3, "total": 6}
+        assert [wo["WorkOrderNo"] for wo in data["next_orders"]] == [
+            "S1", "S2", "S5", "S3", "S4",
+        ]
+        assert data["next_orders"][0]["priority"] == "FIRM RUSH"
+        assert data["next_orders"][0]["DateRequired"] == "2024-03-01"
+
+    def test_empty_queue(self, logged_in_client):
+        data = logged_in_client.get(
+            "/cleaning_queue/api/cleaning-queue/summary"
+        ).get_json()
+        assert data == {
+            "counts": {"firm_rush": 0, "rush": 0, "regular": 0, "total": 0},
+            "next_orders": [],
+        }
+
+    def test_single_query(self, app, logged_in_client, summary_orders):
+        from sqlalchemy import event
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "tblcustworkorderdetail" in statement:
+                statements.append(statement)
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", capture)
+            try:
+                logged_in_client.get("/cleaning_queue/api/cleaning-queue/summary")
+            finally:
+                event.remove(db.engine, "before_cursor_execute", capture)
+
+        assert len(statements) == 1
+        assert "row_number()" in statements[0].lower()
+
+    def test_cached_until_queue_event(self, app, summary_orders):
+        from extensions import cache
+        from routes.queue import get_queue_summary
+
+        cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+        with app.app_context():
+            assert get_queue_summary()["counts"]["total"] == 6
+
+            # A raw write bypasses the ORM events: the cached value is served
+            db.session.execute(
+                WorkOrder.__table__.delete().where(WorkOrder.WorkOrderNo == "S6")
+            )
+            db.session.commit()
+            assert get_queue_summary()["counts"]["total"] == 6
+
+            # Any ORM change to a queued order publishes an event and drops it
+            db.session.get(WorkOrder, "S5").Clean = date(2024, 2, 1)
+            db.session.commit()
+            assert get_queue_summary()["counts"]["total"] == 4
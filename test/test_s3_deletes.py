@@ -0,0 +1,192 @@
+"""
+Tests for batched S3 deletes through the outbox (utils/s3_deletes.py) and
+the delete routes that use it.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.s3_delete_outbox import S3DeleteOutbox
+from models.stored_file import StoredFile
+from models.user import User
+from models.work_order import WorkOrder
+from models.work_order_file import WorkOrderFile
+from utils.file_upload import AWS_S3_BUCKET
+from utils.s3_deletes import (
+    S3_DELETE_BATCH_SIZE,
+    drain_s3_deletes,
+    queue_s3_deletes,
+    retry_delay,
+)
+
+
+def s3_path(key):
+    return f"s3://{AWS_S3_BUCKET}/{key}"
+
+
+def batches(s3):
+    return [
+        [obj["Key"] for obj in call.kwargs["Delete"]["Objects"]]
+        for call in s3.delete_objects.call_args_list
+    ]
+
+
+def queued():
+    db.session.expire_all()
+    return S3DeleteOutbox.query.order_by(S3DeleteOutbox.id).all()
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    client.delete_objects.return_value = {}
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+@pytest.fixture
+def work_order(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="SD1", Name="Deletes"))
+        db.session.add(WorkOrder(WorkOrderNo="7501", CustID="SD1", WOName="Photos"))
+        for i in range(3):
+            db.session.add(
+                WorkOrderFile(
+                    WorkOrderNo="7501",
+                    filename=f"photo{i}.jpg",
+                    file_path=s3_path(f"work_orders/7501/photo{i}.jpg"),
+                    thumbnail_path=s3_path(f"work_orders/7501/thumbnails/photo{i}_thumb.jpg"),
+                )
+            )
+        db.session.add(
+            User(
+                username="deleter",
+                email="deleter@example.com",
+                role="admin",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def admin_client(client, work_order):
+    client.post("/login", data={"username": "deleter", "password": "password"})
+    return client
+
+
+class TestDrain:
+    def test_keys_deleted_in_batches_of_1000(self, app, s3):
+        with app.app_context():
+            queue_s3_deletes(f"k{i}" for i in range(S3_DELETE_BATCH_SIZE + 5))
+            db.session.commit()
+
+            assert drain_s3_deletes(app) == (S3_DELETE_BATCH_SIZE + 5, 0)
+            assert [len(batch) for batch in batches(s3)] == [S3_DELETE_BATCH_SIZE, 5]
+            assert s3.delete_objects.call_args.kwargs["Delete"]["Quiet"] is True
+            assert queued() == []
+
+    def test_failed_keys_retried_with_backoff(self, app, s3):
+        s3.delete_objects.return_value = {
+            "Errors": [{"Key": "b", "Code": "AccessDenied", "Message": "Access Denied"}]
+        }
+        with app.app_context():
+            queue_s3_deletes(["a", "b"])
+            db.session.commit()
+
+            assert drain_s3_deletes(app) == (1, 1)
+            (row,) = queued()
+            assert row.s3_key == "b" and row.attempts == 1
+            assert row.last_error == "AccessDenied: Access Denied"
+            assert row.next_attempt_at > datetime.utcnow()
+
+            # Not due yet: nothing is sent
+            assert drain_s3_deletes(app) == (0, 0)
+            assert s3.delete_objects.call_count == 1
+
+            row.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+            db.session.commit()
+            s3.delete_objects.return_value = {}
+            assert drain_s3_deletes(app) == (1, 0)
+            assert queued() == []
+
+    def test_request_failure_keeps_batch(self, app, s3):
+        s3.delete_objects.side_effect = RuntimeError("S3 down")
+        with app.app_context():
+            queue_s3_deletes(["a", "b"])
+            db.session.commit()
+
+            assert drain_s3_deletes(app) == (0, 2)
+            assert [row.last_error for row in queued()] == ["S3 down", "S3 down"]
+
+    def test_backoff_is_capped(self):
+        assert retry_delay(1) == timedelta(seconds=30)
+        assert retry_delay(3) == timedelta(seconds=120)
+        assert retry_delay(20) == timedelta(hours=1)
+
+    def test_rollback_queues_nothing(self, app, s3):
+        with app.app_context():
+            queue_s3_deletes(["a"])
+            db.session.rollback()
+
+            assert queued() == []
+
+
+class TestRoutes:
+    def test_work_order_delete_is_one_request_after_commit(self, admin_client, work_order, s3):
+        response = admin_client.post("/work_orders/delete/7501")
+
+        assert response.status_code == 302
+        s3.delete_object.assert_not_called()
+        (batch,) = batches(s3)
+        assert sorted(batch) == sorted(
+            [f"work_orders/7501/photo{i}.jpg" for i in range(3)]
+            + [f"work_orders/7501/thumbnails/photo{i}_thumb.jpg" for i in range(3)]
+        )
+        with work_order.app_context():
+            assert db.session.get(WorkOrder, "7501") is None
+            assert S3DeleteOutbox.query.count() == 0
+
+    def test_failed_commit_deletes_nothing(self, admin_client, work_order, s3, mocker):
+        mocker.patch.object(db.session, "commit", side_effect=RuntimeError("DB down"))
+        admin_client.post("/work_orders/delete/7501")
+
+        s3.delete_objects.assert_not_called()
+        with work_order.app_context():
+            assert WorkOrderFile.query.count() == 3
+            assert S3DeleteOutbox.query.count() == 0
+
+    def test_single_file_delete(self, admin_client, work_order, s3):
+        with work_order.app_context():
+            file_id = WorkOrderFile.query.filter_by(filename="photo1.jpg").one().id
+
+        response = admin_client.delete(f"/work_orders/delete_file/{file_id}")
+
+        assert response.get_json() == {"success": True}
+        assert batches(s3) == [
+            ["work_orders/7501/photo1.jpg", "work_orders/7501/thumbnails/photo1_thumb.jpg"]
+        ]
+
+    def test_shared_content_is_not_queued(self, admin_client, work_order, s3):
+        key = "work_orders/7501/photo0.jpg"
+        thumbnail_key = "work_orders/7501/thumbnails/photo0_thumb.jpg"
+        with work_order.app_context():
+            db.session.add(
+                StoredFile(sha256="ab" * 32, s3_key=key, thumbnail_key=thumbnail_key, ref_count=2)
+            )
+            WorkOrderFile.query.filter_by(filename="photo0.jpg").one().content_sha256 = "ab" * 32
+            db.session.commit()
+
+        admin_client.post("/work_orders/delete/7501")
+
+        (batch,) = batches(s3)
+        assert key not in batch and thumbnail_key not in batch
+        assert len(batch) == 4
+        with work_order.app_context():
+            assert db.session.get(StoredFile, "ab" * 32).ref_count == 1
@@ -0,0 +1,131 @@
+"""
+Tests for global search (utils/search_helpers.py, routes/search.py).
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.inventory import Inventory
+from models.user import User
+from models.work_order import WorkOrder, WorkOrderItem
+from services.rag_service import tool_search_customers, tool_search_work_orders
+from utils.search_helpers import apply_search, search_document, search_filter
+
+
+@pytest.fixture
+def searchable(app):
+    with app.app_context():
+        db.session.add_all(
+            [
+                Customer(CustID="SR100", Name="Harbor Marine", City="Bayview"),
+                Customer(CustID="SR200", Name="Marine Canvas Co", Contact="Pat"),
+                Customer(CustID="SR300", Name="Summit Tents", EmailAddress="100%@x.com"),
+            ]
+        )
+        db.session.add_all(
+            [
+                WorkOrder(WorkOrderNo="7001", CustID="SR100", WOName="Harbor cover"),
+                WorkOrder(
+                    WorkOrderNo="7002",
+                    CustID="SR200",
+                    WOName="Bimini top",
+                    SpecialInstructions="check the harbor zipper",
+                ),
+            ]
+        )
+        db.session.add(
+            WorkOrderItem(
+                WorkOrderNo="7002", CustID="SR200", Description="Bimini", Color="Navy"
+            )
+        )
+        db.session.add(
+            Inventory(InventoryKey="INV-SR1", CustID="SR300", Description="Tent fly")
+        )
+        db.session.commit()
+    return app
+
+
+class TestSearchFilter:
+    def test_matches_any_column_case_insensitively(self, searchable):
+        with searchable.app_context():
+            names = {
+                c.CustID
+                for c in apply_search(Customer.query, Customer, "MARINE").all()
+            }
+            assert names == {"SR100", "SR200"}
+            assert apply_search(Customer.query, Customer, "bayview").one().CustID == "SR100"
+
+    def test_blank_term_leaves_query_unchanged(self, searchable):
+        with searchable.app_context():
+            assert search_filter(Customer, "  ") is None
+            assert apply_search(Customer.query, Customer, None).count() == 3
+
+    def test_wildcards_are_literal(self, searchable):
+        with searchable.app_context():
+            assert apply_search(Customer.query, Customer, "100%").one().CustID == "SR300"
+            assert apply_search(Customer.query, Customer, "S_1").count() == 0
+
+    def test_ranked_puts_exact_key_first(self, searchable):
+        with searchable.app_context():
+            ranked = apply_search(WorkOrder.query, WorkOrder, "harbor", ranked=True).all()
+            assert [wo.WorkOrderNo for wo in ranked] == ["7001", "7002"]
+
+            ranked = apply_search(WorkOrder.query, WorkOrder, "7002", ranked=True).all()
+            assert ranked[0].WorkOrderNo == "7002"
+
+    def test_index_expression_matches_query_expression(self, app):
+        """The planner only uses the trigram index for the identical expression."""
+        index = next(
+            ix for ix in WorkOrder.__table__.indexes if ix.name == "idx_workorder_search_trgm"
+        )
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        document = str(
+            search_document(WorkOrder).compile(dialect=postgresql.dialect())
+        ).replace("tblcustworkorderdetail.", "")
+
+        assert f"USING gin (({document}) gin_trgm_ops)" in ddl
+
+
+class TestSearchCallSites:
+    @pytest.fixture
+    def user_client(self, client, app):
+        with app.app_context():
+            db.session.add(
+                User(
+                    username="searcher",
+                    email="searcher@example.com",
+                    role="admin",
+                    password_hash=generate_password_hash("password"),
+                )
+            )
+            db.session.commit()
+        client.post("/login", data={"username": "searcher", "password": "password"})
+        return client
+
+    def test_global_search_api(self, user_client, searchable):
+        body = user_client.get("/api/search?q=bimini").get_json()
+        assert [wo["WorkOrderNo"] for wo in body["work_orders"]] == ["7002"]
+        assert [item["Description"] for item in body["items"]] == ["Bimini"]
+        assert body["customers"] == []
+
+        body = user_client.get("/api/search?q=tent").get_json()
+        assert [c["CustID"] for c in body["customers"]] == ["SR300"]
+        assert [i["InventoryKey"] for i in body["inventory"]] == ["INV-SR1"]
+
+    def test_list_apis_search(self, user_client, searchable):
+        body = user_client.get("/customers/api/customers?search=marine").get_json()
+        assert {c["CustID"] for c in body["data"]} == {"SR100", "SR200"}
+
+        body = user_client.get("/work_orders/api/work_orders?search=zipper").get_json()
+        assert [wo["WorkOrderNo"] for wo in body["data"]] == ["7002"]
+
+    def test_chatbot_tools(self, searchable):
+        with searchable.app_context():
+            result = tool_search_customers("marine")
+            assert {c["customer_id"] for c in result["customers"]} == {"SR100", "SR200"}
+            result = tool_search_work_orders("harbor")
+            assert result["work_orders"][0]["work_order_no"] == "7001"
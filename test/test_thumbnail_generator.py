@@ -0,0 +1,71 @@
+"""
+Tests for image and PDF thumbnail decoding (utils/thumbnail_generator.py).
+"""
+
+from io import BytesIO
+
+import fitz
+from PIL import Image, JpegImagePlugin
+
+from utils.thumbnail_generator import (
+    THUMBNAIL_SIZE,
+    generate_image_thumbnail,
+    generate_pdf_thumbnail,
+    pixmap_to_image,
+)
+
+
+def image_bytes(mode, size, color, format):
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def pdf_bytes(pages=3):
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.draw_rect(fitz.Rect(100, 100, 500, 700), fill=(0, 0, 1))
+    return doc.tobytes()
+
+
+class TestImageThumbnails:
+    def test_large_jpeg_is_drafted(self, mocker):
+        draft = mocker.spy(JpegImagePlugin.JpegImageFile, "draft")
+        thumbnail = generate_image_thumbnail(
+            image_bytes("RGB", (3200, 2400), (10, 120, 200), "JPEG")
+        )
+
+        assert draft.call_args_list[0].args[1:] == ("RGB", THUMBNAIL_SIZE)
+        assert thumbnail.size == THUMBNAIL_SIZE and thumbnail.mode == "RGB"
+        r, g, b = thumbnail.getpixel((100, 100))
+        assert abs(r - 10) < 8 and abs(g - 120) < 8 and abs(b - 200) < 8
+
+    def test_grayscale_and_transparent_images_become_rgb(self):
+        gray = generate_image_thumbnail(image_bytes("L", (800, 600), 90, "JPEG"))
+        clear = generate_image_thumbnail(image_bytes("RGBA", (400, 400), (0, 0, 0, 0), "PNG"))
+
+        assert gray.mode == "RGB" and abs(gray.getpixel((100, 100))[0] - 90) < 4
+        assert clear.getpixel((100, 100)) == (255, 255, 255)
+
+
+class TestPdfThumbnails:
+    def test_renders_first_page_at_thumbnail_size(self, mocker):
+        get_pixmap = mocker.spy(fitz.Page, "get_pixmap")
+        thumbnail = generate_pdf_thumbnail(pdf_bytes())
+
+        pix = get_pixmap.spy_return
+        assert max(pix.width, pix.height) <= THUMBNAIL_SIZE[0] + 1
+        assert thumbnail.size == THUMBNAIL_SIZE
+        assert thumbnail.getpixel((100, 100)) == (0, 0, 255)
+        # Page background and the centering margin are white
+        assert thumbnail.getpixel((100, 10)) == (255, 255, 255)
+        assert thumbnail.getpixel((5, 100)) == (255, 255, 255)
+
+    def test_pixmap_image_shares_buffer(self):
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 4, 2), 1)
+        pix.clear_with(0)
+        img = pixmap_to_image(pix)
+
+        pix.set_pixel(1, 1, (255, 0, 0, 255))
+        assert img.getpixel((1, 1)) == (255, 0, 0, 255)
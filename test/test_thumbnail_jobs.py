@@ -0,0 +1,185 @@
+"""
+Tests for background upload thumbnails (utils/thumbnail_jobs.py).
+"""
+
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models.customer import Customer
+from models.user import User
+from models.work_order import WorkOrder
+from models.work_order_file import WorkOrderFile
+from utils import thumbnail_jobs
+from utils.file_upload import (
+    cleanup_deferred_files,
+    commit_deferred_uploads,
+    save_work_order_file,
+)
+from utils.thumbnail_jobs import thumbnail_pending
+
+
+def png_upload(name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), (200, 30, 30)).save(buffer, format="PNG")
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename=name, content_type="image/png")
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+@pytest.fixture
+def work_order(app):
+    with app.app_context():
+        db.session.add(Customer(CustID="TH1", Name="Thumbs"))
+        db.session.add(WorkOrder(WorkOrderNo="7001", CustID="TH1", WOName="Thumbs"))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def user_client(client, work_order):
+    with work_order.app_context():
+        db.session.add(
+            User(
+                username="thumbs",
+                email="thumbs@example.com",
+                role="user",
+                password_hash=generate_password_hash("password"),
+            )
+        )
+        db.session.commit()
+    client.post("/login", data={"username": "thumbs", "password": "password"})
+    return client
+
+
+def upload(app):
+    """Stage, commit and upload one file the way the routes do."""
+    with app.test_request_context():
+        wo_file = save_work_order_file("7001", png_upload(), defer_s3_upload=True)
+        db.session.add(wo_file)
+        db.session.commit()
+        assert wo_file.thumbnail_path is None
+        success, _, _ = commit_deferred_uploads([wo_file])
+        assert success
+        return wo_file.id
+
+
+def bucket():
+    from utils.file_upload import AWS_S3_BUCKET
+
+    return AWS_S3_BUCKET
+
+
+def thumbnail_keys(s3):
+    return [call.args[2] for call in s3.upload_fileobj.call_args_list]
+
+
+class TestDeferredUploads:
+    def test_request_does_not_generate_thumbnail(self, work_order, s3, mocker):
+        generate = mocker.patch("utils.thumbnail_jobs.generate_thumbnail")
+        with work_order.test_request_context():
+            wo_file = save_work_order_file("7001", png_upload(), defer_s3_upload=True)
+
+        generate.assert_not_called()
+        assert wo_file.thumbnail_path is None
+        assert wo_file._deferred_thumbnail_key.startswith("work_orders/7001/thumbnails/")
+        cleanup_deferred_files([wo_file])
+
+    def test_thumbnail_recorded_after_commit(self, work_order, s3):
+        file_id = upload(work_order)
+
+        with work_order.app_context():
+            wo_file = db.session.get(WorkOrderFile, file_id)
+            assert wo_file.thumbnail_path.endswith("_thumb.jpg")
+            key = wo_file.thumbnail_path.split("/", 3)[3]
+        assert thumbnail_keys(s3) == [key]
+
+    def test_background_pool(self, work_order, s3):
+        work_order.config["THUMBNAIL_WORKERS"] = 2
+        try:
+            with work_order.test_request_context():
+                wo_file = save_work_order_file("7001", png_upload(), defer_s3_upload=True)
+                db.session.add(wo_file)
+                db.session.commit()
+                file_id = wo_file.id
+                commit_deferred_uploads([wo_file])
+        finally:
+            with work_order.app_context():
+                thumbnail_jobs._reset_pool()
+
+        with work_order.app_context():
+            assert db.session.get(WorkOrderFile, file_id).thumbnail_path
+
+    def test_deleted_file_leaves_no_thumbnail(self, work_order, s3):
+        with work_order.test_request_context():
+            wo_file = save_work_order_file("7001", png_upload(), defer_s3_upload=True)
+            db.session.add(wo_file)
+            db.session.commit()
+            key = wo_file._deferred_thumbnail_key
+            spooled = wo_file._deferred_file_path
+            job = (work_order, WorkOrderFile, wo_file.id, wo_file.filename, spooled, key)
+            db.session.delete(wo_file)
+            db.session.commit()
+
+        assert thumbnail_jobs._run_job(*job) is False
+        s3.delete_object.assert_called_once_with(Bucket=bucket(), Key=key)
+        assert not os.path.exists(spooled)
+
+    def test_generation_failure_is_not_fatal(self, work_order, s3, mocker):
+        mocker.patch(
+            "utils.thumbnail_jobs.generate_thumbnail", side_effect=RuntimeError("bad")
+        )
+        file_id = upload(work_order)
+
+        with work_order.app_context():
+            assert db.session.get(WorkOrderFile, file_id).thumbnail_path is None
+
+
+class TestPlaceholder:
+    def test_pending_window(self):
+        recent = WorkOrderFile(uploaded_at=datetime.utcnow())
+        old = WorkOrderFile(uploaded_at=datetime.utcnow() - timedelta(hours=1))
+        done = WorkOrderFile(uploaded_at=datetime.utcnow(), thumbnail_path="s3://b/k")
+
+        assert thumbnail_pending(recent)
+        assert not thumbnail_pending(old)
+        assert not thumbnail_pending(done)
+
+    def test_status_endpoint_and_detail_page(self, user_client, work_order):
+        with work_order.app_context():
+            wo_file = WorkOrderFile(
+                WorkOrderNo="7001",
+                filename="photo.png",
+                file_path="s3://bucket/work_orders/7001/photo.png",
+                uploaded_at=datetime.utcnow(),
+            )
+            db.session.add(wo_file)
+            db.session.commit()
+            file_id = wo_file.id
+
+        status = user_client.get(f"/work_orders/thumbnail/{file_id}/status").get_json()
+        assert status == {"ready": False, "pending": True}
+
+        page = user_client.get("/work_orders/7001").get_data(as_text=True)
+        assert "thumbnail-pending" in page
+        assert f"/work_orders/thumbnail/{file_id}/status" in page
+
+        # Same app context (and session) the client requests run in
+        db.session.get(WorkOrderFile, file_id).thumbnail_path = "s3://bucket/t.jpg"
+        db.session.commit()
+
+        status = user_client.get(f"/work_orders/thumbnail/{file_id}/status").get_json()
+        assert status == {"ready": True, "pending": False}
@@ -0,0 +1,122 @@
+"""
+Tests for streamed uploads (utils/upload_stream.py and its use in
+save_order_file_generic).
+"""
+
+import hashlib
+import os
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from utils import upload_stream
+from utils.file_upload import save_work_order_file
+from utils.thumbnail_generator import generate_thumbnail
+from utils.upload_stream import HashingReader, ThumbnailTee, copy_stream
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), (30, 30, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def s3(mocker):
+    client = MagicMock()
+    mocker.patch("utils.file_upload.s3_client", client)
+    return client
+
+
+def drain(reader, chunk_size=7):
+    while reader.read(chunk_size):
+        pass
+
+
+class TestHashingReader:
+    def test_digest_and_size(self):
+        data = os.urandom(100_000)
+        reader = HashingReader(BytesIO(data))
+        out = BytesIO()
+
+        copy_stream(reader, out, chunk_size=4096)
+
+        assert out.getvalue() == data
+        assert reader.size == len(data)
+        assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+    def test_is_not_seekable(self):
+        # boto3 must buffer it chunk by chunk rather than seek around it
+        assert not hasattr(HashingReader(BytesIO()), "seek")
+
+
+class TestThumbnailTee:
+    def test_text_keeps_bounded_prefix(self, monkeypatch):
+        monkeypatch.setattr(upload_stream, "THUMBNAIL_PREFIX_BYTES", 10)
+        tee = ThumbnailTee("notes.txt")
+        drain(HashingReader(BytesIO(b"0123456789abcdefghij"), tee))
+
+        assert tee.source() == b"0123456789"
+        assert tee.path is None
+        tee.close()
+
+    def test_binary_is_teed_to_disk(self):
+        data = png_bytes()
+        tee = ThumbnailTee("photo.png")
+        drain(HashingReader(BytesIO(data), tee))
+
+        path = tee.source()
+        with open(path, "rb") as f:
+            assert f.read() == data
+        tee.close()
+        assert not os.path.exists(path)
+
+    def test_generators_accept_paths(self, tmp_path):
+        image = tmp_path / "photo.png"
+        image.write_bytes(png_bytes())
+        text = tmp_path / "notes.txt"
+        text.write_bytes("héllo ".encode() * 1000)
+
+        assert generate_thumbnail(str(image), "photo.png").size == (200, 200)
+        assert generate_thumbnail(str(text), "notes.txt").size == (200, 200)
+
+
+class TestImmediateUpload:
+    def test_streams_to_s3_and_hashes(self, app, s3, mocker):
+        data = png_bytes()
+        # Like boto3, read the stream to the end
+        s3.upload_fileobj.side_effect = lambda fileobj, *args, **kwargs: drain(fileobj)
+        generate = mocker.patch(
+            "utils.file_upload.generate_thumbnail", wraps=generate_thumbnail
+        )
+        with app.test_request_context():
+            wo_file = save_work_order_file(
+                "7201", FileStorage(stream=BytesIO(data), filename="photo.png")
+            )
+
+        reader = s3.upload_fileobj.call_args_list[0].args[0]
+        assert isinstance(reader, HashingReader)
+        assert "Config" in s3.upload_fileobj.call_args_list[0].kwargs
+        assert wo_file._content_sha256 == hashlib.sha256(data).hexdigest()
+        # Thumbnail came from the teed copy, which is gone afterwards
+        source = generate.call_args.args[0]
+        assert isinstance(source, str) and not os.path.exists(source)
+        assert wo_file.thumbnail_path.endswith("_thumb.jpg")
+
+    def test_local_mode_hashes_saved_file(self, app, tmp_path, monkeypatch):
+        monkeypatch.setattr("utils.file_upload.UPLOAD_FOLDER", str(tmp_path))
+        data = b"line\n" * 100
+        with app.test_request_context():
+            wo_file = save_work_order_file(
+                "7201",
+                FileStorage(stream=BytesIO(data), filename="notes.txt"),
+                to_s3=False,
+            )
+
+        with open(wo_file.file_path, "rb") as f:
+            assert f.read() == data
+        assert wo_file._content_sha256 == hashlib.sha256(data).hexdigest()
+        assert os.path.exists(wo_file.thumbnail_path)
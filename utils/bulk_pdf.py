@@ -0,0 +1,178 @@
+"""
+Bulk work order PDFs (/work_orders/api/bulk_pdf).
+
+The requested orders are handled in batches of BULK_PDF_BATCH_SIZE:
+
+1. one ``WorkOrderNo IN (...)`` query per batch (PDF load profile) instead
+   of a query per order;
+2. the batch is rendered across a process pool (ReportLab is CPU-bound and
+   holds the GIL), BULK_PDF_WORKERS processes, results kept in order;
+3. the batch is appended to the merged PDF on disk with an incremental
+   save, so earlier pages are never loaded again.
+
+Peak memory is therefore one batch of orders and rendered PDFs, whatever
+the number of orders. The finished file is streamed to the client in
+chunks and deleted afterwards (bulk_pdf_response()).
+
+Usage:
+    path = new_bulk_pdf_path()
+    build_bulk_work_order_pdf(numbers, path, batch_size=25, workers=2)
+    return bulk_pdf_response(path, "WorkOrders_Bulk.pdf")
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import fitz  # PyMuPDF
+from flask import Response
+
+from models.work_order import WorkOrder
+from utils.load_profiles import PDF, work_order_load_options
+from utils.pdf_helpers import prepare_order_data_for_pdf
+from utils.work_order_pdf import work_order_pdf_bytes
+
+
+WORK_ORDER_COMPANY_INFO = {
+    "name": "Awning Cleaning Industries - In House Cleaning Work Order"
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_render_one = partial(work_order_pdf_bytes, company_info=WORK_ORDER_COMPANY_INFO)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool(workers):
+    """The shared render pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process holding DB connections and threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"[BULK PDF] Started render pool with {workers} workers")
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def prefetch_work_order_data(work_order_numbers):
+    """
+    PDF data for work orders, loaded with a single IN query.
+
+    Returns:
+        list: prepare_order_data_for_pdf() dicts in the requested order;
+            unknown numbers are skipped
+    """
+    orders = (
+        WorkOrder.query.options(*work_order_load_options(PDF))
+        .filter(WorkOrder.WorkOrderNo.in_(set(work_order_numbers)))
+        .all()
+    )
+    by_number = {
+        wo.WorkOrderNo: prepare_order_data_for_pdf(wo, order_type="work_order")
+        for wo in orders
+    }
+    return [by_number[no] for no in work_order_numbers if no in by_number]
+
+
+def render_work_order_pdfs(work_orders, workers=0):
+    """
+    Render prepared work orders to PDF bytes, in order.
+
+    Args:
+        work_orders: prepare_order_data_for_pdf() dicts
+        workers: process pool size; 0 renders in the calling thread
+    """
+    if workers <= 0 or len(work_orders) < 2:
+        return [_render_one(wo) for wo in work_orders]
+    try:
+        return list(_render_pool(workers).map(_render_one, work_orders))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM killed); start a fresh pool next time
+        _reset_pool()
+        raise
+
+
+def _append_batch(path, pdfs, first):
+    """Append rendered PDFs to the merged file at path."""
+    batch = fitz.open()
+    for pdf in pdfs:
+        with fitz.open(stream=pdf, filetype="pdf") as src:
+            batch.insert_pdf(src)
+
+    if first:
+        batch.save(path)
+        batch.close()
+        return
+
+    merged = fitz.open(path)
+    try:
+        merged.insert_pdf(batch)
+        merged.saveIncr()
+    finally:
+        merged.close()
+        batch.close()
+
+
+def build_bulk_work_order_pdf(work_order_numbers, path, batch_size=25, workers=0):
+    """
+    Render and merge work orders into one PDF file.
+
+    Args:
+        work_order_numbers: order numbers, in output order
+        path: file to write (see new_bulk_pdf_path())
+        batch_size: orders loaded/rendered/held in memory at a time
+        workers: render processes (0 renders in the calling thread)
+
+    Returns:
+        int: number of work orders rendered (0 means nothing was written)
+    """
+    rendered = 0
+    for start in range(0, len(work_order_numbers), batch_size):
+        batch = prefetch_work_order_data(work_order_numbers[start : start + batch_size])
+        if not batch:
+            continue
+        _append_batch(path, render_work_order_pdfs(batch, workers), first=rendered == 0)
+        rendered += len(batch)
+    return rendered
+
+
+def new_bulk_pdf_path():
+    """A fresh temp file path for a merged PDF."""
+    fd, path = tempfile.mkstemp(prefix="bulk_wo_", suffix=".pdf")
+    os.close(fd)
+    return path
+
+
+def stream_pdf_file(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the file at path in chunks."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def bulk_pdf_response(path, download_name):
+    """Stream the merged PDF as a download; the file is deleted afterwards."""
+    response = Response(stream_pdf_file(path), mimetype="application/pdf")
+    response.headers["Content-Length"] = str(os.path.getsize(path))
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    # Runs even if the client disconnects before the body is sent
+    response.call_on_close(lambda: os.remove(path))
+    return response
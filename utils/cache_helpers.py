@@ -10,50 +10,266 @@ Usage:
     @cached_query(timeout=600)  # Cache for 10 minutes
     def get_all_sources():
         return Source.query.order_by(Source.SSource).all()
+
+cached_query stores None results as a sentinel, collapses concurrent misses
+per key, jitters TTLs and can keep a bounded in-process LRU (maxsize=N).
+
+Hit/miss/set/eviction counters for every helper here are recorded in
+utils.cache_metrics and exposed at /admin/cache-stats.
 """
 
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import wraps
 from extensions import cache
+from utils.cache_metrics import cache_metrics
+
+
+# Stored in place of a None result so "cached empty" is distinguishable from
+# "not cached". A plain string survives pickling by any cache backend.
+CACHED_NONE = "__cached_query_none__"
+
+# Default TTL jitter (+/- 10%) so entries written together don't expire together
+DEFAULT_TTL_JITTER = 0.1
+
+
+def _jittered_timeout(timeout, jitter):
+    """Spread a TTL by +/- jitter fraction (0 keeps "never expires")."""
+    if not timeout or not jitter:
+        return timeout
+    return max(1, int(round(timeout * random.uniform(1 - jitter, 1 + jitter))))
 
 
-def cached_query(timeout=300, key_prefix=None):
+class _KeyLocks:
+    """
+    Per-key locks for single-flight recomputation.
+
+    Only one thread per process rebuilds a given key; the others wait and
+    then read the freshly cached value. Entries are dropped once no thread
+    holds or waits on them so the dict doesn't grow with the key space.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}  # key -> [lock, users]
+
+    @contextmanager
+    def hold(self, key):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = [threading.Lock(), 0]
+                self._locks[key] = entry
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._locks.pop(key, None)
+
+
+_key_locks = _KeyLocks()
+
+
+class _LRUStore:
+    """Bounded in-process LRU with per-entry expiry (used when maxsize is set)."""
+
+    def __init__(self, maxsize, metrics_prefix):
+        self.maxsize = maxsize
+        self.metrics_prefix = metrics_prefix
+        self._data = OrderedDict()  # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        expires_at = time.monotonic() + timeout if timeout else None
+        evicted = 0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            cache_metrics.record_eviction(self.metrics_prefix, evicted)
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def cached_query(
+    timeout=300,
+    key_prefix=None,
+    cache_none=True,
+    jitter=DEFAULT_TTL_JITTER,
+    maxsize=None,
+):
     """
     Decorator to cache database query results.
 
     Args:
         timeout (int): Cache timeout in seconds (default: 300 = 5 minutes)
         key_prefix (str): Optional custom cache key prefix
+        cache_none (bool): Cache None results too (stored as CACHED_NONE), so
+            lookups that find nothing don't hit the database every time
+        jitter (float): Randomly spread each entry's TTL by this fraction
+        maxsize (int): If set, keep entries in a bounded in-process LRU for
+            this function instead of the shared Flask cache
+
+    Concurrent misses for the same key are collapsed: one thread recomputes
+    while the others wait for its result (single-flight, per process).
+
+    The wrapped function gets ``cache_clear()`` and ``cache_delete(*args,
+    **kwargs)`` helpers for invalidation.
     """
 
     def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Build cache key from function name and arguments
-            if key_prefix:
-                cache_key = f"{key_prefix}:{f.__name__}"
-            else:
-                cache_key = f"query:{f.__name__}"
+        metrics_prefix = f"{key_prefix or 'query'}:{f.__name__}"
+        store = _LRUStore(maxsize, metrics_prefix) if maxsize else cache
 
+        def build_key(args, kwargs):
+            cache_key = metrics_prefix
             if args:
                 cache_key += f":{':'.join(str(arg) for arg in args)}"
             if kwargs:
                 cache_key += (
                     f":{':'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))}"
                 )
+            return cache_key
 
-            result = cache.get(cache_key)
-            if result is not None:
+        def lookup(cache_key):
+            """Return (found, value) from the backing store."""
+            result = store.get(cache_key)
+            if result is None:
+                return False, None
+            if isinstance(result, str) and result == CACHED_NONE:
+                return True, None
+            return True, result
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache_key = build_key(args, kwargs)
+
+            found, result = lookup(cache_key)
+            if found:
+                cache_metrics.record_hit(metrics_prefix)
                 return result
 
-            result = f(*args, **kwargs)
-            cache.set(cache_key, result, timeout=timeout)
+            with _key_locks.hold(cache_key):
+                # Another thread may have filled the key while we waited
+                found, result = lookup(cache_key)
+                if found:
+                    cache_metrics.record_hit(metrics_prefix)
+                    return result
+
+                cache_metrics.record_miss(metrics_prefix)
+                with cache_metrics.time_recompute(metrics_prefix):
+                    result = f(*args, **kwargs)
+
+                if result is None and not cache_none:
+                    return result
+
+                store.set(
+                    cache_key,
+                    CACHED_NONE if result is None else result,
+                    timeout=_jittered_timeout(timeout, jitter),
+                )
+                cache_metrics.record_set(metrics_prefix)
+                return result
+
+        def cache_delete(*args, **kwargs):
+            _delete_key(build_key(args, kwargs), metrics_prefix, store=store)
+
+        def cache_clear():
+            if maxsize:
+                count = len(store)
+                store.clear()
+                if count:
+                    cache_metrics.record_eviction(metrics_prefix, count)
+            else:
+                _delete_key(metrics_prefix)
+                invalidate_cache_pattern(f"{metrics_prefix}:*")
+
+        decorated_function.cache_key = build_key
+        decorated_function.cache_delete = cache_delete
+        decorated_function.cache_clear = cache_clear
+        return decorated_function
+
+    return decorator
+
+
+_view_state = threading.local()
+
+
+def cached_view(timeout=300, key_prefix="view"):
+    """
+    Instrumented drop-in for ``@cache.cached`` on view functions.
+
+    Flask-Caching does not report whether a response came from the cache,
+    so the view body is wrapped inside ``cache.cached``: if the body runs it
+    was a miss (and the result is stored), otherwise it was a hit.
+
+    Args:
+        timeout (int): Cache timeout in seconds (default: 300 = 5 minutes)
+        key_prefix (str): Cache key, also used as the metrics prefix
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def recompute(*args, **kwargs):
+            _view_state.recomputed = True
+            cache_metrics.record_miss(key_prefix)
+            with cache_metrics.time_recompute(key_prefix):
+                result = f(*args, **kwargs)
+            cache_metrics.record_set(key_prefix)
             return result
 
+        cached = cache.cached(timeout=timeout, key_prefix=key_prefix)(recompute)
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            _view_state.recomputed = False
+            response = cached(*args, **kwargs)
+            if not _view_state.recomputed:
+                cache_metrics.record_hit(key_prefix)
+            return response
+
         return decorated_function
 
     return decorator
 
 
+def _delete_key(cache_key, metrics_prefix=None, store=None):
+    """Delete a cache key, counting it as an eviction if it existed."""
+    if (store or cache).delete(cache_key):
+        cache_metrics.record_eviction(metrics_prefix or cache_key)
+
+
 def invalidate_cache_pattern(pattern):
     """
     Invalidate all cache keys matching a pattern.
@@ -72,6 +288,8 @@ def invalidate_cache_pattern(pattern):
         for key in backend.scan_iter(pattern):
             backend.delete(key)
             deleted += 1
+        if deleted:
+            cache_metrics.record_eviction(pattern.rstrip("*"), deleted)
         print(f"[CACHE] Deleted {deleted} keys matching pattern '{pattern}'")
 
     # SimpleCache fallback (no pattern support)
@@ -94,7 +312,7 @@ def invalidate_customer_cache():
     except Exception as e:
         print(f"[CACHE WARN] Could not delete memoized customer filters: {e}")
 
-    cache.delete("query:get_all_customers")
+    _delete_key("query:get_all_customers")
     invalidate_cache_pattern("query:get_customer_*")
 
 
@@ -110,7 +328,7 @@ def invalidate_source_cache():
     except Exception as e:
         print(f"[CACHE WARN] Could not delete memoized source filters: {e}")
 
-    cache.delete("query:get_all_sources")
+    _delete_key("query:get_all_sources")
     invalidate_cache_pattern("query:get_source_*")
 
 
@@ -119,11 +337,13 @@ def invalidate_work_order_cache(work_order_no=None):
     Invalidate work order-related cache entries.
     Should be called when work order data is modified.
     """
-    cache.delete("query:get_pending_work_orders")
-    cache.delete("query:get_dashboard_metrics")
+    _delete_key("query:get_pending_work_orders")
+    _delete_key("query:get_dashboard_metrics")
 
     if work_order_no:
-        cache.delete(f"query:get_work_order:{work_order_no}")
+        _delete_key(
+            f"query:get_work_order:{work_order_no}", "query:get_work_order"
+        )
 
 
 def invalidate_repair_order_cache(repair_order_no=None):
@@ -131,11 +351,13 @@ def invalidate_repair_order_cache(repair_order_no=None):
     Invalidate repair order-related cache entries.
     Should be called when repair order data is modified.
     """
-    cache.delete("query:get_pending_repair_orders")
-    cache.delete("query:get_dashboard_metrics")
+    _delete_key("query:get_pending_repair_orders")
+    _delete_key("query:get_dashboard_metrics")
 
     if repair_order_no:
-        cache.delete(f"query:get_repair_order:{repair_order_no}")
+        _delete_key(
+            f"query:get_repair_order:{repair_order_no}", "query:get_repair_order"
+        )
 
 
 def invalidate_analytics_cache():
@@ -143,11 +365,11 @@ def invalidate_analytics_cache():
     Invalidate analytics-related cache entries.
     Should be called when underlying data changes significantly.
     """
-    cache.delete("analytics_dashboard")
-    cache.delete("analytics_api_data")
-    cache.delete("analytics:revenue_chart")
-    cache.delete("analytics:completion_trends")
-    cache.delete("analytics:customer_stats")
+    _delete_key("analytics_dashboard")
+    _delete_key("analytics_api_data")
+    _delete_key("analytics:revenue_chart")
+    _delete_key("analytics:completion_trends")
+    _delete_key("analytics:customer_stats")
     print("[CACHE] Invalidated analytics cache entries")
 
 
@@ -0,0 +1,159 @@
+"""
+Cache instrumentation for the Awning Management System.
+
+Keeps lightweight, thread-safe counters per cache key prefix so we can see
+which caches actually pay for themselves. Every layer we cache at reports
+into the same registry:
+
+- ``cached_query`` results (prefix ``query:<function>`` or custom prefix)
+- ``@cached_view`` analytics responses (prefix is the view's key_prefix)
+- the ML model cache in ``routes/ml.py`` (prefix ``ml:model``)
+
+Counters per prefix:
+    hits, misses, sets, evictions, recompute_seconds (total time spent
+    rebuilding values after a miss)
+
+A one-line summary is printed at most once per ``CACHE_METRICS_LOG_INTERVAL``
+seconds (default 300), piggybacking on normal cache traffic so no background
+thread is needed. The admin JSON endpoint ``/admin/cache-stats`` exposes the
+full snapshot.
+
+Usage:
+    from utils.cache_metrics import cache_metrics
+
+    cache_metrics.record_hit("query:get_all_sources")
+    with cache_metrics.time_recompute("query:get_all_sources"):
+        value = expensive()
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+DEFAULT_LOG_INTERVAL_SECONDS = 300
+
+
+class CacheMetrics:
+    """Thread-safe per-prefix cache counters."""
+
+    FIELDS = ("hits", "misses", "sets", "evictions", "recompute_seconds")
+
+    def __init__(self, log_interval=DEFAULT_LOG_INTERVAL_SECONDS):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._started_at = time.time()
+        self._last_log = time.monotonic()
+        self.log_interval = log_interval
+
+    def _bucket(self, prefix):
+        # Caller must hold self._lock
+        bucket = self._stats.get(prefix)
+        if bucket is None:
+            bucket = {field: 0 for field in self.FIELDS}
+            bucket["recompute_seconds"] = 0.0
+            self._stats[prefix] = bucket
+        return bucket
+
+    def _increment(self, prefix, field, amount=1):
+        with self._lock:
+            self._bucket(prefix)[field] += amount
+        self.maybe_log_summary()
+
+    def record_hit(self, prefix):
+        self._increment(prefix, "hits")
+
+    def record_miss(self, prefix):
+        self._increment(prefix, "misses")
+
+    def record_set(self, prefix):
+        self._increment(prefix, "sets")
+
+    def record_eviction(self, prefix, count=1):
+        self._increment(prefix, "evictions", count)
+
+    def record_recompute(self, prefix, seconds):
+        self._increment(prefix, "recompute_seconds", seconds)
+
+    @contextmanager
+    def time_recompute(self, prefix):
+        """Time the body of the ``with`` block as recompute cost for prefix."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_recompute(prefix, time.perf_counter() - start)
+
+    def snapshot(self):
+        """
+        Return a JSON-serializable copy of all counters.
+
+        Returns:
+            dict: {"since": epoch seconds, "prefixes": {prefix: stats}}
+        """
+        with self._lock:
+            prefixes = {}
+            for prefix, bucket in self._stats.items():
+                stats = dict(bucket)
+                lookups = stats["hits"] + stats["misses"]
+                stats["hit_rate"] = (
+                    round(stats["hits"] / lookups, 4) if lookups else None
+                )
+                stats["avg_recompute_ms"] = (
+                    round(stats["recompute_seconds"] * 1000 / stats["misses"], 2)
+                    if stats["misses"]
+                    else None
+                )
+                stats["recompute_seconds"] = round(stats["recompute_seconds"], 4)
+                prefixes[prefix] = stats
+            return {"since": self._started_at, "prefixes": prefixes}
+
+    def reset(self):
+        """Clear all counters (used by tests and the admin endpoint)."""
+        with self._lock:
+            self._stats = {}
+            self._started_at = time.time()
+            self._last_log = time.monotonic()
+
+    def format_summary(self):
+        """Build a single log line summarizing every prefix."""
+        parts = []
+        for prefix, stats in sorted(self.snapshot()["prefixes"].items()):
+            hit_rate = (
+                f"{stats['hit_rate'] * 100:.0f}%"
+                if stats["hit_rate"] is not None
+                else "n/a"
+            )
+            parts.append(
+                f"{prefix} hit={stats['hits']} miss={stats['misses']} "
+                f"set={stats['sets']} evict={stats['evictions']} "
+                f"rate={hit_rate} recompute={stats['recompute_seconds']:.2f}s"
+            )
+        return "[CACHE STATS] " + (" | ".join(parts) if parts else "no activity")
+
+    def maybe_log_summary(self, now=None):
+        """
+        Print the summary line if the log interval has elapsed.
+
+        Returns:
+            bool: True if a summary line was printed
+        """
+        if not self.log_interval:
+            return False
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._last_log < self.log_interval:
+                return False
+            self._last_log = now
+        print(self.format_summary())
+        return True
+
+
+cache_metrics = CacheMetrics()
+
+
+def init_cache_metrics(app):
+    """Apply CACHE_METRICS_LOG_INTERVAL from app config (0 disables logging)."""
+    cache_metrics.log_interval = app.config.get(
+        "CACHE_METRICS_LOG_INTERVAL", DEFAULT_LOG_INTERVAL_SECONDS
+    )
@@ -0,0 +1,154 @@
+"""
+Totals for the Tabulator list APIs without a COUNT(*) on every page.
+
+Tabulator needs a total (for last_page) with each page, but an exact count
+re-scans every matching row on every request. count_for_list() picks the
+cheapest answer that is good enough:
+
+1. Unfiltered query: the table's row count.
+   - PostgreSQL: ``table_versions.row_count``, kept current by INSERT/DELETE
+     triggers (migration add_table_row_counts).
+   - Other databases (SQLite in tests/dev): an exact count cached in-process
+     until the table's change counter (utils/http_cache.py) moves.
+2. Filtered query on PostgreSQL: the planner's row estimate, when it is at
+   least COUNT_ESTIMATE_THRESHOLD rows. Smaller results are counted exactly,
+   which is cheap and avoids visibly wrong totals on short lists.
+3. Exact COUNT when the client asks for it (``count=exact``) or nothing
+   cheaper applies.
+
+Usage:
+    count = count_for_list(query, WorkOrder, exact=wants_exact_count(request.args))
+    pagination = query.paginate(page=page, per_page=size, error_out=False, count=False)
+    pagination.total = count.total
+"""
+
+import json
+import threading
+from collections import namedtuple
+
+from flask import current_app
+
+from extensions import db
+from models.table_version import TableVersion
+from utils.http_cache import get_table_versions
+
+
+ListCount = namedtuple("ListCount", ["total", "exact", "source"])
+
+# Guards the per-app local (non-PostgreSQL) count cache
+_local_lock = threading.Lock()
+
+
+def _local_counts():
+    """Cached table counts for this app: {table_name: (versions, count)}."""
+    return current_app.extensions.setdefault("list_counts", {})
+
+
+def wants_exact_count(request_args):
+    """True if the client asked for an exact total (count=exact)."""
+    return request_args.get("count", "").lower() == "exact"
+
+
+def exact_count(query):
+    """COUNT of the query's rows (ORDER BY dropped)."""
+    return query.order_by(None).count()
+
+
+def _probe(read, description):
+    """
+    Run an optional read (row-count table, EXPLAIN) in a SAVEPOINT.
+
+    A failure rolls back only the savepoint, not the request's pending
+    changes, and returns None so the caller falls back to counting.
+    """
+    try:
+        with db.session.begin_nested():
+            return read()
+    except Exception as e:
+        print(f"[COUNT] {description} unavailable: {e}")
+        return None
+
+
+def table_row_count(model):
+    """
+    Row count of model's table without scanning it where possible.
+
+    Returns:
+        int: the number of rows in the table
+    """
+    table_name = model.__tablename__
+    if db.engine.dialect.name == "postgresql":
+        # None if table_versions is missing or has no row_count (migration not run)
+        row_count = _probe(
+            lambda: db.session.query(TableVersion.row_count)
+            .filter(TableVersion.table_name == table_name)
+            .scalar(),
+            f"Row count for {table_name}",
+        )
+        if row_count is not None:
+            return row_count
+        return db.session.query(model).count()
+
+    versions = get_table_versions(table_name)
+    with _local_lock:
+        cached = _local_counts().get(table_name)
+    if cached and cached[0] == versions:
+        return cached[1]
+
+    row_count = db.session.query(model).count()
+    with _local_lock:
+        _local_counts()[table_name] = (versions, row_count)
+    return row_count
+
+
+def planner_estimate(query):
+    """
+    PostgreSQL's estimated row count for the query (EXPLAIN, not executed).
+
+    Returns:
+        int or None: None if not on PostgreSQL or the plan could not be read
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+
+    compiled = query.order_by(None).statement.compile(dialect=connection.dialect)
+
+    def estimate():
+        result = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        plan = result if isinstance(result, list) else json.loads(result)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return _probe(estimate, "Planner estimate")
+
+
+def count_for_list(query, model, exact=False):
+    """
+    Total for a list API page (see module docstring for the tiers).
+
+    The query is treated as unfiltered when it has no WHERE clause; joins
+    that drop rows must therefore be expressed as filters.
+
+    Args:
+        query: the list query (filters applied, ordering irrelevant)
+        model: model whose table the query lists
+        exact: always run an exact COUNT
+
+    Returns:
+        ListCount: total, exact (False for estimates), source
+            ("exact", "table" or "estimate")
+    """
+    if exact:
+        return ListCount(exact_count(query), True, "exact")
+
+    if query.whereclause is None:
+        return ListCount(table_row_count(model), True, "table")
+
+    estimate = planner_estimate(query)
+    threshold = current_app.config.get("COUNT_ESTIMATE_THRESHOLD", 10000)
+    if estimate is not None and estimate >= threshold:
+        return ListCount(estimate, False, "estimate")
+
+    return ListCount(exact_count(query), True, "exact")
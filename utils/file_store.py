@@ -0,0 +1,132 @@
+"""
+Content-addressed storage for uploaded order and check-in files.
+
+Customers re-send the same photos and PDFs across work orders, repair
+orders and check-ins. Deferred uploads (save_order_file_generic(...,
+defer_s3_upload=True)) are hashed while they are spooled, so the digest is
+known before anything reaches S3, and each distinct content is stored once:
+
+- acquire_stored_file() takes a reference in ``stored_files`` inside the
+  caller's transaction (INSERT ... ON CONFLICT DO UPDATE ref_count + 1).
+  The first upload of a digest owns the S3 key. Later ones point at its
+  object, reuse its thumbnail and skip the upload.
+- release_stored_file() (called by utils.file_upload.release_file_keys())
+  drops a reference. Only the last one returns the object and thumbnail
+  keys for deletion.
+- forget_stored_file() removes a digest whose first upload failed, so new
+  uploads don't point at a missing object.
+
+Files stored before this (content_sha256 NULL) and immediate/local uploads
+are not in ``stored_files`` and are deleted directly, as before. Like
+utils/order_numbers.py, the statements run on PostgreSQL and SQLite.
+
+Usage:
+    s3_key, thumbnail_key, reused = acquire_stored_file(sha256, s3_key, size)
+    ...
+    keys = release_stored_file(s3_key)  # None: not a stored object
+"""
+
+from flask import current_app
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.stored_file import StoredFile
+
+
+def acquire_stored_file(sha256, s3_key, size=None):
+    """
+    Reference the stored object for a digest, creating it at s3_key if new.
+
+    Does not commit; a rolled back upload gives its reference back.
+
+    Returns:
+        (s3_key, thumbnail_key, reused): the object's key and thumbnail key
+        (None if it has none yet); reused is False when the caller owns the
+        new object and must upload it to s3_key
+    """
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    stmt = (
+        dialect.insert(StoredFile)
+        .values(sha256=sha256, s3_key=s3_key, size=size, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={"ref_count": StoredFile.ref_count + 1},
+        )
+        .returning(StoredFile.s3_key, StoredFile.thumbnail_key)
+    )
+    row = db.session.execute(stmt).one()
+    return row.s3_key, row.thumbnail_key, row.s3_key != s3_key
+
+
+def release_stored_file(s3_key):
+    """
+    Drop one reference to the stored object at s3_key (does not commit).
+
+    Returns:
+        None if s3_key is not a stored object (delete it directly); []
+        while other files still reference it; after the last reference, the
+        object and thumbnail keys to delete
+    """
+    stmt = (
+        update(StoredFile)
+        .where(StoredFile.s3_key == s3_key)
+        .values(ref_count=StoredFile.ref_count - 1)
+        .returning(StoredFile.sha256, StoredFile.ref_count, StoredFile.thumbnail_key)
+    )
+    row = db.session.execute(
+        stmt, execution_options={"synchronize_session": False}
+    ).one_or_none()
+    if row is None:
+        return None
+    if row.ref_count > 0:
+        return []
+
+    db.session.execute(
+        delete(StoredFile).where(StoredFile.sha256 == row.sha256),
+        execution_options={"synchronize_session": False},
+    )
+    return [key for key in (s3_key, row.thumbnail_key) if key]
+
+
+def is_shared_thumbnail(thumbnail_key):
+    """True if thumbnail_key belongs to a stored object (freed with it)."""
+    return (
+        db.session.query(StoredFile.sha256)
+        .filter(StoredFile.thumbnail_key == thumbnail_key)
+        .first()
+        is not None
+    )
+
+
+def record_thumbnail(sha256, thumbnail_key):
+    """Make thumbnail_key the stored object's thumbnail unless it has one."""
+    db.session.execute(
+        update(StoredFile)
+        .where(StoredFile.sha256 == sha256, StoredFile.thumbnail_key.is_(None))
+        .values(thumbnail_key=thumbnail_key),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def forget_stored_file(sha256, s3_key):
+    """
+    Remove the digest owned by s3_key after its upload failed.
+
+    Runs in its own session and commits: it is called after the caller's
+    transaction (commit_deferred_uploads()).
+    """
+    app = current_app._get_current_object()
+    with app.app_context():
+        try:
+            db.session.execute(
+                delete(StoredFile).where(
+                    StoredFile.sha256 == sha256, StoredFile.s3_key == s3_key
+                )
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[FILE STORE] Could not forget {s3_key}: {e}")
+        finally:
+            db.session.remove()
@@ -1,6 +1,10 @@
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
+from flask import current_app
 from models.work_order_file import WorkOrderFile
 from extensions import db
 import boto3
@@ -13,11 +17,32 @@ from .thumbnail_generator import (
     save_thumbnail_to_s3,
     save_thumbnail_locally,
 )
+from .file_store import (
+    acquire_stored_file,
+    forget_stored_file,
+    is_shared_thumbnail,
+    release_stored_file,
+)
+from .presigned_urls import presigned_url_cache
+from .thumbnail_jobs import enqueue_thumbnail
+from .upload_stream import HashingReader, ThumbnailTee, copy_stream
 
 
 UPLOAD_FOLDER = "uploads/work_orders"  # local fallback
 ALLOWED_EXTENSIONS = {"pdf", "jpg", "jpeg", "png", "docx", "xlsx", "txt", "csv"}
 
+# save_order_file_generic() order_type -> S3 folder / file model order column
+FOLDER_PREFIXES = {
+    "work_order": "work_orders",
+    "repair_order": "repair_orders",
+    "checkin": "checkins",
+}
+ORDER_NO_FIELDS = {
+    "work_order": "WorkOrderNo",
+    "repair_order": "RepairOrderNo",
+    "checkin": "CheckInID",
+}
+
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -55,7 +80,9 @@ def is_running_on_aws():
 s3_config = Config(
     connect_timeout=10,      # 10s to establish connection
     read_timeout=30,         # 30s per read operation
-    retries={'max_attempts': 2, 'mode': 'adaptive'}
+    retries={'max_attempts': 2, 'mode': 'adaptive'},
+    # Shared by concurrent uploads: S3_UPLOAD_WORKERS x S3_MULTIPART_CONCURRENCY
+    max_pool_connections=32,
 )
 
 # Detect environment
@@ -146,20 +173,31 @@ def save_order_file_generic(
     Args:
         order_no: The order number
         file: The file object to save
-        order_type: "work_order" or "repair_order"
+        order_type: "work_order", "repair_order" or "checkin"
         to_s3: Whether to save to S3 (True) or locally (False)
         generate_thumbnails: Whether to generate thumbnails
-        file_model_class: The model class to use (WorkOrderFile or RepairOrderFile)
+        file_model_class: The model class to use (WorkOrderFile, RepairOrderFile
+                          or CheckInFile)
         defer_s3_upload: If True, stores file content in memory and returns metadata
                          for upload after DB commit. Prevents orphaned S3 files.
 
     Returns:
         File model instance (not committed to DB)
+        The upload is streamed in chunks, never read whole into memory
+        (utils/upload_stream.py); file_obj._content_sha256 holds the SHA-256
+        hex digest of its content.
         If defer_s3_upload=True, the file_obj will have temporary attributes:
-            - _deferred_file_content: The file bytes to upload
+            - _deferred_file_path: Temp file holding the upload (spooled to
+              disk, not kept in memory); removed by commit_deferred_uploads()
+              or cleanup_deferred_files()
             - _deferred_s3_key: The S3 key to upload to
-            - _deferred_thumbnail_content: Optional thumbnail bytes
-            - _deferred_thumbnail_key: Optional thumbnail S3 key
+            - _deferred_thumbnail_key: Optional thumbnail S3 key; the thumbnail
+              is generated in the background after upload (utils/thumbnail_jobs.py)
+              and thumbnail_path stays None until it is ready
+            - _deferred_reused: Set when content_sha256 matched a stored file;
+              file_path points at the existing object and nothing is uploaded
+              (utils/file_store.py). If that object already has a thumbnail
+              it is reused and no deferred attributes are set at all.
     """
     original_filename = secure_filename(file.filename)
 
@@ -193,13 +231,11 @@ def save_order_file_generic(
         print(f"ERROR: {error_msg}")
         return None
 
-    # Always read file content (needed for deferred upload or thumbnails)
+    deferred = to_s3 and defer_s3_upload
     file.seek(0)
-    file_content = file.read()
-    file.seek(0)  # Reset file pointer
 
     # Determine folder prefix based on order type
-    folder_prefix = "work_orders" if order_type == "work_order" else "repair_orders"
+    folder_prefix = FOLDER_PREFIXES.get(order_type, "repair_orders")
 
     if to_s3:
         # Ensure all string parameters are actually strings, not bytes
@@ -210,99 +246,130 @@ def save_order_file_generic(
         s3_key = f"{folder_prefix}/{order_no}/{filename}"
         file_path = f"s3://{AWS_S3_BUCKET}/{s3_key}"
         thumbnail_path = None
+        reused = False
 
         if defer_s3_upload:
-            # DEFERRED MODE: Store content in memory, upload after DB commit
-            print(f"Deferring S3 upload for: {s3_key}")
+            # DEFERRED MODE: Spool to a temp file, upload after DB commit
+            deferred_path, content_sha256 = _spool_to_tempfile(file)
+
+            # One S3 object per content: reuse it if this digest is stored
+            stored_key, stored_thumbnail_key, reused = acquire_stored_file(
+                content_sha256, s3_key, file_size
+            )
 
-            # Generate thumbnail in memory if requested
-            thumbnail_img = None
+            # Thumbnail is generated in the background once the file is uploaded
             thumbnail_key = None
-            if generate_thumbnails and file_content:
-                try:
-                    thumbnail_img = generate_thumbnail(file_content, filename)
-                    thumbnail_key = f"{folder_prefix}/{order_no}/thumbnails/{filename.rsplit('.', 1)[0]}_thumb.jpg"
-                    thumbnail_path = f"s3://{AWS_S3_BUCKET}/{thumbnail_key}"
-                    print(f"Prepared thumbnail for deferred upload: {thumbnail_key}")
-                except Exception as e:
-                    print(f"WARNING: Error generating thumbnail for {filename}: {e}")
+            if reused:
+                print(f"[FILE STORE] Reusing {stored_key} for: {s3_key}")
+                s3_key = stored_key
+                file_path = f"s3://{AWS_S3_BUCKET}/{s3_key}"
+                if stored_thumbnail_key:
+                    thumbnail_path = f"s3://{AWS_S3_BUCKET}/{stored_thumbnail_key}"
+            else:
+                print(f"Deferring S3 upload for: {s3_key}")
+
+            if generate_thumbnails and file_size and not thumbnail_path:
+                thumbnail_key = f"{folder_prefix}/{order_no}/thumbnails/{filename.rsplit('.', 1)[0]}_thumb.jpg"
+            elif reused:
+                # Nothing to upload or generate
+                _remove_spooled(deferred_path)
+                deferred_path = None
         else:
             # IMMEDIATE MODE: Upload to S3 right away (old behavior, can cause orphans)
-            # Upload file to S3 with proper error handling
+            # Upload file to S3 with proper error handling. The file is
+            # streamed in chunks; the thumbnail reads from the tee afterwards.
+            tee = ThumbnailTee(filename) if generate_thumbnails and file_size else None
+            reader = HashingReader(file, tee)
             try:
-                file.seek(0)
-                s3_client.upload_fileobj(file, AWS_S3_BUCKET, s3_key)
-                print(f"Successfully uploaded file to S3: {s3_key}")
-            except s3_client.exceptions.NoSuchBucket:
-                error_msg = f"S3 bucket '{AWS_S3_BUCKET}' does not exist"
-                print(f"ERROR: {error_msg}")
-                raise ValueError(error_msg)
-            except s3_client.exceptions.ClientError as e:
-                error_code = e.response.get("Error", {}).get("Code", "Unknown")
-                error_msg = f"S3 client error ({error_code}) uploading {filename}: {e}"
-                print(f"ERROR: {error_msg}")
-                raise Exception(error_msg)
-            except Exception as e:
-                error_msg = f"Unexpected error uploading {filename} to S3: {e}"
-                print(f"ERROR: {error_msg}")
-                raise Exception(error_msg)
-
-            # Generate and save thumbnail to S3
-            if generate_thumbnails and file_content:
                 try:
-                    thumbnail_img = generate_thumbnail(file_content, filename)
-                    thumbnail_key = save_thumbnail_to_s3(
-                        thumbnail_img, s3_client, AWS_S3_BUCKET, s3_key
+                    s3_client.upload_fileobj(
+                        reader, AWS_S3_BUCKET, s3_key, Config=s3_transfer_config()
                     )
-                    thumbnail_path = f"s3://{AWS_S3_BUCKET}/{thumbnail_key}"
-                    print(f"Generated thumbnail: {thumbnail_path}")
+                    print(f"Successfully uploaded file to S3: {s3_key}")
+                except s3_client.exceptions.NoSuchBucket:
+                    error_msg = f"S3 bucket '{AWS_S3_BUCKET}' does not exist"
+                    print(f"ERROR: {error_msg}")
+                    raise ValueError(error_msg)
+                except s3_client.exceptions.ClientError as e:
+                    error_code = e.response.get("Error", {}).get("Code", "Unknown")
+                    error_msg = f"S3 client error ({error_code}) uploading {filename}: {e}"
+                    print(f"ERROR: {error_msg}")
+                    raise Exception(error_msg)
                 except Exception as e:
-                    # Thumbnail generation is not critical - log but don't fail
-                    print(f"WARNING: Error generating thumbnail for {filename}: {e}")
+                    error_msg = f"Unexpected error uploading {filename} to S3: {e}"
+                    print(f"ERROR: {error_msg}")
+                    raise Exception(error_msg)
+
+                # Generate and save thumbnail to S3
+                if tee is not None:
+                    try:
+                        thumbnail_img = generate_thumbnail(tee.source(), filename)
+                        thumbnail_key = save_thumbnail_to_s3(
+                            thumbnail_img, s3_client, AWS_S3_BUCKET, s3_key
+                        )
+                        thumbnail_path = f"s3://{AWS_S3_BUCKET}/{thumbnail_key}"
+                        print(f"Generated thumbnail: {thumbnail_path}")
+                    except Exception as e:
+                        # Thumbnail generation is not critical - log but don't fail
+                        print(f"WARNING: Error generating thumbnail for {filename}: {e}")
+            finally:
+                if tee is not None:
+                    tee.close()
+            content_sha256 = reader.hexdigest()
 
             # Clear variables to prevent confusion
-            thumbnail_img = None
             thumbnail_key = None
     else:
         # Local file storage
         order_folder = os.path.join(UPLOAD_FOLDER, folder_prefix, str(order_no))
         os.makedirs(order_folder, exist_ok=True)
         file_path = os.path.join(order_folder, filename)
-        file.save(file_path)
+        reader = HashingReader(file)
+        with open(file_path, "wb") as out:
+            copy_stream(reader, out)
+        content_sha256 = reader.hexdigest()
 
-        # Generate and save thumbnail locally
+        # Generate and save thumbnail locally (from the saved file)
         thumbnail_path = None
-        if generate_thumbnails and file_content:
+        if generate_thumbnails and file_size:
             try:
-                thumbnail_img = generate_thumbnail(file_content, filename)
+                thumbnail_img = generate_thumbnail(file_path, filename)
                 thumbnail_path = save_thumbnail_locally(thumbnail_img, file_path)
                 print(f"Generated thumbnail: {thumbnail_path}")
             except Exception as e:
                 print(f"Error generating thumbnail for {filename}: {e}")
 
     # Determine field name based on order type
-    order_no_field = "WorkOrderNo" if order_type == "work_order" else "RepairOrderNo"
+    order_no_field = ORDER_NO_FIELDS.get(order_type, "RepairOrderNo")
 
     # Create file object but don't commit yet
     if file_model_class is None:
         from models.work_order_file import WorkOrderFile
         file_model_class = WorkOrderFile
 
-    file_obj = file_model_class(
-        **{
-            order_no_field: order_no,
-            "filename": filename,
-            "file_path": file_path,
-            "thumbnail_path": thumbnail_path if generate_thumbnails else None,
-        }
-    )
-
-    # If deferred, attach content for later upload
-    if to_s3 and defer_s3_upload:
-        file_obj._deferred_file_content = file_content
+    fields = {
+        order_no_field: order_no,
+        "filename": filename,
+        "file_path": file_path,
+    }
+    if generate_thumbnails:
+        fields["thumbnail_path"] = thumbnail_path
+    if order_type == "checkin":
+        fields["file_size"] = file_size
+        fields["file_type"] = file.mimetype or None
+    if deferred:
+        fields["content_sha256"] = content_sha256
+    file_obj = file_model_class(**fields)
+
+    file_obj._content_sha256 = content_sha256
+
+    # If deferred, attach the spooled upload for after the DB commit
+    if deferred and deferred_path:
+        file_obj._deferred_file_path = deferred_path
         file_obj._deferred_s3_key = s3_key
-        if generate_thumbnails and thumbnail_img and thumbnail_key:
-            file_obj._deferred_thumbnail_content = thumbnail_img
+        if reused:
+            file_obj._deferred_reused = True
+        if generate_thumbnails and thumbnail_key:
             file_obj._deferred_thumbnail_key = thumbnail_key
 
     return file_obj
@@ -398,10 +465,20 @@ def get_file_size(file_path):
         return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
 
 
+def _sign_get_url(s3_key, expires_in):
+    return s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": AWS_S3_BUCKET, "Key": s3_key},
+        ExpiresIn=expires_in,
+    )
+
+
 def generate_presigned_url(file_path: str, expires_in: int = 3600) -> str:
     """
     Given a full s3://bucket/key path, generate a pre-signed URL.
     Note: This only makes the URL expire, NOT the file itself.
+
+    URLs are reused until shortly before they expire (utils/presigned_urls.py).
     """
     if not file_path.startswith("s3://"):
         raise ValueError("File path must be an S3 path")
@@ -409,11 +486,42 @@ def generate_presigned_url(file_path: str, expires_in: int = 3600) -> str:
     # Remove "s3://bucket-name/"
     s3_key = file_path.replace(f"s3://{AWS_S3_BUCKET}/", "")
 
-    return s3_client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": AWS_S3_BUCKET, "Key": s3_key},
-        ExpiresIn=expires_in,
+    return presigned_url_cache.get_or_sign(s3_key, expires_in, _sign_get_url)
+
+
+def generate_presigned_urls(file_paths, expires_in: int = 3600) -> dict:
+    """
+    Pre-signed URLs for many s3:// paths at once (listing pages).
+
+    Non-S3 paths (and None) are skipped.
+
+    Returns:
+        dict: file_path -> URL
+    """
+    prefix = f"s3://{AWS_S3_BUCKET}/"
+    keys = {
+        path: path.replace(prefix, "")
+        for path in file_paths
+        if path and path.startswith("s3://")
+    }
+    urls = presigned_url_cache.get_or_sign_many(
+        keys.values(), expires_in, _sign_get_url
     )
+    return {path: urls[key] for path, key in keys.items()}
+
+
+def presigned_thumbnail_urls(files, expires_in: int = 3600) -> dict:
+    """
+    Thumbnail URLs for a page of file rows, signed in one batch.
+
+    Lets detail pages link thumbnails straight to S3 instead of through
+    one thumbnail redirect request per file.
+
+    Returns:
+        dict: file id -> URL, for files with an S3 thumbnail
+    """
+    urls = generate_presigned_urls((f.thumbnail_path for f in files), expires_in)
+    return {f.id: urls[f.thumbnail_path] for f in files if f.thumbnail_path in urls}
 
 
 def generate_thumbnail_presigned_url(
@@ -427,18 +535,21 @@ def generate_thumbnail_presigned_url(
     return None
 
 
-def get_file_with_thumbnail_urls(wo_file, expires_in: int = 3600):
+def get_file_with_thumbnail_urls(wo_file, expires_in: int = 3600, signed_urls=None):
     """
     Get file URLs including thumbnail for a WorkOrderFile object
+
+    signed_urls: Optional file_path -> URL map from generate_presigned_urls()
     """
-    file_url = None
+    if signed_urls is None:
+        signed_urls = generate_presigned_urls(
+            (wo_file.file_path, wo_file.thumbnail_path), expires_in
+        )
+    file_url = signed_urls.get(wo_file.file_path)
     thumbnail_url = None
 
-    if wo_file.file_path.startswith("s3://"):
-        file_url = generate_presigned_url(wo_file.file_path, expires_in)
-
     if wo_file.thumbnail_path and wo_file.thumbnail_path.startswith("s3://"):
-        thumbnail_url = generate_presigned_url(wo_file.thumbnail_path, expires_in)
+        thumbnail_url = signed_urls.get(wo_file.thumbnail_path)
     elif wo_file.thumbnail_path and not wo_file.thumbnail_path.startswith("s3://"):
         # Local thumbnail path - you might want to serve this through your web server
         thumbnail_url = wo_file.thumbnail_path
@@ -451,6 +562,15 @@ def get_file_with_thumbnail_urls(wo_file, expires_in: int = 3600):
     }
 
 
+def get_files_with_thumbnail_urls(files, expires_in: int = 3600):
+    """
+    get_file_with_thumbnail_urls() for a list of files, signed in one batch.
+    """
+    paths = [path for f in files for path in (f.file_path, f.thumbnail_path)]
+    signed_urls = generate_presigned_urls(paths, expires_in)
+    return [get_file_with_thumbnail_urls(f, expires_in, signed_urls) for f in files]
+
+
 # Add this to your existing S3 setup (after your file upload functions)
 def save_ml_model(model, metadata, model_name="latest_model"):
     """
@@ -566,32 +686,81 @@ def delete_ml_model(model_name):
         return False
 
 
-def delete_file_from_s3(file_path):
+def _release_s3_path(file_path):
     """
-    Delete a file from S3 given its full s3:// path
-    Also handles thumbnail deletion if a thumbnail path is provided
+    Release one s3:// path of a file row being deleted.
 
-    Args:
-        file_path: Full S3 path (e.g., s3://bucket-name/path/to/file.jpg)
+    Returns:
+        list: S3 keys that can now be deleted (empty while the object or
+        thumbnail is still shared through utils/file_store.py)
+    """
+    s3_key = file_path.replace(f"s3://{AWS_S3_BUCKET}/", "")
+    keys = release_stored_file(s3_key)
+    if keys is None:
+        if is_shared_thumbnail(s3_key):
+            print(f"[FILE STORE] Keeping shared thumbnail: {s3_key}")
+            return []
+        return [s3_key]
+    if not keys:
+        print(f"[FILE STORE] Keeping {s3_key}: still referenced")
+    return keys
+
+
+def release_file_keys(file_obj):
+    """
+    Release a file row's S3 objects (file and thumbnail) in the current DB
+    transaction, without deleting anything yet.
+
+    Call it once per file row being deleted, then queue the keys with
+    utils.s3_deletes.queue_s3_deletes() so they are removed after the commit.
 
     Returns:
-        bool: True on success, False on failure
+        list: S3 keys to delete
     """
-    if not file_path or not file_path.startswith("s3://"):
-        print(f"Not an S3 path, skipping deletion: {file_path}")
-        return False
+    keys = []
+    for path in (file_obj.file_path, getattr(file_obj, "thumbnail_path", None)):
+        if path and path.startswith("s3://"):
+            keys.extend(_release_s3_path(path))
+    return list(dict.fromkeys(keys))
+
+
+def _spool_to_tempfile(file):
+    """Copy an upload to a temp file; return its path and SHA-256."""
+    fd, path = tempfile.mkstemp(prefix="upload_")
+    reader = HashingReader(file)
+    with os.fdopen(fd, "wb") as out:
+        copy_stream(reader, out)
+    file.seek(0)
+    return path, reader.hexdigest()
 
+
+def _remove_spooled(path):
     try:
-        s3_key = file_path.replace(f"s3://{AWS_S3_BUCKET}/", "")
-        s3_client.delete_object(Bucket=AWS_S3_BUCKET, Key=s3_key)
-        print(f"Successfully deleted S3 file: {s3_key}")
-        return True
-    except s3_client.exceptions.NoSuchKey:
-        print(f"S3 file not found (may already be deleted): {s3_key}")
-        return True  # Consider this a success since the file is gone
-    except Exception as e:
-        print(f"Error deleting S3 file {file_path}: {e}")
-        return False
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def s3_transfer_config():
+    """TransferConfig for uploads (multipart above S3_MULTIPART_THRESHOLD_MB)."""
+    mb = 1024 * 1024
+    return TransferConfig(
+        multipart_threshold=current_app.config["S3_MULTIPART_THRESHOLD_MB"] * mb,
+        multipart_chunksize=current_app.config["S3_MULTIPART_CHUNK_MB"] * mb,
+        max_concurrency=current_app.config["S3_MULTIPART_CONCURRENCY"],
+        use_threads=True,
+    )
+
+
+def _upload_deferred(file_obj, transfer_config):
+    if getattr(file_obj, '_deferred_reused', False):
+        return  # Content already stored; only the thumbnail is missing
+    s3_client.upload_file(
+        file_obj._deferred_file_path,
+        AWS_S3_BUCKET,
+        file_obj._deferred_s3_key,
+        Config=transfer_config,
+    )
 
 
 def commit_deferred_uploads(file_objects):
@@ -599,6 +768,11 @@ def commit_deferred_uploads(file_objects):
     Upload files to S3 that were deferred until after DB commit.
     This prevents orphaned S3 files when DB commits fail.
 
+    Files are uploaded S3_UPLOAD_WORKERS at a time over the shared client,
+    larger ones as multipart uploads (s3_transfer_config()). Each uploaded
+    file's thumbnail is then queued (utils/thumbnail_jobs.py), and the spooled
+    temp files are removed whether or not the upload succeeded.
+
     Args:
         file_objects: List of file model objects with deferred upload data
 
@@ -608,48 +782,51 @@ def commit_deferred_uploads(file_objects):
     uploaded_files = []
     failed_files = []
 
-    for file_obj in file_objects:
-        # Check if this file has deferred content
-        if not hasattr(file_obj, '_deferred_file_content'):
-            continue
-
+    # Only files with deferred content
+    pending = [f for f in file_objects if hasattr(f, '_deferred_file_path')]
+    if not pending:
+        return True, uploaded_files, failed_files
+
+    transfer_config = s3_transfer_config()
+    workers = min(current_app.config["S3_UPLOAD_WORKERS"], len(pending))
+    with ThreadPoolExecutor(
+        max_workers=max(workers, 1), thread_name_prefix="s3-upload"
+    ) as pool:
+        futures = [
+            (file_obj, pool.submit(_upload_deferred, file_obj, transfer_config))
+            for file_obj in pending
+        ]
+
+    for file_obj, future in futures:
+        spooled_path = file_obj._deferred_file_path
         try:
-            # Upload main file
-            file_buffer = BytesIO(file_obj._deferred_file_content)
-            s3_client.upload_fileobj(file_buffer, AWS_S3_BUCKET, file_obj._deferred_s3_key)
+            future.result()
             print(f"Successfully uploaded deferred file to S3: {file_obj._deferred_s3_key}")
-
-            # Upload thumbnail if exists
-            if hasattr(file_obj, '_deferred_thumbnail_content'):
-                # Convert PIL Image to bytes if needed
-                thumbnail_buffer = BytesIO()
-                if hasattr(file_obj._deferred_thumbnail_content, 'save'):
-                    # It's a PIL Image
-                    file_obj._deferred_thumbnail_content.save(thumbnail_buffer, format='JPEG')
-                    thumbnail_buffer.seek(0)
-                else:
-                    # It's already bytes
-                    thumbnail_buffer = BytesIO(file_obj._deferred_thumbnail_content)
-
-                s3_client.upload_fileobj(
-                    thumbnail_buffer,
-                    AWS_S3_BUCKET,
-                    file_obj._deferred_thumbnail_key
-                )
-                print(f"Successfully uploaded deferred thumbnail to S3: {file_obj._deferred_thumbnail_key}")
-
             uploaded_files.append(file_obj)
 
-            # Clean up temporary attributes
-            delattr(file_obj, '_deferred_file_content')
-            delattr(file_obj, '_deferred_s3_key')
-            if hasattr(file_obj, '_deferred_thumbnail_content'):
-                delattr(file_obj, '_deferred_thumbnail_content')
-                delattr(file_obj, '_deferred_thumbnail_key')
-
+            # Thumbnail is made in the background; the page shows a placeholder.
+            # The job takes over the spooled file and removes it when done.
+            if hasattr(file_obj, '_deferred_thumbnail_key'):
+                enqueue_thumbnail(
+                    file_obj, spooled_path, file_obj._deferred_thumbnail_key
+                )
+                spooled_path = None
         except Exception as e:
             print(f"ERROR: Failed to upload deferred file {file_obj.filename}: {e}")
             failed_files.append((file_obj, str(e)))
+            # Don't let later uploads of this content point at a missing object
+            if file_obj.content_sha256 and not getattr(file_obj, '_deferred_reused', False):
+                forget_stored_file(file_obj.content_sha256, file_obj._deferred_s3_key)
+        finally:
+            if spooled_path:
+                _remove_spooled(spooled_path)
+            # Clean up temporary attributes
+            delattr(file_obj, '_deferred_file_path')
+            delattr(file_obj, '_deferred_s3_key')
+            if hasattr(file_obj, '_deferred_thumbnail_key'):
+                delattr(file_obj, '_deferred_thumbnail_key')
+            if hasattr(file_obj, '_deferred_reused'):
+                delattr(file_obj, '_deferred_reused')
 
     success = len(failed_files) == 0
     return success, uploaded_files, failed_files
@@ -657,19 +834,20 @@ def commit_deferred_uploads(file_objects):
 
 def cleanup_deferred_files(file_objects):
     """
-    Clean up memory for files that were staged for deferred upload
-    but the transaction was rolled back. This prevents memory leaks.
+    Clean up files that were staged for deferred upload but the
+    transaction was rolled back (removes the spooled temp files).
 
     Args:
         file_objects: List of file model objects with deferred upload data
     """
     for file_obj in file_objects:
-        if hasattr(file_obj, '_deferred_file_content'):
-            delattr(file_obj, '_deferred_file_content')
+        if hasattr(file_obj, '_deferred_file_path'):
+            _remove_spooled(file_obj._deferred_file_path)
+            delattr(file_obj, '_deferred_file_path')
         if hasattr(file_obj, '_deferred_s3_key'):
             delattr(file_obj, '_deferred_s3_key')
-        if hasattr(file_obj, '_deferred_thumbnail_content'):
-            delattr(file_obj, '_deferred_thumbnail_content')
         if hasattr(file_obj, '_deferred_thumbnail_key'):
             delattr(file_obj, '_deferred_thumbnail_key')
+        if hasattr(file_obj, '_deferred_reused'):
+            delattr(file_obj, '_deferred_reused')
     print(f"Cleaned up deferred upload data for {len(file_objects)} files")
@@ -0,0 +1,173 @@
+"""
+Conditional GET (ETag / 304) support for the Tabulator list APIs.
+
+Tabulator re-requests the same page every time a user returns to a list,
+re-sorts or paginates back. When nothing changed we can answer with a
+bodyless 304 instead of re-running the count + page query and serializing
+the rows again.
+
+The ETag is a hash of the request path and arguments, the caller's role
+(some rows carry role-dependent URLs) and a per-table change counter:
+
+- PostgreSQL: ``table_versions`` rows bumped by statement-level triggers
+  (covers ORM writes, bulk UPDATEs and the source_name sync trigger).
+- Other databases (SQLite in tests/dev): in-process counters bumped from
+  SQLAlchemy session events.
+
+Usage:
+    @work_orders_bp.route("/api/work_orders")
+    @login_required
+    @conditional_list_response(WorkOrder)
+    def api_work_orders():
+        ...
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import request, make_response
+from flask_login import current_user
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.table_version import TableVersion
+
+
+# Local (non-PostgreSQL) change counters: {table_name: version}
+_local_versions = {}
+_local_lock = threading.Lock()
+
+# Distinguishes in-process counters across restarts
+_BOOT_ID = f"{os.getpid()}-{time.time_ns()}"
+
+# Cached "does table_versions exist" check per engine URL
+_version_table_available = {}
+
+
+def _bump_local(table_names):
+    if not table_names:
+        return
+    with _local_lock:
+        for name in table_names:
+            _local_versions[name] = _local_versions.get(name, 0) + 1
+
+
+def _uses_triggers(session):
+    try:
+        return session.get_bind().dialect.name == "postgresql"
+    except Exception:
+        return False
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    """Bump local counters for every table touched by this flush."""
+    if _uses_triggers(session):
+        return
+
+    tables = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name:
+            tables.add(table_name)
+    _bump_local(tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    """Bump local counters for ORM-enabled bulk UPDATE/DELETE statements."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if _uses_triggers(orm_execute_state.session):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _bump_local({mapper.local_table.name})
+
+
+def _version_table_exists(engine):
+    key = str(engine.url)
+    if key not in _version_table_available:
+        _version_table_available[key] = sa_inspect(engine).has_table(
+            TableVersion.__tablename__
+        )
+    return _version_table_available[key]
+
+
+def get_table_versions(*table_names):
+    """
+    Return the current change counter for each table name.
+
+    Returns:
+        tuple: versions in the order requested, or None if versions are
+        unavailable (PostgreSQL without the table_versions migration)
+    """
+    engine = db.engine
+    if engine.dialect.name == "postgresql":
+        if not _version_table_exists(engine):
+            return None
+        rows = (
+            db.session.query(TableVersion.table_name, TableVersion.version)
+            .filter(TableVersion.table_name.in_(table_names))
+            .all()
+        )
+        found = dict(rows)
+        return tuple(found.get(name, 0) for name in table_names)
+
+    with _local_lock:
+        return (_BOOT_ID,) + tuple(_local_versions.get(name, 0) for name in table_names)
+
+
+def build_list_etag(table_names):
+    """
+    Build an ETag for the current request over the given tables.
+
+    Returns:
+        str or None: hex digest, or None if table versions are unavailable
+    """
+    versions = get_table_versions(*table_names)
+    if versions is None:
+        return None
+
+    role = getattr(current_user, "role", None) if current_user else None
+    args = sorted(request.args.items(multi=True))
+    raw = repr((request.path, args, role, tuple(table_names), versions))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def conditional_list_response(*models):
+    """
+    Decorator adding ETag / If-None-Match handling to a JSON list endpoint.
+
+    Args:
+        *models: SQLAlchemy models whose tables the response depends on
+    """
+    table_names = [model.__tablename__ for model in models]
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = build_list_etag(table_names)
+            if etag is None:
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,72 @@
+"""
+Named relationship load profiles for WorkOrder queries.
+
+WorkOrder relationships are all lazy by default; each call site picks the
+profile for what it renders instead of every query LEFT JOINing files and
+sources:
+
+- LIST:    customer (list pages/APIs; Source comes from source_name)
+- DETAIL:  customer + source, items and files (detail page)
+- PDF:     customer, ship-to source and items (prepare_order_data_for_pdf)
+- ML:      columns only, no relationships (to_dict(include_items=False))
+- MINIMAL: columns only, for lookups, counts and existence checks
+
+Collections (items, files) use selectinload, so orders with many files or
+items are not duplicated in the main result set.
+
+Usage:
+    work_order = (
+        WorkOrder.query.filter_by(WorkOrderNo=work_order_no)
+        .options(*work_order_load_options(DETAIL))
+        .first_or_404()
+    )
+"""
+
+from sqlalchemy.orm import joinedload, lazyload, selectinload
+
+from models.customer import Customer
+from models.work_order import WorkOrder
+
+
+LIST = "list"
+DETAIL = "detail"
+PDF = "pdf"
+ML = "ml"
+MINIMAL = "minimal"
+
+
+def _work_order_profiles():
+    return {
+        LIST: [joinedload(WorkOrder.customer)],
+        DETAIL: [
+            joinedload(WorkOrder.customer).joinedload(Customer.source_info),
+            selectinload(WorkOrder.items),
+            selectinload(WorkOrder.files),
+        ],
+        PDF: [
+            joinedload(WorkOrder.customer),
+            joinedload(WorkOrder.ship_to_source),
+            selectinload(WorkOrder.items),
+        ],
+        ML: [lazyload("*")],
+        MINIMAL: [lazyload("*")],
+    }
+
+
+def work_order_load_options(profile):
+    """
+    Loader options for a WorkOrder query.
+
+    Args:
+        profile: LIST, DETAIL, PDF, ML or MINIMAL
+
+    Returns:
+        list: options for query.options(*...)
+
+    Raises:
+        ValueError: unknown profile
+    """
+    profiles = _work_order_profiles()
+    if profile not in profiles:
+        raise ValueError(f"Unknown WorkOrder load profile: {profile!r}")
+    return profiles[profile]
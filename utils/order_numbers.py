@@ -0,0 +1,125 @@
+"""
+Work order / repair order number allocation.
+
+Each kind of order has a counter row in ``order_number_counters``. A number
+is allocated with a single ``UPDATE ... SET last_value = last_value + 1
+RETURNING last_value`` inside the creating transaction:
+
+- no MAX(CAST(... AS INTEGER)) scan of the order table per form load/save;
+- concurrent creates queue on the row lock instead of racing for the same
+  number and retrying on duplicate keys;
+- a rolled back create gives its number back (no gaps).
+
+The counter row is seeded from the current maximum the first time it is
+needed (the migration normally seeds it). PostgreSQL and SQLite (3.35+,
+tests/dev) both support UPDATE ... RETURNING and INSERT ... ON CONFLICT, so
+the same statements run on both.
+
+Usage:
+    work_order = WorkOrder(WorkOrderNo=allocate_order_number(WORK_ORDER_NUMBERS), ...)
+    db.session.add(work_order)
+    db.session.commit()
+"""
+
+from sqlalchemy import Integer, cast, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models.order_number_counter import OrderNumberCounter
+from models.repair_order import RepairWorkOrder
+from models.work_order import WorkOrder
+
+
+WORK_ORDER_NUMBERS = "work_order"
+REPAIR_ORDER_NUMBERS = "repair_order"
+
+# Counter name -> order number column it allocates for
+_NUMBER_COLUMNS = {
+    WORK_ORDER_NUMBERS: WorkOrder.WorkOrderNo,
+    REPAIR_ORDER_NUMBERS: RepairWorkOrder.RepairOrderNo,
+}
+
+
+def _highest_existing_number(counter):
+    """Largest number in use in the order table (0 if empty)."""
+    column = _NUMBER_COLUMNS[counter]
+    return db.session.query(func.max(cast(column, Integer))).scalar() or 0
+
+
+def _increment(counter):
+    stmt = (
+        update(OrderNumberCounter)
+        .where(OrderNumberCounter.name == counter)
+        .values(last_value=OrderNumberCounter.last_value + 1, updated_at=func.now())
+        .returning(OrderNumberCounter.last_value)
+    )
+    return db.session.execute(
+        stmt, execution_options={"synchronize_session": False}
+    ).scalar()
+
+
+def _seed_counter(counter):
+    """Create the counter row from the current maximum (no-op if it exists)."""
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    stmt = (
+        dialect.insert(OrderNumberCounter)
+        .values(name=counter, last_value=_highest_existing_number(counter))
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    db.session.execute(stmt)
+
+
+def allocate_order_number(counter):
+    """
+    Allocate the next order number in the current transaction.
+
+    Does not commit. The counter row stays locked until the caller's
+    transaction ends, so concurrent creates get consecutive numbers.
+
+    Args:
+        counter: WORK_ORDER_NUMBERS or REPAIR_ORDER_NUMBERS
+
+    Returns:
+        str: the allocated number
+    """
+    number = _increment(counter)
+    if number is None:
+        _seed_counter(counter)
+        number = _increment(counter)
+    return str(number)
+
+
+def peek_next_order_number(counter):
+    """
+    The number the next allocation will probably get (for display only).
+
+    Reads the counter row without locking it; another user may take the
+    number before this one is saved.
+    """
+    last_value = (
+        db.session.query(OrderNumberCounter.last_value)
+        .filter(OrderNumberCounter.name == counter)
+        .scalar()
+    )
+    if last_value is None:
+        last_value = _highest_existing_number(counter)
+    return str(last_value + 1)
+
+
+def sync_order_counter(counter):
+    """
+    Move the counter past any number already in the order table.
+
+    For recovery after a duplicate key, e.g. when orders were inserted with
+    explicit numbers by an import. Does not commit.
+    """
+    highest = _highest_existing_number(counter)
+    db.session.execute(
+        update(OrderNumberCounter)
+        .where(
+            OrderNumberCounter.name == counter,
+            OrderNumberCounter.last_value < highest,
+        )
+        .values(last_value=highest, updated_at=func.now()),
+        execution_options={"synchronize_session": False},
+    )
@@ -0,0 +1,329 @@
+"""
+Rendered PDF cache for work order and repair order PDFs.
+
+An order's PDF only changes when the data fed to the renderer changes, so
+rendered bytes are cached under a key of the order number plus a SHA-256 of
+the prepare_order_data_for_pdf() output (and PDF_LAYOUT_VERSION, bumped when
+the ReportLab layout code changes). The same hash is the response ETag, so a
+browser re-opening an unchanged PDF gets a 304 without the PDF being read.
+
+Tiers:
+- local disk (PDF_CACHE_DIR), least recently used files evicted once the
+  directory exceeds PDF_CACHE_MAX_BYTES (0 disables the cache);
+- optional S3 (PDF_CACHE_S3), shared by all app instances, under
+  ``pdf_cache/<order type>/<order no>/``.
+
+Stale artifacts are removed when an order or its items are committed
+(session events below); hashing keeps lookups correct even without that,
+e.g. when only the customer's address changed. Local files are removed right
+after the commit. The order's S3 prefix is queued in the S3 delete outbox
+with the change and removed by the background drain (utils/s3_deletes.py),
+so requests never wait on S3 listing and deletes.
+
+Usage:
+    order_data = prepare_order_data_for_pdf(work_order, order_type="work_order")
+    return order_pdf_response(
+        WORK_ORDER_PDFS, work_order_no, order_data,
+        render=lambda: generate_work_order_pdf(order_data).getvalue(),
+        download_name=f"WorkOrder_{work_order_no}.pdf",
+    )
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+PDF_LAYOUT_VERSION = 1
+
+WORK_ORDER_PDFS = "work_order"
+REPAIR_ORDER_PDFS = "repair_order"
+
+S3_PREFIX = "pdf_cache"
+
+_evict_lock = threading.Lock()
+
+
+def pdf_content_hash(order_data):
+    """SHA-256 of the renderer input (the cache key and ETag)."""
+    raw = json.dumps(
+        [PDF_LAYOUT_VERSION, order_data], sort_keys=True, default=str
+    ).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _cache_dir():
+    return current_app.config.get("PDF_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "awning_pdf_cache"
+    )
+
+
+def _local_enabled():
+    return current_app.config.get("PDF_CACHE_MAX_BYTES", 0) > 0
+
+
+def _s3_enabled():
+    return bool(current_app.config.get("PDF_CACHE_S3"))
+
+
+def _safe(order_no):
+    return str(order_no).replace("/", "_").replace("\\", "_")
+
+
+def _local_path(order_type, order_no, content_hash):
+    return os.path.join(_cache_dir(), order_type, _safe(order_no), f"{content_hash}.pdf")
+
+
+def _s3_key(order_type, order_no, content_hash=None):
+    prefix = f"{S3_PREFIX}/{order_type}/{_safe(order_no)}/"
+    return prefix + f"{content_hash}.pdf" if content_hash else prefix
+
+
+# ---------------------------------------------------------------------------
+# Local disk tier
+# ---------------------------------------------------------------------------
+
+
+def _read_local(path):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # Reads refresh the mtime, which is what eviction orders by
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+def _write_local(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so concurrent readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _evict_local(current_app.config["PDF_CACHE_MAX_BYTES"])
+
+
+def _evict_local(max_bytes):
+    """Delete least recently used PDFs until the cache fits in max_bytes."""
+    with _evict_lock:
+        entries = []
+        for root, _, files in os.walk(_cache_dir()):
+            for name in files:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# ---------------------------------------------------------------------------
+# S3 tier
+# ---------------------------------------------------------------------------
+
+
+def _s3():
+    # Imported lazily: utils.file_upload needs AWS settings at import time
+    from utils.file_upload import AWS_S3_BUCKET, s3_client
+
+    return s3_client, AWS_S3_BUCKET
+
+
+def _read_s3(key):
+    s3_client, bucket = _s3()
+    try:
+        return s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    except Exception as e:
+        print(f"[PDF CACHE] S3 read failed for {key}: {e}")
+        return None
+
+
+def _write_s3(key, data):
+    s3_client, bucket = _s3()
+    try:
+        s3_client.put_object(
+            Bucket=bucket, Key=key, Body=data, ContentType="application/pdf"
+        )
+    except Exception as e:
+        print(f"[PDF CACHE] S3 write failed for {key}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def get_cached_pdf(order_type, order_no, order_data, render):
+    """
+    PDF bytes for an order, rendering only on a cache miss.
+
+    Args:
+        order_type: WORK_ORDER_PDFS or REPAIR_ORDER_PDFS
+        order_no: work order / repair order number
+        order_data: prepare_order_data_for_pdf() output
+        render: callable returning the PDF bytes
+
+    Returns:
+        tuple: (pdf bytes, content hash)
+    """
+    content_hash = pdf_content_hash(order_data)
+    local_path = _local_path(order_type, order_no, content_hash)
+
+    if _local_enabled():
+        data = _read_local(local_path)
+        if data is not None:
+            return data, content_hash
+
+    data = None
+    if _s3_enabled():
+        data = _read_s3(_s3_key(order_type, order_no, content_hash))
+
+    if data is None:
+        data = render()
+        if _s3_enabled():
+            _write_s3(_s3_key(order_type, order_no, content_hash), data)
+
+    if _local_enabled():
+        _write_local(local_path, data)
+    return data, content_hash
+
+
+def order_pdf_response(
+    order_type, order_no, order_data, render, download_name, as_attachment=True
+):
+    """
+    Response serving an order's PDF from the cache, with ETag / 304 support.
+
+    Args are as for get_cached_pdf(), plus the download name and whether the
+    browser should download (True) or display (False) the PDF.
+    """
+    content_hash = pdf_content_hash(order_data)
+    if request.if_none_match.contains(content_hash):
+        response = make_response("", 304)
+    else:
+        data, content_hash = get_cached_pdf(order_type, order_no, order_data, render)
+        response = make_response(data)
+        response.mimetype = "application/pdf"
+        disposition = "attachment" if as_attachment else "inline"
+        response.headers.set("Content-Disposition", disposition, filename=download_name)
+
+    response.set_etag(content_hash)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _remove_local(order_type, order_no):
+    shutil.rmtree(
+        os.path.join(_cache_dir(), order_type, _safe(order_no)), ignore_errors=True
+    )
+
+
+def _queue_s3_invalidation(session, order_type, order_no):
+    """Queue the order's S3 prefix in the delete outbox (once per transaction)."""
+    from utils.s3_deletes import queue_s3_deletes
+
+    queued = session.info.setdefault(_QUEUED_KEY, set())
+    if (order_type, order_no) not in queued:
+        queued.add((order_type, order_no))
+        queue_s3_deletes([_s3_key(order_type, order_no)], session=session)
+
+
+def invalidate_order_pdfs(order_type, order_no):
+    """
+    Remove every cached PDF of an order.
+
+    The local copies go now; the S3 copies are queued in the current
+    transaction and deleted in the background after it commits.
+    """
+    from extensions import db
+
+    _remove_local(order_type, order_no)
+    if _s3_enabled():
+        _queue_s3_invalidation(db.session(), order_type, order_no)
+
+
+# ---------------------------------------------------------------------------
+# Invalidate on edit
+# ---------------------------------------------------------------------------
+
+_PENDING_KEY = "pdf_cache_invalidate"
+# Orders whose S3 prefix is already in the delete outbox this transaction
+_QUEUED_KEY = "pdf_cache_s3_queued"
+
+
+def _changed_order(obj):
+    """(order type, order number) whose PDF obj belongs to, or None."""
+    table = getattr(obj, "__tablename__", None)
+    if table in ("tblcustworkorderdetail", "tblorddetcustawngs"):
+        return WORK_ORDER_PDFS, obj.WorkOrderNo
+    if table in ("tblrepairworkorderdetail", "tblreporddetcustawngs"):
+        return REPAIR_ORDER_PDFS, obj.RepairOrderNo
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_orders(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    changed_orders = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed = _changed_order(obj)
+        if changed and changed[1]:
+            changed_orders.add(changed)
+    pending.update(changed_orders)
+
+    try:
+        s3_enabled = changed_orders and _s3_enabled()
+    except RuntimeError:
+        return  # Outside an application context (scripts): nothing is cached
+    if s3_enabled:
+        # Written by the commit's next flush, atomically with the change
+        for order_type, order_no in changed_orders:
+            _queue_s3_invalidation(session, order_type, order_no)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_orders(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    queued = session.info.pop(_QUEUED_KEY, None)
+    try:
+        for order_type, order_no in pending or ():
+            _remove_local(order_type, order_no)
+        if queued:
+            from utils.s3_deletes import schedule_s3_delete_drain
+
+            schedule_s3_delete_drain()
+    except RuntimeError:
+        # Outside an application context (scripts): nothing is cached there
+        pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_orders(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_QUEUED_KEY, None)
@@ -0,0 +1,324 @@
+"""
+Shared ReportLab styles for the work order and repair order PDFs.
+
+Both generators used to rebuild getSampleStyleSheet() plus a dozen custom
+ParagraphStyles for every PDF, clone a style for every check/X cell and build
+every TableStyle inline. The styles never depend on the order being
+rendered, so they are built once, when this module is imported (once per
+process, including each bulk PDF render worker), and shared read-only:
+
+- PARAGRAPH_STYLES: sample stylesheet + custom styles, by name
+- BOOL_STYLES: green/red variants of the custom styles, by (name, value)
+- TABLE_STYLES: the fixed TableStyles used by the layouts, by name
+
+Nothing may modify these objects: they are shared by every PDF (and every
+thread) in the process. Derive a new style with ``style.clone(...)``
+instead.
+
+Usage:
+    from utils.pdf_styles import PARAGRAPH_STYLES, TABLE_STYLES, bool_style
+
+    Paragraph("Customer ID", PARAGRAPH_STYLES["SmallLabel"])
+    table.setStyle(TABLE_STYLES["Items"])
+"""
+
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.colors import green, red
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import TableStyle
+
+
+def _build_paragraph_styles():
+    sample = getSampleStyleSheet()
+    normal = sample["Normal"]
+    styles = {name: sample[name] for name in sample.byName}
+
+    def add(style):
+        styles[style.name] = style
+
+    # Company name style - modern and prominent
+    add(
+        ParagraphStyle(
+            name="CompanyName",
+            parent=normal,
+            fontSize=12,
+            spaceAfter=0.1 * inch,
+            alignment=TA_CENTER,
+            fontName="Helvetica-Bold",
+        )
+    )
+
+    # Work order / repair order number - extra prominent
+    for name in ("WONumber", "RONumber"):
+        add(
+            ParagraphStyle(
+                name=name,
+                parent=normal,
+                fontSize=16,
+                fontName="Helvetica-Bold",
+                alignment=TA_RIGHT,
+                textColor=colors.HexColor("#d32f2f"),  # Strong red
+                borderWidth=2,
+                borderColor=colors.HexColor("#d32f2f"),
+                borderPadding=6,
+            )
+        )
+
+    # Order number in the header bar
+    add(
+        ParagraphStyle(
+            name="HeaderOrderNumber",
+            parent=normal,
+            fontSize=14,
+            fontName="Helvetica-Bold",
+            alignment=TA_RIGHT,
+        )
+    )
+
+    # Field labels - refined and consistent
+    add(
+        ParagraphStyle(
+            name="SmallLabel",
+            parent=normal,
+            fontSize=8,
+            textColor=colors.HexColor("#424242"),  # Dark grey
+            fontName="Helvetica",
+            spaceBefore=1,
+            spaceAfter=1,
+        )
+    )
+
+    # Important labels (like Rush, Repairs) - standout
+    add(
+        ParagraphStyle(
+            name="ImportantLabel",
+            parent=normal,
+            fontSize=8,
+            textColor=colors.HexColor("#d32f2f"),  # Red
+            fontName="Helvetica-Bold",
+            spaceBefore=1,
+            spaceAfter=1,
+        )
+    )
+
+    # Values - clean and readable
+    add(
+        ParagraphStyle(
+            name="SmallValue",
+            parent=normal,
+            fontSize=9,
+            textColor=colors.HexColor("#212121"),  # Rich black
+            fontName="Helvetica",
+            spaceBefore=1,
+            spaceAfter=1,
+        )
+    )
+
+    # Values - bold and prominent for source info
+    add(
+        ParagraphStyle(
+            name="SmallValueSource",
+            parent=normal,
+            fontSize=11,  # slightly larger than default SmallValue
+            textColor=colors.HexColor("#000000"),  # pure black for emphasis
+            fontName="Helvetica-Bold",  # make it bold
+            spaceBefore=1,
+            spaceAfter=1,
+        )
+    )
+
+    # Special instructions - SmallValue without the extra spacing
+    add(
+        ParagraphStyle(
+            name="SpecialInstrValue",
+            parent=styles["SmallValue"],
+            spaceBefore=0,
+            spaceAfter=0,
+        )
+    )
+
+    # Table headers - professional and clean
+    add(
+        ParagraphStyle(
+            name="TableHeader",
+            parent=normal,
+            fontSize=9,
+            textColor=colors.black,
+            fontName="Helvetica-Bold",
+            alignment=TA_CENTER,
+            spaceBefore=2,
+            spaceAfter=2,
+        )
+    )
+
+    # Table cells - alternating friendly
+    add(
+        ParagraphStyle(
+            name="TableCell",
+            parent=normal,
+            fontSize=8,
+            textColor=colors.HexColor("#424242"),
+            fontName="Helvetica",
+            alignment=TA_CENTER,
+            spaceBefore=1,
+            spaceAfter=1,
+        )
+    )
+
+    # Rush highlighting - urgent red
+    add(
+        ParagraphStyle(
+            name="RushHighlight",
+            parent=styles["SmallValue"],
+            textColor=colors.HexColor("#d32f2f"),
+            fontName="Helvetica-Bold",
+            borderWidth=1,
+            borderColor=colors.HexColor("#ffcdd2"),  # Light red border
+            borderPadding=2,
+        )
+    )
+
+    # Condensed spacing for tight layouts
+    add(
+        ParagraphStyle(
+            name="Condensed",
+            parent=styles["SmallValue"],
+            spaceBefore=0.5,
+            spaceAfter=0.5,
+            fontSize=8,
+        )
+    )
+
+    # Footer text - subtle and professional
+    add(
+        ParagraphStyle(
+            name="Footer",
+            parent=normal,
+            fontSize=7,
+            textColor=colors.HexColor("#212121"),  # Medium grey
+            fontName="Helvetica",
+            alignment=TA_CENTER,
+        )
+    )
+
+    return styles
+
+
+def _build_bool_styles(styles):
+    """Green (True) / red (False) copies of every style, for check/X cells."""
+    variants = {}
+    for name, style in styles.items():
+        if not isinstance(style, ParagraphStyle):
+            continue
+        variants[(name, True)] = style.clone(f"{name}Green", textColor=green)
+        variants[(name, False)] = style.clone(f"{name}Red", textColor=red)
+    return variants
+
+
+def _table_style(*commands):
+    style = TableStyle(commands)
+    # A tuple has no append(), so TableStyle.add() fails on a shared style
+    style._cmds = tuple(style._cmds)
+    return style
+
+
+def _header_bar(background):
+    return _table_style(
+        ("BACKGROUND", (0, 0), (-1, 0), background),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (0, 0), (0, 0), "CENTER"),
+        ("ALIGN", (2, 0), (2, 0), "RIGHT"),
+        ("FONTSIZE", (0, 0), (-1, -1), 12),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("LINEBELOW", (0, 0), (-1, 0), 1, colors.black),  # Horizontal line below
+    )
+
+
+def _build_table_styles():
+    return {
+        "WorkOrderHeader": _header_bar(colors.lightblue),
+        "RepairOrderHeader": _header_bar(colors.lightgreen),
+        "RushRow": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ("LINEBELOW", (0, 0), (-1, 0), 1, colors.black),  # line under the row
+        ),
+        "TopSection": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 4),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+        ),
+        "Items": _table_style(
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (0, 1), (0, -1), "RIGHT"),  # Qty right
+            ("ALIGN", (5, 1), (5, -1), "RIGHT"),  # Size/Wgt right
+            ("ALIGN", (6, 1), (6, -1), "RIGHT"),  # Price right
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),  # header
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+            ("LINEABOVE", (0, 0), (-1, 0), 1, colors.black),
+            ("LINEBELOW", (0, 0), (-1, 0), 1, colors.black),
+            ("GRID", (0, 1), (-1, -1), 0.25, colors.grey),  # light grid for body
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.whitesmoke]),
+            ("LEFTPADDING", (0, 0), (-1, -1), 2),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ),
+        "SpecialInstructions": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("LEFTPADDING", (0, 0), (-1, -1), 6),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+        ),
+        "FooterRow": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 2),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+        ),
+        "MaterialList": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("LEFTPADDING", (1, 0), (1, -1), 2),
+            ("RIGHTPADDING", (1, 0), (1, -1), 2),
+        ),
+        "Checkboxes": _table_style(
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+            ("BOX", (1, 0), (1, 0), 1, colors.black),
+            ("BOX", (3, 0), (3, 0), 1, colors.black),
+            ("BOX", (5, 0), (5, 0), 1, colors.black),
+        ),
+    }
+
+
+_paragraph_styles = _build_paragraph_styles()
+
+PARAGRAPH_STYLES = MappingProxyType(_paragraph_styles)
+BOOL_STYLES = MappingProxyType(_build_bool_styles(_paragraph_styles))
+TABLE_STYLES = MappingProxyType(_build_table_styles())
+
+
+def bool_style(style, value):
+    """
+    Green (value True) or red (value False) variant of a paragraph style.
+
+    Registered styles come from BOOL_STYLES; any other style is cloned.
+    """
+    variant = BOOL_STYLES.get((style.name, bool(value)))
+    if variant is not None and PARAGRAPH_STYLES.get(style.name) is style:
+        return variant
+    return style.clone(
+        "GreenStyle" if value else "RedStyle", textColor=green if value else red
+    )
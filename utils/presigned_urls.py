@@ -0,0 +1,95 @@
+"""
+Reuse of presigned S3 GET URLs.
+
+The file listings and thumbnail redirects signed a new URL for every file on
+every page render (~0.5 ms of SigV4 work each), and a new URL each time
+also defeats the browser cache for thumbnails stored with a one-year
+Cache-Control.
+
+URLs are cached per process, keyed by (S3 key, expires_in, expiry bucket).
+Time is cut into buckets of (1 - MIN_REMAINING_FRACTION) x expires_in. A URL
+signed in a bucket is reused until the bucket ends, so a cached URL always
+has at least MIN_REMAINING_FRACTION of its lifetime left when handed out
+(6 minutes of a 1 hour URL). The LRU is bounded by PRESIGNED_URL_CACHE_SIZE.
+Hits and misses show up under "presigned_url" at /admin/cache-stats.
+
+Usage:
+    url = presigned_url_cache.get_or_sign(s3_key, 3600, sign)
+    urls = presigned_url_cache.get_or_sign_many(s3_keys, 3600, sign)  # {key: url}
+
+where sign(s3_key, expires_in) returns a freshly signed URL.
+"""
+
+import time
+
+from utils.cache_helpers import _LRUStore
+from utils.cache_metrics import cache_metrics
+
+
+PRESIGNED_URL_CACHE_SIZE = 4096
+
+# A cached URL is handed out with at least this fraction of its lifetime left
+MIN_REMAINING_FRACTION = 0.1
+
+METRICS_PREFIX = "presigned_url"
+
+
+class PresignedUrlCache:
+    """Bounded, thread-safe cache of presigned URLs (see module docstring)."""
+
+    def __init__(self, maxsize=PRESIGNED_URL_CACHE_SIZE, clock=time.time):
+        self._store = _LRUStore(maxsize, METRICS_PREFIX)
+        self._clock = clock
+
+    def _bucket(self, expires_in):
+        """Current bucket index and the seconds until it ends."""
+        window = expires_in * (1 - MIN_REMAINING_FRACTION)
+        now = self._clock()
+        index = int(now // window)
+        return index, (index + 1) * window - now
+
+    def _lookup(self, s3_key, expires_in, bucket, remaining, sign):
+        cache_key = (s3_key, expires_in, bucket)
+        url = self._store.get(cache_key)
+        if url is not None:
+            cache_metrics.record_hit(METRICS_PREFIX)
+            return url
+
+        cache_metrics.record_miss(METRICS_PREFIX)
+        url = sign(s3_key, expires_in)
+        self._store.set(cache_key, url, timeout=remaining)
+        cache_metrics.record_set(METRICS_PREFIX)
+        return url
+
+    def get_or_sign(self, s3_key, expires_in, sign):
+        """Cached URL for s3_key, signing (and caching) one if needed."""
+        if expires_in <= 0:
+            return sign(s3_key, expires_in)
+        bucket, remaining = self._bucket(expires_in)
+        return self._lookup(s3_key, expires_in, bucket, remaining, sign)
+
+    def get_or_sign_many(self, s3_keys, expires_in, sign):
+        """
+        URLs for many keys at once (listing pages).
+
+        All keys share one bucket, so the URLs on a page expire together.
+
+        Returns:
+            dict: s3_key -> URL
+        """
+        if expires_in <= 0:
+            return {key: sign(key, expires_in) for key in s3_keys}
+        bucket, remaining = self._bucket(expires_in)
+        return {
+            key: self._lookup(key, expires_in, bucket, remaining, sign)
+            for key in dict.fromkeys(s3_keys)
+        }
+
+    def clear(self):
+        self._store.clear()
+
+    def __len__(self):
+        return len(self._store)
+
+
+presigned_url_cache = PresignedUrlCache()
@@ -8,7 +8,13 @@ Reduces code duplication across work_orders, repair_orders, customers,
 and queue route files.
 """
 
-from sqlalchemy import cast, Integer, or_
+import base64
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, cast, false, Integer, or_
 from sqlalchemy.orm import joinedload
 
 
@@ -183,6 +189,74 @@ def apply_column_filters(query, model, request_args, filter_config):
     return query
 
 
+SortKey = namedtuple("SortKey", ["field", "expression", "descending", "nulls_last"])
+
+
+def sort_key(field, expression, descending=False, nulls_last=False):
+    """Build a SortKey (e.g. for a route's default sort)."""
+    return SortKey(field, expression, descending, nulls_last)
+
+
+def tabulator_sort_keys(model, request_args, sort_config=None):
+    """
+    Parse Tabulator multi-column sorting into a list of SortKey tuples.
+
+    Handles sort[0][field], sort[0][dir], sort[1][field], etc. Fields are
+    resolved the same way as apply_tabulator_sorting (see there for
+    sort_config); unknown fields are skipped.
+
+    Returns:
+        list[SortKey]: empty if no (known) sort was requested
+    """
+    sort_config = sort_config or {}
+    keys = []
+
+    i = 0
+    while True:
+        field = request_args.get(f"sort[{i}][field]")
+        if not field:
+            break
+
+        descending = request_args.get(f"sort[{i}][dir]", "asc") == "desc"
+        i += 1
+
+        # Check if this field has a custom column object
+        if field in sort_config and not isinstance(sort_config[field], str):
+            keys.append(sort_key(field, sort_config[field], descending))
+            continue
+
+        # Try to get the column from the model
+        column = getattr(model, field, None)
+        if not column:
+            continue
+
+        # Determine the sort type
+        sort_type = sort_config.get(field, "string")
+
+        if sort_type == "integer":
+            # Cast to integer for proper numeric sorting
+            keys.append(sort_key(field, cast(column, Integer), descending))
+        elif sort_type == "date":
+            # Date fields with nulls_last()
+            keys.append(sort_key(field, column, descending, nulls_last=True))
+        else:
+            # String or default sorting
+            keys.append(sort_key(field, column, descending))
+
+    return keys
+
+
+def sort_clauses(sort_keys):
+    """ORDER BY clauses for a list of SortKey tuples."""
+    clauses = []
+    for key in sort_keys:
+        clause = key.expression.desc() if key.descending else key.expression.asc()
+        if key.nulls_last:
+            clause = clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
 def apply_tabulator_sorting(query, model, request_args, sort_config=None):
     """
     Parse and apply Tabulator multi-column sorting.
@@ -215,63 +289,155 @@ def apply_tabulator_sorting(query, model, request_args, sort_config=None):
             "Source": Source.SSource
         })
     """
-    sort_config = sort_config or {}
-    order_by_clauses = []
+    sort_keys = tabulator_sort_keys(model, request_args, sort_config)
 
-    i = 0
-    while True:
-        field = request_args.get(f"sort[{i}][field]")
-        if not field:
-            break
+    # Apply sorting if any clauses were built
+    if sort_keys:
+        query = query.order_by(*sort_clauses(sort_keys))
 
-        direction = request_args.get(f"sort[{i}][dir]", "asc")
+    return query
 
-        # Check if this field has a custom column object
-        if field in sort_config and not isinstance(sort_config[field], str):
-            column = sort_config[field]
-            if direction == "desc":
-                order_by_clauses.append(column.desc())
-            else:
-                order_by_clauses.append(column.asc())
-        else:
-            # Try to get the column from the model
-            column = getattr(model, field, None)
-            if not column:
-                i += 1
-                continue
-
-            # Determine the sort type
-            sort_type = sort_config.get(field, "string")
-
-            if sort_type == "integer":
-                # Cast to integer for proper numeric sorting
-                cast_column = cast(column, Integer)
-                if direction == "desc":
-                    order_by_clauses.append(cast_column.desc())
-                else:
-                    order_by_clauses.append(cast_column.asc())
-
-            elif sort_type == "date":
-                # Date fields with nulls_last()
-                if direction == "desc":
-                    order_by_clauses.append(column.desc().nulls_last())
-                else:
-                    order_by_clauses.append(column.asc().nulls_last())
 
-            else:
-                # String or default sorting
-                if direction == "desc":
-                    order_by_clauses.append(column.desc())
-                else:
-                    order_by_clauses.append(column.asc())
+class InvalidCursor(ValueError):
+    """A keyset cursor that is malformed or was made for a different sort."""
 
-        i += 1
 
-    # Apply sorting if any clauses were built
-    if order_by_clauses:
-        query = query.order_by(*order_by_clauses)
+KeysetPage = namedtuple("KeysetPage", ["items", "next_cursor", "has_next"])
 
-    return query
+
+def _clause_element(expression):
+    return expression.__clause_element__() if hasattr(expression, "__clause_element__") else expression
+
+
+def _sort_signature(sort_keys):
+    return [f"{key.field}:{'desc' if key.descending else 'asc'}" for key in sort_keys]
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(key, value):
+    """Restore a cursor value to the Python type of its sort expression."""
+    if value is None:
+        return None
+    try:
+        python_type = _clause_element(key.expression).type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is Decimal:
+            return Decimal(value)
+        if python_type is int:
+            return int(value)
+    except (TypeError, ValueError, ArithmeticError):
+        raise InvalidCursor(f"Bad cursor value for {key.field}")
+    return value
+
+
+def encode_cursor(sort_keys, values):
+    """Opaque cursor for the row with the given sort key values."""
+    payload = {"s": _sort_signature(sort_keys), "v": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort_keys, cursor):
+    """
+    Sort key values from a cursor made by encode_cursor.
+
+    Raises:
+        InvalidCursor: if the cursor is malformed or was made for another sort
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        signature, values = payload["s"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if signature != _sort_signature(sort_keys) or len(values) != len(sort_keys):
+        raise InvalidCursor("Cursor does not match the requested sort")
+    return [_decode_value(key, value) for key, value in zip(sort_keys, values)]
+
+
+def _after_condition(sort_keys, values):
+    """
+    WHERE clause selecting rows that sort after the given key values.
+
+    Expands (k1, k2, ...) > (v1, v2, ...) into
+    k1 > v1 OR (k1 = v1 AND k2 > v2) OR ..., honouring each key's direction
+    with NULLs sorting last (keyset_paginate forces NULLS LAST on every key).
+    """
+    conditions = []
+    for index, (key, value) in enumerate(zip(sort_keys, values)):
+        if value is None:
+            continue  # NULLs are last: nothing sorts after a NULL in this key
+        expression = key.expression
+        beyond = expression < value if key.descending else expression > value
+        equal = [
+            earlier.expression.is_(None) if earlier_value is None else earlier.expression == earlier_value
+            for earlier, earlier_value in zip(sort_keys[:index], values[:index])
+        ]
+        conditions.append(and_(*equal, or_(beyond, expression.is_(None))))
+    return or_(*conditions) if conditions else false()
+
+
+def keyset_paginate(query, sort_keys, cursor, size, tiebreaker):
+    """
+    Cursor-based (seek) pagination.
+
+    Instead of OFFSET and a COUNT, the page after a cursor is selected with a
+    WHERE clause on the sort key values of the previous page's last row, so
+    deep pages cost the same as the first and no count is run. NULLs sort
+    last on every key, and tiebreaker (the primary key) is appended as the
+    final key so the order is total.
+
+    Args:
+        query: SQLAlchemy query (any ORDER BY on it is replaced)
+        sort_keys: list of SortKey (e.g. from tabulator_sort_keys)
+        cursor: cursor from a previous page's next_cursor; empty/None for the
+            first page
+        size: page size
+        tiebreaker: unique column appended to the sort
+
+    Returns:
+        KeysetPage: items, next_cursor (None on the last page), has_next
+
+    Raises:
+        InvalidCursor: if the cursor is malformed or was made for another sort
+
+    Example:
+        sort_keys = tabulator_sort_keys(WorkOrder, request.args, sort_config)
+        page = keyset_paginate(query, sort_keys, request.args.get("cursor"),
+                               25, tiebreaker=WorkOrder.WorkOrderNo)
+    """
+    sort_keys = [key._replace(nulls_last=True) for key in sort_keys]
+    tiebreaker_element = _clause_element(tiebreaker)
+    if not any(_clause_element(key.expression).compare(tiebreaker_element) for key in sort_keys):
+        sort_keys.append(sort_key("_tiebreaker", tiebreaker, nulls_last=True))
+
+    query = query.order_by(None).order_by(*sort_clauses(sort_keys))
+    if cursor:
+        query = query.filter(_after_condition(sort_keys, decode_cursor(sort_keys, cursor)))
+
+    # Read the sort key values alongside each row to build the next cursor
+    query = query.add_columns(
+        *[_clause_element(key.expression).label(f"keyset_{i}") for i, key in enumerate(sort_keys)]
+    )
+    rows = query.limit(size + 1).all()
+
+    has_next = len(rows) > size
+    rows = rows[:size]
+    next_cursor = encode_cursor(sort_keys, tuple(rows[-1])[1:]) if has_next else None
+    return KeysetPage([row[0] for row in rows], next_cursor, has_next)
 
 
 def apply_search_filter(query, model, search_term, searchable_fields):
@@ -0,0 +1,472 @@
+"""
+Change events for the cleaning queue and in-progress boards.
+
+Screens subscribe to a server-sent events stream (routes/events.py) and patch
+themselves from compact events instead of re-requesting whole pages:
+
+    queue.positions    {"version", "positions": {work_order_no: position}}
+                       ("rebalanced": true instead of positions for big writes)
+    work_order.status  {"work_order_no", "status", "tier", "in_queue", "date"}
+                       status is approved/cleaned/treated/packaged/completed/
+                       processing
+    work_order.updated {"work_order_no", "in_queue"}
+                       other edits to a queued order (priority, dates, name,
+                       quote, queue position cleared, deleted)
+
+Events are collected from ORM flushes (status transitions on WorkOrder) and
+from bulk queue position writes (utils/queue_positions.py), and only delivered
+once the transaction commits:
+
+- PostgreSQL: ``pg_notify`` is issued inside the transaction (NOTIFY is
+  transactional, so rolled back events are never sent). Every worker starts
+  one LISTEN thread on its first request (init_queue_events()) that forwards
+  notifications to its in-process broker, so all gunicorn workers see every
+  event.
+- Other databases (SQLite in tests/dev): an in-memory stand-in keeps events
+  on the session and publishes them to this process's broker after commit.
+
+Callbacks registered with add_commit_hook() also run in the committing
+process right after its commit, with either bridge, so local caches are
+dropped without waiting for the notification to come back.
+"""
+
+import itertools
+import json
+import os
+import queue
+import select
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+
+from sqlalchemy import event, inspect as sa_inspect, text
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.work_order import WorkOrder
+
+
+# NOTIFY channel shared by all workers
+QUEUE_EVENTS_CHANNEL = "queue_events"
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7500
+
+# Position writes larger than this are sent as a bare "rebalanced" event
+MAX_EVENT_POSITIONS = 200
+
+# session.info key for events waiting for commit
+_PENDING_KEY = "queue_events_pending"
+
+# Called with the committed events in the committing process (add_commit_hook)
+_commit_hooks = []
+
+# Other WorkOrder attributes shown on the queue screens/summary
+_QUEUE_FIELDS = (
+    "QueuePosition",
+    "FirmRush",
+    "RushOrder",
+    "DateRequired",
+    "DateIn",
+    "WOName",
+    "CustID",
+    "Quote",
+)
+
+# WorkOrder attribute -> status name reported when it becomes set
+_STATUS_FIELDS = (
+    ("DateCompleted", "completed"),
+    ("final_location", "packaged"),
+    ("Treat", "treated"),
+    ("Clean", "cleaned"),
+    ("ProcessingStatus", "processing"),
+)
+
+
+class Subscription:
+    """One SSE client's mailbox."""
+
+    def __init__(self, maxsize=500):
+        self._queue = queue.Queue(maxsize=maxsize)
+        # Set when events were dropped; the client has to reload
+        self.overflowed = False
+
+    def put(self, evt):
+        try:
+            self._queue.put_nowait(evt)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next event, or None after timeout seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """
+    In-process pub/sub with a short replay buffer.
+
+    Event ids are "<broker id>-<sequence>", so a client reconnecting with a
+    Last-Event-ID from another worker (or before a restart) is told to reset
+    instead of silently missing events.
+    """
+
+    def __init__(self, history=500):
+        self.broker_id = f"{os.getpid()}x{time.time_ns() % 10**6}"
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call callback(event) for every published event (e.g. cache invalidation)."""
+        self._listeners.append(callback)
+
+    def publish(self, event_type, data):
+        with self._lock:
+            evt = {
+                "id": f"{self.broker_id}-{next(self._sequence)}",
+                "type": event_type,
+                "data": data,
+            }
+            self._history.append(evt)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(evt)
+        for callback in self._listeners:
+            try:
+                callback(evt)
+            except Exception as e:
+                print(f"[QUEUE EVENTS] Listener {callback.__name__} failed: {e}")
+        return evt
+
+    def subscribe(self, last_event_id=None, max_subscribers=None):
+        """
+        Register a subscription.
+
+        Returns:
+            tuple: (subscription, replay) - replay is the list of missed events,
+            or None if they are no longer available (client should reset).
+            (None, None) when max_subscribers are already registered.
+        """
+        subscription = Subscription()
+        with self._lock:
+            if max_subscribers is not None and len(self._subscribers) >= max_subscribers:
+                return None, None
+            self._subscribers.add(subscription)
+            replay = self._replay_after(last_event_id)
+        return subscription, replay
+
+    def poll(self, last_event_id=None):
+        """
+        Missed events without subscribing.
+
+        Returns:
+            tuple: (replay, cursor) - replay as for subscribe(), cursor the id
+            of the newest event so far (pass it back as last_event_id)
+        """
+        with self._lock:
+            replay = self._replay_after(last_event_id)
+            cursor = self._history[-1]["id"] if self._history else f"{self.broker_id}-0"
+        return replay, cursor
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _replay_after(self, last_event_id):
+        if not last_event_id:
+            return []
+        broker_id, _, sequence = last_event_id.rpartition("-")
+        if broker_id != self.broker_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        history = list(self._history)
+        if history and int(history[0]["id"].rpartition("-")[2]) > sequence + 1:
+            # Oldest buffered event is newer than the next one the client needs
+            return None
+        return [e for e in history if int(e["id"].rpartition("-")[2]) > sequence]
+
+
+broker = EventBroker()
+
+
+def _encode(event_type, data):
+    return json.dumps({"type": event_type, "data": data}, separators=(",", ":"))
+
+
+class InMemoryBridge:
+    """Stand-in bridge: publish to this process's broker after commit."""
+
+    transactional = False
+
+    def send(self, session, event_type, data):
+        session.info.setdefault(_PENDING_KEY, []).append((event_type, data))
+
+    def deliver(self, events):
+        for event_type, data in events:
+            broker.publish(event_type, data)
+
+    def start(self):
+        pass
+
+
+class PostgresNotifyBridge:
+    """
+    pg_notify inside the writing transaction, LISTEN thread per process.
+
+    The listener uses its own connection (outside the pool) and reconnects
+    with backoff if it drops. It runs inside an app context so broker
+    listeners can use the cache.
+    """
+
+    transactional = True
+
+    def __init__(self, app, engine, channel=QUEUE_EVENTS_CHANNEL):
+        self.app = app
+        self.engine = engine
+        self.channel = channel
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def send(self, session, event_type, data):
+        payload = _encode(event_type, data)
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            payload = _encode(event_type, {"truncated": True})
+        session.connection().execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": payload},
+        )
+        # Kept for the commit hooks only; the broker hears it through LISTEN
+        session.info.setdefault(_PENDING_KEY, []).append((event_type, data))
+
+    def deliver(self, events):
+        pass  # Postgres delivers on commit
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return  # every request checks; skip the lock once running
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._listen_forever, name="queue-events-listener", daemon=True
+            )
+            self._thread.start()
+
+    def _listen_forever(self):
+        backoff = 1
+        with self.app.app_context():
+            while True:
+                try:
+                    self._listen()
+                    backoff = 1
+                except Exception as e:
+                    print(f"[QUEUE EVENTS] Listener error, reconnecting in {backoff}s: {e}")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+
+    def _listen(self):
+        raw = self.engine.raw_connection()
+        try:
+            # Detach so the pool never hands this LISTEN connection out again
+            raw.detach()
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            print(f"[QUEUE EVENTS] Listening on '{self.channel}' (pid {os.getpid()})")
+
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notification = conn.notifies.pop(0)
+                    try:
+                        message = json.loads(notification.payload)
+                    except ValueError:
+                        continue
+                    broker.publish(message["type"], message["data"])
+        finally:
+            raw.close()
+
+
+_bridge = InMemoryBridge()
+
+
+def init_queue_events(app):
+    """Choose the bridge from QUEUE_EVENTS_BACKEND ("auto", "postgres" or "memory")."""
+    global _bridge
+    backend = app.config.get("QUEUE_EVENTS_BACKEND", "auto")
+    with app.app_context():
+        engine = db.engine
+    if backend == "auto":
+        backend = "postgres" if engine.dialect.name == "postgresql" else "memory"
+
+    if backend == "postgres":
+        _bridge = PostgresNotifyBridge(app, engine)
+
+        @app.before_request
+        def _start_queue_events_listener():
+            # Per worker: a thread started before gunicorn forks is not
+            # inherited, and workers that never serve /events/stream still
+            # need the events to invalidate their caches
+            _bridge.start()
+    else:
+        _bridge = InMemoryBridge()
+
+
+def get_bridge():
+    return _bridge
+
+
+def add_commit_hook(callback):
+    """
+    Call callback(events) in the committing process after each commit that
+    emitted queue events (events: list of (event_type, data)).
+    """
+    _commit_hooks.append(callback)
+
+
+def subscribe(last_event_id=None, max_subscribers=None):
+    """Subscribe to queue events, starting the LISTEN thread if needed."""
+    _bridge.start()
+    return broker.subscribe(last_event_id, max_subscribers=max_subscribers)
+
+
+def emit(event_type, data, session=None):
+    """Queue an event for delivery when the current transaction commits."""
+    _bridge.send(session or db.session, event_type, data)
+
+
+def emit_queue_positions(positions, version, session=None):
+    """Event for a bulk QueuePosition write."""
+    data = {"version": version}
+    if len(positions) > MAX_EVENT_POSITIONS:
+        data["rebalanced"] = True
+    else:
+        data["positions"] = dict(positions)
+    emit("queue.positions", data, session=session)
+
+
+def _iso(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _in_queue(wo):
+    return (
+        wo.DateCompleted is None
+        and wo.Clean is None
+        and wo.Treat is None
+        and wo.Quote == "Approved"
+    )
+
+
+def _status_event(wo, status, value=None):
+    from utils.queue_positions import priority_tier
+
+    return {
+        "work_order_no": wo.WorkOrderNo,
+        "status": status,
+        "tier": priority_tier(wo.FirmRush, wo.RushOrder),
+        "in_queue": _in_queue(wo),
+        "date": _iso(value),
+    }
+
+
+def _work_order_events(session):
+    """(event type, data) for WorkOrders written by this flush."""
+    events = []
+    for wo in session.new:
+        if isinstance(wo, WorkOrder) and wo.Quote == "Approved":
+            events.append(("work_order.status", _status_event(wo, "approved")))
+
+    for wo in session.deleted:
+        if isinstance(wo, WorkOrder) and _in_queue(wo):
+            events.append(
+                ("work_order.updated", {"work_order_no": wo.WorkOrderNo, "in_queue": False})
+            )
+
+    for wo in session.dirty:
+        if not isinstance(wo, WorkOrder):
+            continue
+        state = sa_inspect(wo)
+        if not state.modified:
+            continue
+
+        # Only report a transition when the old value is known: setting an
+        # expired attribute (e.g. re-saving a form) has no deleted history
+        status = None
+        ambiguous = False
+        quote = state.attrs.Quote.history
+        if quote.added and wo.Quote == "Approved":
+            if not quote.deleted:
+                ambiguous = True
+            elif quote.deleted[0] != "Approved":
+                status = _status_event(wo, "approved")
+
+        for attr, name in _STATUS_FIELDS:
+            history = state.attrs[attr].history
+            if not (history.added and history.added[0]):
+                continue
+            if not history.deleted:
+                ambiguous = True
+            elif not history.deleted[0]:
+                status = _status_event(wo, name, history.added[0])
+                break
+
+        if status:
+            events.append(("work_order.status", status))
+            continue
+
+        changed = [a for a in _QUEUE_FIELDS if state.attrs[a].history.has_changes()]
+        was_queued = "Approved" in (quote.deleted or ())
+        if ambiguous or (changed and (_in_queue(wo) or was_queued)):
+            events.append(
+                (
+                    "work_order.updated",
+                    {"work_order_no": wo.WorkOrderNo, "in_queue": _in_queue(wo)},
+                )
+            )
+    return events
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_work_order_events(session, flush_context):
+    for event_type, data in _work_order_events(session):
+        emit(event_type, data, session=session)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _bridge.deliver(pending)
+        for callback in _commit_hooks:
+            try:
+                callback(pending)
+            except Exception as e:
+                print(f"[QUEUE EVENTS] Commit hook {callback.__name__} failed: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def format_sse(evt):
+    """Serialize one broker event for a text/event-stream response."""
+    data = json.dumps(evt["data"], separators=(",", ":"))
+    return f"id: {evt['id']}\nevent: {evt['type']}\ndata: {data}\n\n"
@@ -0,0 +1,484 @@
+"""
+Sparse (gap-based) cleaning queue positions.
+
+QueuePosition values are spaced QUEUE_POSITION_GAP apart instead of being
+dense 1..N. Placing an order between two neighbours takes the midpoint of
+their positions, so inserting a newly approved order or dragging an order
+around only writes the rows that actually moved. When two neighbours end up
+adjacent (no integer left between them) the whole queue is renumbered once
+with fresh gaps - see rebalance_queue_positions().
+
+Ordering rules (unchanged from the dense scheme):
+1. Firm Rush: DateRequired (closest first), then DateIn, then WorkOrderNo
+2. Rush: DateIn (oldest first - FIFO), then WorkOrderNo
+3. Regular: DateIn (oldest first - FIFO), then WorkOrderNo
+
+New orders are placed in front of the first order of their tier that sorts
+after them, so manual reordering of existing orders is preserved.
+
+Every position write bumps a queue version (a ``table_versions`` row named
+QUEUE_VERSION_KEY). Clients send back the version they rendered, and a
+write against a stale version fails with QueueVersionConflict instead of
+holding row locks for the whole request.
+"""
+
+from collections import namedtuple
+from datetime import date, datetime
+
+from sqlalchemy import Integer, String, and_, case, column, func, update, values
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.table_version import TableVersion
+from models.work_order import WorkOrder
+from utils.queue_events import emit_queue_positions
+
+
+# Distance between consecutive positions after a rebalance
+QUEUE_POSITION_GAP = 1024
+
+# Priority tiers, in queue order
+TIER_FIRM_RUSH = 0
+TIER_RUSH = 1
+TIER_REGULAR = 2
+
+# table_versions row holding the cleaning queue's optimistic-concurrency version
+QUEUE_VERSION_KEY = "cleaning_queue"
+
+QueueEntry = namedtuple("QueueEntry", ["work_order_no", "position", "tier", "sort_key"])
+
+
+def queue_base_filter():
+    """Incomplete work orders with approved quotes not yet cleaned/treated."""
+    return and_(
+        WorkOrder.DateCompleted.is_(None),
+        WorkOrder.Clean.is_(None),        # Exclude already cleaned orders
+        WorkOrder.Treat.is_(None),        # Exclude already treated orders
+        WorkOrder.Quote == 'Approved'
+    )
+
+
+def safe_date_sort_key(date_value):
+    """Convert date object to a sortable format - now handles proper date types"""
+    # Handle None or empty
+    if not date_value:
+        return date.max  # Put empty dates at the end
+
+    # Already a date object - return as-is
+    if isinstance(date_value, date):
+        return date_value
+
+    # Legacy string handling (for backward compatibility during migration)
+    if isinstance(date_value, str):
+        if date_value.strip() == "":
+            return date.max
+
+        # If it's already in YYYY-MM-DD format, parse it
+        if len(date_value) == 10 and date_value[4] == "-" and date_value[7] == "-":
+            try:
+                return datetime.strptime(date_value, "%Y-%m-%d").date()
+            except ValueError:
+                return date.max
+
+        # Try other formats
+        try:
+            if "/" in date_value:
+                return datetime.strptime(date_value, "%m/%d/%Y").date()
+        except ValueError:
+            pass
+
+    # Fallback
+    return date.max
+
+
+def priority_tier(firm_rush, rush_order):
+    """Map the rush flags to a tier number (lower sorts first)."""
+    if firm_rush:
+        return TIER_FIRM_RUSH
+    if rush_order:
+        return TIER_RUSH
+    return TIER_REGULAR
+
+
+def tier_sort_key(tier, date_required, date_in, work_order_no):
+    """FIFO sort key within a tier (firm rush also honours DateRequired)."""
+    if tier == TIER_FIRM_RUSH:
+        return (
+            safe_date_sort_key(date_required),
+            safe_date_sort_key(date_in),
+            work_order_no,
+        )
+    return (safe_date_sort_key(date_in), work_order_no)
+
+
+_ENTRY_COLUMNS = (
+    WorkOrder.WorkOrderNo,
+    WorkOrder.QueuePosition,
+    WorkOrder.FirmRush,
+    WorkOrder.RushOrder,
+    WorkOrder.DateRequired,
+    WorkOrder.DateIn,
+)
+
+
+def _to_entry(row):
+    work_order_no, position, firm_rush, rush_order, date_required, date_in = row
+    tier = priority_tier(firm_rush, rush_order)
+    return QueueEntry(
+        work_order_no,
+        position,
+        tier,
+        tier_sort_key(tier, date_required, date_in, work_order_no),
+    )
+
+
+def load_positioned_entries():
+    """
+    Load the positioned part of the queue as lightweight tuples.
+
+    Only the columns needed for placement are selected, so no WorkOrder
+    objects (or their eager-loaded relationships) are built.
+    """
+    rows = (
+        db.session.query(*_ENTRY_COLUMNS)
+        .filter(queue_base_filter(), WorkOrder.QueuePosition.isnot(None))
+        .order_by(WorkOrder.QueuePosition.asc(), WorkOrder.WorkOrderNo.asc())
+        .all()
+    )
+    return [_to_entry(row) for row in rows]
+
+
+def load_unassigned_entries():
+    """Load queued orders that have no position yet, in placement order."""
+    rows = (
+        db.session.query(*_ENTRY_COLUMNS)
+        .filter(queue_base_filter(), WorkOrder.QueuePosition.is_(None))
+        .all()
+    )
+    entries = [_to_entry(row) for row in rows]
+    entries.sort(key=lambda e: (e.tier, e.sort_key))
+    return entries
+
+
+def find_insert_index(entries, new_entry):
+    """
+    Index in the position-ordered entries where new_entry belongs.
+
+    That is in front of the first entry that is in a lower-priority tier, or
+    in the same tier with a later FIFO key.
+    """
+    for index, entry in enumerate(entries):
+        if entry.tier > new_entry.tier:
+            return index
+        if entry.tier == new_entry.tier and entry.sort_key > new_entry.sort_key:
+            return index
+    return len(entries)
+
+
+def position_between(before, after):
+    """
+    Pick a position strictly between two neighbours.
+
+    Args:
+        before: position of the previous entry (None at the head)
+        after: position of the next entry (None at the tail)
+
+    Returns:
+        int or None: None if there is no free integer between them
+    """
+    if after is None:
+        return (before or 0) + QUEUE_POSITION_GAP
+    low = before if before is not None else 0
+    if after - low > 1:
+        return (low + after) // 2
+    return None
+
+
+class QueueVersionConflict(Exception):
+    """The queue changed since the client loaded it."""
+
+    def __init__(self, current_version):
+        super().__init__(f"Queue version is now {current_version}")
+        self.current_version = current_version
+
+
+def get_queue_version():
+    """Current queue version (0 if the queue has never been written)."""
+    version = (
+        db.session.query(TableVersion.version)
+        .filter(TableVersion.table_name == QUEUE_VERSION_KEY)
+        .scalar()
+    )
+    return version or 0
+
+
+def bump_queue_version(expected_version=None):
+    """
+    Increment the queue version, optionally only if it still equals
+    expected_version (compare-and-swap in one UPDATE ... RETURNING).
+
+    Does not commit; on PostgreSQL the version row stays locked until the
+    caller's transaction ends, which serializes concurrent queue writes.
+
+    Returns:
+        int: the new version
+
+    Raises:
+        QueueVersionConflict: if expected_version is stale
+    """
+    stmt = (
+        update(TableVersion)
+        .where(TableVersion.table_name == QUEUE_VERSION_KEY)
+        .values(version=TableVersion.version + 1, updated_at=func.now())
+        .returning(TableVersion.version)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(TableVersion.version == expected_version)
+
+    new_version = db.session.execute(
+        stmt, execution_options={"synchronize_session": False}
+    ).scalar()
+    if new_version is not None:
+        return new_version
+
+    row_exists = (
+        db.session.query(TableVersion.table_name)
+        .filter(TableVersion.table_name == QUEUE_VERSION_KEY)
+        .first()
+    )
+    if row_exists or expected_version not in (None, 0):
+        raise QueueVersionConflict(get_queue_version())
+
+    # First write ever (the migration normally seeds this row)
+    try:
+        db.session.add(TableVersion(table_name=QUEUE_VERSION_KEY, version=1))
+        db.session.flush()
+    except IntegrityError:
+        # Another request created it first; the caller rolls back
+        raise QueueVersionConflict(1)
+    return 1
+
+
+def bulk_update_positions_statement(positions, dialect_name):
+    """
+    One UPDATE statement applying {work_order_no: position}.
+
+    PostgreSQL joins against an inline VALUES list
+    (UPDATE ... FROM (VALUES ...) AS new_positions); other databases use a
+    CASE expression over the primary key.
+    """
+    if dialect_name == "postgresql":
+        new_positions = values(
+            column("work_order_no", String),
+            column("queue_position", Integer),
+            name="new_positions",
+        ).data(list(positions.items()))
+        return (
+            update(WorkOrder)
+            .where(WorkOrder.WorkOrderNo == new_positions.c.work_order_no)
+            .values(QueuePosition=new_positions.c.queue_position)
+        )
+
+    return (
+        update(WorkOrder)
+        .where(WorkOrder.WorkOrderNo.in_(list(positions)))
+        .values(QueuePosition=case(positions, value=WorkOrder.WorkOrderNo))
+    )
+
+
+def write_queue_positions(positions, expected_version=None):
+    """
+    Apply {work_order_no: position} in a single UPDATE and bump the queue
+    version. Does not commit.
+
+    Args:
+        positions: new positions by work order number
+        expected_version: version the caller's view was based on (None skips
+            the check)
+
+    Returns:
+        int or None: the new queue version (None if nothing was written)
+
+    Raises:
+        QueueVersionConflict: if expected_version is stale
+    """
+    if not positions:
+        return None
+
+    new_version = bump_queue_version(expected_version)
+    stmt = bulk_update_positions_statement(
+        positions, db.session.get_bind().dialect.name
+    )
+    db.session.execute(stmt, execution_options={"synchronize_session": False})
+    emit_queue_positions(positions, new_version)
+    return new_version
+
+
+def rebalance_queue_positions(entries=None):
+    """
+    Renumber the positioned queue with fresh gaps, keeping the current order.
+
+    Only rows whose position changes are written. Does not commit.
+
+    Args:
+        entries: position-ordered entries (loaded if not given)
+
+    Returns:
+        list: the rebalanced entries, in queue order
+    """
+    if entries is None:
+        entries = load_positioned_entries()
+
+    rebalanced = []
+    changed = {}
+    for index, entry in enumerate(entries):
+        position = (index + 1) * QUEUE_POSITION_GAP
+        if entry.position != position:
+            changed[entry.work_order_no] = position
+        rebalanced.append(entry._replace(position=position))
+
+    write_queue_positions(changed)
+    return rebalanced
+
+
+def place_new_entries(entries, new_entries):
+    """
+    Choose positions for new entries within the positioned queue.
+
+    Args:
+        entries: position-ordered positioned entries
+        new_entries: entries without positions, sorted by (tier, sort_key)
+
+    Returns:
+        tuple: (updated position-ordered entries, {work_order_no: position},
+        rebalanced) - rebalanced is True if the queue had to be renumbered,
+        in which case the rebalance UPDATEs have already been issued.
+    """
+    entries = list(entries)
+    assigned = {}
+    rebalanced = False
+
+    for new_entry in new_entries:
+        index = find_insert_index(entries, new_entry)
+        before = entries[index - 1].position if index > 0 else None
+        after = entries[index].position if index < len(entries) else None
+        position = position_between(before, after)
+
+        if position is None:
+            # Neighbours are adjacent: renumber once and retry
+            entries = rebalance_queue_positions(entries)
+            # Rebalance rewrote everything already placed in this batch
+            assigned = {
+                e.work_order_no: e.position
+                for e in entries
+                if e.work_order_no in assigned
+            }
+            rebalanced = True
+            before = entries[index - 1].position if index > 0 else None
+            after = entries[index].position if index < len(entries) else None
+            position = position_between(before, after)
+
+        entries.insert(index, new_entry._replace(position=position))
+        assigned[new_entry.work_order_no] = position
+
+    return entries, assigned, rebalanced
+
+
+def assign_positions_to_unassigned():
+    """
+    Give every queued order without a position a slot in its tier.
+
+    Only the newly placed orders are written (plus the whole queue on the
+    rare occasion a rebalance is needed). Does not commit.
+
+    Returns:
+        int: number of orders that received a position
+    """
+    new_entries = load_unassigned_entries()
+    if not new_entries:
+        return 0
+
+    entries = load_positioned_entries()
+    _, assigned, _ = place_new_entries(entries, new_entries)
+    write_queue_positions(assigned)
+    return len(new_entries)
+
+
+def reorder_within_slots(ordered_ids, current_positions):
+    """
+    Reassign the positions a set of orders already occupies to a new order.
+
+    A drag-and-drop on one page only permutes that page's orders, so giving
+    the i-th order in the new arrangement the i-th smallest of their existing
+    positions keeps every other page untouched.
+
+    Args:
+        ordered_ids: work order numbers in their new order
+        current_positions: {work_order_no: position} for those orders
+
+    Returns:
+        dict: {work_order_no: new_position} for the orders that moved
+    """
+    slots = sorted(current_positions[wo_id] for wo_id in ordered_ids)
+    return {
+        wo_id: slot
+        for wo_id, slot in zip(ordered_ids, slots)
+        if current_positions[wo_id] != slot
+    }
+
+
+def move_queue_entry(work_order_no, target_rank, expected_version=None):
+    """
+    Move one queued order to a 1-based rank anywhere in the queue.
+
+    Only the two orders that will surround it are read (OFFSET/LIMIT on
+    QueuePosition) and only the moved row is written, so an order can be
+    sent to another page without loading the rest of the queue. A rebalance
+    happens only if its new neighbours have no gap left. Does not commit.
+
+    Args:
+        work_order_no: the order to move (must be positioned and in the queue)
+        target_rank: rank the order should have after the move
+        expected_version: queue version the client saw
+
+    Returns:
+        tuple: (new position, new queue version)
+
+    Raises:
+        QueueVersionConflict: if expected_version is stale
+    """
+    target_rank = max(1, target_rank)
+    others = (
+        db.session.query(WorkOrder.QueuePosition)
+        .filter(
+            queue_base_filter(),
+            WorkOrder.QueuePosition.isnot(None),
+            WorkOrder.WorkOrderNo != work_order_no,
+        )
+        .order_by(WorkOrder.QueuePosition.asc(), WorkOrder.WorkOrderNo.asc())
+    )
+
+    def neighbours():
+        if target_rank == 1:
+            rows = others.limit(1).all()
+            return None, rows[0][0] if rows else None
+        rows = others.offset(target_rank - 2).limit(2).all()
+        if not rows:
+            # Past the end: go to the tail
+            tail = others.order_by(None).with_entities(func.max(WorkOrder.QueuePosition)).scalar()
+            return tail, None
+        return rows[0][0], rows[1][0] if len(rows) > 1 else None
+
+    before, after = neighbours()
+    position = position_between(before, after)
+    if position is None:
+        bump_queue_version(expected_version)
+        expected_version = None
+        rebalance_queue_positions()
+        before, after = neighbours()
+        position = position_between(before, after)
+
+    new_version = write_queue_positions(
+        {work_order_no: position}, expected_version=expected_version
+    )
+    return position, new_version
@@ -1,20 +1,17 @@
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.lib import colors
 from reportlab.platypus import (
     SimpleDocTemplate,
     Paragraph,
     Spacer,
     Table,
-    TableStyle,
     KeepTogether,
     PageBreak,
 )
 from io import BytesIO
 from datetime import datetime
 from utils.helpers import safe_bool_convert, map_bool_display
+from utils.pdf_styles import PARAGRAPH_STYLES, TABLE_STYLES
 
 
 def safe_paragraph(text, style, field_name=None):
@@ -45,153 +42,7 @@ class RepairOrderPDF:
         self.company_info = company_info or {
             "name": "Awning Cleaning Industries - In House Repair Work Order"
         }
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self):
-        # Company name style - modern and prominent
-        self.styles.add(
-            ParagraphStyle(
-                name="CompanyName",
-                parent=self.styles["Normal"],
-                fontSize=12,
-                spaceAfter=0.1 * inch,
-                alignment=TA_CENTER,
-                fontName="Helvetica-Bold",
-            )
-        )
-
-        # Repair Order Number - extra prominent
-        self.styles.add(
-            ParagraphStyle(
-                name="RONumber",
-                parent=self.styles["Normal"],
-                fontSize=16,
-                fontName="Helvetica-Bold",
-                alignment=TA_RIGHT,
-                textColor=colors.HexColor("#d32f2f"),  # Strong red
-                borderWidth=2,
-                borderColor=colors.HexColor("#d32f2f"),
-                borderPadding=6,
-            )
-        )
-
-        # Field labels - refined and consistent
-        self.styles.add(
-            ParagraphStyle(
-                name="SmallLabel",
-                parent=self.styles["Normal"],
-                fontSize=8,
-                textColor=colors.HexColor("#424242"),  # Dark grey
-                fontName="Helvetica",
-                spaceBefore=1,
-                spaceAfter=1,
-            )
-        )
-
-        # Important labels (like Rush, Repairs) - standout
-        self.styles.add(
-            ParagraphStyle(
-                name="ImportantLabel",
-                parent=self.styles["Normal"],
-                fontSize=8,
-                textColor=colors.HexColor("#d32f2f"),  # Red
-                fontName="Helvetica-Bold",
-                spaceBefore=1,
-                spaceAfter=1,
-            )
-        )
-
-        # Values - clean and readable
-        self.styles.add(
-            ParagraphStyle(
-                name="SmallValue",
-                parent=self.styles["Normal"],
-                fontSize=9,
-                textColor=colors.HexColor("#212121"),  # Rich black
-                fontName="Helvetica",
-                spaceBefore=1,
-                spaceAfter=1,
-            )
-        )
-
-        # Values - bold and prominent for source info
-        self.styles.add(
-            ParagraphStyle(
-                name="SmallValueSource",
-                parent=self.styles["Normal"],
-                fontSize=11,  # slightly larger than default SmallValue
-                textColor=colors.HexColor("#000000"),  # pure black for emphasis
-                fontName="Helvetica-Bold",  # make it bold
-                spaceBefore=1,
-                spaceAfter=1,
-            )
-        )
-
-        # Table headers - professional and clean
-        self.styles.add(
-            ParagraphStyle(
-                name="TableHeader",
-                parent=self.styles["Normal"],
-                fontSize=9,
-                textColor=colors.black,
-                fontName="Helvetica-Bold",
-                alignment=TA_CENTER,
-                spaceBefore=2,
-                spaceAfter=2,
-            )
-        )
-
-        # Table cells - alternating friendly
-        self.styles.add(
-            ParagraphStyle(
-                name="TableCell",
-                parent=self.styles["Normal"],
-                fontSize=8,
-                textColor=colors.HexColor("#424242"),
-                fontName="Helvetica",
-                alignment=TA_CENTER,
-                spaceBefore=1,
-                spaceAfter=1,
-            )
-        )
-
-        # Rush highlighting - urgent red
-        self.styles.add(
-            ParagraphStyle(
-                name="RushHighlight",
-                parent=self.styles["SmallValue"],
-                textColor=colors.HexColor("#d32f2f"),
-                fontName="Helvetica-Bold",
-                borderWidth=1,
-                borderColor=colors.HexColor("#ffcdd2"),  # Light red border
-                borderPadding=2,
-            )
-        )
-
-        # Condensed spacing for tight layouts
-        self.styles.add(
-            ParagraphStyle(
-                name="Condensed",
-                parent=self.styles["SmallValue"],
-                spaceBefore=0.5,
-                spaceAfter=0.5,
-                fontSize=8,
-            )
-        )
-
-        # Footer text - subtle and professional
-        self.styles.add(
-            ParagraphStyle(
-                name="Footer",
-                parent=self.styles["Normal"],
-                fontSize=7,
-                textColor=colors.HexColor("#212121"),  # Medium grey
-                fontName="Helvetica",
-                alignment=TA_CENTER,
-            )
-        )
-
+        self.styles = PARAGRAPH_STYLES
 
     def _format_date(self, date_str):
         if not date_str:
@@ -250,45 +101,12 @@ class RepairOrderPDF:
             [
                 safe_paragraph(self.company_info["name"], self.styles["CompanyName"]),
                 "",
-                safe_paragraph(
-                    ro_number,
-                    ParagraphStyle(
-                        name="RONumber",
-                        parent=self.styles["Normal"],
-                        fontSize=14,
-                        fontName="Helvetica-Bold",
-                        alignment=TA_RIGHT,
-                    ),
-                ),
+                safe_paragraph(ro_number, self.styles["HeaderOrderNumber"]),
             ]
         ]
 
         header_table = Table(header_data, colWidths=[4 * inch, 1 * inch, 2 * inch])
-        header_table.setStyle(
-            TableStyle(
-                [
-                    (
-                        "BACKGROUND",
-                        (0, 0),
-                        (-1, 0),
-                        colors.lightgreen,
-                    ),  # Blue background
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 0), (0, 0), "CENTER"),
-                    ("ALIGN", (2, 0), (2, 0), "RIGHT"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    (
-                        "LINEBELOW",
-                        (0, 0),
-                        (-1, 0),
-                        1,
-                        colors.black,
-                    ),  # Horizontal line below
-                ]
-            )
-        )
+        header_table.setStyle(TABLE_STYLES["RepairOrderHeader"])
 
         return [header_table, Spacer(1, 0.1 * inch)]
 
@@ -324,22 +142,7 @@ class RepairOrderPDF:
 
         # Use a Table with nested flowables in cells
         rush_table = Table(table_data, colWidths=[2 * inch, 2 * inch, 2 * inch])
-        rush_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                    ("TOPPADDING", (0, 0), (-1, -1), 4),
-                    (
-                        "LINEBELOW",
-                        (0, 0),
-                        (-1, 0),
-                        1,
-                        colors.black,
-                    ),  # horizontal line under the row
-                ]
-            )
-        )
+        rush_table.setStyle(TABLE_STYLES["RushRow"])
 
         return [rush_table, Spacer(1, 0.1 * inch)]
 
@@ -487,15 +290,7 @@ class RepairOrderPDF:
         header_table = Table(
             [[left_table, right_table]], colWidths=[3.2 * inch, 3.2 * inch]
         )
-        header_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 4),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-                ]
-            )
-        )
+        header_table.setStyle(TABLE_STYLES["TopSection"])
 
         return [header_table, Spacer(1, 0.15 * inch)]
 
@@ -564,38 +359,7 @@ class RepairOrderPDF:
         ]
 
         items_table = Table(rows, colWidths=col_widths, repeatRows=1)
-        items_table.setStyle(
-            TableStyle(
-                [
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 1), (0, -1), "RIGHT"),  # Qty right
-                    ("ALIGN", (5, 1), (5, -1), "RIGHT"),  # Size/Wgt right
-                    ("ALIGN", (6, 1), (6, -1), "RIGHT"),  # Price right
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),  # header
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                    ("LINEABOVE", (0, 0), (-1, 0), 1, colors.black),
-                    ("LINEBELOW", (0, 0), (-1, 0), 1, colors.black),
-                    (
-                        "GRID",
-                        (0, 1),
-                        (-1, -1),
-                        0.25,
-                        colors.grey,
-                    ),  # light grid for body
-                    (
-                        "ROWBACKGROUNDS",
-                        (0, 1),
-                        (-1, -1),
-                        [colors.white, colors.whitesmoke],
-                    ),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 2),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 2),
-                    ("TOPPADDING", (0, 0), (-1, -1), 2),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-                ]
-            )
-        )
+        items_table.setStyle(TABLE_STYLES["Items"])
 
         return [items_table, Spacer(1, 0.2 * inch)]
 
@@ -609,20 +373,12 @@ class RepairOrderPDF:
         if special_instr_text:
             special_instr_text = special_instr_text.replace("\n", "<br/>")
 
-        # Create a custom style for special instructions without extra spacing
-        special_instr_style = ParagraphStyle(
-            name="SpecialInstrValue",
-            parent=self.styles["SmallValue"],
-            spaceBefore=0,
-            spaceAfter=0,
-        )
-
         # Create a table for special instructions with a reasonable minimum height
         # If the text is longer, ReportLab will automatically flow to a second page
         special_instructions = [
             [
                 safe_paragraph("Special<br/>Instructions", self.styles["SmallLabel"]),
-                safe_paragraph(special_instr_text, special_instr_style),
+                safe_paragraph(special_instr_text, self.styles["SpecialInstrValue"]),
             ]
         ]
 
@@ -631,19 +387,7 @@ class RepairOrderPDF:
             colWidths=[1.0 * inch, 5.5 * inch],
             rowHeights=[1.2 * inch],  # Increased height to accommodate padding
         )
-        special_instructions_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                    ("TOPPADDING", (0, 0), (-1, -1), 6),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-                ]
-            )
-        )
+        special_instructions_table.setStyle(TABLE_STYLES["SpecialInstructions"])
 
         # --- Clean section (repair-specific fields) ---
         clean_footer = [
@@ -675,17 +419,7 @@ class RepairOrderPDF:
                 1.0 * inch,
             ],
         )
-        clean_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 2),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 2),
-                ]
-            )
-        )
+        clean_table.setStyle(TABLE_STYLES["FooterRow"])
 
         # --- Status and completion section ---
         status_footer = [
@@ -706,17 +440,7 @@ class RepairOrderPDF:
                 1.5 * inch,
             ],
         )
-        status_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 2),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 2),
-                ]
-            )
-        )
+        status_table.setStyle(TABLE_STYLES["FooterRow"])
 
         # --- Completion section ---
         completion_footer = [
@@ -750,17 +474,7 @@ class RepairOrderPDF:
                 1.0 * inch,
             ],
         )
-        completion_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 2),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 2),
-                ]
-            )
-        )
+        completion_table.setStyle(TABLE_STYLES["FooterRow"])
 
         # --- Material List section ---
         material_list = [
@@ -775,16 +489,7 @@ class RepairOrderPDF:
             colWidths=[1.0 * inch, 5.5 * inch],
             rowHeights=[0.3 * inch],
         )
-        material_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 8),
-                    ("LEFTPADDING", (1, 0), (1, -1), 2),
-                    ("RIGHTPADDING", (1, 0), (1, -1), 2),
-                ]
-            )
-        )
+        material_table.setStyle(TABLE_STYLES["MaterialList"])
 
         # --- Checkbox section ---
         bottom_footer = [
@@ -810,17 +515,7 @@ class RepairOrderPDF:
             ],
             rowHeights=0.25 * inch,
         )
-        checkbox_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (1, 0), (-1, -1), "CENTER"),
-                    ("BOX", (1, 0), (1, 0), 1, colors.black),
-                    ("BOX", (3, 0), (3, 0), 1, colors.black),
-                    ("BOX", (5, 0), (5, 0), 1, colors.black),
-                ]
-            )
-        )
+        checkbox_table.setStyle(TABLE_STYLES["Checkboxes"])
 
         return [
             Spacer(1, 0.2 * inch),
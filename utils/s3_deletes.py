@@ -0,0 +1,243 @@
+"""
+Batched S3 deletes for removed orders and files.
+
+Deleting a work order used to call delete_object once per file and once per
+thumbnail, inside the request and before the DB commit: an order with 40
+photos made 80 S3 round trips, and a failed commit left rows pointing at
+objects that were already gone (or a failed delete left orphans in S3).
+
+The delete routes now:
+
+1. release each file row's objects (utils.file_upload.release_file_keys(),
+   which keeps content still shared through utils/file_store.py) and queue
+   the keys with queue_s3_deletes(). The outbox rows are added to the
+   current session, so they commit or roll back with the rows being deleted;
+2. commit;
+3. call schedule_s3_delete_drain(), which removes due keys with
+   delete_objects, up to S3_DELETE_BATCH_SIZE (1000, the S3 limit) keys per
+   call, on a background thread (S3_DELETE_WORKERS; 0 runs it inline).
+
+Keys S3 fails to delete stay in ``s3_delete_outbox`` with their error and
+are retried with exponential backoff by later drains, or by
+scripts/drain_s3_deletes.py from cron.
+
+A key ending in "/" is a prefix: the drain lists it and deletes every object
+under it (the rendered PDF cache of an edited order, utils/pdf_cache.py).
+
+Usage:
+    for file_obj in order.files:
+        queue_s3_deletes(release_file_keys(file_obj))
+    db.session.delete(order)
+    db.session.commit()
+    schedule_s3_delete_drain()
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from extensions import db
+from models.s3_delete_outbox import S3DeleteOutbox
+
+
+# delete_objects accepts at most 1000 keys per request
+S3_DELETE_BATCH_SIZE = 1000
+
+# Retry backoff: 30 s, 1 min, 2 min, ... capped at an hour
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+_executor = None
+_executor_lock = threading.Lock()
+_drain_state = {"scheduled": False, "rerun": False}
+
+
+def _pool():
+    """The S3 delete worker pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config["S3_DELETE_WORKERS"]
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="s3-delete"
+            )
+            print(f"[S3 DELETES] Started delete pool with {workers} workers")
+        return _executor
+
+
+def _reset_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+        _drain_state.update(scheduled=False, rerun=False)
+
+
+def queue_s3_deletes(keys, session=None):
+    """
+    Queue S3 keys for deletion in the current DB transaction (no commit).
+
+    Returns:
+        int: number of keys queued
+    """
+    session = session or db.session
+    keys = [key for key in dict.fromkeys(keys) if key]
+    for key in keys:
+        session.add(S3DeleteOutbox(s3_key=key))
+    return len(keys)
+
+
+def retry_delay(attempts):
+    """Backoff before the next try of a key that failed `attempts` times."""
+    return timedelta(
+        seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    )
+
+
+def _delete_batch(rows):
+    """
+    Delete one batch of outbox rows' keys with as few delete_objects calls
+    as possible (one, unless prefixes expand past S3_DELETE_BATCH_SIZE).
+
+    Returns:
+        dict: outbox s3_key -> error message for keys that were not deleted
+    """
+    from .file_upload import AWS_S3_BUCKET, s3_client
+
+    errors = {}
+    # S3 object key -> the outbox key it came from (itself, or its prefix)
+    owners = {}
+    for key in dict.fromkeys(row.s3_key for row in rows):
+        if not key.endswith("/"):
+            owners.setdefault(key, key)
+            continue
+        try:
+            listing = s3_client.list_objects_v2(Bucket=AWS_S3_BUCKET, Prefix=key)
+        except Exception as e:
+            errors[key] = str(e)
+            continue
+        for obj in listing.get("Contents", []):
+            owners.setdefault(obj["Key"], key)
+        if listing.get("IsTruncated"):
+            # Delete this page now; the retry lists what is left
+            errors[key] = "More objects under prefix"
+
+    objects = list(owners)
+    for start in range(0, len(objects), S3_DELETE_BATCH_SIZE):
+        chunk = objects[start : start + S3_DELETE_BATCH_SIZE]
+        try:
+            response = s3_client.delete_objects(
+                Bucket=AWS_S3_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+        except Exception as e:
+            for key in chunk:
+                errors.setdefault(owners[key], str(e))
+            continue
+        # Quiet mode only reports failures; a missing key counts as deleted
+        for error in response.get("Errors", []):
+            owner = owners.get(error["Key"], error["Key"])
+            errors.setdefault(owner, f"{error.get('Code')}: {error.get('Message')}")
+    return errors
+
+
+def drain_s3_deletes(app=None, limit=None):
+    """
+    Delete every due key in the outbox, S3_DELETE_BATCH_SIZE per request.
+
+    Runs in its own app context and commits after each batch. Failed keys
+    stay queued with their error and a later next_attempt_at.
+
+    Args:
+        app: Flask app (defaults to current_app)
+        limit: stop after this many keys (None: all due keys)
+
+    Returns:
+        (deleted, failed): key counts
+    """
+    app = app or current_app._get_current_object()
+    deleted = failed = 0
+
+    with app.app_context():
+        try:
+            while limit is None or deleted + failed < limit:
+                size = S3_DELETE_BATCH_SIZE
+                if limit is not None:
+                    size = min(size, limit - deleted - failed)
+                now = datetime.utcnow()
+                rows = (
+                    S3DeleteOutbox.query.filter(S3DeleteOutbox.next_attempt_at <= now)
+                    .order_by(S3DeleteOutbox.id)
+                    .limit(size)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                )
+                if not rows:
+                    break
+
+                errors = _delete_batch(rows)
+                for row in rows:
+                    error = errors.get(row.s3_key)
+                    if error is None:
+                        db.session.delete(row)
+                    else:
+                        row.attempts += 1
+                        row.last_error = error
+                        row.next_attempt_at = now + retry_delay(row.attempts)
+                db.session.commit()
+                batch_failed = sum(1 for row in rows if row.s3_key in errors)
+                deleted += len(rows) - batch_failed
+                failed += batch_failed
+                print(
+                    f"[S3 DELETES] Deleted {len(rows) - batch_failed} of "
+                    f"{len(rows)} keys in one request"
+                )
+        except Exception as e:
+            db.session.rollback()
+            print(f"[S3 DELETES] Drain failed: {e}")
+        finally:
+            db.session.remove()
+
+    if failed:
+        print(f"[S3 DELETES] {failed} keys failed; will retry")
+    return deleted, failed
+
+
+def _drain_loop(app):
+    """Drain, again if more deletes were scheduled while this one ran."""
+    while True:
+        try:
+            drain_s3_deletes(app)
+        finally:
+            with _executor_lock:
+                if not _drain_state["rerun"]:
+                    _drain_state["scheduled"] = False
+                    return
+                _drain_state["rerun"] = False
+
+
+def schedule_s3_delete_drain():
+    """
+    Drain the outbox after a commit that queued deletes.
+
+    At most one drain runs at a time; a request that queues deletes while
+    one is running makes it go around once more instead of starting another.
+
+    Returns:
+        Future, or None when the drain ran inline or was already running
+    """
+    app = current_app._get_current_object()
+    if app.config["S3_DELETE_WORKERS"] <= 0:
+        drain_s3_deletes(app)
+        return None
+
+    executor = _pool()
+    with _executor_lock:
+        if _drain_state["scheduled"]:
+            _drain_state["rerun"] = True
+            return None
+        _drain_state["scheduled"] = True
+    return executor.submit(_drain_loop, app)
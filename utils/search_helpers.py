@@ -0,0 +1,110 @@
+"""
+Text search over work orders, customers, work order items and inventory.
+
+Each searchable model lists its search columns in ``__search_columns__``
+(first column = the record's key). Searches match a single "search
+document" expression, the columns joined with " | ", instead of an OR of
+ILIKEs over every column:
+
+- PostgreSQL: ``document ILIKE '%term%'`` is served by a pg_trgm GIN index
+  on the same expression (search_index(), migration add_search_trgm_indexes),
+  and results are ranked with ``word_similarity()``.
+- SQLite (tests/dev): the same expression is matched with LIKE, and ranked
+  by exact key match and prefix match only.
+
+Terms are matched literally (% and _ are escaped). Terms shorter than three
+characters cannot use a trigram index and fall back to a scan.
+
+Usage:
+    query = apply_search(Customer.query, Customer, request.args.get("search"))
+    results = apply_search(WorkOrder.query, WorkOrder, term, ranked=True).limit(10).all()
+"""
+
+from sqlalchemy import case, func, inspect as sa_inspect, literal_column
+
+from extensions import db
+
+
+SEARCH_SEPARATOR = " | "
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_columns(model):
+    return [getattr(model, name) for name in model.__search_columns__]
+
+
+def search_document(model, columns=None):
+    """The search document expression for model (see module docstring)."""
+    document = None
+    for column in columns or search_columns(model):
+        part = func.coalesce(column, literal_column("''"))
+        if document is None:
+            document = part
+        else:
+            document = document.concat(literal_column(f"'{SEARCH_SEPARATOR}'")).concat(part)
+    return document
+
+
+def search_index(model, name):
+    """Trigram GIN index on model's search document (PostgreSQL only)."""
+    # Built from plain table columns; the label (needed to name the operator
+    # class) hides the table from Index, so it is passed explicitly.
+    columns = [sa_inspect(model).columns[name] for name in model.__search_columns__]
+    return db.Index(
+        name,
+        search_document(model, columns).label("search_document"),
+        postgresql_using="gin",
+        postgresql_ops={"search_document": "gin_trgm_ops"},
+        _table=model.__table__,
+    ).ddl_if(dialect="postgresql")
+
+
+def search_filter(model, term):
+    """
+    WHERE clause matching records that contain term.
+
+    Returns:
+        clause or None: None for a blank term
+    """
+    term = (term or "").strip()
+    if not term:
+        return None
+    return search_document(model).ilike(f"%{_escape_like(term)}%", escape="\\")
+
+
+def search_rank(model, term):
+    """Relevance of a record for term (higher is better)."""
+    term = (term or "").strip()
+    key = search_columns(model)[0]
+    rank = case((func.lower(key) == term.lower(), 1.0), else_=0.0)
+
+    if db.engine.dialect.name == "postgresql":
+        return rank + func.word_similarity(term, search_document(model))
+
+    prefix = search_document(model).ilike(f"{_escape_like(term)}%", escape="\\")
+    return rank + case((prefix, 0.5), else_=0.0)
+
+
+def apply_search(query, model, term, ranked=False):
+    """
+    Filter query to records matching term, optionally best matches first.
+
+    Args:
+        query: SQLAlchemy query over model
+        model: a model with __search_columns__
+        term: search text (blank returns the query unchanged)
+        ranked: order by relevance (put this before any other ORDER BY)
+
+    Returns:
+        Modified query
+    """
+    criterion = search_filter(model, term)
+    if criterion is None:
+        return query
+    query = query.filter(criterion)
+    if ranked:
+        query = query.order_by(search_rank(model, term).desc())
+    return query
@@ -1,3 +1,4 @@
+import codecs
 import os
 import boto3
 from PIL import Image, ImageDraw, ImageFont
@@ -12,6 +13,18 @@ import mimetypes
 # Thumbnail settings
 THUMBNAIL_SIZE = (200, 200)
 THUMBNAIL_QUALITY = 85
+TEXT_PREVIEW_BYTES = 2048
+
+
+def _source(file_content):
+    """Readable input for a parser: a path as-is, bytes wrapped in BytesIO.
+
+    The generators accept either the file's bytes or the path of a (spooled)
+    copy, so large uploads never have to be read into memory.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        return BytesIO(file_content)
+    return file_content
 
 
 def get_file_type(filename):
@@ -91,26 +104,44 @@ def create_icon_thumbnail(icon_text, bg_color, text_color=(255, 255, 255)):
     return img
 
 
+def pixmap_to_image(pix):
+    """Wrap an RGBA PyMuPDF Pixmap as a PIL Image without copying its pixels.
+
+    The image shares the pixmap's buffer, so keep the pixmap alive while the
+    image is used.
+    """
+    return Image.frombuffer(
+        "RGBA", (pix.width, pix.height), pix.samples_mv, "raw", "RGBA", pix.stride, 1
+    )
+
+
 def generate_pdf_thumbnail(file_content):
     """Generate thumbnail from PDF first page"""
     try:
-        pdf_document = fitz.open(stream=file_content, filetype="pdf")
+        if isinstance(file_content, (bytes, bytearray)):
+            pdf_document = fitz.open(stream=file_content, filetype="pdf")
+        else:
+            pdf_document = fitz.open(file_content, filetype="pdf")
         if len(pdf_document) > 0:
             page = pdf_document[0]
-            # Render page to image
-            mat = fitz.Matrix(1.0, 1.0)  # zoom factor
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-
-            img = Image.open(BytesIO(img_data))
+            # Render straight at thumbnail size instead of at 100% then
+            # through PNG bytes and a resize
+            zoom = min(
+                THUMBNAIL_SIZE[0] / page.rect.width,
+                THUMBNAIL_SIZE[1] / page.rect.height,
+            )
+            # RGBA so the pixmap buffer can be shared (PIL has no 3-byte RGB)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=True)
+            img = pixmap_to_image(pix)
+            # Rounding can leave a pixel over
             img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
 
             # Create a new image with white background
             thumbnail = Image.new("RGB", THUMBNAIL_SIZE, (255, 255, 255))
-            # Center the image
+            # Center the image (transparent page background becomes white)
             x = (THUMBNAIL_SIZE[0] - img.width) // 2
             y = (THUMBNAIL_SIZE[1] - img.height) // 2
-            thumbnail.paste(img, (x, y))
+            thumbnail.paste(img, (x, y), img)
 
             pdf_document.close()
             return thumbnail
@@ -123,7 +154,7 @@ def generate_pdf_thumbnail(file_content):
 def generate_docx_thumbnail(file_content):
     """Generate thumbnail from DOCX content"""
     try:
-        doc = Document(BytesIO(file_content))
+        doc = Document(_source(file_content))
         text_content = ""
 
         for paragraph in doc.paragraphs[:10]:  # First 10 paragraphs
@@ -146,11 +177,12 @@ def generate_excel_thumbnail(file_content, filename):
     """Generate thumbnail from Excel/CSV content"""
     try:
         if filename.endswith(".csv"):
-            df = pd.read_csv(BytesIO(file_content), nrows=10)
+            df = pd.read_csv(_source(file_content), nrows=10)
             title = "CSV File"
             bg_color = (40, 167, 69)
         else:
-            wb = load_workbook(BytesIO(file_content))
+            # read_only streams the sheet instead of loading the whole workbook
+            wb = load_workbook(_source(file_content), read_only=True)
             ws = wb.active
 
             # Get first few rows and columns
@@ -158,6 +190,7 @@ def generate_excel_thumbnail(file_content, filename):
             for row in ws.iter_rows(max_row=6, max_col=3, values_only=True):
                 row_data = [str(cell) if cell is not None else "" for cell in row]
                 data.append(" | ".join(row_data))
+            wb.close()
 
             text_content = "\n".join(data)
             title = "Excel File"
@@ -179,7 +212,13 @@ def generate_excel_thumbnail(file_content, filename):
 def generate_text_thumbnail(file_content):
     """Generate thumbnail from text file"""
     try:
-        text = file_content.decode("utf-8")[:500]  # First 500 characters
+        if isinstance(file_content, (bytes, bytearray)):
+            head = bytes(file_content[:TEXT_PREVIEW_BYTES])
+        else:
+            with open(file_content, "rb") as f:
+                head = f.read(TEXT_PREVIEW_BYTES)
+        # Incremental decode: a character cut at the end of head is not an error
+        text = codecs.getincrementaldecoder("utf-8")().decode(head)[:500]  # First 500 characters
         return create_text_thumbnail(
             text, "Text File", (108, 117, 125), (255, 255, 255)
         )
@@ -192,18 +231,26 @@ def generate_text_thumbnail(file_content):
 def generate_image_thumbnail(file_content):
     """Generate thumbnail from image file"""
     try:
-        img = Image.open(BytesIO(file_content))
-        # Convert to RGB if necessary
+        img = Image.open(_source(file_content))
+        # JPEG: have the decoder scale down (by up to 1/8) instead of
+        # decoding every pixel of a phone photo
+        if img.format == "JPEG":
+            img.draft("RGB", THUMBNAIL_SIZE)
+
+        # Flatten transparency first: resizing RGBA is slower than pasting
         if img.mode in ("RGBA", "LA", "P"):
             background = Image.new("RGB", img.size, (255, 255, 255))
             if img.mode == "P":
                 img = img.convert("RGBA")
             background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
             img = background
-        elif img.mode != "RGB":
+        elif img.mode not in ("RGB", "L"):
             img = img.convert("RGB")
 
+        # Grayscale is converted after the resize, on the small image
         img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
 
         # Create a new image with white background and center the thumbnail
         thumbnail = Image.new("RGB", THUMBNAIL_SIZE, (255, 255, 255))
@@ -219,7 +266,10 @@ def generate_image_thumbnail(file_content):
 
 
 def generate_thumbnail(file_content, filename):
-    """Main function to generate thumbnail based on file type"""
+    """Main function to generate thumbnail based on file type
+
+    file_content is the file's bytes, or the path of a copy of the file.
+    """
     file_type = get_file_type(filename)
 
     if file_type == "image":
@@ -0,0 +1,184 @@
+"""
+Background thumbnail generation for uploaded order files.
+
+Rasterizing a PDF page, loading a workbook or resizing a photo takes up to
+seconds per file, so deferred uploads (save_order_file_generic(...,
+defer_s3_upload=True)) no longer make thumbnails inside the request.
+commit_deferred_uploads() runs after the DB commit. Once a file is in S3,
+it queues a job here that:
+
+1. generates the thumbnail from the spooled upload (then removes it);
+2. uploads it next to the file (``<order>/thumbnails/<name>_thumb.jpg``);
+3. sets the file row's ``thumbnail_path``, and makes it the thumbnail of
+   the row's stored content so later uploads of the same file reuse it
+   (utils/file_store.py).
+
+Until then ``thumbnail_path`` is NULL. The detail pages show a placeholder
+for recent files (thumbnail_pending()) and poll the thumbnail status
+endpoint.
+
+Jobs run on a shared pool of THUMBNAIL_WORKERS threads. At most
+THUMBNAIL_QUEUE_SIZE jobs are queued or running; past that the job runs in
+the calling thread, as before. THUMBNAIL_WORKERS = 0 always runs jobs inline
+(tests).
+
+Usage:
+    enqueue_thumbnail(file_obj, spooled_path, thumbnail_key)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from flask import current_app
+
+from extensions import db
+from .file_store import record_thumbnail
+from .thumbnail_generator import THUMBNAIL_QUALITY, generate_thumbnail
+
+
+# Files without a thumbnail this long after upload are shown with their icon
+THUMBNAIL_PENDING_SECONDS = 300
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    """The shared thumbnail pool and its queue slots, started on first use."""
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config["THUMBNAIL_WORKERS"]
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="thumbnail"
+            )
+            _slots = threading.BoundedSemaphore(
+                current_app.config["THUMBNAIL_QUEUE_SIZE"]
+            )
+            print(f"[THUMBNAILS] Started thumbnail pool with {workers} workers")
+        return _executor, _slots
+
+
+def _reset_pool():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+        _slots = None
+
+
+def thumbnail_s3_path(thumbnail_key):
+    from .file_upload import AWS_S3_BUCKET
+
+    return f"s3://{AWS_S3_BUCKET}/{thumbnail_key}"
+
+
+def _run_job(
+    app, model_class, file_id, filename, spooled_path, thumbnail_key, content_sha256=None
+):
+    """Generate, upload and record one thumbnail."""
+    from .file_upload import AWS_S3_BUCKET, s3_client
+
+    try:
+        try:
+            # Generators read what they need from the file, not all of it
+            thumbnail = generate_thumbnail(spooled_path, filename)
+        finally:
+            os.remove(spooled_path)
+        buffer = BytesIO()
+        thumbnail.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY)
+        buffer.seek(0)
+        s3_client.upload_fileobj(
+            buffer,
+            AWS_S3_BUCKET,
+            thumbnail_key,
+            ExtraArgs={
+                "ContentType": "image/jpeg",
+                "CacheControl": "max-age=31536000",  # 1 year cache
+            },
+        )
+    except Exception as e:
+        # Not critical: the file keeps its type icon
+        print(f"[THUMBNAILS] Failed for {filename}: {e}")
+        return False
+
+    with app.app_context():
+        try:
+            updated = (
+                db.session.query(model_class)
+                .filter(model_class.id == file_id)
+                .update(
+                    {"thumbnail_path": thumbnail_s3_path(thumbnail_key)},
+                    synchronize_session=False,
+                )
+            )
+            if updated and content_sha256:
+                record_thumbnail(content_sha256, thumbnail_key)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[THUMBNAILS] Could not record thumbnail for {filename}: {e}")
+            updated = 0
+        finally:
+            db.session.remove()
+
+    if not updated:
+        # The file row was deleted meanwhile; don't leave the thumbnail behind
+        try:
+            s3_client.delete_object(Bucket=AWS_S3_BUCKET, Key=thumbnail_key)
+        except Exception as e:
+            print(f"[THUMBNAILS] Could not delete orphaned {thumbnail_key}: {e}")
+        return False
+    print(f"[THUMBNAILS] Generated {thumbnail_key}")
+    return True
+
+
+def enqueue_thumbnail(file_obj, spooled_path, thumbnail_key):
+    """
+    Queue thumbnail generation for a committed, uploaded file row.
+
+    Args:
+        file_obj: WorkOrderFile / RepairOrderFile (committed, so it has an id)
+        spooled_path: temp file with the upload; the job removes it
+        thumbnail_key: S3 key for the thumbnail
+
+    Returns:
+        Future, or None when the job ran in the calling thread
+    """
+    app = current_app._get_current_object()
+    job = (
+        app,
+        type(file_obj),
+        file_obj.id,
+        file_obj.filename,
+        spooled_path,
+        thumbnail_key,
+        getattr(file_obj, "content_sha256", None),
+    )
+
+    if app.config["THUMBNAIL_WORKERS"] <= 0:
+        _run_job(*job)
+        return None
+
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        print(f"[THUMBNAILS] Queue full, generating {file_obj.filename} inline")
+        _run_job(*job)
+        return None
+
+    future = executor.submit(_run_job, *job)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def thumbnail_pending(file_obj):
+    """True while a recently uploaded file may still get its thumbnail."""
+    if file_obj.thumbnail_path or not file_obj.uploaded_at:
+        return False
+    age = datetime.utcnow() - file_obj.uploaded_at
+    return age < timedelta(seconds=THUMBNAIL_PENDING_SECONDS)
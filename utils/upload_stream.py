@@ -0,0 +1,109 @@
+"""
+Streaming helpers for uploaded order files.
+
+An upload is read once, in chunks, and never held whole in memory:
+
+- HashingReader wraps the request file. Everything read through it (by
+  boto3's upload_fileobj(), a copy to disk, ...) goes into a SHA-256, and
+  optionally into a ThumbnailTee.
+- ThumbnailTee keeps only what thumbnailing needs. For text and CSV files
+  that is the first THUMBNAIL_PREFIX_BYTES, kept in memory. PDF, DOCX, XLSX
+  and images need the whole file (their index or image data runs to the
+  end), so it is teed to a temp file on disk.
+
+HashingReader has no seek()/tell(), so boto3 treats it as a non-seekable
+stream. It buffers at most one multipart chunk per concurrent part
+(S3_MULTIPART_CHUNK_MB x S3_MULTIPART_CONCURRENCY), and a single chunk for
+files below the multipart threshold. Memory per upload is therefore bounded
+whatever MAX_UPLOAD_SIZE_MB is.
+
+Usage:
+    tee = ThumbnailTee(filename)
+    reader = HashingReader(file, tee)
+    s3_client.upload_fileobj(reader, bucket, key, Config=s3_transfer_config())
+    try:
+        thumbnail = generate_thumbnail(tee.source(), filename)
+    finally:
+        tee.close()
+"""
+
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Enough for the text/CSV previews (8 lines / 10 rows)
+THUMBNAIL_PREFIX_BYTES = 64 * 1024
+PREFIX_EXTENSIONS = {"txt", "csv"}
+
+
+class ThumbnailTee:
+    """The part of an upload that thumbnail generation will read."""
+
+    def __init__(self, filename):
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        self.prefix_only = extension in PREFIX_EXTENSIONS
+        self.path = None
+        if self.prefix_only:
+            self._out = BytesIO()
+        else:
+            fd, self.path = tempfile.mkstemp(prefix="thumb_src_")
+            self._out = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        if self.prefix_only:
+            room = THUMBNAIL_PREFIX_BYTES - self._out.tell()
+            if room > 0:
+                self._out.write(data[:room])
+        else:
+            self._out.write(data)
+
+    def source(self):
+        """Input for generate_thumbnail(): prefix bytes or a file path."""
+        if self.prefix_only:
+            return self._out.getvalue()
+        self._out.flush()
+        return self.path
+
+    def close(self):
+        self._out.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+class HashingReader:
+    """Read-only wrapper that hashes (and optionally tees) what is read."""
+
+    def __init__(self, stream, tee=None):
+        self._stream = stream
+        self._tee = tee
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        if data:
+            self._hash.update(data)
+            self.size += len(data)
+            if self._tee is not None:
+                self._tee.write(data)
+        return data
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def copy_stream(reader, out, chunk_size=READ_CHUNK_SIZE):
+    """Copy a reader to an open file in chunks."""
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        out.write(chunk)